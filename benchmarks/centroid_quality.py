@@ -10,11 +10,14 @@ https://dl.acm.org/doi/pdf/10.1145/3583133.3590726.
 Usage:
     python benchmarks.py
 
-This script will generate centroids using 2 techniques, CVT and random
-generation. These centroids will then be evaluated by the get_score()
-function which will output a probability score between [0, 1].
+This script will generate centroids using several techniques, e.g., CVT,
+mini-batch CVT, and random generation. These centroids will then be evaluated
+by the get_score() function which will output a probability score between
+[0, 1]. The time taken to generate the centroids is also reported.
 """
 
+import time
+
 import numpy as np
 from scipy.spatial import distance
 
@@ -58,7 +61,7 @@ def get_score(centroids, num_samples, seed):
 
 
 def main():
-    """main() function that benchmarks 6 different centroid generation
+    """main() function that benchmarks 7 different centroid generation
     techniques used in the aforementioned paper.
     """
 
@@ -73,20 +76,23 @@ def main():
 
     # Different methods for generating centroids.
     generation_methods = [
-        "kmeans", "random", "sobol", "scrambled_sobol", "halton"
+        "kmeans", "minibatch_kmeans", "random", "sobol", "scrambled_sobol",
+        "halton"
     ]
 
     # Benchmark each centroid generation technique.
     for method in generation_methods:
+        start = time.time()
         archive = CVTArchive(solution_dim=solution_dim,
                              cells=cells,
                              ranges=ranges,
                              centroid_method=method)
+        duration = time.time() - start
         print(
             f"Score for {method} generation: ",
             get_score(centroids=archive.centroids,
                       num_samples=num_samples,
-                      seed=score_seed))
+                      seed=score_seed), f"({duration:.3f} s)")
 
 
 if __name__ == "__main__":
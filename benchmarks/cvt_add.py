@@ -26,15 +26,46 @@ run:
 
     import cvt_add  # The name of this file.
     cvt_add.plot_times(*cvt_add.load_times())
+
+The script can also compare the centroid indices of CVTArchive (k-D tree, brute
+force, GEMM, IVF, and graph) across measure space dimensions. In this
+experiment, we construct archives with 10k random centroids in measure spaces
+with 2, 10, 20, and 50 dimensions. For each index, we time how long it takes to
+find the closest centroid of 10k random points in batches of 1k, taking the
+minimum of 5 runs, and we measure the recall, i.e., the fraction of points that
+were assigned to their exact closest centroid. Run this comparison with:
+
+    python cvt_add.py backends
+
+This produces cvt_index_times.json and cvt_index_plot.png. To re-plot these
+results, run:
+
+    cvt_add.plot_backend_times(cvt_add.load_backend_times())
 """
 import json
+import sys
 import timeit
 from functools import partial
 
 import matplotlib.pyplot as plt
 import numpy as np
 
-from ribs.archives import CVTArchive
+from ribs.archives import BruteForceIndex, CVTArchive
+
+# Centroid indices compared in main_backends, along with their kwargs.
+BACKENDS = {
+    "kd_tree": {},
+    "brute_force": {
+        "chunk_size": 100
+    },
+    "gemm": {},
+    "ivf": {
+        "n_probe": 16
+    },
+    "graph": {
+        "ef": 64
+    },
+}
 
 
 def save_times(n_cells,
@@ -141,5 +172,94 @@ def main():
     save_times(n_cells, brute_force_t, kd_tree_t)
 
 
+def load_backend_times(filename="cvt_index_times.json"):
+    """Loads the results of main_backends from the given file."""
+    with open(filename, "r") as file:
+        return json.load(file)
+
+
+def plot_backend_times(results, filename="cvt_index_plot.png"):
+    """Plots the results of main_backends to the given file."""
+    fig, (time_ax, recall_ax) = plt.subplots(1, 2, figsize=(8, 4))
+    fig.tight_layout(w_pad=3)
+    for name in BACKENDS:
+        time_ax.plot(results["measure_dims"],
+                     results["times"][name],
+                     "-o",
+                     label=name)
+        recall_ax.plot(results["measure_dims"],
+                       results["recall"][name],
+                       "-o",
+                       label=name)
+    time_ax.set_title("Runtime to index 10k points\nwith 10k centroids")
+    time_ax.set_xlabel("Measure space dimensions")
+    time_ax.set_ylabel("log(time) (s)")
+    time_ax.set_yscale("log")
+    recall_ax.set_title("Fraction of points assigned\nto the closest centroid")
+    recall_ax.set_xlabel("Measure space dimensions")
+    recall_ax.set_ylabel("Recall")
+    for ax in (time_ax, recall_ax):
+        ax.grid(True, which="major", linestyle="--", linewidth=1)
+    time_ax.legend(loc="upper left")
+    fig.savefig(filename, bbox_inches="tight", dpi=120)
+
+
+def main_backends():
+    """Compares the centroid indices of CVTArchive across measure space
+    dimensions."""
+    measure_dims = [2, 10, 20, 50]
+    cells = 10_000
+    n_batches = 10
+    batch_size = 1_000
+    rng = np.random.default_rng(42)
+
+    results = {
+        "measure_dims": measure_dims,
+        "times": {
+            name: [] for name in BACKENDS
+        },
+        "recall": {
+            name: [] for name in BACKENDS
+        },
+    }
+    for measure_dim in measure_dims:
+        # Random centroids avoid running k-means in high dimensions.
+        centroids = rng.uniform(-1, 1, (cells, measure_dim))
+        all_measures_batch = rng.uniform(-1, 1,
+                                         (n_batches, batch_size, measure_dim))
+        exact = BruteForceIndex(centroids, chunk_size=100).query(
+            all_measures_batch.reshape(-1, measure_dim))
+
+        for name, kwargs in BACKENDS.items():
+            print(f"--------------\n"
+                  f"Measure dims: {measure_dim}\n"
+                  f"Index: {name}")
+            archive = CVTArchive(solution_dim=0,
+                                 cells=cells,
+                                 ranges=[(-1, 1)] * measure_dim,
+                                 custom_centroids=centroids,
+                                 centroid_index=name,
+                                 centroid_index_kwargs=kwargs,
+                                 seed=42)
+
+            def index_all(archive=archive, batches=all_measures_batch):
+                return np.concatenate(
+                    [archive.index_of(batch) for batch in batches])
+
+            recall = np.mean(index_all() == exact)
+            res_t = min(timeit.repeat(index_all, repeat=5, number=1))
+            print(f"Time: {res_t} s\nRecall: {recall}")
+
+            results["times"][name].append(res_t)
+            results["recall"][name].append(float(recall))
+
+    with open("cvt_index_times.json", "w") as file:
+        json.dump(results, file)
+    plot_backend_times(results)
+
+
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:] == ["backends"]:
+        main_backends()
+    else:
+        main()
@@ -0,0 +1,76 @@
+"""Compare the memory, accuracy, and speed of the field codecs.
+
+Storing solutions with a FieldCodec trades accuracy for memory. In this script,
+we fill an ArrayStore with 10k random 1000D solutions sampled uniformly from
+[-1, 1] for each codec, as well as for plain float64 and float32 storage. For
+each setting, we record the bytes taken by each stored solution, the maximum and
+mean absolute error of the solutions read back from the store, and the time to
+add the solutions and to retrieve them. Times are the minimum over 5 runs (see
+https://docs.python.org/3/library/timeit.html#timeit.Timer.repeat).
+
+Usage:
+    python field_codecs.py
+
+This script runs in under a minute. It prints a table of the results and saves
+the raw results to field_codecs.json.
+"""
+import json
+import timeit
+
+import numpy as np
+
+from ribs.archives import ArrayStore, BFloat16Codec, Float16Codec, Int8Codec
+
+
+def main():
+    """Fills a store with each codec and records the results."""
+    n_solutions = 10_000
+    solution_dim = 1_000
+    solutions = np.random.default_rng(42).uniform(-1, 1,
+                                                  (n_solutions, solution_dim))
+    indices = np.arange(n_solutions)
+
+    settings = {
+        "float64": np.float64,
+        "float32": np.float32,
+        "float16": Float16Codec(),
+        "bfloat16": BFloat16Codec(),
+        "int8": Int8Codec(),
+    }
+
+    results = {}
+    for name, dtype in settings.items():
+        store = ArrayStore({"solution": ((solution_dim,), dtype)}, n_solutions)
+
+        def add(store=store):
+            store.add(indices, {"solution": solutions})
+
+        def retrieve(store=store):
+            return store.retrieve(indices, "solution")[1]
+
+        add_t = min(timeit.repeat(add, repeat=5, number=1))
+        retrieve_t = min(timeit.repeat(retrieve, repeat=5, number=1))
+        error = np.abs(retrieve() - solutions)
+
+        nbytes = store.as_raw_dict()["fields.solution"].nbytes
+        results[name] = {
+            "bytes_per_solution": nbytes / n_solutions,
+            "max_error": float(error.max()),
+            "mean_error": float(error.mean()),
+            "add_t": add_t,
+            "retrieve_t": retrieve_t,
+        }
+
+    print(f"{'Setting':<10}{'Bytes':>8}{'Max err':>12}{'Mean err':>12}"
+          f"{'Add (s)':>10}{'Get (s)':>10}")
+    for name, res in results.items():
+        print(f"{name:<10}{res['bytes_per_solution']:>8.0f}"
+              f"{res['max_error']:>12.2e}{res['mean_error']:>12.2e}"
+              f"{res['add_t']:>10.4f}{res['retrieve_t']:>10.4f}")
+
+    with open("field_codecs.json", "w") as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
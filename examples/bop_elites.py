@@ -14,7 +14,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import tqdm
 
-from ribs.archives import GridArchive
+from ribs.archives import HierarchicalGridArchive
 from ribs.emitters import BayesianOptimizationEmitter
 from ribs.schedulers import BayesianOptimizationScheduler
 from ribs.visualize import grid_archive_heatmap
@@ -113,22 +113,18 @@ def main(
     logdir = Path(outdir)
     logdir.mkdir(exist_ok=True)
 
-    # The main grid archive that interacts with BOP-Elites. We start at the
-    # lowest resolution from ``upscale_schedule``.
+    # The archive that interacts with BOP-Elites. BOP-Elites starts at the
+    # lowest resolution from ``upscale_schedule`` and upscales the archive by
+    # making finer resolutions active. Meanwhile, the archive stores all
+    # evaluated data seen so far in ``main_archive.finest``, so we do not need a
+    # separate passive archive. The finest resolution is the least common
+    # multiple of the resolutions in ``upscale_schedule`` (50x50 by default),
+    # so the resolutions do not need to divide each other.
     max_bound = solution_dim / 2 * 5.12
     bounds = [(-max_bound, max_bound), (-max_bound, max_bound)]
-    main_archive = GridArchive(
+    main_archive = HierarchicalGridArchive(
         solution_dim=solution_dim,
-        dims=upscale_schedule[0],
-        ranges=bounds,
-        seed=seed,
-    )
-    # The passive archive that does NOT interact with BOP-Elites other than
-    # storing all evaluated data seen so far. We do not scale the passive
-    # archive, and it always stays at the final resolution.
-    passive_archive = GridArchive(
-        solution_dim=solution_dim,
-        dims=upscale_schedule[-1],
+        resolutions=upscale_schedule,
         ranges=bounds,
         seed=seed,
     )
@@ -152,9 +148,7 @@ def main(
 
     # Scheduler for managing multiple emitters (in what order we ask them for
     # solutions etc.).
-    scheduler = BayesianOptimizationScheduler(main_archive,
-                                              emitters,
-                                              result_archive=passive_archive)
+    scheduler = BayesianOptimizationScheduler(main_archive, emitters)
 
     metrics = {
         "QD Score": {
@@ -181,15 +175,15 @@ def main(
         final_itr = i == iterations
         if i % log_every == 0 or final_itr:
             if final_itr:
-                scheduler.result_archive.data(return_type="pandas").to_csv(
+                main_archive.finest.data(return_type="pandas").to_csv(
                     logdir / "final_archive.csv")
 
+            # Metrics are reported at the final resolution of the schedule.
+            final_stats = main_archive.level_stats(upscale_schedule[-1])
             metrics["QD Score"]["x"].append(i)
-            metrics["QD Score"]["y"].append(
-                scheduler.result_archive.stats.qd_score)
+            metrics["QD Score"]["y"].append(final_stats.qd_score)
             metrics["Archive Coverage"]["x"].append(i)
-            metrics["Archive Coverage"]["y"].append(
-                scheduler.result_archive.stats.coverage)
+            metrics["Archive Coverage"]["y"].append(final_stats.coverage)
             metrics["Itr. Time"]["x"].append(i)
             metrics["Itr. Time"]["y"].append(time.time() - itr_start_time)
 
@@ -199,7 +193,7 @@ def main(
                 f"QD Score: {metrics['QD Score']['y'][-1]:.3f}")
 
             save_heatmap(
-                scheduler.result_archive,
+                main_archive.finest,
                 logdir / f"heatmap_{i:08d}.png",
             )
 
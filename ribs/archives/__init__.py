@@ -16,6 +16,7 @@ hierarchy, with all archives inheriting from
     ribs.archives.CVTArchive
     ribs.archives.DensityArchive
     ribs.archives.GridArchive
+    ribs.archives.HierarchicalGridArchive
     ribs.archives.ProximityArchive
     ribs.archives.SlidingBoundariesArchive
     ribs.archives.ArchiveBase
@@ -29,6 +30,22 @@ This subpackage also contains several utilities associated with the archives.
     :toctree:
 
     ribs.archives.ArrayStore
+    ribs.archives.SparseArrayStore
+    ribs.archives.ChunkedArrayStore
+    ribs.archives.CentroidIndex
+    ribs.archives.KDTreeIndex
+    ribs.archives.BruteForceIndex
+    ribs.archives.GEMMIndex
+    ribs.archives.AutoIndex
+    ribs.archives.IVFIndex
+    ribs.archives.GraphIndex
+    ribs.archives.CentroidCache
+    ribs.archives.mini_batch_k_means
+    ribs.archives.ArchiveView
+    ribs.archives.FieldCodec
+    ribs.archives.Float16Codec
+    ribs.archives.BFloat16Codec
+    ribs.archives.Int8Codec
     ribs.archives.AddStatus
     ribs.archives.ArchiveDataFrame
     ribs.archives.ArchiveStats
@@ -39,24 +56,52 @@ from ribs.archives._add_status import AddStatus
 from ribs.archives._archive_base import ArchiveBase
 from ribs.archives._archive_data_frame import ArchiveDataFrame
 from ribs.archives._archive_stats import ArchiveStats
+from ribs.archives._archive_view import ArchiveView
 from ribs.archives._array_store import ArrayStore
 from ribs.archives._categorical_archive import CategoricalArchive
+from ribs.archives._centroid_cache import CentroidCache
+from ribs.archives._centroid_index import (AutoIndex, BruteForceIndex,
+                                           CentroidIndex, GEMMIndex, GraphIndex,
+                                           IVFIndex, KDTreeIndex)
+from ribs.archives._chunked_array_store import ChunkedArrayStore
 from ribs.archives._cqd_score import CQDScoreResult, cqd_score
 from ribs.archives._cvt_archive import CVTArchive
 from ribs.archives._density_archive import DensityArchive
+from ribs.archives._field_codecs import (BFloat16Codec, FieldCodec,
+                                         Float16Codec, Int8Codec)
 from ribs.archives._grid_archive import GridArchive
+from ribs.archives._hierarchical_grid_archive import HierarchicalGridArchive
+from ribs.archives._mini_batch_k_means import mini_batch_k_means
 from ribs.archives._proximity_archive import ProximityArchive
 from ribs.archives._sliding_boundaries_archive import SlidingBoundariesArchive
+from ribs.archives._sparse_array_store import SparseArrayStore
 
 __all__ = [
     "CategoricalArchive",
     "CVTArchive",
     "DensityArchive",
     "GridArchive",
+    "HierarchicalGridArchive",
     "ProximityArchive",
     "SlidingBoundariesArchive",
     "ArchiveBase",
     "ArrayStore",
+    "SparseArrayStore",
+    "ChunkedArrayStore",
+    "CentroidIndex",
+    "KDTreeIndex",
+    "BruteForceIndex",
+    "GEMMIndex",
+    "AutoIndex",
+    "IVFIndex",
+    "GraphIndex",
+    "CentroidCache",
+    "mini_batch_k_means",
+    "ArchiveView",
+    "FieldCodec",
+    "Float16Codec",
+    "BFloat16Codec",
+    "Int8Codec",
     "AddStatus",
     "ArchiveDataFrame",
     "ArchiveStats",
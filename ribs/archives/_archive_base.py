@@ -3,6 +3,7 @@ from abc import ABC
 
 
 class ArchiveBase(ABC):
+    # pylint: disable = too-many-public-methods
     """Base class for archives.
 
     An archive stores *elites*. Each elite consists of several data *fields*: at
@@ -89,6 +90,16 @@ class ArchiveBase(ABC):
         raise NotImplementedError(
             "`empty` has not been implemented in this archive")
 
+    @property
+    def generation(self):
+        """int: Token that changes every time the archive is modified.
+
+        Useful for checking whether data obtained from :meth:`data` with
+        ``copy=False`` may have gone stale.
+        """
+        raise NotImplementedError(
+            "`generation` has not been implemented in this archive")
+
     ## dunder methods ##
 
     def __len__(self):
@@ -170,6 +181,102 @@ class ArchiveBase(ABC):
         raise NotImplementedError(
             "`clear` has not been implemented in this archive")
 
+    def remove(self, indices):
+        """Removes the elites at the given indices from the archive.
+
+        Indices are the same indices as those in the ``index`` field of
+        :meth:`data` and :meth:`retrieve`. Indices without an elite are ignored.
+
+        Args:
+            indices (array-like): Indices of elites to remove.
+        Returns:
+            Archives that renumber their remaining elites after a removal return
+            an array mapping old indices to new indices (see
+            :meth:`ProximityArchive.remove
+            <ribs.archives.ProximityArchive.remove>`). Other archives return
+            None.
+        """
+        raise NotImplementedError(
+            "`remove` has not been implemented in this archive")
+
+    def checkpoint(self, path, compact=False):
+        """Persists the archive to a delta log in the directory ``path``.
+
+        The first call with a given ``path`` writes a full snapshot of the
+        archive. From then on, the archive appends a compact record of each
+        modification to the log, and subsequent calls with the same ``path``
+        only need to flush the records written since the previous call, so the
+        cost of a checkpoint scales with the number of elites that changed
+        rather than with the size of the archive. The archive can be recovered
+        from the log with :meth:`restore`.
+
+        Args:
+            path (str or pathlib.Path): Directory of the log.
+            compact (bool): If True and the archive is already logging to
+                ``path``, the records in the log are folded into a new full
+                snapshot, which keeps the log from growing without bound.
+        """
+        raise NotImplementedError(
+            "`checkpoint` has not been implemented in this archive")
+
+    def restore(self, path):
+        """Restores the elites in the archive from a log written by
+        :meth:`checkpoint`.
+
+        The archive must have been constructed with the same parameters as the
+        archive that wrote the log. Any elites currently in the archive are
+        discarded, and the archive continues logging to ``path`` afterwards.
+
+        Args:
+            path (str or pathlib.Path): Directory of the log.
+        """
+        raise NotImplementedError(
+            "`restore` has not been implemented in this archive")
+
+    @classmethod
+    def from_records(cls, records, **kwargs):
+        """Creates an archive holding the elites in a structured array.
+
+        This is the counterpart of :meth:`to_records`. The elites are written
+        to the archive directly, together with their thresholds, and the
+        archive stats are computed once at the end. Unlike passing the elites
+        to :meth:`add`, the elites do not compete with each other, so loading
+        millions of elites only takes a few vectorized passes over the data.
+
+        Example:
+
+            ::
+
+                records = archive.to_records()
+                ... # E.g., save the records with np.save() and load them in
+                    # another job.
+                new_archive = GridArchive.from_records(records,
+                                                       solution_dim=...,
+                                                       dims=...,
+                                                       ranges=...)
+
+        Args:
+            records (numpy.ndarray): Structured array with one record per
+                elite, e.g., from :meth:`to_records`. It must have all the
+                fields of the archive except ``threshold`` and ``index``.
+                Missing thresholds are set to the objectives of the elites, as
+                in archives with ``learning_rate=1.0``. If there is an
+                ``index`` field, each elite is written at its index, so the
+                records must come from an archive with the same cells;
+                otherwise, the indices are computed from the measures with
+                :meth:`index_of`.
+            kwargs: Arguments for constructing the archive, e.g.,
+                ``solution_dim``.
+        Returns:
+            ArchiveBase: The new archive.
+        Raises:
+            ValueError: ``records`` is missing some fields of the archive or
+                has fields that are not in the archive.
+            ValueError: There are multiple elites in the same cell.
+        """
+        raise NotImplementedError(
+            "`from_records` has not been implemented in this archive")
+
     ## Methods for reading from the archive ##
 
     def retrieve(self, measures):
@@ -232,7 +339,7 @@ class ArchiveBase(ABC):
         raise NotImplementedError(
             "`retrieve_single` has not been implemented in this archive")
 
-    def data(self, fields=None, return_type="dict"):
+    def data(self, fields=None, return_type="dict", copy=True, out=None):
         """Returns data of the elites in the archive.
 
         Args:
@@ -242,12 +349,23 @@ class ArchiveBase(ABC):
                 name.
             return_type (str): Type of data to return. See below. Ignored if
                 ``fields`` is a str.
+            copy (bool): If False, the archive may return read-only views of its
+                internal arrays instead of copies when the elites are stored
+                contiguously (see :meth:`ArrayStore.retrieve
+                <ribs.archives.ArrayStore.retrieve>`). Such views update as the
+                archive changes, so compare :attr:`generation` before and after
+                using them. Ignored when ``return_type="pandas"``.
+            out (dict): Dict mapping from field names to preallocated arrays of
+                length ``len(archive)`` into which the data of those fields is
+                written. The arrays are returned in place of new arrays. See
+                :meth:`ArrayStore.retrieve <ribs.archives.ArrayStore.retrieve>`.
 
         Returns:
-            The data for all elites in the archive. All data returned by this
-            method will be a copy, i.e., the data will not update as the archive
-            changes. If ``fields`` was a single str, the returned data will just
-            be an array holding data for the given field, such as::
+            The data for all elites in the archive. Unless ``copy=False`` was
+            passed, all data returned by this method will be a copy, i.e., the
+            data will not update as the archive changes. If ``fields`` was a
+            single str, the returned data will just be an array holding data for
+            the given field, such as::
 
                   measures = archive.data("measures")
 
@@ -308,11 +426,139 @@ class ArchiveBase(ABC):
 
               Like the other return types, the columns returned can be adjusted
               with the ``fields`` parameter.
+
+            - ``return_type="arrow"``: A :class:`pyarrow.RecordBatch` with one
+              column per field. Fields with 1D data, such as ``measures``,
+              become fixed-size list columns rather than being split into
+              multiple columns, and the columns wrap the retrieved NumPy arrays
+              without further copies. Requires pyarrow (``pip install
+              ribs[arrow]``).
         """
         raise NotImplementedError(
             "`data` has not been implemented in this archive")
 
-    def sample_elites(self, n):
+    def write_arrow(self,
+                    path,
+                    fields=None,
+                    file_format="parquet",
+                    chunk_size=100_000):
+        """Writes the elites in the archive to a Parquet or Feather file.
+
+        The elites are written in chunks of ``chunk_size``, so even very large
+        archives can be written with bounded memory. Each chunk has the same
+        columns as ``data(return_type="arrow")``. Requires pyarrow (``pip
+        install ribs[arrow]``).
+
+        Args:
+            path (str or pathlib.Path): Path of the output file.
+            fields (array-like of str): Fields to include in the file. By
+                default, all fields are included.
+            file_format (str): Either ``"parquet"`` or ``"feather"``.
+            chunk_size (int): Number of elites to write at a time.
+        """
+        raise NotImplementedError(
+            "`write_arrow` has not been implemented in this archive")
+
+    def to_records(self, fields=None):
+        """Copies the elites in the archive into a NumPy structured array.
+
+        The array has one record per elite and one column per field, e.g.,
+        ``records["solution"]`` has shape ``(len(archive), solution_dim)``. As
+        the data of all the elites are in a single contiguous array, they can
+        be saved (e.g., with :func:`numpy.save`) and moved to other processes
+        in one piece, and :meth:`from_records` recreates the archive from
+        them. See :meth:`ArrayStore.to_records
+        <ribs.archives.ArrayStore.to_records>` for more info.
+
+        Args:
+            fields (array-like of str): Fields to include. By default, all
+                fields are included.
+        Returns:
+            numpy.ndarray: Structured array of length ``len(archive)``.
+        """
+        raise NotImplementedError(
+            "`to_records` has not been implemented in this archive")
+
+    def iter_batches(self, batch_size, fields=None):
+        """Iterates over the elites in the archive in batches.
+
+        Each batch is a dict with the data of up to ``batch_size`` elites, in
+        the same format as ``data(return_type="dict")``. Iterating over batches
+        rather than individual elites (e.g., with ``for elite in archive``)
+        avoids creating a dict for every elite, so even archives with millions
+        of elites can be processed quickly and without copying all of their
+        data at once. As with iteration over individual elites, a
+        :class:`RuntimeError` is raised if the archive is modified during
+        iteration.
+
+        Example:
+
+            ::
+
+                for batch in archive.iter_batches(1024):
+                    batch["solution"]  # Shape: (<=1024, solution_dim)
+                    batch["objective"]
+                    ...
+
+        Args:
+            batch_size (int): Maximum number of elites in each batch.
+            fields (str or array-like of str): Fields to include in each batch,
+                as in :meth:`data`. If this is a single str, each batch is just
+                the array for that field.
+        Returns:
+            iterator: Iterator over the batches.
+        Raises:
+            ValueError: ``batch_size`` is not positive.
+        """
+        raise NotImplementedError(
+            "`iter_batches` has not been implemented in this archive")
+
+    def changes_since(self, token, fields=None):
+        """Lists the elites that were added or improved since the given token.
+
+        Structures that are derived from the archive, such as a dense array of
+        objectives or a heatmap, can be kept up to date by only visiting the
+        cells that changed, rather than calling :meth:`data` after every
+        :meth:`add`.
+
+        Example:
+
+            ::
+
+                changes, token = archive.changes_since(None)  # changes is None.
+                ...
+                archive.add(...)
+                changes, token = archive.changes_since(token, ["index",
+                                                               "objective"])
+                if changes is None:
+                    ... # Rebuild from archive.data().
+                else:
+                    changes["index"]  # Indices of cells that were written.
+                    changes["objective"]
+
+        ``changes`` is None whenever the changes since ``token`` are not known,
+        in which case the caller should rebuild everything it derived from the
+        archive. This is the case when ``token`` is None or came from another
+        archive, when many elites were added since ``token``, and when elites
+        were removed (e.g., with :meth:`clear`) since ``token``. See
+        :meth:`ArrayStore.changes_since
+        <ribs.archives.ArrayStore.changes_since>` for more info.
+
+        Args:
+            token: Token returned by a previous call to this method, or None.
+                The token is opaque and should not be modified.
+            fields (str or array-like of str): If None, ``changes`` is an array
+                of the indices of the cells that were written. Otherwise,
+                ``changes`` holds the data of these cells for the given fields,
+                as in :meth:`data` with ``return_type="dict"``.
+        Returns:
+            tuple: 2-element tuple of ``(changes, token)``, where ``token`` is
+            the token to pass to the next call.
+        """
+        raise NotImplementedError(
+            "`changes_since` has not been implemented in this archive")
+
+    def sample_elites(self, n, fields=None, out=None):
         """Randomly samples elites from the archive.
 
         Currently, this sampling is done uniformly at random. Furthermore, each
@@ -329,12 +575,54 @@ class ArchiveBase(ABC):
                 elites["measures"]
                 ...
 
+        Callers that sample elites repeatedly, such as emitters, can select only
+        the fields they need and reuse the same arrays on every call::
+
+            parents = np.empty((16, archive.solution_dim),
+                               dtype=archive.dtypes["solution"])
+            ...
+            archive.sample_elites(16, "solution", out={"solution": parents})
+
         Args:
             n (int): Number of elites to sample.
+            fields (str or array-like of str): Fields to include. By default,
+                all fields are included. If this is a single str, only the array
+                for that field is returned, as in :meth:`data`.
+            out (dict): Dict mapping from field names to preallocated arrays of
+                length ``n`` into which the sampled data of those fields is
+                written. The arrays are returned in place of new arrays. See
+                :meth:`ArrayStore.retrieve <ribs.archives.ArrayStore.retrieve>`.
         Returns:
             dict: Holds a batch of elites randomly selected from the archive.
         Raises:
             IndexError: The archive is empty.
+            ValueError: An array in ``out`` has the wrong shape or dtype.
         """
         raise NotImplementedError(
             "`sample_elites` has not been implemented in this archive")
+
+    def snapshot(self):
+        """Returns a frozen copy of the archive at this point in time.
+
+        The snapshot supports all the methods and properties for reading from
+        the archive, such as :meth:`data`, :meth:`retrieve`,
+        :meth:`sample_elites`, iteration, and :attr:`stats`, so it can also be
+        passed to functions like :func:`~ribs.archives.cqd_score` and the
+        heatmaps in :mod:`ribs.visualize`. Methods that modify the snapshot
+        raise a :class:`RuntimeError`.
+
+        Creating a snapshot is cheap since the snapshot initially shares the
+        elites' data with the archive. When the archive later modifies its data,
+        e.g., in :meth:`add`, it first copies the chunks of the data that are
+        about to change into the snapshot. Thus, the snapshot stays consistent
+        without a full copy of the archive, which makes snapshots suitable for
+        reading the archive in a background thread while the main loop
+        continues to add solutions. See :meth:`ArrayStore.snapshot
+        <ribs.archives.ArrayStore.snapshot>` for more info.
+
+        Returns:
+            ArchiveBase: The snapshot, which is an instance of the same class as
+            this archive.
+        """
+        raise NotImplementedError(
+            "`snapshot` has not been implemented in this archive")
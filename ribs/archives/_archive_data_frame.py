@@ -3,6 +3,9 @@ import re
 
 import pandas as pd
 
+# Number of elites that iterelites() slices out of the field arrays at a time.
+_ITERELITES_BATCH_SIZE = 1024
+
 # Developer Notes:
 # - The documentation for this class is hacked -- to add new methods, manually
 #   modify the template in docs/_templates/autosummary/class.rst
@@ -33,6 +36,13 @@ class ArchiveDataFrame(pd.DataFrame):
                 elite["objective"]
                 ...
 
+        To process the elites in batches of arrays instead, use::
+
+            for batch in df.iter_batches(1024):
+                batch["solution"]  # Shape: (<=1024, solution_dim)
+                batch["objective"]
+                ...
+
         Arrays corresponding to individual fields can be accessed with
         :meth:`get_field`. For instance, the following is an array where entry
         ``i`` contains the measures of the ``i``'th elite in the DataFrame::
@@ -79,9 +89,9 @@ class ArchiveDataFrame(pd.DataFrame):
     def _constructor(self):
         return ArchiveDataFrame
 
-    def iterelites(self):
-        """Iterator that outputs every elite in the ArchiveDataFrame as a dict.
-        """
+    def _field_arrays(self):
+        """Returns a dict mapping from the fields in the data frame to the
+        arrays holding their data."""
         # Identify fields in the data frame. There are some edge cases here,
         # such as if someone purposely names their field with an underscore and
         # a number at the end like "foobar_0", but it covers most cases.
@@ -106,15 +116,42 @@ class ArchiveDataFrame(pd.DataFrame):
         for name in fields:
             fields[name] = self.get_field(name)
 
-        n_elites = len(self)
+        return fields
+
+    def iter_batches(self, batch_size):
+        """Iterator that outputs the elites in the ArchiveDataFrame in batches.
 
+        Each batch is a dict mapping from field names to arrays with the data of
+        up to ``batch_size`` elites, e.g., ``batch["measures"]`` has shape
+        ``(<=batch_size, measure_dim)``. The arrays are slices of the arrays
+        from :meth:`get_field`, which are only created once.
+
+        Args:
+            batch_size (int): Maximum number of elites in each batch.
+        Raises:
+            ValueError: ``batch_size`` is not positive.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}.")
+
+        fields = self._field_arrays()
         return map(
-            lambda i: {
-                name: arr[i] for name, arr in fields.items()
+            lambda start: {
+                name: arr[start:start + batch_size]
+                for name, arr in fields.items()
             },
-            range(n_elites),
+            range(0, len(self), batch_size),
         )
 
+    def iterelites(self):
+        """Iterator that outputs every elite in the ArchiveDataFrame as a dict.
+        """
+        n_elites = len(self)
+        for start, batch in zip(range(0, n_elites, _ITERELITES_BATCH_SIZE),
+                                self.iter_batches(_ITERELITES_BATCH_SIZE)):
+            for i in range(min(_ITERELITES_BATCH_SIZE, n_elites - start)):
+                yield {name: arr[i] for name, arr in batch.items()}
+
     def get_field(self, field):
         """Array holding the data for the given field.
 
@@ -0,0 +1,147 @@
+"""Provides ArchiveView."""
+import numpy as np
+
+from ribs.archives._array_store import ArrayStore
+from ribs.archives._utils import fill_sentinel_values
+
+
+class ArchiveView:
+    """Read-only view of an archive whose elites are in shared memory.
+
+    Archives created with ``shared_memory=True`` hold their elites in
+    :mod:`multiprocessing.shared_memory`. Worker processes can read such an
+    archive by creating an ArchiveView with the :attr:`shm_name` of the archive,
+    which avoids sending a pickled copy of the archive to every worker. The
+    view reads the live elites of the archive, so it reflects additions made by
+    the archive's process after the view was created.
+
+    Each read is checked against the sequence lock of the underlying
+    :class:`~ribs.archives.ArrayStore` and repeated if it overlaps a
+    modification of the archive (see :meth:`ArrayStore.consistent_read
+    <ribs.archives.ArrayStore.consistent_read>`), so reads never return elites
+    that are partially written. All results are copies of the archive's data.
+
+    Example:
+
+        ::
+
+            # In the main process.
+            archive = GridArchive(..., shared_memory=True)
+
+            # In a worker process.
+            view = ArchiveView(archive.shm_name)
+            elites = view.sample_elites(16)
+            ...
+            view.close()
+
+    Args:
+        name (str): The ``shm_name`` of the archive.
+        index_of (callable): Function that maps a batch of measures to archive
+            indices, e.g., the ``index_of`` method of an empty archive created
+            with the same settings as the original archive. Only needed for
+            :meth:`retrieve`.
+        seed (int): Value to seed the random number generator used in
+            :meth:`sample_elites`. Set to None to avoid a fixed seed.
+        timeout (float): Maximum time in seconds that each read waits for the
+            archive to stop being modified. By default, there is no limit.
+    Raises:
+        FileNotFoundError: There is no archive with the given name in shared
+            memory.
+    """
+
+    def __init__(self, name, *, index_of=None, seed=None, timeout=None):
+        self._store = ArrayStore.attach(name)
+        self._index_of = index_of
+        self._rng = np.random.default_rng(seed)
+        self._timeout = timeout
+
+    def __len__(self):
+        """Number of elites in the archive."""
+        return self._read(len)
+
+    def _read(self, fn):
+        """Calls ``fn`` on the store until the call is consistent."""
+        return self._store.consistent_read(fn, self._timeout)
+
+    @property
+    def empty(self):
+        """bool: Whether the archive is empty."""
+        return len(self) == 0
+
+    @property
+    def generation(self):
+        """int: The :attr:`~ribs.archives.ArchiveBase.generation` of the
+        archive."""
+        return self._read(lambda store: store.generation)
+
+    @property
+    def field_list(self):
+        """list: List of data fields in the archive, including the index."""
+        return self._read(lambda store: store.field_list_with_index)
+
+    def retrieve(self, measures):
+        """Retrieves the elites with measures in the same cells as the measures
+        specified.
+
+        See :meth:`ArchiveBase.retrieve <ribs.archives.ArchiveBase.retrieve>`
+        for more info.
+
+        Args:
+            measures (array-like): (batch_size, measure_dim) array of
+                coordinates in measure space.
+        Returns:
+            tuple: 2-element tuple of (boolean ``occupied`` array, dict of elite
+            data). Unoccupied entries are filled with sentinel values.
+        Raises:
+            RuntimeError: The view was created without ``index_of``.
+        """
+        if self._index_of is None:
+            raise RuntimeError(
+                "ArchiveView.retrieve requires passing index_of to the view.")
+
+        indices = self._index_of(np.asarray(measures))
+        occupied, data = self._read(lambda store: store.retrieve(indices))
+        fill_sentinel_values(occupied, data)
+        return occupied, data
+
+    def data(self, fields=None, return_type="dict", out=None):
+        """Retrieves a copy of the data of the elites in the archive.
+
+        See :meth:`ArchiveBase.data <ribs.archives.ArchiveBase.data>` for more
+        info on the arguments and return value.
+        """
+        return self._read(
+            lambda store: store.data(fields, return_type, out=out))
+
+    def sample_elites(self, n, fields=None, out=None):
+        """Randomly samples elites from the archive.
+
+        See :meth:`ArchiveBase.sample_elites
+        <ribs.archives.ArchiveBase.sample_elites>` for more info.
+
+        Args:
+            n (int): Number of elites to sample.
+            fields (str or array-like of str): Fields to include.
+            out (dict): Preallocated arrays for the data of some fields.
+        Returns:
+            dict: Holds a batch of elites randomly selected from the archive.
+        Raises:
+            IndexError: The archive is empty.
+        """
+
+        def sample(store):
+            if len(store) == 0:
+                raise IndexError("No elements in archive.")
+            random_indices = self._rng.integers(len(store), size=n)
+            selected_indices = store.occupied_list[random_indices]
+            _, elites = store.retrieve(selected_indices, fields, out=out)
+            return elites
+
+        return self._read(sample)
+
+    def close(self):
+        """Detaches the view from the archive's shared memory.
+
+        The view must not be used afterwards.
+        """
+        self._store.detach()
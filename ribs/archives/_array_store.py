@@ -1,14 +1,160 @@
 """Provides ArrayStore."""
+# pylint: disable = too-many-lines
+import collections
+import contextlib
 import itertools
+import json
 import numbers
+import os
+import pickle
+import secrets
+import struct
+import sys
+import time
+import weakref
+import zlib
 from enum import IntEnum
 from functools import cached_property
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
 
 import numpy as np
 from numpy_groupies import aggregate_nb as aggregate
 
 from ribs._utils import readonly
 from ribs.archives._archive_data_frame import ArchiveDataFrame
+from ribs.archives._field_codecs import FieldCodec
+
+
+def _contiguous_slice(indices):
+    """Returns a slice equivalent to the 1D int array ``indices``.
+
+    Returns None if the indices are not a contiguous increasing range.
+    """
+    if len(indices) == 0:
+        return slice(0, 0)
+    start = int(indices[0])
+    stop = int(indices[-1]) + 1
+    if stop - start != len(indices) or np.any(indices[1:] <= indices[:-1]):
+        return None
+    return slice(start, stop)
+
+
+def _import_pyarrow():
+    """Imports pyarrow, which is an optional dependency."""
+    try:
+        # We do not want to import at the top because that would require
+        # pyarrow to always be installed.
+        # pylint: disable = import-outside-toplevel
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow must be installed -- please run "
+            "`pip install ribs[arrow]` or `pip install pyarrow`") from e
+    return pyarrow
+
+
+def _arrow_array(pa, arr):
+    """Converts a field array of shape ``(n, ...)`` into an Arrow array.
+
+    Fields with >1D entries become (nested) fixed-size list arrays. Numeric
+    fields are wrapped without copying their buffers.
+    """
+    if arr.dtype == object:
+        # Object arrays have no Arrow buffer to share, so pyarrow has to infer
+        # the type from the Python objects.
+        return pa.array(list(arr))
+
+    arr = np.ascontiguousarray(arr)
+    result = pa.array(arr.reshape(-1))
+    for dim in reversed(arr.shape[1:]):
+        result = pa.FixedSizeListArray.from_arrays(result, dim)
+    return result
+
+
+def _pack(columns, return_type):
+    """Packs a list of ``(name, array)`` pairs into the format of ``data`` in
+    :meth:`ArrayStore.retrieve` for the given ``return_type``."""
+    if return_type == "dict":
+        return dict(columns)
+    if return_type == "tuple":
+        return tuple(arr for _, arr in columns)
+    if return_type == "pandas":
+        data = {}
+        for name, arr in columns:
+            if len(arr.shape) == 1:  # Scalar entries.
+                data[name] = arr
+            elif len(arr.shape) == 2:  # 1D array entries.
+                for i in range(arr.shape[1]):
+                    data[f"{name}_{i}"] = arr[:, i]
+            else:
+                raise ValueError(
+                    f"Field `{name}` has shape {arr.shape[1:]} -- "
+                    "cannot convert fields with shape >1D to Pandas")
+        # Data above are already copied, so no need to copy again.
+        return ArchiveDataFrame(data, copy=False)
+    if return_type == "arrow":
+        pa = _import_pyarrow()
+        data = dict(columns)
+        return pa.RecordBatch.from_arrays(
+            [_arrow_array(pa, arr) for arr in data.values()],
+            names=list(data),
+        )
+    raise ValueError(f"Invalid return_type {return_type}.")
+
+
+def _check_out(name, buf, shape, dtype):
+    """Checks that an array passed in ``out`` can hold data of the given shape
+    and dtype."""
+    if buf.shape != shape or buf.dtype != dtype:
+        raise ValueError(
+            f"The array in `out` for `{name}` has shape {buf.shape} and dtype "
+            f"{buf.dtype}, but it should have shape {shape} and dtype "
+            f"{np.dtype(dtype)}.")
+
+
+def _copy_into(name, buf, arr):
+    """Copies ``arr`` into the array ``buf`` passed in ``out``."""
+    _check_out(name, buf, arr.shape, arr.dtype)
+    buf[...] = arr
+    return buf
+
+
+def _attach_segment(name):
+    """Attaches to an existing shared memory segment without registering it
+    with the resource tracker.
+
+    The resource tracker unlinks registered segments when the process that
+    created them exits, so attaching processes must not register segments that
+    they do not own.
+    """
+    if sys.version_info >= (3, 13):
+        # pylint: disable-next = unexpected-keyword-arg
+        return SharedMemory(name, track=False)
+
+    # Before Python 3.13, SharedMemory always registers the segment, and
+    # unregistering it afterwards would also drop the registration of the
+    # owner when both share a resource tracker.
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        return SharedMemory(name)
+    finally:
+        resource_tracker.register = register
+
+
+def _close_segment(segment):
+    """Closes a shared memory segment.
+
+    Returns:
+        bool: Whether the segment was closed. Segments cannot be closed while
+        arrays still refer to them.
+    """
+    try:
+        segment.close()
+        return True
+    except BufferError:
+        return False
 
 
 class Update(IntEnum):
@@ -17,6 +163,130 @@ class Update(IntEnum):
     CLEAR = 1
 
 
+# Each record in the delta log is framed as the length of its body, the body,
+# and the CRC32 of the body. The body starts with the header below, which holds
+# the operation (one of the values of Update, or one of the additional
+# operations below), the updates counters after the operation, the capacity of
+# the store, and the number of indices in the record. For additions, the header
+# is followed by the indices and then the rows of each field at those indices.
+# For removals, the header is followed only by the indices.
+_LOG_REMOVE = 2
+_LOG_COMPACT = 3
+_LOG_LENGTH = struct.Struct("<Q")
+_LOG_HEADER = struct.Struct("<BqqqQ")
+_LOG_CRC = struct.Struct("<I")
+
+# Stores in shared memory have a header segment that starts with the int64 slots
+# below, followed by a JSON description of the arrays in the store and the
+# segments that hold them. The sequence number is odd while the store is being
+# modified, and the epoch changes whenever the arrays are reallocated. The epoch
+# is set to -1 once the store leaves shared memory.
+_SHM_HEADER_SIZE = 65536
+_SHM_SEQ = 0
+_SHM_EPOCH = 1
+_SHM_N_OCCUPIED = 2
+_SHM_LAYOUT_LEN = 3
+_SHM_LAYOUT_OFFSET = 32
+
+# Snapshots copy the arrays of a store in chunks of about this many bytes.
+_SNAPSHOT_CHUNK_BYTES = 1 << 20
+
+# Maximum number of indices held in the change log of a store (see
+# ArrayStore.changes_since).
+_CHANGE_LOG_SIZE = 1 << 16
+
+# Source of ids that tell apart the change logs of different stores, as well as
+# the change logs of a store before and after a reset.
+_CHANGE_LOG_IDS = itertools.count()
+
+
+class _SnapshotArray:
+    """Copy-on-write copy of an array in an ArrayStore, used in snapshots.
+
+    The snapshot reads from the live array of the store, except in chunks that
+    the store saved into :attr:`chunks` before writing to them. Indexing always
+    returns a copy, since the live array may change later.
+    """
+
+    def __init__(self, live):
+        self.live = live
+        self.shape = live.shape
+        self.dtype = live.dtype
+        row_bytes = max(live[:1].nbytes, 1)
+        self.chunk_size = max(_SNAPSHOT_CHUNK_BYTES // row_bytes, 1)
+        self.chunks = {}
+
+    def __len__(self):
+        """Number of rows in the array."""
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        """Converts the array to a NumPy array, which is always a copy."""
+        # pylint: disable = unused-argument
+        arr = self[:]
+        return arr if dtype is None else arr.astype(dtype, copy=False)
+
+    def view(self):
+        """Returns a copy of the whole array."""
+        return self[:]
+
+    def __getitem__(self, key):
+        """Supports indexing with an int, a slice, or an array of indices."""
+        if isinstance(key, slice):
+            key = np.arange(*key.indices(len(self)))
+        elif isinstance(key, numbers.Integral):
+            chunk_id, offset = divmod(int(key), self.chunk_size)
+            result = self.live[key]
+            chunk = self.chunks.get(chunk_id)
+            if chunk is not None:
+                result = chunk[offset]
+            return result.copy() if isinstance(result, np.ndarray) else result
+
+        key = np.asarray(key)
+        result = self.live[key]  # Induces copy.
+
+        # The store saves a chunk before writing to it, so any value written
+        # after the snapshot was taken is in a saved chunk by the time the live
+        # array has been read above.
+        if self.chunks:
+            chunk_ids = key // self.chunk_size
+            for chunk_id in np.intersect1d(chunk_ids, list(self.chunks)):
+                mask = chunk_ids == chunk_id
+                result[mask] = self.chunks[chunk_id][key[mask] %
+                                                     self.chunk_size]
+        return result
+
+    def save(self, live, rows=None):
+        """Saves the chunks that ``live`` is about to modify at ``rows``.
+
+        ``rows`` may be an array of indices, a slice, or None to indicate the
+        entire array. Nothing is saved if ``live`` is not the array that this
+        snapshot refers to, e.g., because the store reallocated its arrays.
+        """
+        if live is not self.live:
+            return
+
+        n_chunks = -(-len(self) // self.chunk_size)
+        if rows is None:
+            chunk_ids = range(n_chunks)
+        elif isinstance(rows, slice):
+            start, stop, _ = rows.indices(len(self))
+            if start >= stop:
+                return
+            chunk_ids = range(start // self.chunk_size,
+                              (stop - 1) // self.chunk_size + 1)
+        else:
+            rows = np.asarray(rows)
+            chunk_ids = np.unique(rows // self.chunk_size)
+
+        for chunk_id in chunk_ids:
+            chunk_id = int(chunk_id)
+            if chunk_id not in self.chunks:
+                start = chunk_id * self.chunk_size
+                self.chunks[chunk_id] = np.array(self.live[start:start +
+                                                           self.chunk_size])
+
+
 class ArrayStoreIterator:
     """An iterator for an ArrayStore's entries."""
 
@@ -41,8 +311,8 @@ class ArrayStoreIterator:
             # to clear() would cause the len(self.store) to be 0 and thus
             # trigger StopIteration.
             raise RuntimeError(
-                "ArrayStore was modified with add() or clear() during "
-                "iteration.")
+                "ArrayStore was modified with add(), clear(), remove(), or "
+                "compact() during iteration.")
 
         if self.iter_idx >= len(self.store):
             raise StopIteration
@@ -52,12 +322,16 @@ class ArrayStoreIterator:
 
         d = {"index": idx}
         for name, arr in self.store._fields.items():
-            d[name] = arr[idx]
+            if name in self.store._codecs:
+                d[name] = self.store._decode(name, arr[idx][None])[0]
+            else:
+                d[name] = arr[idx]
 
         return d
 
 
 class ArrayStore:
+    # pylint: disable = too-many-public-methods
     """Maintains a set of arrays that share a common dimension.
 
     The ArrayStore consists of several *fields* of data that are manipulated
@@ -84,8 +358,28 @@ class ArrayStore:
             "measures": ((10,), np.float32)}`` will create an "objective" field
             with shape ``(capacity,)`` and a "measures" field with shape
             ``(capacity, 10)``. Note that field names must be valid Python
-            identifiers.
+            identifiers. The dtype of a field may also be a
+            :class:`~ribs.archives.FieldCodec`, in which case the field is
+            stored in the encoding of the codec; see :class:`FieldCodec
+            <ribs.archives.FieldCodec>` for more info.
         capacity (int): Total possible entries in the store.
+        memmap_dir (str or pathlib.Path): If passed, every field and the
+            ``occupied``, ``occupied_list``, and ``updates`` props are stored in
+            :class:`numpy.memmap` files under this directory rather than in
+            memory, which allows the store to hold more data than fits in RAM.
+            The directory is created if it does not exist. If the directory
+            already holds a store, that store is reopened without copying its
+            data; in this case, ``field_desc`` must match the fields of the
+            existing store, and ``capacity`` is only used if the existing store
+            is empty. Fields with ``object`` dtype cannot be memory-mapped.
+        shared_memory (bool): If True, every field and the ``occupied``,
+            ``occupied_list``, and ``updates`` props are allocated in
+            :mod:`multiprocessing.shared_memory` segments, so that other
+            processes can read the store without a copy by passing
+            :attr:`shm_name` to :meth:`attach`. Call
+            :meth:`release_shared_memory` once other processes no longer need
+            the store. Fields with ``object`` dtype cannot be placed in shared
+            memory.
 
     Attributes:
         _props (dict): Properties that are common to every ArrayStore.
@@ -100,25 +394,73 @@ class ArrayStore:
             * "updates": Int array recording number of calls to functions that
               modified the store.
 
-        _fields (dict): Holds all the arrays with their data.
+        _fields (dict): Holds all the arrays with their data. Fields with a
+            codec hold their data in encoded form.
+
+        _codecs (dict): Maps from the names of fields that have a
+            :class:`~ribs.archives.FieldCodec` to tuples of ``(shape, codec)``,
+            where ``shape`` is the shape of each decoded entry.
+
+        _log_dir (str): Directory of the delta log, or None if the store is not
+            logging its changes. See :meth:`start_log`.
+
+        _log_file: File handle for appending to the delta log.
+
+        _positions (numpy.ndarray): Array of size ``(capacity,)`` mapping each
+            occupied index to its position in ``occupied_list``. It is only
+            needed by :meth:`remove`, so it is built on the first call to
+            :meth:`remove` and maintained from then on; until then, it is None.
+
+        _readonly (bool): Whether the store cannot be modified, as is the case
+            for snapshots (see :meth:`snapshot`) and stores attached with
+            :meth:`attach`.
+
+        _snapshots (list): Weak references to the snapshots of this store.
+            Before the store writes to its arrays, it copies the chunks about
+            to be written into the snapshots that still refer to them.
+
+        _shm (dict): State of stores in shared memory, or None for other
+            stores.
+
+            * "name": Name of the header segment (see :attr:`shm_name`).
+            * "header": The header segment.
+            * "meta": int64 array over the slots at the start of the header.
+            * "segments": Dict mapping from the keys of the arrays (in the same
+              format as :meth:`as_raw_dict`) to the segments holding them.
+            * "retired": Segments that were replaced when the arrays were
+              reallocated but could not be closed yet.
+            * "count": Number of segments created so far.
+            * "epoch": Epoch of the arrays in "segments".
+
+        _changes (dict): Log of the indices written by :meth:`add`, which is
+            read by :meth:`changes_since`.
+
+            * "id": Id of the log, which changes whenever the log is reset.
+            * "start": Generation since which the log is complete.
+            * "entries": Deque of ``(generation, indices)`` tuples, where
+              ``indices`` were written by the :meth:`add` call that brought the
+              store to ``generation``.
+            * "size": Total number of indices in "entries".
 
     Raises:
         ValueError: One of the fields in ``field_desc`` has a reserved name
             (currently, "index" is the only reserved name).
         ValueError: One of the fields in ``field_desc`` has a name that is not a
             valid Python identifier.
+        ValueError: ``memmap_dir`` holds a store whose fields do not match
+            ``field_desc``.
+        ValueError: ``memmap_dir`` or ``shared_memory`` was passed and one of
+            the fields has ``object`` dtype.
+        ValueError: Both ``memmap_dir`` and ``shared_memory`` were passed.
     """
 
-    def __init__(self, field_desc, capacity):
-        self._props = {
-            "capacity": capacity,
-            "occupied": np.zeros(capacity, dtype=bool),
-            "n_occupied": 0,
-            "occupied_list": np.empty(capacity, dtype=np.int32),
-            "updates": np.array([0, 0]),
-        }
-
-        self._fields = {}
+    def __init__(self,
+                 field_desc,
+                 capacity,
+                 memmap_dir=None,
+                 shared_memory=False):
+        parsed_desc = {}
+        self._codecs = {}
         for name, (field_shape, dtype) in field_desc.items():
             if name == "index":
                 raise ValueError(f"`{name}` is a reserved field name.")
@@ -129,8 +471,264 @@ class ArrayStore:
             if isinstance(field_shape, numbers.Integral):
                 field_shape = (field_shape,)
 
-            array_shape = (capacity,) + tuple(field_shape)
-            self._fields[name] = np.empty(array_shape, dtype)
+            field_shape = tuple(field_shape)
+            if isinstance(dtype, FieldCodec):
+                # The field is allocated in its encoded form.
+                self._codecs[name] = (field_shape, dtype)
+                field_shape, dtype = dtype.storage(field_shape)
+                field_shape = tuple(field_shape)
+
+            parsed_desc[name] = (field_shape, np.dtype(dtype))
+
+        self._memmap_dir = (None
+                            if memmap_dir is None else os.fspath(memmap_dir))
+        self._log_dir = None
+        self._log_file = None
+        self._positions = None
+        self._readonly = False
+        self._snapshots = []
+        self._shm = None
+
+        if self._memmap_dir is not None and shared_memory:
+            raise ValueError(
+                "memmap_dir and shared_memory cannot be used together.")
+
+        if self._memmap_dir is not None or shared_memory:
+            for name, (_, dtype) in parsed_desc.items():
+                if dtype == object:
+                    raise ValueError(
+                        f"Field `{name}` has object dtype, which cannot be "
+                        "stored in a memmap or in shared memory.")
+
+        if shared_memory:
+            self._create_shared_header()
+
+        if self._memmap_dir is not None:
+            os.makedirs(self._memmap_dir, exist_ok=True)
+            if self._reopen_memmap(parsed_desc):
+                self._reset_changes()
+                return
+
+        self._props = {
+            "capacity":
+                capacity,
+            "occupied":
+                self._allocate("props.occupied", (capacity,), bool),
+            "n_occupied":
+                0,
+            "occupied_list":
+                self._allocate("props.occupied_list", (capacity,), np.int32),
+            "updates":
+                self._allocate("props.updates", (2,), np.int64),
+        }
+        self._props["occupied"].fill(False)
+        self._props["updates"].fill(0)
+
+        self._fields = {}
+        for name, (field_shape, dtype) in parsed_desc.items():
+            array_shape = (capacity,) + field_shape
+            self._fields[name] = self._allocate(f"fields.{name}", array_shape,
+                                                dtype)
+
+        self._write_storage_meta()
+        self._reset_changes()
+
+    ## Storage ##
+
+    def _memmap_path(self, key):
+        """Path of the memmap file holding the array with the given key."""
+        return os.path.join(self._memmap_dir, f"{key}.dat")
+
+    def _allocate(self, key, shape, dtype):
+        """Allocates an uninitialized array for the store.
+
+        ``key`` identifies the array in the same format as the keys of
+        :meth:`as_raw_dict`, e.g., ``props.occupied`` or ``fields.objective``.
+        """
+        if self._shm is not None:
+            return self._allocate_shared(key, shape, dtype)
+        if self._memmap_dir is None:
+            return np.empty(shape, dtype)
+        return np.memmap(self._memmap_path(key),
+                         dtype=dtype,
+                         mode="w+",
+                         shape=shape)
+
+    def _grow(self, key, arr, capacity):
+        """Returns a version of ``arr`` whose first dimension is ``capacity``.
+
+        The first ``min(len(arr), capacity)`` entries of the new array hold the
+        contents of ``arr``. For in-memory and shared memory stores, this
+        requires copying ``arr``, while for memmap stores, the underlying file
+        is extended in place (files are not truncated when ``capacity`` is
+        smaller).
+        """
+        new_shape = (capacity,) + arr.shape[1:]
+        if self._memmap_dir is None:
+            new_arr = self._allocate(key, new_shape, arr.dtype)
+            n = min(len(arr), capacity)
+            new_arr[:n] = arr[:n]
+            return new_arr
+
+        arr.flush()
+        # Opening in "r+" mode extends the file (with zeros) to the new size.
+        return np.memmap(self._memmap_path(key),
+                         dtype=arr.dtype,
+                         mode="r+",
+                         shape=new_shape)
+
+    def _decode(self, name, arr):
+        """Decodes entries of a field that has a codec."""
+        shape, codec = self._codecs[name]
+        return codec.decode(arr, shape)
+
+    @contextlib.contextmanager
+    def _writing(self):
+        """Wraps every modification of the store.
+
+        For stores in shared memory, the sequence number in the header is odd
+        during the modification, so readers that see an odd sequence number, or
+        a sequence number that changed during their read, know that their read
+        may be torn.
+
+        Raises:
+            RuntimeError: The store is read-only.
+        """
+        if self._readonly:
+            raise RuntimeError("This ArrayStore is read-only.")
+        if self._shm is None:
+            yield
+            return
+
+        meta = self._shm["meta"]
+        meta[_SHM_SEQ] += 1
+        try:
+            yield
+        finally:
+            meta[_SHM_N_OCCUPIED] = self._props["n_occupied"]
+            meta[_SHM_SEQ] += 1
+
+    def _write_storage_meta(self):
+        """Records the layout of a memmap store so that it can be reopened, or
+        publishes the layout of a shared memory store to its readers."""
+        if self._shm is not None:
+            self._write_shared_layout()
+            return
+        if self._memmap_dir is None:
+            return
+
+        meta = {
+            "capacity": int(self._props["capacity"]),
+            "fields": {
+                name: [list(arr.shape[1:]), arr.dtype.str]
+                for name, arr in self._fields.items()
+            },
+        }
+        # Write to a temporary file first so that the metadata is replaced
+        # atomically.
+        path = os.path.join(self._memmap_dir, "store.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(meta, file)
+        os.replace(path + ".tmp", path)
+
+    def _reopen_memmap(self, field_desc):
+        """Attempts to reopen an existing store in the memmap directory.
+
+        Returns:
+            bool: True if the store was reopened, or False if there was no
+            existing store or the existing store was empty (in which case the
+            store should be created from scratch).
+        """
+        path = os.path.join(self._memmap_dir, "store.json")
+        if not os.path.exists(path):
+            return False
+
+        with open(path, "r", encoding="utf-8") as file:
+            meta = json.load(file)
+
+        stored_desc = {
+            name: (tuple(shape), np.dtype(dtype))
+            for name, (shape, dtype) in meta["fields"].items()
+        }
+        if stored_desc != field_desc:
+            raise ValueError(
+                f"The store in {self._memmap_dir} has fields {stored_desc}, "
+                f"which do not match the requested fields {field_desc}.")
+
+        capacity = meta["capacity"]
+        occupied = np.memmap(self._memmap_path("props.occupied"),
+                             dtype=bool,
+                             mode="r+",
+                             shape=(capacity,))
+        n_occupied = int(np.count_nonzero(occupied))
+        if n_occupied == 0:
+            return False
+
+        self._props = {
+            "capacity":
+                capacity,
+            "occupied":
+                occupied,
+            "n_occupied":
+                n_occupied,
+            "occupied_list":
+                np.memmap(self._memmap_path("props.occupied_list"),
+                          dtype=np.int32,
+                          mode="r+",
+                          shape=(capacity,)),
+            "updates":
+                np.memmap(self._memmap_path("props.updates"),
+                          dtype=np.int64,
+                          mode="r+",
+                          shape=(2,)),
+        }
+        self._fields = {
+            name:
+                np.memmap(self._memmap_path(f"fields.{name}"),
+                          dtype=dtype,
+                          mode="r+",
+                          shape=(capacity,) + field_shape)
+            for name, (field_shape, dtype) in field_desc.items()
+        }
+        return True
+
+    def __getstate__(self):
+        """Pickles memmap and shared memory stores, as well as read-only stores,
+        as regular in-memory stores.
+
+        Otherwise, the unpickled store would write to the same files or shared
+        memory as the original store. For the same reason, the delta log is not
+        carried over, and neither are the snapshots of the store. To share a
+        store with other processes without copying it, use :meth:`attach`
+        instead.
+        """
+        state = self.__dict__.copy()
+        # The unpickled store does not continue writing to the delta log.
+        state["_log_dir"] = None
+        # Its changes are tracked separately from those of this store.
+        state["_changes"] = {
+            "id": next(_CHANGE_LOG_IDS),
+            "start": self.generation,
+            "entries": collections.deque(),
+            "size": 0,
+        }
+        state["_log_file"] = None
+        state["_snapshots"] = []
+        if (self._memmap_dir is not None or self._shm is not None or
+                self._readonly):
+            state["_memmap_dir"] = None
+            state["_shm"] = None
+            state["_readonly"] = False
+            state["_props"] = {
+                name:
+                    np.array(val) if isinstance(val, (np.ndarray,
+                                                      _SnapshotArray)) else val
+                for name, val in self._props.items()
+            }
+            state["_fields"] = {
+                name: np.array(arr) for name, arr in self._fields.items()
+            }
+        return state
 
     def __len__(self):
         """Number of occupied indices in the store, i.e., number of indices that
@@ -156,11 +754,81 @@ class ArrayStore:
         """
         return ArrayStoreIterator(self)
 
+    def iter_batches(self, batch_size, fields=None):
+        """Iterates over entries in the store in batches.
+
+        Each batch holds up to ``batch_size`` consecutive entries of
+        :attr:`occupied_list`, in the format of ``data`` in :meth:`retrieve`
+        with ``return_type="dict"``. Whereas iterating over the store creates a
+        dict for every entry, this creates one dict of arrays per batch, so
+        entire stores can be processed at the speed of NumPy without holding a
+        copy of all the data at once.
+
+        Example:
+
+            ::
+
+                for batch in store.iter_batches(1024):
+                    batch["index"]  # Shape: (<=1024,)
+                    batch["objective"]
+                    ...
+
+        Args:
+            batch_size (int): Maximum number of entries in each batch.
+            fields (str or array-like of str): Fields to include in each batch;
+                see :meth:`retrieve`. If this is a single str, each batch is
+                just the array for that field.
+        Yields:
+            dict: The data of the next batch of entries.
+        Raises:
+            ValueError: ``batch_size`` is not positive.
+            RuntimeError: The store was modified, e.g., with :meth:`add` or
+                :meth:`clear`, during iteration.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}.")
+
+        # Only occupied_list, generation, and retrieve() are used here, so
+        # other stores with these members can iterate with this method too.
+        generation = self.generation
+        occupied_list = self.occupied_list
+        start = 0
+        while True:
+            # As in ArrayStoreIterator, this check goes before the check for the
+            # end of the iteration.
+            if self.generation != generation:
+                raise RuntimeError(
+                    "ArrayStore was modified with add(), clear(), remove(), or "
+                    "compact() during iteration.")
+            if start >= len(occupied_list):
+                return
+            yield self.retrieve(occupied_list[start:start + batch_size],
+                                fields)[1]
+            start += batch_size
+
     @property
     def capacity(self):
         """int: Maximum number of data entries in the store."""
         return self._props["capacity"]
 
+    @property
+    def memmap_dir(self):
+        """str: Directory holding the memmap files of this store, or None if
+        the store is held in memory."""
+        return self._memmap_dir
+
+    @property
+    def shm_name(self):
+        """str: Name that other processes pass to :meth:`attach` to read this
+        store, or None if the store is not in shared memory."""
+        return None if self._shm is None else self._shm["name"]
+
+    @property
+    def log_dir(self):
+        """str: Directory of the delta log of this store, or None if the store
+        is not logging its changes."""
+        return self._log_dir
+
     @property
     def occupied(self):
         """numpy.ndarray: Boolean array of size ``(capacity,)`` indicating
@@ -174,6 +842,23 @@ class ArrayStore:
         return readonly(
             self._props["occupied_list"][:self._props["n_occupied"]])
 
+    @property
+    def generation(self):
+        """int: Token that changes every time the store is modified.
+
+        The token is the total number of calls to methods that modify the store
+        (e.g., :meth:`add` and :meth:`clear`), so it only ever increases. It is
+        useful for checking whether data obtained with ``copy=False`` in
+        :meth:`retrieve` or :meth:`data` may have gone stale::
+
+            token = store.generation
+            data = store.data(copy=False)
+            ...
+            if store.generation != token:
+                # `data` may no longer reflect the contents of the store.
+        """
+        return int(self._props["updates"].sum())
+
     @cached_property
     def field_desc(self):
         """dict: Description of fields in the store.
@@ -191,10 +876,12 @@ class ArrayStore:
         the field_desc in the constructor, which accepts ints for 1D field
         shapes (e.g., ``5``), this field_desc shows 1D field shapes as tuples of
         1 entry (e.g., ``(5,)``). Since dicts in Python are ordered, note that
-        this dict will have the same order as in the constructor.
+        this dict will have the same order as in the constructor. Fields with a
+        :class:`~ribs.archives.FieldCodec` show the codec in place of the
+        dtype.
         """
         return {
-            name: (arr.shape[1:], arr.dtype)
+            name: self._codecs.get(name, (arr.shape[1:], arr.dtype))
             for name, arr in self._fields.items()
         }
 
@@ -214,7 +901,10 @@ class ArrayStore:
         # Calling `.type` retrieves the numpy scalar type, which is callable:
         # - https://numpy.org/doc/stable/reference/arrays.scalars.html
         # - https://numpy.org/doc/stable/reference/arrays.dtypes.html
-        return {name: arr.dtype.type for name, arr in self._fields.items()}
+        return {
+            name: (self._codecs[name][1].dtype if name in self._codecs else
+                   arr.dtype.type) for name, arr in self._fields.items()
+        }
 
     @cached_property
     def dtypes_with_index(self):
@@ -261,7 +951,12 @@ class ArrayStore:
         """
         return list(self._fields) + ["index"]
 
-    def retrieve(self, indices, fields=None, return_type="dict"):
+    def retrieve(self,
+                 indices,
+                 fields=None,
+                 return_type="dict",
+                 copy=True,
+                 out=None):
         """Collects data at the given indices.
 
         Args:
@@ -272,6 +967,27 @@ class ArrayStore:
                 list). This can also be a single str indicating a field name.
             return_type (str): Type of data to return. See the ``data`` returned
                 below. Ignored if ``fields`` is a str.
+            copy (bool): If False and ``indices`` is a contiguous increasing
+                range of indices (e.g., ``[4, 5, 6, 7]``), the data is returned
+                as read-only views of the store's arrays instead of copies,
+                which avoids copying large fields like solutions. If the indices
+                cannot be expressed as a slice, the data is copied as usual.
+                Views reflect later modifications of the store, so compare
+                :attr:`generation` before and after to check whether they are
+                still valid. Fields with a :class:`~ribs.archives.FieldCodec`
+                are always decoded into new arrays. Ignored when
+                ``return_type="pandas"``. With
+                ``return_type="arrow"``, the record batch shares the views'
+                buffers, so no field is copied at all.
+            out (dict): Dict mapping from field names (including "index") to
+                preallocated arrays of shape ``(len(indices), ...)`` with the
+                dtype of the field, e.g., ``{"solution":
+                np.empty((batch_size, solution_dim))}``. The data of these
+                fields is gathered into the arrays with :func:`numpy.take`
+                rather than into new arrays, and the arrays themselves are
+                returned in ``data``. This avoids allocating arrays on every
+                call when data is retrieved repeatedly, e.g., in an emitter.
+                Fields that are in ``out`` but not in ``fields`` are ignored.
 
         Returns:
             tuple: 2-element tuple consisting of:
@@ -346,71 +1062,97 @@ class ArrayStore:
                 Like the other return types, the columns can be adjusted with
                 the ``fields`` parameter.
 
-            All data returned by this method will be a copy, i.e., the data will
-            not update as the store changes.
+              - ``return_type="arrow"``: A :class:`pyarrow.RecordBatch` with one
+                column per field (plus ``index``), named after the field.
+                Unlike with ``pandas``, fields are not split into multiple
+                columns; instead, fields with 1D entries become fixed-size list
+                columns (e.g., ``measures`` becomes a column of type
+                ``fixed_size_list<float>[10]``), and fields with >1D entries
+                become nested fixed-size lists. The columns wrap the NumPy
+                arrays retrieved from the store without any further per-column
+                copy. Fields with ``bool`` dtype are the exception, since Arrow
+                packs booleans into bits. Requires pyarrow, which can be
+                installed with ``pip install ribs[arrow]``.
+
+            Unless ``copy=False`` was passed, all data returned by this method
+            will be a copy, i.e., the data will not update as the store changes.
 
         Raises:
             ValueError: Invalid field name provided.
             ValueError: Invalid return_type provided.
+            ValueError: An array in ``out`` has the wrong shape or dtype.
         """
-        single_field = isinstance(fields, str)
         indices = np.asarray(indices, dtype=np.int32)
-        occupied = self._props["occupied"][indices]  # Induces copy.
 
-        if single_field:
-            data = None
-        elif return_type in ("dict", "pandas"):
-            data = {}
-        elif return_type == "tuple":
-            data = []
+        # When views are allowed, all the arrays are indexed with a slice rather
+        # than with `indices`.
+        view_slice = (None if copy or return_type == "pandas" else
+                      _contiguous_slice(indices))
+        if view_slice is None:
+            occupied = self._props["occupied"][indices]  # Induces copy.
         else:
-            raise ValueError(f"Invalid return_type {return_type}.")
+            occupied = readonly(self._props["occupied"][view_slice])
+
+        return occupied, self._gather(
+            indices, indices if view_slice is None else view_slice, fields,
+            return_type, out)
+
+    def _gather(self, indices, rows, fields, return_type, out=None):
+        """Collects the data in the given rows of the arrays, in the format of
+        ``data`` in :meth:`retrieve`.
+
+        ``indices`` is reported as the "index" field. If ``rows`` is an int
+        array, the data are copied, and if it is a slice, the data are read-only
+        views of the arrays (except for fields with a codec, which are always
+        decoded into new arrays). Fields in ``out`` are gathered into the given
+        arrays instead. ``rows`` must be valid rows of the arrays.
+        """
+        single_field = isinstance(fields, str)
+        views = isinstance(rows, slice)
 
         if single_field:
             fields = [fields]
         elif fields is None:
             fields = itertools.chain(self._fields, ["index"])
 
+        columns = []
         for name in fields:
-            # Collect array data.
-            #
+            buf = None if out is None else out.get(name)
+
             # Note that fancy indexing with indices already creates a copy, so
             # only `indices` needs to be copied explicitly.
             if name == "index":
-                arr = np.copy(indices)
+                if buf is not None:
+                    arr = _copy_into(name, buf, indices)
+                else:
+                    arr = readonly(
+                        indices.view()) if views else np.copy(indices)
+            elif name in self._codecs:
+                # Decoding always creates a new array.
+                arr = self._decode(name, self._fields[name][rows])
+                if buf is not None:
+                    arr = _copy_into(name, buf, arr)
             elif name in self._fields:
-                arr = self._fields[name][indices]  # Induces copy.
+                field = self._fields[name]
+                if buf is None:
+                    arr = field[rows]  # Induces copy for int rows.
+                    if views:
+                        arr = readonly(arr)
+                elif views or not isinstance(field, np.ndarray):
+                    arr = _copy_into(name, buf, field[rows])
+                else:
+                    _check_out(name, buf, (len(rows),) + field.shape[1:],
+                               field.dtype)
+                    # The rows are valid, so "wrap" only serves to avoid the
+                    # temporary buffer that numpy.take uses in "raise" mode.
+                    arr = np.take(field, rows, axis=0, out=buf, mode="wrap")
             else:
                 raise ValueError(f"`{name}` is not a field in this ArrayStore.")
+            columns.append((name, arr))
 
-            # Accumulate data into the return type.
-            if single_field:
-                data = arr
-            elif return_type == "dict":
-                data[name] = arr
-            elif return_type == "tuple":
-                data.append(arr)
-            elif return_type == "pandas":
-                if len(arr.shape) == 1:  # Scalar entries.
-                    data[name] = arr
-                elif len(arr.shape) == 2:  # 1D array entries.
-                    for i in range(arr.shape[1]):
-                        data[f"{name}_{i}"] = arr[:, i]
-                else:
-                    raise ValueError(
-                        f"Field `{name}` has shape {arr.shape[1:]} -- "
-                        "cannot convert fields with shape >1D to Pandas")
-
-        # Postprocess return data.
-        if return_type == "tuple":
-            data = tuple(data)
-        elif return_type == "pandas":
-            # Data above are already copied, so no need to copy again.
-            data = ArchiveDataFrame(data, copy=False)
+        return columns[0][1] if single_field else _pack(columns, return_type)
 
-        return occupied, data
-
-    def data(self, fields=None, return_type="dict"):
+    def data(self, fields=None, return_type="dict", copy=True, out=None):
         """Retrieves data for all entries in the store.
 
         Equivalent to calling :meth:`retrieve` with :attr:`occupied_list`.
@@ -418,11 +1160,204 @@ class ArrayStore:
         Args:
             fields (str or array-like of str): See :meth:`retrieve`.
             return_type (str): See :meth:`retrieve`.
+            copy (bool): See :meth:`retrieve`. Views are returned when the
+                :attr:`occupied_list` is a contiguous increasing range, as is
+                the case for stores that are filled in order (such as the store
+                in :class:`~ribs.archives.ProximityArchive`).
+            out (dict): See :meth:`retrieve`. The arrays must have a length of
+                ``len(store)``.
         Returns:
             See ``data`` in :meth:`retrieve`. ``occupied`` is not returned since
             all indices are known to be occupied in this method.
         """
-        return self.retrieve(self.occupied_list, fields, return_type)[1]
+        return self.retrieve(self.occupied_list, fields, return_type, copy,
+                             out)[1]
+
+    def changes_since(self, token):
+        """Lists the indices that were written since the given token.
+
+        The store keeps a bounded log of the indices written by :meth:`add`, so
+        structures derived from the store (e.g., heatmaps or dense arrays of
+        objectives) can be updated by only visiting the entries that changed,
+        rather than the entire store::
+
+            indices, token = store.changes_since(None)  # indices is None.
+            ... # Build the structure from store.data().
+            while ...:
+                ... # Modify the store.
+                indices, token = store.changes_since(token)
+                if indices is None:
+                    ... # Rebuild the structure from store.data().
+                else:
+                    ... # Update the structure at `indices`.
+
+        If the changes since ``token`` are not known, ``indices`` is None, which
+        means that the caller should rebuild everything it derived from the
+        store. This is the case when ``token`` is None or came from another
+        store, when the log overflowed since ``token`` (the log holds up to
+        65,536 indices), and when entries were removed with :meth:`clear`,
+        :meth:`remove`, or :meth:`compact` since ``token``. It is also always
+        the case for stores attached with :meth:`attach`, since the log is held
+        by the process that writes to the store.
+
+        Args:
+            token: Token returned by a previous call to this method, or None.
+        Returns:
+            tuple: 2-element tuple of ``(indices, token)``, where ``indices`` is
+            a sorted int32 array of the unique indices that were written since
+            ``token`` (or None as described above), and ``token`` is the token
+            to pass to the next call.
+        """
+        changes = self._changes
+        new_token = (changes["id"], self.generation)
+        if (token is None or token[0] != changes["id"] or
+                not changes["start"] <= token[1] <= self.generation or
+            (self._shm is not None and self._readonly)):
+            return None, new_token
+
+        arrays = []
+        for generation, indices in reversed(changes["entries"]):
+            if generation <= token[1]:
+                break
+            arrays.append(indices)
+        indices = (np.unique(np.concatenate(arrays))
+                   if arrays else np.empty(0, dtype=np.int32))
+        return indices, new_token
+
+    def _reset_changes(self):
+        """Starts a new change log, so that changes_since() reports a full
+        refresh for all previous tokens."""
+        self._changes = {
+            "id": next(_CHANGE_LOG_IDS),
+            "start": self.generation,
+            "entries": collections.deque(),
+            "size": 0,
+        }
+
+    def _record_changes(self, indices):
+        """Records the indices written by add() in the change log, dropping the
+        oldest entries once the log is full."""
+        changes = self._changes
+        changes["entries"].append(
+            (self.generation, np.asarray(indices, dtype=np.int32)))
+        changes["size"] += len(indices)
+        while changes["size"] > _CHANGE_LOG_SIZE:
+            generation, dropped = changes["entries"].popleft()
+            changes["size"] -= len(dropped)
+            # Changes up to this generation are no longer known.
+            changes["start"] = generation
+
+    def write_arrow(self,
+                    path,
+                    fields=None,
+                    file_format="parquet",
+                    chunk_size=100_000):
+        """Writes all entries in the store to a Parquet or Feather file.
+
+        Entries are retrieved and written in chunks of ``chunk_size`` entries,
+        so at most one chunk is held in memory at a time regardless of the size
+        of the store. Each chunk is written as a record batch in the format of
+        ``retrieve(..., return_type="arrow")``.
+
+        Requires pyarrow, which can be installed with ``pip install
+        ribs[arrow]``.
+
+        Args:
+            path (str or pathlib.Path): Path of the output file.
+            fields (array-like of str): Fields to include in the file. By
+                default, all fields and the index are included.
+            file_format (str): Either ``"parquet"`` or ``"feather"`` (i.e., the
+                Arrow IPC file format).
+            chunk_size (int): Number of entries to write at a time.
+        Raises:
+            ValueError: Invalid file_format provided.
+            ValueError: Invalid field name provided.
+        """
+        if file_format not in ("parquet", "feather"):
+            raise ValueError(f"Invalid file_format {file_format}.")
+        if isinstance(fields, str):
+            fields = [fields]
+
+        pa = _import_pyarrow()
+        occupied_list = self.occupied_list
+
+        def chunk(start):
+            return self.retrieve(occupied_list[start:start + chunk_size],
+                                 fields,
+                                 return_type="arrow")[1]
+
+        batch = chunk(0)
+        if file_format == "parquet":
+            # pylint: disable-next = import-outside-toplevel
+            import pyarrow.parquet
+            writer = pyarrow.parquet.ParquetWriter(os.fspath(path),
+                                                   batch.schema)
+        else:
+            writer = pa.ipc.new_file(os.fspath(path), batch.schema)
+
+        with writer:
+            for start in range(0, len(occupied_list), chunk_size):
+                if start > 0:
+                    batch = chunk(start)
+                writer.write_batch(batch)
+
+    def to_records(self, fields=None, chunk_size=100_000):
+        """Copies all entries in the store into a NumPy structured array.
+
+        Each entry becomes one record of the array, and each field becomes a
+        (possibly multi-dimensional) column named after the field, with the
+        shape and dtype of the field as given by :attr:`field_desc` and
+        :attr:`dtypes_with_index`. Fields with a
+        :class:`~ribs.archives.FieldCodec` are decoded. The entries are in the
+        order of :attr:`occupied_list`, and they are copied in chunks of
+        ``chunk_size`` entries, so the only full-size array that is allocated
+        is the result.
+
+        Example:
+
+            ::
+
+                records = store.to_records()
+                records.dtype  # [("objective", "<f4"), ("measures", "<f4",
+                               #  (2,)), ("index", "<i4")]
+                records["measures"]  # Shape: (len(store), 2)
+
+        Args:
+            fields (array-like of str): Fields to include in the array. By
+                default, all fields and the index are included.
+            chunk_size (int): Number of entries to copy at a time.
+        Returns:
+            numpy.ndarray: Structured array of length ``len(store)``.
+        Raises:
+            ValueError: Invalid field name provided.
+        """
+        if fields is None:
+            fields = self.field_list_with_index
+        elif isinstance(fields, str):
+            fields = [fields]
+        invalid = set(fields) - set(self.field_list_with_index)
+        if invalid:
+            raise ValueError(f"Invalid fields: {invalid}")
+
+        # As in write_arrow(), only public members are used here, so that other
+        # stores can call this method too.
+        field_desc = self.field_desc
+        dtypes = self.dtypes_with_index
+        records = np.empty(
+            len(self),
+            dtype=[(name, dtypes[name],
+                    () if name == "index" else field_desc[name][0])
+                   for name in fields],
+        )
+
+        occupied_list = self.occupied_list
+        for start in range(0, len(occupied_list), chunk_size):
+            _, data = self.retrieve(occupied_list[start:start + chunk_size],
+                                    fields)
+            for name, arr in data.items():
+                records[name][start:start + len(arr)] = arr
+
+        return records
 
     def add(self, indices, data):
         """Adds new data to the store at the given indices.
@@ -450,49 +1385,192 @@ class ArrayStore:
             ValueError: ``data`` has fields that have a different length than
                 ``indices``.
         """
-        self._props["updates"][Update.ADD] += 1
+        with self._writing():
+            self._props["updates"][Update.ADD] += 1
 
-        if len(indices) == 0:
-            return
+            if len(indices) == 0:
+                self._log_record(Update.ADD)
+                return
 
-        for name, arr in data.items():
-            if len(arr) != len(indices):
-                raise ValueError(
-                    f"In `data`, the array for `{name}` has length "
-                    f"{len(arr)} but should be the same length as indices "
-                    f"({len(indices)})")
+            for name, arr in data.items():
+                if len(arr) != len(indices):
+                    raise ValueError(
+                        f"In `data`, the array for `{name}` has length "
+                        f"{len(arr)} but should be the same length as indices "
+                        f"({len(indices)})")
 
-        if data.keys() != self._fields.keys():
-            raise ValueError(
-                f"`data` has keys {data.keys()} but should have the "
-                f"same keys as this ArrayStore, i.e., {self._fields.keys()}. "
-                "This error may occur if the archive has extra_fields but the "
-                "fields were not passed to archive.add() or scheduler.tell(). "
-                "This can also occur if the archive and result_archive have "
-                "different extra_fields.")
-
-        # Update occupancy data.
-        unique_indices = np.where(aggregate(indices, 1, func="len") != 0)[0]
-        cur_occupied = self._props["occupied"][unique_indices]
-        new_indices = unique_indices[~cur_occupied]
-        n_occupied = self._props["n_occupied"]
-        self._props["occupied"][new_indices] = True
-        self._props["occupied_list"][n_occupied:n_occupied +
-                                     len(new_indices)] = new_indices
-        self._props["n_occupied"] = n_occupied + len(new_indices)
-
-        # Insert into the ArrayStore. Note that we do not assume indices are
-        # unique. Hence, when updating occupancy data above, we computed the
-        # unique indices. In contrast, here we let NumPy's default behavior
-        # handle duplicate indices.
-        for name, arr in self._fields.items():
-            arr[indices] = data[name]
+            if data.keys() != self._fields.keys():
+                raise ValueError(
+                    f"`data` has keys {data.keys()} but should have the "
+                    "same keys as this ArrayStore, i.e., "
+                    f"{self._fields.keys()}. This error may occur if the "
+                    "archive has extra_fields but the fields were not passed "
+                    "to archive.add() or scheduler.tell(). This can also occur "
+                    "if the archive and result_archive have different "
+                    "extra_fields.")
+
+            # Update occupancy data.
+            unique_indices = np.where(aggregate(indices, 1, func="len") != 0)[0]
+            cur_occupied = self._props["occupied"][unique_indices]
+            new_indices = unique_indices[~cur_occupied]
+            n_occupied = self._props["n_occupied"]
+            new_slice = slice(n_occupied, n_occupied + len(new_indices))
+            self._before_write("props.occupied", new_indices)
+            self._before_write("props.occupied_list", new_slice)
+            self._props["occupied"][new_indices] = True
+            self._props["occupied_list"][new_slice] = new_indices
+            self._props["n_occupied"] = n_occupied + len(new_indices)
+            if self._positions is not None:
+                self._positions[new_indices] = np.arange(
+                    n_occupied, n_occupied + len(new_indices))
+
+            # Insert into the ArrayStore. Note that we do not assume indices are
+            # unique. Hence, when updating occupancy data above, we computed the
+            # unique indices. In contrast, here we let NumPy's default behavior
+            # handle duplicate indices.
+            for name, arr in self._fields.items():
+                self._before_write(f"fields.{name}", unique_indices)
+                arr[indices] = (self._codecs[name][1].encode(data[name])
+                                if name in self._codecs else data[name])
+
+            self._record_changes(unique_indices)
+            self._log_record(Update.ADD, unique_indices)
 
     def clear(self):
         """Removes all entries from the store."""
-        self._props["updates"][Update.CLEAR] += 1
-        self._props["n_occupied"] = 0  # Effectively clears occupied_list too.
-        self._props["occupied"].fill(False)
+        with self._writing():
+            self._props["updates"][Update.CLEAR] += 1
+            # Effectively clears occupied_list too.
+            self._props["n_occupied"] = 0
+            self._before_write("props.occupied")
+            self._props["occupied"].fill(False)
+            self._reset_changes()
+            self._log_record(Update.CLEAR)
+
+    def _position_map(self):
+        """Returns the array mapping occupied indices to their positions in
+        ``occupied_list``, building it if necessary."""
+        if self._positions is None:
+            n_occupied = self._props["n_occupied"]
+            self._positions = np.empty(self._props["capacity"], np.int32)
+            self._positions[self._props["occupied_list"][:n_occupied]] = \
+                np.arange(n_occupied)
+        return self._positions
+
+    def remove(self, indices):
+        """Removes the entries at the given indices from the store.
+
+        Each removed index is swapped out of :attr:`occupied_list` with one of
+        the indices at the end of the list, so removing ``k`` entries takes
+        ``O(k)`` time rather than time proportional to the size of the store
+        (the first call also takes ``O(capacity)`` time to set up a map from
+        indices to positions in :attr:`occupied_list`). As a result, removal
+        does not preserve the order of :attr:`occupied_list`. Removed indices
+        keep their old data, but they are no longer marked as occupied.
+
+        Removal counts as a call to :meth:`clear` in the ``updates`` prop, e.g.,
+        for the purposes of detecting modifications during iteration.
+
+        Args:
+            indices (array-like): Indices to remove. Duplicate indices and
+                indices that are not occupied are ignored.
+        """
+        with self._writing():
+            self._props["updates"][Update.CLEAR] += 1
+
+            indices = np.unique(np.asarray(indices, dtype=np.int32))
+            indices = indices[self._props["occupied"][indices]]
+            positions = self._position_map()[indices]
+
+            n_occupied = self._props["n_occupied"]
+            n_remaining = n_occupied - len(indices)
+            occupied_list = self._props["occupied_list"]
+
+            # The last len(indices) positions of occupied_list are about to be
+            # cut off. Entries at these positions that are not being removed
+            # fill the holes left by removed entries at earlier positions; there
+            # are exactly as many of these entries as there are holes.
+            keep_tail = np.ones(len(indices), dtype=bool)
+            keep_tail[positions[positions >= n_remaining] - n_remaining] = False
+            movers = occupied_list[n_remaining:n_occupied][keep_tail]
+            holes = positions[positions < n_remaining]
+            self._before_write("props.occupied_list", holes)
+            occupied_list[holes] = movers
+            self._positions[movers] = holes
+
+            self._before_write("props.occupied", indices)
+            self._props["occupied"][indices] = False
+            self._props["n_occupied"] = n_remaining
+
+            self._reset_changes()
+            self._log_record(_LOG_REMOVE, indices, rows=False)
+
+    def compact(self, capacity=None):
+        """Renumbers the entries in the store to indices ``0`` through
+        ``len(store) - 1``.
+
+        Entries keep their relative order, i.e., an entry with a lower index
+        than another entry before compaction also has a lower index after
+        compaction, and :attr:`occupied_list` becomes ``[0, 1, ...,
+        len(store) - 1]``. This is useful for stores that grow by appending
+        entries, such as the store in :class:`~ribs.archives.ProximityArchive`,
+        after entries have been removed with :meth:`remove`. The store can also
+        be shrunk to free the space left by removed entries.
+
+        Compaction counts as a call to :meth:`clear` in the ``updates`` prop.
+
+        Args:
+            capacity (int): New capacity of the store. Defaults to the current
+                capacity. For memmap stores, shrinking only reduces the portion
+                of the files that is used; the files themselves are not
+                truncated.
+        Returns:
+            numpy.ndarray: int32 array of size ``(old_capacity,)`` mapping each
+            old index to its new index, or to -1 if the old index was not
+            occupied. Derived structures that refer to entries by index can use
+            this array to update their references, e.g., ``new_index =
+            index_map[old_index]``.
+        Raises:
+            ValueError: ``capacity`` is less than the number of entries in the
+                store.
+        """
+        cur_capacity = self._props["capacity"]
+        capacity = cur_capacity if capacity is None else capacity
+        n_occupied = self._props["n_occupied"]
+        if capacity < n_occupied:
+            raise ValueError(
+                f"New capacity ({capacity}) must be at least the number of "
+                f"entries in the store ({n_occupied}).")
+
+        with self._writing():
+            self._props["updates"][Update.CLEAR] += 1
+
+            old_indices = np.flatnonzero(self._props["occupied"]).astype(
+                np.int32)
+            index_map = np.full(cur_capacity, -1, dtype=np.int32)
+            index_map[old_indices] = np.arange(n_occupied)
+
+            # Since old_indices is increasing, each entry moves to an index at
+            # or before its old index. The right-hand side is gathered into a
+            # copy before assignment, so entries are never overwritten before
+            # they move.
+            for name, arr in self._fields.items():
+                self._before_write(f"fields.{name}", slice(0, n_occupied))
+                arr[:n_occupied] = arr[old_indices]
+            self._before_write("props.occupied")
+            self._before_write("props.occupied_list", slice(0, n_occupied))
+            self._props["occupied"][:n_occupied] = True
+            self._props["occupied"][n_occupied:] = False
+            self._props["occupied_list"][:n_occupied] = np.arange(n_occupied)
+            self._positions = None
+
+            if capacity != cur_capacity:
+                self._set_capacity(capacity)
+
+            self._reset_changes()
+            self._log_record(_LOG_COMPACT)
+
+        return index_map
 
     def resize(self, capacity):
         """Resizes the store to the given capacity.
@@ -508,21 +1586,122 @@ class ArrayStore:
                 f"New capacity ({capacity}) must be greater than current "
                 f"capacity ({self._props['capacity']}.")
 
+        with self._writing():
+            self._set_capacity(capacity)
+
+    def _set_capacity(self, capacity):
+        """Grows or shrinks all arrays in the store to the given capacity.
+
+        When growing, the new indices are marked as unoccupied. When shrinking,
+        all occupied indices must be less than ``capacity``.
+        """
+        if self._memmap_dir is not None:
+            # The new memmaps share their files with the current ones, which
+            # the snapshots refer to.
+            self._before_write("props.occupied")
+            self._before_write("props.occupied_list")
+            for name in self._fields:
+                self._before_write(f"fields.{name}")
+
         cur_capacity = self._props["capacity"]
         self._props["capacity"] = capacity
 
-        cur_occupied = self._props["occupied"]
-        self._props["occupied"] = np.zeros(capacity, dtype=bool)
-        self._props["occupied"][:cur_capacity] = cur_occupied
+        self._props["occupied"] = self._grow("props.occupied",
+                                             self._props["occupied"], capacity)
+        self._props["occupied"][cur_capacity:] = False
 
-        cur_occupied_list = self._props["occupied_list"]
-        self._props["occupied_list"] = np.empty(capacity, dtype=np.int32)
-        self._props["occupied_list"][:cur_capacity] = cur_occupied_list
+        self._props["occupied_list"] = self._grow("props.occupied_list",
+                                                  self._props["occupied_list"],
+                                                  capacity)
 
         for name, cur_arr in self._fields.items():
-            new_shape = (capacity,) + cur_arr.shape[1:]
-            self._fields[name] = np.empty(new_shape, cur_arr.dtype)
-            self._fields[name][:cur_capacity] = cur_arr
+            self._fields[name] = self._grow(f"fields.{name}", cur_arr, capacity)
+
+        if self._positions is not None:
+            positions = np.empty(capacity, np.int32)
+            n = min(cur_capacity, capacity)
+            positions[:n] = self._positions[:n]
+            self._positions = positions
+
+        self._write_storage_meta()
+
+    def snapshot(self):
+        """Returns a read-only copy of the store at this point in time.
+
+        The snapshot initially shares the arrays of the store, so creating it
+        takes time proportional to the number of fields rather than the number
+        of entries. Whenever the store is about to write to a chunk of one of
+        these arrays (about 1 MiB of rows), it first copies the chunk into the
+        snapshot, so each chunk is copied at most once per snapshot, and only
+        if it is written. Reading from the snapshot thus gives a consistent
+        view of the store even while the store is modified, e.g., in another
+        thread.
+
+        Snapshots support all the methods for reading the store, and they
+        always return copies of the data. Methods that modify a snapshot raise
+        a :class:`RuntimeError`. The snapshot of a snapshot is the snapshot
+        itself.
+
+        Returns:
+            ArrayStore: The snapshot.
+        Raises:
+            RuntimeError: The store was attached with :meth:`attach`. Such
+                stores are modified by another process, so they cannot copy
+                chunks before modifications. Use :meth:`consistent_read`
+                instead.
+        """
+        # pylint: disable = protected-access
+        if self._readonly:
+            if self._shm is not None:
+                raise RuntimeError(
+                    "Stores attached from shared memory cannot be snapshotted.")
+            return self
+
+        snapshot = ArrayStore({}, 0)  # Create an empty store.
+        snapshot._props = {
+            "capacity": self._props["capacity"],
+            "occupied": _SnapshotArray(self._props["occupied"]),
+            "n_occupied": self._props["n_occupied"],
+            "occupied_list": _SnapshotArray(self._props["occupied_list"]),
+            "updates": np.array(self._props["updates"]),
+        }
+        snapshot._fields = {
+            name: _SnapshotArray(arr) for name, arr in self._fields.items()
+        }
+        snapshot._codecs = self._codecs
+        snapshot._readonly = True
+        # The snapshot answers changes_since() as of the time it was taken.
+        snapshot._changes = dict(self._changes,
+                                 entries=collections.deque(
+                                     self._changes["entries"]))
+
+        self._snapshots.append(weakref.ref(snapshot))
+        return snapshot
+
+    def _before_write(self, key, rows=None):
+        """Saves the chunks of the array with the given key that are about to
+        be written at ``rows`` into the snapshots of the store.
+
+        ``key`` has the same format as the keys of :meth:`as_raw_dict`, and
+        ``rows`` may be an array of indices, a slice, or None to indicate the
+        entire array.
+        """
+        # pylint: disable = protected-access
+        if not self._snapshots:
+            return
+
+        group, name = key.split(".", 1)
+        live = (self._props if group == "props" else self._fields)[name]
+
+        snapshots = []
+        for ref in self._snapshots:
+            snapshot = ref()
+            if snapshot is None:
+                continue
+            snapshots.append(ref)
+            arrays = snapshot._props if group == "props" else snapshot._fields
+            arrays[name].save(live, rows)
+        self._snapshots = snapshots
 
     def as_raw_dict(self):
         """Returns the raw data in the ArrayStore as a one-level dictionary.
@@ -538,13 +1717,16 @@ class ArrayStore:
               ...
             }
 
+        Fields with a :class:`~ribs.archives.FieldCodec` are given in their
+        encoded form.
+
         Returns:
             dict: See description above.
         """
         d = {}
         for prefix, attr in [("props", self._props), ("fields", self._fields)]:
             for name, val in attr.items():
-                if isinstance(val, np.ndarray):
+                if isinstance(val, (np.ndarray, _SnapshotArray)):
                     val = readonly(val.view())
                 d[f"{prefix}.{name}"] = val
         return d
@@ -553,6 +1735,9 @@ class ArrayStore:
     def from_raw_dict(d):
         """Loads an ArrayStore from a dict of raw info.
 
+        The returned store has no codecs, so fields that were encoded with a
+        :class:`~ribs.archives.FieldCodec` hold their encoded data.
+
         Args:
             d (dict): Dict returned by :meth:`as_raw_dict`.
         Returns:
@@ -582,5 +1767,529 @@ class ArrayStore:
 
         store._props = props
         store._fields = fields
+        store._reset_changes()
+
+        return store
+
+    ## Delta log ##
+
+    def start_log(self, log_dir):
+        """Starts recording changes to the store in a delta log.
+
+        The log lives in ``log_dir`` and consists of a base snapshot of the
+        store (``base.npz``) and an append-only file of deltas (``log.bin``).
+        After this method is called, every call to :meth:`add` and
+        :meth:`clear` appends a compact binary record to the log. Records for
+        :meth:`add` hold only the indices that were inserted and the rows of
+        each field at those indices, so writing the log costs time proportional
+        to the number of changed entries rather than to the size of the store.
+        Each record is keyed by the ``updates`` counters of the store, and each
+        record is checksummed so that a record torn by a crash is detected and
+        discarded by :meth:`load_log`.
+
+        Records are buffered in memory; call :meth:`sync_log` to force them to
+        disk, and call :meth:`compact_log` to fold the records into the base
+        snapshot once the log grows large.
+
+        Fields with ``object`` dtype are pickled, both in the base snapshot and
+        in the records, so logs of such stores should only be loaded from
+        trusted sources.
+
+        If the store is already logging to another directory, that log is
+        closed first.
+
+        Args:
+            log_dir (str or pathlib.Path): Directory for the log. It is created
+                if it does not exist. Any existing log in the directory is
+                overwritten.
+        """
+        self.close_log()
+        log_dir = os.fspath(log_dir)
+        os.makedirs(log_dir, exist_ok=True)
+        self._log_dir = log_dir
+        self._write_log_base()
+
+    def sync_log(self):
+        """Flushes buffered records of the delta log to disk.
+
+        Once this method returns, :meth:`load_log` is able to recover the
+        current state of the store even if the process crashes.
+
+        Raises:
+            RuntimeError: The store is not logging its changes.
+        """
+        if self._log_file is None:
+            raise RuntimeError("This ArrayStore is not logging its changes; "
+                               "call start_log() first.")
+        self._log_file.flush()
+        os.fsync(self._log_file.fileno())
+
+    def compact_log(self):
+        """Folds the records of the delta log into its base snapshot.
+
+        The base snapshot is replaced with a snapshot of the current state of
+        the store, and the record file is truncated.
+
+        Raises:
+            RuntimeError: The store is not logging its changes.
+        """
+        if self._log_file is None:
+            raise RuntimeError("This ArrayStore is not logging its changes; "
+                               "call start_log() first.")
+        self._write_log_base()
+
+    def close_log(self):
+        """Stops recording changes in the delta log.
+
+        Buffered records are flushed to disk before the log is closed. Nothing
+        happens if the store is not logging its changes.
+        """
+        if self._log_file is not None:
+            self.sync_log()
+            self._log_file.close()
+        self._log_dir = None
+        self._log_file = None
+
+    def _write_log_base(self):
+        """Writes a base snapshot of the store and starts a new record file."""
+        if self._log_file is not None:
+            self._log_file.close()
+
+        # Write to a temporary file first so that the snapshot is replaced
+        # atomically. Records left over from before the snapshot are skipped
+        # by load_log() since their updates counters predate the snapshot, so a
+        # crash before the record file is truncated below is harmless.
+        path = os.path.join(self._log_dir, "base.npz")
+        with open(path + ".tmp", "wb") as file:
+            np.savez(file, **self.as_raw_dict())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path + ".tmp", path)
+
+        # pylint: disable-next = consider-using-with
+        self._log_file = open(os.path.join(self._log_dir, "log.bin"), "wb")
+
+    def _log_record(self, op, indices=None, rows=True):
+        """Appends a record for the given operation to the delta log.
+
+        If ``rows`` is True, the rows of each field at ``indices`` are written
+        after the indices.
+        """
+        if self._log_file is None:
+            return
+
+        n = 0 if indices is None else len(indices)
+        body = [
+            _LOG_HEADER.pack(op, self._props["updates"][Update.ADD],
+                             self._props["updates"][Update.CLEAR],
+                             self._props["capacity"], n)
+        ]
+        if n > 0:
+            indices = np.asarray(indices, dtype=np.int32)
+            body.append(indices.tobytes())
+            if rows:
+                for arr in self._fields.values():
+                    if arr.dtype == object:
+                        # Rows of objects have no fixed size, so they are
+                        # pickled and prefixed with their length.
+                        rows_bytes = pickle.dumps(arr[indices])
+                        body.append(_LOG_LENGTH.pack(len(rows_bytes)))
+                        body.append(rows_bytes)
+                    else:
+                        body.append(
+                            np.ascontiguousarray(arr[indices]).tobytes())
+        body = b"".join(body)
+
+        self._log_file.write(
+            _LOG_LENGTH.pack(len(body)) + body +
+            _LOG_CRC.pack(zlib.crc32(body)))
+
+    @staticmethod
+    def load_log(log_dir, resume=False, field_desc=None):
+        """Loads an ArrayStore from a delta log written by :meth:`start_log`.
+
+        The base snapshot is loaded, and then the records in the log are
+        replayed on top of it. Replay stops at the first incomplete or corrupted
+        record, which is how a record torn by a crash shows up.
+
+        Fields with ``object`` dtype are unpickled, so only logs from trusted
+        sources should be loaded.
+
+        Args:
+            log_dir (str or pathlib.Path): Directory of the log.
+            resume (bool): If True, the loaded store continues to record its
+                changes in the same log. Any torn records at the end of the log
+                are removed so that new records are appended after the last
+                valid one.
+            field_desc (dict): Description of the fields of the store, as in
+                the constructor. The log only holds fields with a
+                :class:`~ribs.archives.FieldCodec` in their encoded form, so the
+                codecs must be passed here for such fields to be decoded.
+        Returns:
+            ArrayStore: The new ArrayStore, which holds its data in memory.
+        """
+        # pylint: disable = protected-access
+
+        log_dir = os.fspath(log_dir)
+        # Fields with object dtype are pickled in the base snapshot.
+        with np.load(os.path.join(log_dir, "base.npz"),
+                     allow_pickle=True) as base:
+            d = {name: base[name] for name in base.files}
+        for name in ["props.capacity", "props.n_occupied"]:
+            d[name] = int(d[name])
+        store = ArrayStore.from_raw_dict(d)
+        base_updates = store._props["updates"].copy()
+
+        log_path = os.path.join(log_dir, "log.bin")
+        with open(log_path, "rb") as file:
+            buffer = file.read()
+
+        offset = 0
+        while True:
+            body_start = offset + _LOG_LENGTH.size
+            if body_start > len(buffer):
+                break
+            (length,) = _LOG_LENGTH.unpack_from(buffer, offset)
+            body_end = body_start + length
+            if body_end + _LOG_CRC.size > len(buffer):
+                break
+            body = buffer[body_start:body_end]
+            (crc,) = _LOG_CRC.unpack_from(buffer, body_end)
+            if crc != zlib.crc32(body):
+                break
+            offset = body_end + _LOG_CRC.size
+
+            op, n_add, n_clear, capacity, n = _LOG_HEADER.unpack_from(body)
+            if n_add + n_clear <= base_updates.sum():
+                # The record is already included in the base snapshot.
+                continue
+
+            if capacity > store._props["capacity"]:
+                store.resize(capacity)
+
+            if op == Update.CLEAR:
+                store.clear()
+            elif op == _LOG_COMPACT:
+                store.compact(capacity)
+            elif op == _LOG_REMOVE:
+                store.remove(np.frombuffer(body, np.int32, n, _LOG_HEADER.size))
+            elif n > 0:
+                pos = _LOG_HEADER.size
+                indices = np.frombuffer(body, np.int32, n, pos)
+                pos += indices.nbytes
+                data = {}
+                for name, arr in store._fields.items():
+                    if arr.dtype == object:
+                        (size,) = _LOG_LENGTH.unpack_from(body, pos)
+                        pos += _LOG_LENGTH.size
+                        data[name] = pickle.loads(body[pos:pos + size])
+                        pos += size
+                        continue
+                    count = n * int(np.prod(arr.shape[1:], dtype=int))
+                    data[name] = np.frombuffer(body, arr.dtype, count,
+                                               pos).reshape((n,) +
+                                                            arr.shape[1:])
+                    pos += data[name].nbytes
+                store.add(indices, data)
+
+            store._props["updates"][Update.ADD] = n_add
+            store._props["updates"][Update.CLEAR] = n_clear
+
+        # The codecs are only set now so that the replay above writes the
+        # encoded rows directly.
+        for name, (field_shape, dtype) in (field_desc or {}).items():
+            if isinstance(dtype, FieldCodec):
+                if isinstance(field_shape, numbers.Integral):
+                    field_shape = (field_shape,)
+                store._codecs[name] = (tuple(field_shape), dtype)
+
+        # Changes made during the replay are not reported by changes_since().
+        store._reset_changes()
+
+        if resume:
+            store._log_dir = log_dir
+            # pylint: disable-next = consider-using-with
+            store._log_file = open(log_path, "r+b")
+            store._log_file.truncate(offset)
+            store._log_file.seek(offset)
 
         return store
+
+    ## Shared memory ##
+
+    def _create_shared_header(self):
+        """Creates the header segment of a store in shared memory."""
+        name = f"ribs_{secrets.token_hex(6)}"
+        header = SharedMemory(name, create=True, size=_SHM_HEADER_SIZE)
+        meta = np.ndarray((_SHM_LAYOUT_OFFSET // 8,), np.int64, header.buf)
+        meta.fill(0)
+        self._shm = {
+            "name": name,
+            "header": header,
+            "meta": meta,
+            "segments": {},
+            "retired": [],
+            "count": 0,
+            "epoch": 0,
+        }
+
+    def _allocate_shared(self, key, shape, dtype):
+        """Allocates an array in a new shared memory segment, retiring the
+        segment that previously held the array with the given key."""
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape, dtype=int)) * dtype.itemsize
+        segment = SharedMemory(f"{self._shm['name']}_{self._shm['count']}",
+                               create=True,
+                               size=max(size, 1))
+        self._shm["count"] += 1
+
+        old_segment = self._shm["segments"].get(key)
+        if old_segment is not None:
+            # Readers that still map the old segment keep their mapping, and
+            # they switch to the new segment once they see the new epoch.
+            old_segment.unlink()
+            self._shm["retired"].append(old_segment)
+        self._shm["segments"][key] = segment
+
+        return np.ndarray(shape, dtype, segment.buf)
+
+    def _shared_arrays(self):
+        """Returns a dict mapping from keys to the arrays held in shared
+        memory."""
+        arrays = {
+            f"props.{name}": self._props[name]
+            for name in ["occupied", "occupied_list", "updates"]
+        }
+        for name, arr in self._fields.items():
+            arrays[f"fields.{name}"] = arr
+        return arrays
+
+    def _write_shared_layout(self):
+        """Publishes the arrays of the store to readers in other processes."""
+        # Segments retired by earlier reallocations can usually be closed by
+        # now, since the arrays that referred to them have been replaced.
+        self._shm["retired"] = [
+            segment for segment in self._shm["retired"]
+            if not _close_segment(segment)
+        ]
+
+        layout = json.dumps({
+            "arrays": {
+                key: [
+                    self._shm["segments"][key].name,
+                    list(arr.shape), arr.dtype.str
+                ] for key, arr in self._shared_arrays().items()
+            },
+            # Readers need the codecs to decode the fields.
+            "codecs": pickle.dumps(self._codecs).hex(),
+        }).encode("utf-8")
+        if _SHM_LAYOUT_OFFSET + len(layout) > _SHM_HEADER_SIZE:
+            raise ValueError("The store has too many fields to be placed in "
+                             "shared memory.")
+
+        buf = self._shm["header"].buf
+        buf[_SHM_LAYOUT_OFFSET:_SHM_LAYOUT_OFFSET + len(layout)] = layout
+        meta = self._shm["meta"]
+        meta[_SHM_LAYOUT_LEN] = len(layout)
+        meta[_SHM_N_OCCUPIED] = self._props["n_occupied"]
+        meta[_SHM_EPOCH] += 1
+        self._shm["epoch"] = int(meta[_SHM_EPOCH])
+
+    def _load_shared_layout(self):
+        """Attaches to the arrays that the owner of the store last published.
+
+        Raises:
+            RuntimeError: The owner released the store from shared memory.
+        """
+        meta = self._shm["meta"]
+        epoch = int(meta[_SHM_EPOCH])
+        if epoch == -1:
+            raise RuntimeError(
+                f"The store `{self._shm['name']}` is no longer in shared "
+                "memory.")
+
+        length = int(meta[_SHM_LAYOUT_LEN])
+        layout = json.loads(
+            bytes(
+                self._shm["header"].buf[_SHM_LAYOUT_OFFSET:_SHM_LAYOUT_OFFSET +
+                                        length]))
+
+        segments = {}
+        arrays = {}
+        try:
+            for key, (name, shape, dtype) in layout["arrays"].items():
+                segments[key] = _attach_segment(name)
+                arrays[key] = readonly(
+                    np.ndarray(shape, dtype, segments[key].buf))
+        except FileNotFoundError:
+            # The owner reallocated the arrays again while we were attaching.
+            for segment in segments.values():
+                _close_segment(segment)
+            raise
+
+        self._props = {
+            "capacity": len(arrays["props.occupied"]),
+            "occupied": arrays["props.occupied"],
+            "n_occupied": 0,
+            "occupied_list": arrays["props.occupied_list"],
+            "updates": arrays["props.updates"],
+        }
+        self._fields = {
+            key[len("fields."):]: arr
+            for key, arr in arrays.items()
+            if key.startswith("fields.")
+        }
+        del arrays
+        self._codecs = pickle.loads(bytes.fromhex(layout["codecs"]))
+
+        self._shm["retired"] = [
+            segment for segment in itertools.chain(
+                self._shm["retired"], self._shm["segments"].values())
+            if not _close_segment(segment)
+        ]
+        self._shm["segments"] = segments
+        self._shm["epoch"] = epoch
+
+    @staticmethod
+    def attach(name):
+        """Attaches to a store that another process placed in shared memory.
+
+        The returned store reads the live arrays of the original store without
+        copying them, and it cannot be modified. Since the original store may be
+        modified at any time, reads should go through :meth:`consistent_read`.
+        Call :meth:`detach` once the store is no longer needed.
+
+        Args:
+            name (str): The :attr:`shm_name` of the original store.
+        Returns:
+            ArrayStore: The attached store.
+        Raises:
+            FileNotFoundError: There is no store with the given name in shared
+                memory.
+        """
+        # pylint: disable = protected-access
+        store = ArrayStore({}, 0)  # Create an empty store.
+        header = _attach_segment(name)
+        meta = np.ndarray((_SHM_LAYOUT_OFFSET // 8,), np.int64, header.buf)
+        store._shm = {
+            "name": name,
+            "header": header,
+            "meta": readonly(meta),
+            "segments": {},
+            "retired": [],
+            "count": 0,
+            "epoch": None,
+        }
+        store._readonly = True
+        store.consistent_read(lambda store: None)
+        return store
+
+    def consistent_read(self, fn, timeout=None):
+        """Calls ``fn`` on this store until the call does not overlap a
+        modification of the store.
+
+        This method implements the reader side of a sequence lock. The owner of
+        a store in shared memory makes the sequence number in the header of the
+        store odd while it modifies the store (e.g., during :meth:`add`) and
+        even afterwards. A read is consistent if the sequence number was even
+        before the read and unchanged after it; otherwise, the read may be torn,
+        and ``fn`` is called again. Before each call, the store attaches to
+        reallocated arrays (e.g., after :meth:`resize`) and picks up the current
+        number of entries.
+
+        ``fn`` should copy any data it reads, e.g., by calling :meth:`retrieve`
+        or :meth:`data` with ``copy=True``, since views of the arrays would
+        change along with the original store. Exceptions raised by ``fn``
+        during a torn read are ignored, as they can be caused by the torn read
+        itself.
+
+        For stores that are not attached from shared memory, this method simply
+        calls ``fn``.
+
+        Args:
+            fn (callable): Function that takes in this store and returns the
+                result of the read.
+            timeout (float): Maximum time in seconds to wait for a consistent
+                read. By default, there is no limit.
+        Returns:
+            The return value of ``fn`` from a consistent read.
+        Raises:
+            TimeoutError: No consistent read was possible within ``timeout``.
+            RuntimeError: The owner released the store from shared memory.
+        """
+        if self._shm is None or not self._readonly:
+            return fn(self)
+
+        meta = self._shm["meta"]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            seq = int(meta[_SHM_SEQ])
+            if seq % 2 == 0:
+                try:
+                    if int(meta[_SHM_EPOCH]) != self._shm["epoch"]:
+                        self._load_shared_layout()
+                    self._props["n_occupied"] = int(meta[_SHM_N_OCCUPIED])
+                    result = fn(self)
+                except Exception:  # pylint: disable = broad-exception-caught
+                    if int(meta[_SHM_SEQ]) == seq:
+                        raise
+                else:
+                    if int(meta[_SHM_SEQ]) == seq:
+                        return result
+
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(
+                    "Could not read the store within the timeout since it kept "
+                    "being modified.")
+            time.sleep(0)
+
+    def detach(self):
+        """Closes the shared memory of a store returned by :meth:`attach`.
+
+        The store must not be used afterwards.
+        """
+        if self._shm is None or not self._readonly:
+            return
+        self._props = {}
+        self._fields = {}
+        self._shm["meta"] = None
+        for segment in itertools.chain(self._shm["retired"],
+                                       self._shm["segments"].values(),
+                                       [self._shm["header"]]):
+            _close_segment(segment)
+        self._shm = None
+
+    def release_shared_memory(self):
+        """Moves the store out of shared memory.
+
+        The arrays are copied into private memory, and their shared memory
+        segments are unlinked. Attached readers can no longer read the store;
+        their reads raise a :class:`RuntimeError`. Stores that are not in shared
+        memory (including stores returned by :meth:`attach`) are unaffected.
+        """
+        if self._shm is None or self._readonly:
+            return
+
+        # Copy the arrays out before any modification that may come from the
+        # caller after this method returns.
+        self._props = {
+            name: np.array(val) if isinstance(val, np.ndarray) else val
+            for name, val in self._props.items()
+        }
+        self._fields = {
+            name: np.array(arr) for name, arr in self._fields.items()
+        }
+
+        meta = self._shm["meta"]
+        meta[_SHM_EPOCH] = -1
+        meta[_SHM_SEQ] += 2
+        del meta
+        self._shm["meta"] = None  # Releases the buffer of the header.
+
+        for segment in itertools.chain(self._shm["segments"].values(),
+                                       [self._shm["header"]]):
+            segment.unlink()
+            _close_segment(segment)
+        for segment in self._shm["retired"]:
+            _close_segment(segment)
+        self._shm = None
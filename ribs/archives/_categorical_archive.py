@@ -1,6 +1,7 @@
 """Contains the CategoricalArchive."""
+import os
+
 import numpy as np
-from numpy_groupies import aggregate_nb as aggregate
 
 from ribs._utils import (check_batch_shape, check_shape, validate_batch,
                          validate_single)
@@ -8,7 +9,8 @@ from ribs.archives._archive_base import ArchiveBase
 from ribs.archives._archive_stats import ArchiveStats
 from ribs.archives._array_store import ArrayStore
 from ribs.archives._grid_archive import GridArchive
-from ribs.archives._utils import (fill_sentinel_values, parse_dtype,
+from ribs.archives._utils import (batch_insertion, fill_sentinel_values,
+                                  load_records, parse_dtype, snapshot_archive,
                                   validate_cma_mae_settings)
 
 
@@ -63,6 +65,9 @@ class CategoricalArchive(ArchiveBase):
             ``np.float64``. Second, ``dtype`` can be a dict specifying separate
             dtypes, of the form ``{"solution": <dtype>, "objective": <dtype>,
             "measures": <dtype>}``.
+            In the dict, the solution dtype may also be a
+            :class:`~ribs.archives.FieldCodec`, which stores the solutions in
+            reduced precision.
         extra_fields (dict): Description of extra fields of data that is stored
             next to elite data like solutions and objectives. The description is
             a dict mapping from a field name (str) to a tuple of ``(shape,
@@ -70,7 +75,8 @@ class CategoricalArchive(ArchiveBase):
             np.float32)}`` will create a "foo" field that contains scalar values
             and a "bar" field that contains 10D values. Note that field names
             must be valid Python identifiers, and names already used in the
-            archive are not allowed.
+            archive are not allowed. The dtype of an extra field may also be a
+            :class:`~ribs.archives.FieldCodec`.
     Raises:
         ValueError: Invalid values for learning_rate and threshold_min.
         ValueError: Invalid names in extra_fields.
@@ -141,9 +147,12 @@ class CategoricalArchive(ArchiveBase):
         self._qd_score_offset = self.dtypes["objective"](qd_score_offset)
 
         # Set up statistics -- objective_sum is the sum of all objective values
-        # in the archive; it is useful for computing qd_score and obj_mean.
-        self._best_elite = None
+        # in the archive; it is useful for computing qd_score and obj_mean. It
+        # is kept in float64 and only cast to the objective dtype in stats.
         self._objective_sum = None
+        self._obj_max = None
+        self._best_index = None
+        self._best_elite = None
         self._stats = None
         self._stats_reset()
 
@@ -159,12 +168,39 @@ class CategoricalArchive(ArchiveBase):
 
     @property
     def stats(self):
+        if self._stats is None:
+            num_elites = len(self)
+            objective_dtype = self.dtypes["objective"]
+            if num_elites == 0:
+                self._stats = ArchiveStats(
+                    num_elites=0,
+                    coverage=objective_dtype(0.0),
+                    qd_score=objective_dtype(0.0),
+                    norm_qd_score=objective_dtype(0.0),
+                    obj_max=None,
+                    obj_mean=None,
+                )
+            else:
+                qd_score = (self._objective_sum -
+                            num_elites * np.float64(self._qd_score_offset))
+                self._stats = ArchiveStats(
+                    num_elites=num_elites,
+                    coverage=objective_dtype(num_elites / self.cells),
+                    qd_score=objective_dtype(qd_score),
+                    norm_qd_score=objective_dtype(qd_score / self.cells),
+                    obj_max=self._obj_max,
+                    obj_mean=objective_dtype(self._objective_sum / num_elites),
+                )
         return self._stats
 
     @property
     def empty(self):
         return len(self._store) == 0
 
+    @property
+    def generation(self):
+        return self._store.generation
+
     ## Properties that are not in ArchiveBase ##
     ## Roughly ordered by the parameter list in the constructor. ##
 
@@ -189,6 +225,7 @@ class CategoricalArchive(ArchiveBase):
             threshold of the best elite's cell after the best elite was inserted
             into the archive.
         """
+        self._load_best_elite()
         return self._best_elite
 
     @property
@@ -235,43 +272,57 @@ class CategoricalArchive(ArchiveBase):
 
     def _stats_reset(self):
         """Resets the archive stats."""
+        self._objective_sum = np.float64(0.0)
+        self._obj_max = None
+        self._best_index = None
         self._best_elite = None
-        self._objective_sum = self.dtypes["objective"](0.0)
-        self._stats = ArchiveStats(
-            num_elites=0,
-            coverage=self.dtypes["objective"](0.0),
-            qd_score=self.dtypes["objective"](0.0),
-            norm_qd_score=self.dtypes["objective"](0.0),
-            obj_max=None,
-            obj_mean=None,
-        )
+        self._stats = None
 
-    def _stats_update(self, new_objective_sum, new_best_index):
+    def _stats_recompute(self):
+        """Recomputes the archive stats from the elites currently in the
+        store."""
+        self._stats_reset()
+        if self.empty:
+            return
+        objective = self._store.data("objective")
+        best = np.argmax(objective)
+        self._stats_update(np.sum(objective, dtype=np.float64),
+                           self._store.occupied_list[best], objective[best])
+
+    def _stats_update(self, new_objective_sum, new_best_index,
+                      new_best_objective):
         """Updates statistics based on a new sum of objective values
-        (new_objective_sum) and the index of a potential new best elite
-        (new_best_index)."""
-        _, new_best_elite = self._store.retrieve([new_best_index])
-        new_best_elite = {k: v[0] for k, v in new_best_elite.items()}
-
-        if (self._stats.obj_max is None or
-                new_best_elite["objective"] > self._stats.obj_max):
-            self._best_elite = new_best_elite
-            new_obj_max = new_best_elite["objective"]
-        else:
-            new_obj_max = self._stats.obj_max
+        (new_objective_sum) and the index and objective of a potential new best
+        elite (new_best_index and new_best_objective).
 
+        Only the raw counters are updated here; :attr:`stats` and
+        :attr:`best_elite` are built from them when they are accessed, so that
+        frequent small additions do not pay for retrieving the best elite and
+        creating an ArchiveStats every time.
+        """
+        # The objective may come straight from the validated input, so it is
+        # cast to match the objectives stored in the archive.
+        new_best_objective = self.dtypes["objective"](new_best_objective)
+        if self._obj_max is None or new_best_objective > self._obj_max:
+            self._obj_max = new_best_objective
+            self._best_index = new_best_index
+            self._best_elite = None
         self._objective_sum = new_objective_sum
-        new_qd_score = (
-            self._objective_sum -
-            self.dtypes["objective"](len(self)) * self._qd_score_offset)
-        self._stats = ArchiveStats(
-            num_elites=len(self),
-            coverage=self.dtypes["objective"](len(self) / self.cells),
-            qd_score=new_qd_score,
-            norm_qd_score=self.dtypes["objective"](new_qd_score / self.cells),
-            obj_max=new_obj_max,
-            obj_mean=self.dtypes["objective"](self._objective_sum / len(self)),
-        )
+        self._stats = None
+
+    def _load_best_elite(self, indices=None):
+        """Retrieves the best elite from the store if it has not been retrieved
+        since it was found.
+
+        If ``indices`` is passed, the best elite is only retrieved if it is at
+        one of the indices, i.e., right before those cells are overwritten.
+        This matters in non-elitist archives, where the cell of the best elite
+        may be taken by an elite with a lower objective.
+        """
+        if (self._best_elite is None and self._best_index is not None and
+            (indices is None or np.any(indices == self._best_index))):
+            _, best_elite = self._store.retrieve([self._best_index])
+            self._best_elite = {k: v[0] for k, v in best_elite.items()}
 
     def index_of(self, measures):
         """Returns archive indices for the given batch of measures.
@@ -327,47 +378,6 @@ class CategoricalArchive(ArchiveBase):
 
     ## Methods for writing to the archive ##
 
-    @staticmethod
-    def _compute_thresholds(indices, objective, cur_threshold, learning_rate,
-                            dtype):
-        """Computes new thresholds with the CMA-MAE batch threshold update rule.
-
-        If entries in `indices` are duplicated, they receive the same threshold.
-        """
-        if len(indices) == 0:
-            return np.array([], dtype=dtype)
-
-        # Compute the number of objectives inserted into each cell. Note that we
-        # index with `indices` to place the counts at all relevant indices. For
-        # instance, if we had an array [1,2,3,1,5], we would end up with
-        # [2,1,1,2,1] (there are 2 1's, 1 2, 1 3, 2 1's, and 1 5).
-        #
-        # All objective_sizes should be > 0 since we only retrieve counts for
-        # indices in `indices`.
-        objective_sizes = aggregate(indices, 1, func="len",
-                                    fill_value=0)[indices]
-
-        # Compute the sum of the objectives inserted into each cell -- again, we
-        # index with `indices`.
-        objective_sums = aggregate(indices,
-                                   objective,
-                                   func="sum",
-                                   fill_value=np.nan)[indices]
-
-        # Update the threshold with the batch update rule from Fontaine 2023
-        # (https://arxiv.org/abs/2205.10752).
-        #
-        # Unlike in single_entry_with_threshold, we do not need to worry about
-        # cur_threshold having -np.inf here as a result of threshold_min being
-        # -np.inf. This is because the case with threshold_min = -np.inf is
-        # handled separately since we compute the new threshold based on the max
-        # objective in each cell in that case.
-        ratio = dtype(1.0 - learning_rate)**objective_sizes
-        new_threshold = (ratio * cur_threshold +
-                         (objective_sums / objective_sizes) * (1 - ratio))
-
-        return new_threshold
-
     def add(self, solution, objective, measures, **fields):
         """Inserts a batch of solutions into the archive.
 
@@ -478,97 +488,46 @@ class CategoricalArchive(ArchiveBase):
 
         # Retrieve indices of the archive cells.
         indices = self.index_of(data["measures"])
-        batch_size = len(indices)
-
-        # Retrieve current data and thresholds. Unoccupied cells default to
-        # threshold_min.
-        cur_occupied, cur_data = self._store.retrieve(indices)
-        cur_threshold = cur_data["threshold"]
-        cur_threshold[~cur_occupied] = self.threshold_min
-
-        # Compute status -- arrays below are all boolean arrays of length
-        # batch_size.
-        #
-        # When we want CMA-ME behavior, the threshold defaults to -inf for new
-        # cells, which satisfies the condition for can_insert.
-        can_insert = data["objective"] > cur_threshold
-        is_new = can_insert & ~cur_occupied
-        improve_existing = can_insert & cur_occupied
-        add_info["status"] = np.zeros(batch_size, dtype=np.int32)
-        add_info["status"][is_new] = 2
-        add_info["status"][improve_existing] = 1
-
-        # If threshold_min is -inf, then we want CMA-ME behavior, which computes
-        # the improvement value of new solutions w.r.t zero. Otherwise, we
-        # compute improvement with respect to threshold_min.
-        cur_threshold[is_new] = (self.dtypes["threshold"](0.0)
-                                 if self.threshold_min == -np.inf else
-                                 self.threshold_min)
-        add_info["value"] = data["objective"] - cur_threshold
-
-        # Return early if we cannot insert anything -- continuing throws a
-        # ValueError in aggregate() since index[can_insert] would be empty.
-        if not np.any(can_insert):
-            return add_info
 
-        # Select all solutions that _can_ be inserted -- at this point, there
-        # are still conflicts in the insertions, e.g., multiple solutions can
-        # map to index 0.
-        indices = indices[can_insert]
-        data = {name: arr[can_insert] for name, arr in data.items()}
-        cur_threshold = cur_threshold[can_insert]
-
-        # Compute the new threshold associated with each entry.
-        if self.threshold_min == -np.inf:
-            # Regular archive behavior: thresholds are just the objectives.
-            new_threshold = data["objective"]
-        else:
-            # Batch threshold update described in Fontaine 2023
-            # (https://arxiv.org/abs/2205.10752). This computation is based on
-            # the mean objective of all solutions in the batch that could have
-            # been inserted into each cell.
-            new_threshold = self._compute_thresholds(indices, data["objective"],
-                                                     cur_threshold,
-                                                     self.learning_rate,
-                                                     self.dtypes["threshold"])
-
-        # Retrieve indices of solutions that _should_ be inserted into the
-        # archive. Currently, multiple solutions may be inserted at each archive
-        # index, but we only want to insert the maximum among these solutions.
-        # Thus, we obtain the argmax for each archive index.
-        #
-        # We use a fill_value of -1 to indicate archive indices that were not
-        # covered in the batch. Note that the length of archive_argmax is only
-        # max(indices), rather than the total number of grid cells. However,
-        # this is okay because we only need the indices of the solutions, which
-        # we store in should_insert.
-        #
-        # aggregate() always chooses the first item if there are ties, so the
-        # first elite will be inserted if there is a tie. See their default
-        # numpy implementation for more info:
-        # https://github.com/ml31415/numpy-groupies/blob/master/numpy_groupies/aggregate_numpy.py#L107
-        archive_argmax = aggregate(indices,
-                                   data["objective"],
-                                   func="argmax",
-                                   fill_value=-1)
-        should_insert = archive_argmax[archive_argmax != -1]
+        # Retrieve current thresholds and objectives.
+        cur_occupied, (cur_threshold, cur_objective) = self._store.retrieve(
+            indices, ["threshold", "objective"], return_type="tuple")
+
+        # Compute the status and value of each solution, as well as which
+        # solutions to insert and their new thresholds. When we want CMA-ME
+        # behavior, the threshold defaults to -inf for new cells, so every
+        # solution can be inserted into a new cell, and the value of new
+        # solutions is computed w.r.t. zero. Otherwise, values are computed
+        # w.r.t. threshold_min, and thresholds follow the batch threshold update
+        # described in Fontaine 2023 (https://arxiv.org/abs/2205.10752). When
+        # multiple solutions can be inserted into the same cell, only the one
+        # with the highest objective is inserted, and the first one wins ties.
+        (status, value, should_insert, new_threshold, objective_delta,
+         best) = batch_insertion(indices, data["objective"], cur_occupied,
+                                 cur_threshold, cur_objective,
+                                 self.threshold_min, self.learning_rate)
+        add_info["status"] = status
+        add_info["value"] = value
+
+        # Return early if we cannot insert anything.
+        if len(should_insert) == 0:
+            return add_info
 
         # Select only solutions that will be inserted into the archive.
         indices = indices[should_insert]
         data = {name: arr[should_insert] for name, arr in data.items()}
-        data["threshold"] = new_threshold[should_insert]
+        data["threshold"] = new_threshold
 
-        # Insert elites into the store.
+        # Insert elites into the store. With a learning rate below 1, an elite
+        # may be replaced by one with a lower objective, so the best elite must
+        # be retrieved before its cell is overwritten.
+        self._load_best_elite(indices)
         self._store.add(indices, data)
 
         # Compute statistics.
-        cur_objective = cur_data["objective"]
-        cur_objective[~cur_occupied] = 0.0
-        cur_objective = cur_objective[can_insert][should_insert]
-        objective_sum = (self._objective_sum +
-                         np.sum(data["objective"] - cur_objective))
-        best_index = indices[np.argmax(data["objective"])]
-        self._stats_update(objective_sum, best_index)
+        objective_sum = self._objective_sum + objective_delta
+        self._stats_update(objective_sum, indices[best],
+                           data["objective"][best])
 
         return add_info
 
@@ -677,7 +636,9 @@ class CategoricalArchive(ArchiveBase):
             data["threshold"] = [(cur_threshold * (1.0 - self.learning_rate) +
                                   objective * self.learning_rate)]
 
-            # Insert elite into the store.
+            # Insert elite into the store, retrieving the best elite first in
+            # case this overwrites it (see add()).
+            self._load_best_elite(index)
             self._store.add(index[None], {
                 name: np.expand_dims(arr, axis=0) for name, arr in data.items()
             })
@@ -686,7 +647,7 @@ class CategoricalArchive(ArchiveBase):
             cur_objective = (cur_data["objective"][0]
                              if cur_occupied else self.dtypes["objective"](0.0))
             self._stats_update(self._objective_sum + objective - cur_objective,
-                               index)
+                               index, objective)
 
         # Value is the improvement over the current threshold (can be negative).
         add_info["value"] = objective - cur_threshold
@@ -698,6 +659,81 @@ class CategoricalArchive(ArchiveBase):
         self._store.clear()
         self._stats_reset()
 
+    def remove(self, indices):
+        """Removes the elites at the given indices from the archive.
+
+        Emptied cells behave like cells that were never filled; in particular,
+        their CMA-MAE thresholds start over from :attr:`threshold_min`.
+
+        Args:
+            indices (array-like): Indices of elites to remove; see
+                :meth:`index_of`. Indices without an elite are ignored.
+        """
+        self._store.remove(indices)
+        self._stats_recompute()
+
+    def checkpoint(self, path, compact=False):
+        """Persists the archive to a delta log in the directory ``path``.
+
+        Measures with ``object`` dtype (the default) are pickled in the log.
+        See :meth:`ArchiveBase.checkpoint
+        <ribs.archives.ArchiveBase.checkpoint>` for more info.
+        """
+        path = os.fspath(path)
+        if self._store.log_dir != path:
+            self._store.start_log(path)
+        elif compact:
+            self._store.compact_log()
+        else:
+            self._store.sync_log()
+
+    def restore(self, path):
+        """Restores the elites in the archive from a log written by
+        :meth:`checkpoint`.
+
+        See :meth:`ArchiveBase.restore
+        <ribs.archives.ArchiveBase.restore>` for more info.
+
+        Args:
+            path (str or pathlib.Path): Directory of the log.
+        Raises:
+            ValueError: The fields of the elites in the log do not match the
+                fields of this archive.
+            ValueError: The capacity of the archive in the log is not the
+                number of cells in this archive.
+        """
+        store = ArrayStore.load_log(path,
+                                    resume=True,
+                                    field_desc=self._store.field_desc)
+        if (store.field_desc != self._store.field_desc or
+                store.capacity != self.cells):
+            store.close_log()
+            raise ValueError(
+                f"The archive in {os.fspath(path)} has fields "
+                f"{store.field_desc} and capacity {store.capacity}, which "
+                "do not match the fields "
+                f"{self._store.field_desc} and number of cells "
+                f"{self.cells} of this archive.")
+
+        self._store.close_log()
+        self._store = store
+        self._stats_recompute()
+
+    @classmethod
+    def from_records(cls, records, **kwargs):
+        """Creates an archive holding the elites in a structured array.
+
+        See :meth:`ArchiveBase.from_records
+        <ribs.archives.ArchiveBase.from_records>` for more info.
+        """
+        # pylint: disable = protected-access
+        archive = cls(**kwargs)
+        indices = (records["index"] if "index" in (records.dtype.names or ())
+                   else archive.index_of(records["measures"]))
+        load_records(archive._store, records, indices)
+        archive._stats_recompute()
+        return archive
+
     ## Methods for reading from the archive ##
     ## Refer to ArchiveBase for documentation of these methods. ##
 
@@ -718,14 +754,36 @@ class CategoricalArchive(ArchiveBase):
 
         return occupied[0], {field: arr[0] for field, arr in data.items()}
 
-    def data(self, fields=None, return_type="dict"):
-        return self._store.data(fields, return_type)
+    def data(self, fields=None, return_type="dict", copy=True, out=None):
+        return self._store.data(fields, return_type, copy, out)
 
-    def sample_elites(self, n):
+    def write_arrow(self,
+                    path,
+                    fields=None,
+                    file_format="parquet",
+                    chunk_size=100_000):
+        self._store.write_arrow(path, fields, file_format, chunk_size)
+
+    def to_records(self, fields=None):
+        return self._store.to_records(fields)
+
+    def iter_batches(self, batch_size, fields=None):
+        return self._store.iter_batches(batch_size, fields)
+
+    def changes_since(self, token, fields=None):
+        indices, token = self._store.changes_since(token)
+        if indices is None or fields is None:
+            return indices, token
+        return self._store.retrieve(indices, fields)[1], token
+
+    def sample_elites(self, n, fields=None, out=None):
         if self.empty:
             raise IndexError("No elements in archive.")
 
         random_indices = self._rng.integers(len(self._store), size=n)
         selected_indices = self._store.occupied_list[random_indices]
-        _, elites = self._store.retrieve(selected_indices)
+        _, elites = self._store.retrieve(selected_indices, fields, out=out)
         return elites
+
+    def snapshot(self):
+        return snapshot_archive(self)
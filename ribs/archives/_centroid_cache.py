@@ -0,0 +1,235 @@
+"""Provides CentroidCache."""
+import hashlib
+import json
+import os
+import shutil
+import socket
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Version of the layout of cache entries. It is part of every key so that
+# entries written in an older layout are never loaded.
+_CACHE_VERSION = 1
+
+
+def _encode(obj):
+    """Encodes objects that are not JSON-serializable when computing keys."""
+    if isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        return {
+            "sha256": hashlib.sha256(arr.tobytes()).hexdigest(),
+            "shape": arr.shape,
+            "dtype": arr.dtype.str,
+        }
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return repr(obj)
+
+
+def _pid_alive(pid):
+    """Checks whether a process with the given PID exists on this host."""
+    try:
+        # Signal 0 only checks that the process exists.
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists but belongs to another user.
+        return True
+    return True
+
+
+class CentroidCache:
+    """On-disk cache of the centroids of :class:`~ribs.archives.CVTArchive`.
+
+    Generating a CVT with k-means can take minutes when there are many cells,
+    and experiments with many seeds or many configurations would otherwise
+    repeat this work in every run. Passing ``centroid_cache`` to
+    :class:`~ribs.archives.CVTArchive` stores the centroids (and the samples
+    used to create them) under a key that is the hash of the parameters of the
+    CVT, e.g., the number of cells, the ranges, the centroid method, the
+    samples, the seed, and the k-means kwargs. Archives created later with the
+    same parameters load the centroids instead of generating them.
+
+    Each entry is a directory named after its key that holds one ``.npy`` file
+    per array. The arrays are loaded with ``np.load(..., mmap_mode="r")``, so
+    they are read-only and are only read from disk when they are used. Entries
+    are written to a temporary directory and renamed into place, so readers
+    never see partial entries. Writers also hold a lock file next to the entry
+    while they compute it, so when several processes of a sweep need the same
+    entry, one of them computes it and the others wait for it. The lock file
+    records the host, PID, and start time of the process holding it. If that
+    process was killed while holding the lock, i.e., it ran on the same host and
+    its PID no longer exists, the lock is stale and is broken by the next
+    process that waits for it (this check is only done on POSIX systems). Locks
+    held by processes on other hosts cannot be checked, so :meth:`get` also
+    accepts a ``timeout``.
+
+    Args:
+        directory (str or pathlib.Path): Directory holding the cache. It is
+            created if it does not exist.
+    """
+
+    def __init__(self, directory):
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def directory(self):
+        """pathlib.Path: Directory holding the cache."""
+        return self._directory
+
+    @staticmethod
+    def key(params):
+        """Computes the key of an entry.
+
+        Args:
+            params (dict): Parameters that determine the contents of the entry.
+                Values may be JSON-serializable objects or numpy arrays; arrays
+                are identified by the hash of their contents.
+        Returns:
+            str: Hex digest that identifies the parameters.
+        """
+        encoded = json.dumps({
+            "version": _CACHE_VERSION,
+            **params
+        },
+                             sort_keys=True,
+                             default=_encode)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def load(self, key):
+        """Loads the arrays in an entry.
+
+        Args:
+            key (str): Key of the entry.
+        Returns:
+            dict: Mapping from the name of each array to a read-only memory map
+            of the array, or None if the entry does not exist.
+        """
+        path = self._directory / key
+        if not path.is_dir():
+            return None
+        return {
+            file.stem: np.load(file, mmap_mode="r")
+            for file in sorted(path.glob("*.npy"))
+        }
+
+    def save(self, key, arrays):
+        """Saves arrays to an entry.
+
+        The entry is written to a temporary directory and then renamed to its
+        final location. If another process saved the entry first, the entry is
+        left as is.
+
+        Args:
+            key (str): Key of the entry.
+            arrays (dict): Mapping from names to arrays. Names must be valid
+                file names.
+        """
+        tmp_path = tempfile.mkdtemp(prefix=f".{key}-", dir=self._directory)
+        try:
+            for name, arr in arrays.items():
+                np.save(os.path.join(tmp_path, f"{name}.npy"), arr)
+            os.rename(tmp_path, self._directory / key)
+        except OSError:
+            if not (self._directory / key).is_dir():
+                raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    @staticmethod
+    def _read_lock(lock_path):
+        """Reads the holder of a lock, or returns None if the lock does not
+        exist or its holder has not been written yet."""
+        try:
+            with open(lock_path, encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _is_stale(holder):
+        """Checks whether the holder of a lock was killed while holding it."""
+        return (os.name == "posix" and
+                holder.get("host") == socket.gethostname() and
+                not _pid_alive(holder.get("pid")))
+
+    def _break_lock(self, lock_path, holder):
+        """Removes a stale lock with the given holder.
+
+        The lock is first renamed, so that only one of the processes that found
+        the lock to be stale removes it. If the renamed lock turns out to have
+        been taken by another process in the meantime, it is put back.
+        """
+        stale_path = lock_path.with_name(f"{lock_path.name}.{os.getpid()}")
+        try:
+            os.rename(lock_path, stale_path)
+        except FileNotFoundError:
+            return
+        if self._read_lock(stale_path) == holder:
+            os.remove(stale_path)
+        else:
+            os.rename(stale_path, lock_path)
+
+    def get(self, params, compute, poll_interval=0.1, timeout=None):
+        """Loads the entry for the given parameters, computing it if it does
+        not exist.
+
+        Args:
+            params (dict): Parameters of the entry; see :meth:`key`.
+            compute (callable): Function that takes no arguments and returns a
+                dict of arrays for the entry. It is only called by the one
+                process that holds the lock of the entry.
+            poll_interval (float): Seconds to wait between checks for the entry
+                while another process computes it.
+            timeout (float): Maximum number of seconds to wait for another
+                process to compute the entry. By default, there is no limit.
+        Returns:
+            dict: The arrays in the entry, as in :meth:`load`.
+        Raises:
+            TimeoutError: The entry was locked by another process for longer
+                than ``timeout`` seconds.
+        """
+        key = self.key(params)
+        lock_path = self._directory / f"{key}.lock"
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            arrays = self.load(key)
+            if arrays is not None:
+                return arrays
+
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                holder = self._read_lock(lock_path)
+                if holder is not None and self._is_stale(holder):
+                    self._break_lock(lock_path, holder)
+                    continue
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(
+                        f"Timed out after {timeout} s waiting for the lock "
+                        f"{lock_path}, which is held by {holder}. If the "
+                        "process holding it is no longer running, delete the "
+                        "lock file.") from None
+                time.sleep(poll_interval)
+                continue
+
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as file:
+                    json.dump(
+                        {
+                            "host": socket.gethostname(),
+                            "pid": os.getpid(),
+                            "time": time.time(),
+                        }, file)
+                # The entry may have been saved between the check above and
+                # taking the lock.
+                if not (self._directory / key).is_dir():
+                    self.save(key, compute())
+                return self.load(key)
+            finally:
+                os.remove(lock_path)
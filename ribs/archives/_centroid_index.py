@@ -0,0 +1,478 @@
+"""Provides indices for finding the nearest centroid in a CVTArchive."""
+import time
+
+import numba as nb
+import numpy as np
+from scipy.spatial import cKDTree  # pylint: disable=no-name-in-module
+from sklearn.cluster import k_means
+
+
+@nb.jit(nopython=True)
+def _squared_distance(x, y):
+    """Squared Euclidean distance between two vectors."""
+    total = 0.0
+    for k in range(len(x)):  # pylint: disable = consider-using-enumerate
+        diff = x[k] - y[k]
+        total += diff * diff
+    return total
+
+
+@nb.jit(nopython=True)
+def _ivf_query_nb(measures, centroids, probes, members, offsets):
+    """Finds the nearest centroid to each measure among the members of its
+    probed lists."""
+    indices = np.empty(len(measures), dtype=np.int32)
+    for i, query in enumerate(measures):
+        best = -1
+        best_dist = np.inf
+        for p in probes[i]:
+            for j in range(offsets[p], offsets[p + 1]):
+                dist = _squared_distance(query, centroids[members[j]])
+                if dist < best_dist:
+                    best = members[j]
+                    best_dist = dist
+        indices[i] = best
+    return indices
+
+
+@nb.jit(nopython=True)
+def _graph_query_nb(measures, centroids, neighbors, entries, ef):
+    """Finds the nearest centroid to each measure with a beam search over the
+    neighbor graph.
+
+    The beam holds the ``ef`` closest centroids seen so far, sorted by distance.
+    The search repeatedly expands the closest centroid in the beam that has not
+    been expanded, and it stops once every centroid in the beam is expanded.
+    """
+    indices = np.empty(len(measures), dtype=np.int32)
+    # Holds the number of the query that last visited each centroid, so that
+    # it does not need to be reset between queries.
+    visited = np.zeros(len(centroids), dtype=np.int64)
+    beam = np.empty(ef, dtype=np.int64)
+    beam_dist = np.empty(ef, dtype=np.float64)
+    expanded = np.empty(ef, dtype=np.bool_)
+
+    for i, query in enumerate(measures):
+        stamp = i + 1
+
+        # Start from the closest of the entry points.
+        start = entries[0]
+        start_dist = np.inf
+        for entry in entries:
+            dist = _squared_distance(query, centroids[entry])
+            if dist < start_dist:
+                start = entry
+                start_dist = dist
+        visited[start] = stamp
+        beam[0] = start
+        beam_dist[0] = start_dist
+        expanded[0] = False
+        size = 1
+
+        while True:
+            pos = 0
+            while pos < size and expanded[pos]:
+                pos += 1
+            if pos == size:
+                break
+            expanded[pos] = True
+            node = beam[pos]
+
+            for neighbor in neighbors[node]:
+                if visited[neighbor] == stamp:
+                    continue
+                visited[neighbor] = stamp
+                dist = _squared_distance(query, centroids[neighbor])
+                if size == ef and dist >= beam_dist[size - 1]:
+                    continue
+
+                # Insert the neighbor into the sorted beam, dropping the
+                # farthest centroid if the beam is full.
+                pos = size if size < ef else ef - 1
+                size = min(size + 1, ef)
+                while pos > 0 and beam_dist[pos - 1] > dist:
+                    beam[pos] = beam[pos - 1]
+                    beam_dist[pos] = beam_dist[pos - 1]
+                    expanded[pos] = expanded[pos - 1]
+                    pos -= 1
+                beam[pos] = neighbor
+                beam_dist[pos] = dist
+                expanded[pos] = False
+
+        indices[i] = beam[0]
+    return indices
+
+
+class CentroidIndex:
+    """Base class for indices that find the nearest centroid to points in
+    measure space.
+
+    :class:`~ribs.archives.CVTArchive` uses a centroid index in
+    :meth:`~ribs.archives.CVTArchive.index_of`. The index is selected with the
+    ``centroid_index`` argument of the archive, which may also be a subclass of
+    this class; the archive then constructs the subclass with its centroids and
+    with ``centroid_index_kwargs``.
+
+    Subclasses implement :meth:`query`.
+
+    Args:
+        centroids (array-like): (cells, measure_dim) array of centroids.
+    """
+
+    def __init__(self, centroids):
+        self._centroids = np.asarray(centroids)
+
+    @property
+    def centroids(self):
+        """numpy.ndarray: The centroids in the index."""
+        return self._centroids
+
+    def query(self, measures):
+        """Finds the nearest centroid to each point.
+
+        Args:
+            measures (numpy.ndarray): (batch_size, measure_dim) array of points
+                in measure space.
+        Returns:
+            numpy.ndarray: (batch_size,) int32 array with the index of the
+            nearest centroid to each point.
+        """
+        raise NotImplementedError
+
+
+class KDTreeIndex(CentroidIndex):
+    """Finds exact nearest centroids with a :class:`~scipy.spatial.cKDTree`.
+
+    Queries take roughly O(log(cells)) time in low-dimensional measure spaces,
+    but k-D trees degrade towards brute force as the dimensionality grows.
+
+    Args:
+        centroids (array-like): (cells, measure_dim) array of centroids.
+        workers (int): Number of threads used by
+            :meth:`~scipy.spatial.cKDTree.query`. Pass -1 to use all CPUs.
+        kwargs: kwargs for :class:`~scipy.spatial.cKDTree`.
+    """
+
+    def __init__(self, centroids, workers=1, **kwargs):
+        CentroidIndex.__init__(self, centroids)
+        self._workers = workers
+        self._tree = cKDTree(self._centroids, **kwargs)
+
+    def query(self, measures):
+        _, indices = self._tree.query(measures, workers=self._workers)
+        return indices.astype(np.int32)
+
+
+class BruteForceIndex(CentroidIndex):
+    """Finds exact nearest centroids by computing the distance to every
+    centroid.
+
+    Args:
+        centroids (array-like): (cells, measure_dim) array of centroids.
+        chunk_size (int): If passed, the distances are computed for chunk_size
+            points at a time, which limits the memory of the (chunk_size,
+            cells, measure_dim) array of differences.
+    """
+
+    def __init__(self, centroids, chunk_size=None):
+        CentroidIndex.__init__(self, centroids)
+        self._chunk_size = chunk_size
+
+    def query(self, measures):
+        expanded_measures = np.expand_dims(measures, axis=1)
+        # Compute indices chunks at a time
+        if self._chunk_size is not None and \
+                self._chunk_size < measures.shape[0]:
+            indices = []
+            chunks = np.array_split(
+                expanded_measures,
+                np.ceil(len(expanded_measures) / self._chunk_size))
+            for chunk in chunks:
+                distances = chunk - self._centroids
+                distances = np.sum(np.square(distances), axis=2)
+                current_res = np.argmin(distances, axis=1).astype(np.int32)
+                indices.append(current_res)
+            return np.concatenate(tuple(indices))
+        else:
+            # Brute force distance calculation -- start by taking the
+            # difference between each measure i and all the centroids.
+            distances = expanded_measures - self._centroids
+            # Compute the total squared distance -- no need to compute
+            # actual distance with a sqrt.
+            distances = np.sum(np.square(distances), axis=2)
+            return np.argmin(distances, axis=1).astype(np.int32)
+
+
+class GEMMIndex(CentroidIndex):
+    """Finds exact nearest centroids with matrix multiplications.
+
+    The squared distance between a point :math:`x` and a centroid :math:`c` is
+    :math:`||x||^2 - 2 x \\cdot c + ||c||^2`. The dot products for a block of
+    points and all the centroids form one matrix multiplication, which is
+    handled by BLAS, and the squared norms of the centroids are computed once
+    when the index is built. Since :math:`||x||^2` is the same for all the
+    centroids, it is skipped. Unlike :class:`BruteForceIndex`, this index only
+    allocates a (block_size, cells) array of distances rather than a
+    (batch_size, cells, measure_dim) array of differences.
+
+    Since the distances are computed from a difference of large terms, they
+    lose precision when the points and centroids are far from the origin
+    relative to the distances between them. Thus, the mean of the centroids is
+    subtracted from the centroids and the points, and the distances are
+    computed in float64 regardless of the dtype of the centroids. Points that
+    are nearly equidistant from two centroids may still be assigned to either
+    centroid due to rounding errors.
+
+    Args:
+        centroids (array-like): (cells, measure_dim) array of centroids.
+        block_size (int): Number of points for which distances are computed at
+            a time. By default, blocks hold about 4M distances.
+    """
+
+    def __init__(self, centroids, block_size=None):
+        CentroidIndex.__init__(self, centroids)
+        self._block_size = (max(1, (1 << 22) // len(self._centroids))
+                            if block_size is None else block_size)
+        centroids = self._centroids.astype(np.float64)
+        self._center = np.mean(centroids, axis=0)
+        centroids -= self._center
+        self._centroids_t = np.ascontiguousarray(centroids.T)
+        self._centroid_sq_norms = np.sum(np.square(centroids), axis=1)
+
+    def query(self, measures):
+        measures = np.asarray(measures)
+        indices = np.empty(len(measures), dtype=np.int32)
+        for start in range(0, len(measures), self._block_size):
+            block = (
+                measures[start:start + self._block_size].astype(np.float64) -
+                self._center)
+            distances = self._centroid_sq_norms - 2 * (
+                block @ self._centroids_t)
+            indices[start:start + self._block_size] = np.argmin(distances,
+                                                                axis=1)
+        return indices
+
+
+class AutoIndex(CentroidIndex):
+    """Selects the fastest exact index for the given centroids.
+
+    When this index is built, it builds a :class:`KDTreeIndex`, a
+    :class:`GEMMIndex`, and a :class:`BruteForceIndex` whose chunks hold about
+    4M differences. It then times queries of a calibration batch of random
+    points in the bounding box of the centroids with each of them, and it keeps
+    the fastest one, which is available as :attr:`selected`. Thus, the
+    selection depends on the number of centroids, the dimensionality of the
+    measure space, and the machine. Since rounding errors may cause
+    :class:`GEMMIndex` and :class:`BruteForceIndex` to return a different
+    centroid than the k-D tree, any candidate whose results for the calibration
+    batch differ from those of the :class:`KDTreeIndex` is rejected, and its
+    time is recorded as inf.
+
+    Args:
+        centroids (array-like): (cells, measure_dim) array of centroids.
+        workers (int): Number of threads for the :class:`KDTreeIndex`.
+        n_calibration (int): Number of points in the calibration batch.
+        seed (int): Seed for the calibration batch.
+        ckdtree_kwargs (dict): kwargs for :class:`~scipy.spatial.cKDTree`.
+    """
+
+    def __init__(self,
+                 centroids,
+                 workers=1,
+                 n_calibration=256,
+                 seed=None,
+                 ckdtree_kwargs=None):
+        CentroidIndex.__init__(self, centroids)
+        cells = len(self._centroids)
+        measure_dim = self._centroids.shape[1]
+        candidates = [
+            KDTreeIndex(self._centroids,
+                        workers=workers,
+                        **(ckdtree_kwargs or {})),
+            GEMMIndex(self._centroids),
+            BruteForceIndex(self._centroids,
+                            chunk_size=max(1,
+                                           (1 << 22) // (cells * measure_dim))),
+        ]
+
+        calibration = np.random.default_rng(seed).uniform(
+            self._centroids.min(axis=0),
+            self._centroids.max(axis=0),
+            (n_calibration, measure_dim),
+        ).astype(self._centroids.dtype)
+        self._times = {}
+        expected = None
+        for candidate in candidates:
+            # The first query is not timed since it may include one-time costs
+            # like loading BLAS.
+            candidate.query(calibration[:1])
+            start = time.perf_counter()
+            indices = candidate.query(calibration)
+            duration = time.perf_counter() - start
+            if expected is None:
+                # The k-D tree is first, and its results are the reference.
+                expected = indices
+            elif np.any(indices != expected):
+                duration = np.inf
+            self._times[type(candidate).__name__] = duration
+        self._selected = min(
+            candidates,
+            key=lambda candidate: self._times[type(candidate).__name__])
+
+    @property
+    def selected(self):
+        """CentroidIndex: The index used for queries."""
+        return self._selected
+
+    @property
+    def times(self):
+        """dict: Time in seconds taken by each candidate to query the
+        calibration batch, keyed by the name of its class."""
+        return self._times
+
+    def query(self, measures):
+        return self._selected.query(measures)
+
+
+class IVFIndex(CentroidIndex):
+    """Finds approximate nearest centroids with an inverted file (IVF) index.
+
+    The centroids are grouped into ``n_lists`` lists by running k-means over
+    the centroids themselves. To find the nearest centroid to a point, the
+    index first finds the ``n_probe`` lists whose k-means centers are closest to
+    the point, and it then only compares the point against the centroids in
+    those lists. Thus, ``n_probe`` trades recall for throughput: each query
+    costs about ``n_lists + n_probe * cells / n_lists`` distance computations,
+    and with ``n_probe = n_lists``, the index is exact.
+
+    Args:
+        centroids (array-like): (cells, measure_dim) array of centroids.
+        n_lists (int): Number of lists. Defaults to the square root of the
+            number of centroids.
+        n_probe (int): Number of lists to search for each point.
+        seed (int): Seed for the k-means clustering of the centroids.
+    Raises:
+        ValueError: ``n_lists`` or ``n_probe`` is less than 1.
+    """
+
+    def __init__(self, centroids, n_lists=None, n_probe=8, seed=None):
+        CentroidIndex.__init__(self, centroids)
+        cells = len(self._centroids)
+        n_lists = (max(1, int(np.sqrt(cells))) if n_lists is None else min(
+            n_lists, cells))
+        if n_lists < 1:
+            raise ValueError(f"n_lists must be at least 1 but is {n_lists}")
+        self.n_probe = n_probe
+
+        list_centers, labels, _ = k_means(self._centroids,
+                                          n_clusters=n_lists,
+                                          n_init=1,
+                                          init="random",
+                                          random_state=seed)
+        self._list_centers = list_centers.astype(self._centroids.dtype)
+        self._members = np.argsort(labels, kind="stable").astype(np.int32)
+        self._offsets = np.concatenate(
+            ([0], np.cumsum(np.bincount(labels, minlength=n_lists))))
+
+    @property
+    def n_lists(self):
+        """int: Number of lists in the index."""
+        return len(self._list_centers)
+
+    @property
+    def n_probe(self):
+        """int: Number of lists searched for each point. Can be set to tune
+        recall after the index is built."""
+        return self._n_probe
+
+    @n_probe.setter
+    def n_probe(self, n_probe):
+        if n_probe < 1:
+            raise ValueError(f"n_probe must be at least 1 but is {n_probe}")
+        self._n_probe = int(n_probe)
+
+    def query(self, measures):
+        measures = np.asarray(measures, dtype=self._centroids.dtype)
+        n_probe = min(self._n_probe, self.n_lists)
+        center_distances = np.sum(
+            np.square(np.expand_dims(measures, axis=1) - self._list_centers),
+            axis=2)
+        if n_probe == self.n_lists:
+            probes = np.broadcast_to(np.arange(self.n_lists),
+                                     center_distances.shape)
+        else:
+            probes = np.argpartition(center_distances, n_probe - 1,
+                                     axis=1)[:, :n_probe]
+        return _ivf_query_nb(measures, self._centroids,
+                             np.ascontiguousarray(probes), self._members,
+                             self._offsets)
+
+
+class GraphIndex(CentroidIndex):
+    """Finds approximate nearest centroids with a search over a neighbor graph
+    of the centroids, in the style of HNSW.
+
+    Each centroid is linked to its ``n_neighbors`` nearest centroids, and the
+    graph has two layers like a shallow HNSW graph: the upper layer is a
+    random sample of ``n_entry`` centroids, and the lower layer holds all the
+    centroids. To find the nearest centroid to a point, the index picks the
+    closest centroid in the upper layer and then runs a beam search with a beam
+    of width ``ef`` over the lower layer. Thus, ``ef`` trades recall for
+    throughput. Unlike :class:`IVFIndex`, the cost of a query grows slowly with
+    the number of centroids, which makes this index suited for archives with
+    many cells in high-dimensional measure spaces.
+
+    Args:
+        centroids (array-like): (cells, measure_dim) array of centroids.
+        n_neighbors (int): Number of neighbors of each centroid in the graph.
+        ef (int): Width of the beam in the search.
+        n_entry (int): Number of centroids in the upper layer. Defaults to the
+            square root of the number of centroids.
+        seed (int): Seed for selecting the centroids in the upper layer.
+    Raises:
+        ValueError: ``n_neighbors`` or ``ef`` is less than 1.
+    """
+
+    def __init__(self,
+                 centroids,
+                 n_neighbors=16,
+                 ef=16,
+                 n_entry=None,
+                 seed=None):
+        CentroidIndex.__init__(self, centroids)
+        cells = len(self._centroids)
+        if n_neighbors < 1:
+            raise ValueError(
+                f"n_neighbors must be at least 1 but is {n_neighbors}")
+        self.ef = ef
+
+        # The nearest neighbor of each centroid is itself, so it is skipped.
+        n_neighbors = min(n_neighbors, cells - 1)
+        if n_neighbors > 0:
+            _, neighbors = cKDTree(self._centroids).query(self._centroids,
+                                                          k=n_neighbors + 1)
+            self._neighbors = neighbors[:, 1:].astype(np.int32)
+        else:
+            self._neighbors = np.empty((cells, 0), dtype=np.int32)
+
+        n_entry = (max(1, int(np.sqrt(cells))) if n_entry is None else min(
+            max(n_entry, 1), cells))
+        self._entries = np.random.default_rng(seed).choice(
+            cells, n_entry, replace=False).astype(np.int32)
+
+    @property
+    def ef(self):
+        """int: Width of the beam in the search. Can be set to tune recall
+        after the index is built."""
+        return self._ef
+
+    @ef.setter
+    def ef(self, ef):
+        if ef < 1:
+            raise ValueError(f"ef must be at least 1 but is {ef}")
+        self._ef = int(ef)
+
+    def query(self, measures):
+        measures = np.asarray(measures, dtype=self._centroids.dtype)
+        return _graph_query_nb(measures, self._centroids, self._neighbors,
+                               self._entries, self._ef)
@@ -0,0 +1,697 @@
+"""Provides ChunkedArrayStore."""
+import json
+import os
+import shutil
+from functools import cached_property
+
+import numpy as np
+
+from ribs._utils import readonly
+from ribs.archives._array_store import (ArrayStore, _check_out,
+                                        _contiguous_slice, _copy_into, _pack)
+
+# Default number of rows in each block.
+_DEFAULT_BLOCK_SIZE = 1 << 16
+
+# Name of the file that records the block size in the delta log.
+_LOG_META = "chunked.json"
+
+
+def _block_log_dir(log_dir, block_id):
+    """Directory of the delta log of a block."""
+    return os.path.join(log_dir, f"block_{block_id}")
+
+
+class ChunkedArrayStore:
+    # pylint: disable = too-many-public-methods
+    """Maintains a set of arrays in fixed-size blocks that are allocated as the
+    store grows.
+
+    :meth:`ArrayStore.resize <ribs.archives.ArrayStore.resize>` allocates new
+    arrays and copies every field into them, so a store that grows by doubling
+    (like the one in :class:`~ribs.archives.ProximityArchive`) periodically
+    stalls while it copies all its entries, and it briefly holds the old and
+    new arrays at once. The ChunkedArrayStore instead splits the index range
+    into blocks of ``block_size`` indices, each held in its own
+    :class:`~ribs.archives.ArrayStore`. Index ``i`` lives in block ``i //
+    block_size`` at row ``i % block_size``. Growing the store only allocates
+    new blocks (and fills up the last block if it is partial), so it takes time
+    proportional to the block size and never copies the existing blocks.
+
+    The ChunkedArrayStore supports the same methods for reading and writing
+    entries as the :class:`~ribs.archives.ArrayStore`, e.g., :meth:`retrieve`,
+    :meth:`add`, :meth:`remove`, :meth:`compact`, and the delta log. Reads that
+    span several blocks gather each block's share of the indices with a single
+    fancy-indexing operation per field. :attr:`occupied_list` lists the
+    occupied indices block by block, and in the order in which they were added
+    within each block. The store cannot be memory-mapped or placed in shared
+    memory.
+
+    Args:
+        field_desc (dict): Description of fields in the store. See
+            :class:`~ribs.archives.ArrayStore`.
+        capacity (int): Total possible entries in the store.
+        block_size (int): Number of indices in each block. Larger blocks make
+            reads cheaper, while smaller blocks make growth cheaper.
+    Raises:
+        ValueError: ``block_size`` is not positive.
+        ValueError: One of the fields in ``field_desc`` has a reserved name or
+            is not a valid Python identifier.
+    """
+
+    def __init__(self, field_desc, capacity, block_size=_DEFAULT_BLOCK_SIZE):
+        if block_size < 1:
+            raise ValueError(f"block_size must be positive, got {block_size}.")
+        self._block_size = int(block_size)
+        self._capacity = 0
+        self._blocks = [ArrayStore(field_desc, min(capacity, self._block_size))]
+        self._log_dir = None
+        self._readonly = False
+
+        # Sum of the generations of blocks that were dropped by compact(), so
+        # that the generation of the store never decreases.
+        self._dropped_generation = 0
+
+        # Cache of occupied_list, as a tuple of (generation, occupied_list).
+        self._occupied_list = None
+
+        self._set_capacity(capacity)
+
+    def __getstate__(self):
+        """Pickles the store without its delta log.
+
+        As with the :class:`~ribs.archives.ArrayStore`, read-only stores are
+        pickled as regular stores.
+        """
+        state = self.__dict__.copy()
+        state["_log_dir"] = None
+        state["_readonly"] = False
+        return state
+
+    ## Blocks ##
+
+    def _new_block(self, capacity):
+        """Creates a block, which starts logging if the store is logging."""
+        block = ArrayStore(self._blocks[0].field_desc, capacity)
+        if self._log_dir is not None:
+            block.start_log(_block_log_dir(self._log_dir, len(self._blocks)))
+        return block
+
+    def _set_capacity(self, capacity):
+        """Sets the number of indices in the store.
+
+        All blocks except the last one hold ``block_size`` indices. Growing
+        fills up the last block and appends new blocks. Shrinking drops blocks
+        at the end and shrinks the last remaining block, which requires that
+        the dropped indices are not occupied.
+        """
+        n_blocks = max(-(-capacity // self._block_size), 1)
+
+        for block_id in range(n_blocks, len(self._blocks)):
+            block = self._blocks[block_id]
+            self._dropped_generation += block.generation
+            log_dir = block.log_dir
+            if log_dir is not None:
+                block.close_log()
+                shutil.rmtree(log_dir, ignore_errors=True)
+        del self._blocks[n_blocks:]
+
+        for block_id in range(n_blocks):
+            size = min(self._block_size, capacity - block_id * self._block_size)
+            if block_id == len(self._blocks):
+                self._blocks.append(self._new_block(size))
+            elif size > self._blocks[block_id].capacity:
+                self._blocks[block_id].resize(size)
+            elif size < self._blocks[block_id].capacity:
+                self._blocks[block_id].compact(size)
+
+        self._capacity = capacity
+
+    def _group(self, indices):
+        """Splits int32 indices by the blocks that hold them.
+
+        Returns:
+            list: Tuples of ``(block, positions, rows)``, where ``positions``
+            selects the indices in the block from ``indices`` and ``rows`` are
+            their rows in the block. Positions within each block keep their
+            order in ``indices``. If all the indices are in one block,
+            ``positions`` is ``slice(None)``.
+        Raises:
+            IndexError: Some of the indices are outside the range ``[0,
+                capacity)``.
+        """
+        if len(indices) == 0:
+            return [(self._blocks[0], slice(None), indices)]
+        if indices.min() < 0 or indices.max() >= self._capacity:
+            raise IndexError(
+                f"Indices must be in the range [0, {self._capacity}).")
+
+        block_ids, rows = np.divmod(indices, self._block_size)
+        first = block_ids[0]
+        if np.all(block_ids == first):
+            return [(self._blocks[first], slice(None), rows)]
+
+        order = np.argsort(block_ids, kind="stable")
+        bounds = np.flatnonzero(np.diff(block_ids[order])) + 1
+        return [(self._blocks[block_ids[positions[0]]], positions,
+                 rows[positions]) for positions in np.split(order, bounds)]
+
+    def _check_writable(self):
+        """Raises a RuntimeError if the store is read-only."""
+        if self._readonly:
+            raise RuntimeError("This ChunkedArrayStore is read-only.")
+
+    def _check_generation(self, generation):
+        """Raises a RuntimeError if the store was modified since it had the
+        given generation."""
+        if self.generation != generation:
+            raise RuntimeError(
+                "ArrayStore was modified with add(), clear(), remove(), or "
+                "compact() during iteration.")
+
+    ## dunder methods ##
+
+    def __len__(self):
+        """Number of occupied indices in the store."""
+        return sum(len(block) for block in self._blocks)
+
+    def __iter__(self):
+        """Iterates over entries in the store.
+
+        See :meth:`ArrayStore.__iter__ <ribs.archives.ArrayStore.__iter__>`.
+        """
+        generation = self.generation
+        for block_id, block in enumerate(self._blocks):
+            offset = block_id * self._block_size
+            # The iterator of each block detects modifications of that block,
+            # while the check below detects modifications of other blocks.
+            for entry in block:
+                self._check_generation(generation)
+                entry["index"] = entry["index"] + offset
+                yield entry
+        self._check_generation(generation)
+
+    def iter_batches(self, batch_size, fields=None):
+        """Iterates over entries in the store in batches.
+
+        See :meth:`ArrayStore.iter_batches
+        <ribs.archives.ArrayStore.iter_batches>`.
+        """
+        return ArrayStore.iter_batches(self, batch_size, fields)
+
+    ## Properties ##
+
+    @property
+    def capacity(self):
+        """int: Maximum number of data entries in the store."""
+        return self._capacity
+
+    @property
+    def block_size(self):
+        """int: Number of indices in each block."""
+        return self._block_size
+
+    @property
+    def memmap_dir(self):
+        """None: Chunked stores are always held in memory."""
+        return None
+
+    @property
+    def shm_name(self):
+        """None: Chunked stores are never placed in shared memory."""
+        return None
+
+    @property
+    def log_dir(self):
+        """str: Directory of the delta log of this store, or None if the store
+        is not logging its changes."""
+        return self._log_dir
+
+    @property
+    def occupied(self):
+        """numpy.ndarray: Boolean array of size ``(capacity,)`` indicating
+        whether each index has a data entry. Since this array is assembled from
+        the blocks, it is a copy."""
+        return readonly(
+            np.concatenate([block.occupied for block in self._blocks]))
+
+    @property
+    def occupied_list(self):
+        """numpy.ndarray: int32 array listing all occupied indices in the
+        store.
+
+        The list is assembled from the blocks and cached until the store is
+        modified.
+        """
+        generation = self.generation
+        if self._occupied_list is None or self._occupied_list[0] != generation:
+            occupied_list = np.concatenate([
+                block.occupied_list + block_id * self._block_size
+                for block_id, block in enumerate(self._blocks)
+            ]).astype(np.int32, copy=False)
+            self._occupied_list = (generation, readonly(occupied_list))
+        return self._occupied_list[1]
+
+    @property
+    def generation(self):
+        """int: Token that changes every time the store is modified.
+
+        See :attr:`ArrayStore.generation
+        <ribs.archives.ArrayStore.generation>`.
+        """
+        return self._dropped_generation + sum(
+            block.generation for block in self._blocks)
+
+    @cached_property
+    def field_desc(self):
+        """dict: Description of fields in the store."""
+        return self._blocks[0].field_desc
+
+    @cached_property
+    def dtypes(self):
+        """dict: Data types of fields in the store."""
+        return self._blocks[0].dtypes
+
+    @cached_property
+    def dtypes_with_index(self):
+        """dict: Data types of fields in the store, plus the index, which is
+        int32."""
+        return self._blocks[0].dtypes_with_index
+
+    @cached_property
+    def field_list(self):
+        """list: List of fields in the store."""
+        return self._blocks[0].field_list
+
+    @cached_property
+    def field_list_with_index(self):
+        """list: List of fields in the store, plus the index."""
+        return self._blocks[0].field_list_with_index
+
+    ## Methods for reading ##
+
+    def retrieve(self,
+                 indices,
+                 fields=None,
+                 return_type="dict",
+                 copy=True,
+                 out=None):
+        """Collects data at the given indices.
+
+        See :meth:`ArrayStore.retrieve <ribs.archives.ArrayStore.retrieve>` for
+        more info.
+
+        Args:
+            indices (array-like): List of indices at which to collect data.
+            fields (str or array-like of str): List of fields to include.
+            return_type (str): Type of data to return.
+            copy (bool): If False and the indices are a contiguous increasing
+                range within a single block, the data is returned as views.
+                Data that span several blocks are always copied.
+            out (dict): Preallocated arrays for the data of some fields. See
+                :meth:`ArrayStore.retrieve
+                <ribs.archives.ArrayStore.retrieve>`.
+        Returns:
+            tuple: 2-element tuple of ``occupied`` and ``data``, as in
+            :meth:`ArrayStore.retrieve <ribs.archives.ArrayStore.retrieve>`.
+        Raises:
+            IndexError: Some of the indices are outside the range ``[0,
+                capacity)``.
+            ValueError: Invalid field name provided.
+            ValueError: Invalid return_type provided.
+            ValueError: An array in ``out`` has the wrong shape or dtype.
+        """
+        # pylint: disable = protected-access
+        indices = np.asarray(indices, dtype=np.int32)
+        groups = self._group(indices)
+
+        if len(groups) == 1:
+            # The block can read the data directly, including as views.
+            block, _, rows = groups[0]
+            view_slice = (None if copy or return_type == "pandas" else
+                          _contiguous_slice(rows))
+            if view_slice is None:
+                occupied = block._props["occupied"][rows]
+            else:
+                occupied = readonly(block._props["occupied"][view_slice])
+                rows = view_slice
+            return occupied, block._gather(indices, rows, fields, return_type,
+                                           out)
+
+        if isinstance(fields, str):
+            names = [fields]
+        elif fields is None:
+            names = self.field_list_with_index
+        else:
+            names = list(fields)
+        # Each block gathers its rows of every field once, and the rows are
+        # then scattered into the output arrays.
+        block_names = list(dict.fromkeys(n for n in names if n != "index"))
+
+        out = out or {}
+        occupied = np.empty(len(indices), dtype=bool)
+        arrays = {
+            "index": (_copy_into("index", out["index"], indices)
+                      if "index" in out else np.copy(indices))
+        }
+        for block, positions, rows in groups:
+            occupied[positions] = block._props["occupied"][rows]
+            columns = block._gather(rows, rows, block_names, "tuple")
+            for name, arr in zip(block_names, columns):
+                if name not in arrays:
+                    shape = (len(indices),) + arr.shape[1:]
+                    if name in out:
+                        _check_out(name, out[name], shape, arr.dtype)
+                        arrays[name] = out[name]
+                    else:
+                        arrays[name] = np.empty(shape, dtype=arr.dtype)
+                arrays[name][positions] = arr
+
+        columns = [(name, arrays[name]) for name in names]
+        return occupied, (columns[0][1] if isinstance(fields, str) else _pack(
+            columns, return_type))
+
+    def data(self, fields=None, return_type="dict", copy=True, out=None):
+        """Retrieves data for all entries in the store.
+
+        See :meth:`ArrayStore.data <ribs.archives.ArrayStore.data>`.
+        """
+        return self.retrieve(self.occupied_list, fields, return_type, copy,
+                             out)[1]
+
+    def changes_since(self, token):
+        """Lists the indices that were written since the given token.
+
+        See :meth:`ArrayStore.changes_since
+        <ribs.archives.ArrayStore.changes_since>`. Each block tracks its own
+        changes, so the token holds one token per block. All the entries of
+        blocks that were added since ``token`` count as changed.
+        """
+        if token is not None and len(token) > len(self._blocks):
+            token = None
+
+        arrays = []
+        new_token = []
+        for block_id, block in enumerate(self._blocks):
+            is_new = token is not None and block_id >= len(token)
+            rows, block_token = block.changes_since(
+                None if token is None or is_new else token[block_id])
+            if is_new:
+                rows = block.occupied_list
+            elif rows is None:
+                # Once any block needs a full refresh, so does the store.
+                token = None
+            new_token.append(block_token)
+            if token is not None:
+                arrays.append(rows + block_id * self._block_size)
+
+        if token is None:
+            return None, tuple(new_token)
+        return (np.concatenate(arrays).astype(np.int32,
+                                              copy=False), tuple(new_token))
+
+    def write_arrow(self,
+                    path,
+                    fields=None,
+                    file_format="parquet",
+                    chunk_size=100_000):
+        """Writes all entries in the store to a Parquet or Feather file.
+
+        See :meth:`ArrayStore.write_arrow
+        <ribs.archives.ArrayStore.write_arrow>`.
+        """
+        # The implementation only reads the store through occupied_list and
+        # retrieve(), so it applies to this store as well.
+        ArrayStore.write_arrow(self, path, fields, file_format, chunk_size)
+
+    def to_records(self, fields=None, chunk_size=100_000):
+        """Copies all entries in the store into a NumPy structured array.
+
+        See :meth:`ArrayStore.to_records
+        <ribs.archives.ArrayStore.to_records>`.
+        """
+        return ArrayStore.to_records(self, fields, chunk_size)
+
+    ## Methods for writing ##
+
+    def add(self, indices, data):
+        """Adds new data to the store at the given indices.
+
+        See :meth:`ArrayStore.add <ribs.archives.ArrayStore.add>` for more
+        info.
+
+        Args:
+            indices (array-like): List of indices for addition.
+            data (dict): Dict with data to add at each index.
+        Raises:
+            IndexError: Some of the indices are outside the range ``[0,
+                capacity)``.
+            ValueError: ``data`` does not have the same keys as the fields of
+                this store.
+            ValueError: ``data`` has fields that have a different length than
+                ``indices``.
+        """
+        indices = np.asarray(indices, dtype=np.int32)
+        groups = self._group(indices)
+        if len(groups) == 1:
+            # The block validates the data.
+            block, _, rows = groups[0]
+            block.add(rows, data)
+            return
+
+        for name, arr in data.items():
+            if len(arr) != len(indices):
+                raise ValueError(
+                    f"In `data`, the array for `{name}` has length "
+                    f"{len(arr)} but should be the same length as indices "
+                    f"({len(indices)})")
+        arrays = [(name, np.asarray(arr)) for name, arr in data.items()]
+        for block, positions, rows in groups:
+            block.add(rows, {name: arr[positions] for name, arr in arrays})
+
+    def clear(self):
+        """Removes all entries from the store."""
+        for block in self._blocks:
+            block.clear()
+
+    def remove(self, indices):
+        """Removes the entries at the given indices from the store.
+
+        See :meth:`ArrayStore.remove <ribs.archives.ArrayStore.remove>`.
+
+        Args:
+            indices (array-like): Indices to remove. Duplicate indices and
+                indices that are not occupied are ignored.
+        Raises:
+            IndexError: Some of the indices are outside the range ``[0,
+                capacity)``.
+        """
+        for block, _, rows in self._group(np.asarray(indices, dtype=np.int32)):
+            block.remove(rows)
+
+    def compact(self, capacity=None):
+        """Renumbers the entries in the store to indices ``0`` through
+        ``len(store) - 1``.
+
+        See :meth:`ArrayStore.compact <ribs.archives.ArrayStore.compact>` for
+        more info. The entries are moved one block at a time, so compaction
+        holds at most one extra block of data in memory. Fields with a
+        :class:`~ribs.archives.FieldCodec` are moved in their encoded form.
+
+        Args:
+            capacity (int): New capacity of the store. Defaults to the current
+                capacity.
+        Returns:
+            numpy.ndarray: int32 array of size ``(old_capacity,)`` mapping each
+            old index to its new index, or to -1 if the old index was not
+            occupied.
+        Raises:
+            ValueError: ``capacity`` is less than the number of entries in the
+                store.
+            RuntimeError: The store is read-only.
+        """
+        # pylint: disable = protected-access
+        self._check_writable()
+        capacity = self._capacity if capacity is None else capacity
+        n_occupied = len(self)
+        if capacity < n_occupied:
+            raise ValueError(
+                f"New capacity ({capacity}) must be at least the number of "
+                f"entries in the store ({n_occupied}).")
+
+        old_indices = np.flatnonzero(self.occupied).astype(np.int32)
+        index_map = np.full(self._capacity, -1, dtype=np.int32)
+        index_map[old_indices] = np.arange(n_occupied)
+
+        # Since each entry moves to an index at or before its old index, the
+        # entries that move into block k are all in blocks k and later, and all
+        # entries in block k move to blocks k and earlier. Thus, filling the
+        # blocks in order never overwrites an entry before it has moved.
+        for block_id, target in enumerate(self._blocks):
+            start = block_id * self._block_size
+            moving = old_indices[start:start + self._block_size]
+
+            raw = {name: [] for name in self.field_list}
+            for block, _, rows in self._group(moving):
+                for name in raw:
+                    raw[name].append(block._fields[name][rows])
+
+            # The rows are written in their stored form, as in load_log().
+            codecs, target._codecs = target._codecs, {}
+            try:
+                target.clear()
+                target.add(np.arange(len(moving)), {
+                    name: np.concatenate(arrs) for name, arrs in raw.items()
+                })
+            finally:
+                target._codecs = codecs
+
+        if capacity != self._capacity:
+            self._set_capacity(capacity)
+
+        return index_map
+
+    def resize(self, capacity):
+        """Resizes the store to the given capacity.
+
+        Growing the store only fills up the last block and allocates new
+        blocks, so the existing entries are never copied beyond the last
+        block.
+
+        Args:
+            capacity (int): New capacity.
+        Raises:
+            ValueError: The new capacity is less than or equal to the current
+                capacity.
+            RuntimeError: The store is read-only.
+        """
+        self._check_writable()
+        if capacity <= self._capacity:
+            raise ValueError(
+                f"New capacity ({capacity}) must be greater than current "
+                f"capacity ({self._capacity}.")
+        self._set_capacity(capacity)
+
+    def snapshot(self):
+        """Returns a read-only copy of the store at this point in time.
+
+        Each block is snapshotted as in :meth:`ArrayStore.snapshot
+        <ribs.archives.ArrayStore.snapshot>`.
+
+        Returns:
+            ChunkedArrayStore: The snapshot.
+        """
+        # pylint: disable = protected-access
+        if self._readonly:
+            return self
+
+        snapshot = ChunkedArrayStore({}, 0, self._block_size)
+        snapshot._capacity = self._capacity
+        snapshot._blocks = [block.snapshot() for block in self._blocks]
+        snapshot._dropped_generation = self._dropped_generation
+        snapshot._readonly = True
+        return snapshot
+
+    def release_shared_memory(self):
+        """Does nothing, since chunked stores are never in shared memory."""
+
+    ## Delta log ##
+
+    def start_log(self, log_dir):
+        """Starts recording changes to the store in a delta log.
+
+        See :meth:`ArrayStore.start_log <ribs.archives.ArrayStore.start_log>`.
+        Each block keeps its own log in a subdirectory of ``log_dir``.
+        """
+        self.close_log()
+        log_dir = os.fspath(log_dir)
+        os.makedirs(log_dir, exist_ok=True)
+
+        # Remove the logs of blocks from a previous log in this directory.
+        for name in os.listdir(log_dir):
+            if name.startswith("block_"):
+                shutil.rmtree(os.path.join(log_dir, name))
+        with open(os.path.join(log_dir, _LOG_META), "w",
+                  encoding="utf-8") as file:
+            json.dump({"block_size": self._block_size}, file)
+
+        for block_id, block in enumerate(self._blocks):
+            block.start_log(_block_log_dir(log_dir, block_id))
+        self._log_dir = log_dir
+
+    def sync_log(self):
+        """Flushes buffered records of the delta log to disk.
+
+        Raises:
+            RuntimeError: The store is not logging its changes.
+        """
+        if self._log_dir is None:
+            raise RuntimeError("This ChunkedArrayStore is not logging its "
+                               "changes; call start_log() first.")
+        for block in self._blocks:
+            block.sync_log()
+
+    def compact_log(self):
+        """Folds the records of the delta log into its base snapshot.
+
+        Raises:
+            RuntimeError: The store is not logging its changes.
+        """
+        if self._log_dir is None:
+            raise RuntimeError("This ChunkedArrayStore is not logging its "
+                               "changes; call start_log() first.")
+        for block in self._blocks:
+            block.compact_log()
+
+    def close_log(self):
+        """Stops recording changes in the delta log."""
+        for block in self._blocks:
+            block.close_log()
+        self._log_dir = None
+
+    @staticmethod
+    def load_log(log_dir, resume=False, field_desc=None):
+        """Loads a store from a delta log written by :meth:`start_log`.
+
+        See :meth:`ArrayStore.load_log <ribs.archives.ArrayStore.load_log>`.
+
+        Args:
+            log_dir (str or pathlib.Path): Directory of the log.
+            resume (bool): Whether the loaded store continues writing to the
+                log.
+            field_desc (dict): Description of the fields of the store, which is
+                needed to decode fields with a codec.
+        Returns:
+            ChunkedArrayStore: The new store.
+        Raises:
+            ValueError: The log was not written by a ChunkedArrayStore.
+        """
+        # pylint: disable = protected-access
+        log_dir = os.fspath(log_dir)
+        meta_path = os.path.join(log_dir, _LOG_META)
+        if not os.path.exists(meta_path):
+            raise ValueError(
+                f"The log in {log_dir} was not written by a ChunkedArrayStore.")
+        with open(meta_path, encoding="utf-8") as file:
+            block_size = json.load(file)["block_size"]
+
+        blocks = []
+        while os.path.isdir(_block_log_dir(log_dir, len(blocks))):
+            blocks.append(
+                ArrayStore.load_log(_block_log_dir(log_dir, len(blocks)),
+                                    resume, field_desc))
+
+        store = ChunkedArrayStore({}, 0, block_size)  # Create an empty store.
+        store._blocks = blocks
+
+        # The log only records the capacity of a block when the block is
+        # modified, so blocks that grew without being modified afterwards are
+        # grown here.
+        for block in blocks[:-1]:
+            if block.capacity < block_size:
+                block.resize(block_size)
+        store._capacity = (len(blocks) - 1) * block_size + blocks[-1].capacity
+
+        if resume:
+            store._log_dir = log_dir
+        return store
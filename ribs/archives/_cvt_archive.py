@@ -1,20 +1,65 @@
 """Contains the CVTArchive."""
 import numbers
+import os
 
 import numpy as np
-from numpy_groupies import aggregate_nb as aggregate
-from scipy.spatial import cKDTree  # pylint: disable=no-name-in-module
+from scipy.sparse import csr_matrix
+# pylint: disable-next=no-name-in-module
+from scipy.spatial import Delaunay, Voronoi, cKDTree
 from scipy.stats.qmc import Halton, Sobol
 from sklearn.cluster import k_means
 
-from ribs._utils import (check_batch_shape, check_finite, check_shape,
-                         validate_batch, validate_single)
+from ribs._utils import (check_batch_shape, check_finite, check_is_1d,
+                         check_shape, validate_batch, validate_single)
 from ribs.archives._archive_base import ArchiveBase
 from ribs.archives._archive_stats import ArchiveStats
 from ribs.archives._array_store import ArrayStore
-from ribs.archives._utils import (fill_sentinel_values, parse_dtype,
+from ribs.archives._centroid_cache import CentroidCache
+from ribs.archives._centroid_index import (AutoIndex, BruteForceIndex,
+                                           CentroidIndex, GEMMIndex, GraphIndex,
+                                           IVFIndex, KDTreeIndex)
+from ribs.archives._mini_batch_k_means import mini_batch_k_means
+from ribs.archives._utils import (batch_insertion, fill_sentinel_values,
+                                  load_records, parse_dtype, snapshot_archive,
                                   validate_cma_mae_settings)
 
+# Delaunay triangulations take seconds for thousands of centroids in 4D, and
+# minutes in 6D, so the "auto" adjacency only uses them up to this dimension.
+_DELAUNAY_MAX_DIM = 4
+
+
+def _cvt_adjacency(centroids, method, n_neighbors):
+    """Computes the adjacency of the cells of a CVT.
+
+    Returns:
+        tuple: ``indptr`` and ``indices`` of the adjacency in CSR format, with
+        sorted indices in each row.
+    """
+    n_cells = len(centroids)
+    if method == "delaunay":
+        indptr, indices = Delaunay(centroids).vertex_neighbor_vertices
+        rows = np.repeat(np.arange(n_cells), np.diff(indptr))
+        cols = indices
+    else:
+        # Symmetrized k-nearest neighbors of each centroid. The closest
+        # neighbor of each centroid is itself, so it is skipped.
+        n_neighbors = min(n_neighbors, n_cells - 1)
+        _, knn = cKDTree(centroids).query(centroids, k=n_neighbors + 1)
+        knn = knn[:, 1:]
+        rows = np.concatenate(
+            [np.repeat(np.arange(n_cells), n_neighbors),
+             knn.ravel()])
+        cols = np.concatenate(
+            [knn.ravel(),
+             np.repeat(np.arange(n_cells), n_neighbors)])
+
+    adjacency = csr_matrix((np.ones(len(rows), dtype=bool), (rows, cols)),
+                           shape=(n_cells, n_cells))
+    adjacency.sum_duplicates()
+    adjacency.sort_indices()
+    return (adjacency.indptr.astype(np.int64),
+            adjacency.indices.astype(np.int32))
+
 
 class CVTArchive(ArchiveBase):
     # pylint: disable = too-many-public-methods
@@ -29,10 +74,14 @@ class CVTArchive(ArchiveBase):
     the closest centroid in measure space (using Euclidean distance). For
     k-means clustering, we use :func:`sklearn.cluster.k_means`.
 
-    By default, finding the closest centroid is done in roughly
-    O(log(number of cells)) time using :class:`scipy.spatial.cKDTree`. To switch
-    to brute force, which takes O(number of cells) time, pass
-    ``use_kd_tree=False``.
+    Finding the closest centroid can be done in roughly O(log(number of
+    cells)) time using :class:`scipy.spatial.cKDTree` (``use_kd_tree=True``) or
+    with brute force, which takes O(number of cells) time
+    (``use_kd_tree=False``). By default, the archive times both approaches on
+    its centroids when it is constructed, including brute force computed with
+    matrix multiplications, and it uses the fastest one (see
+    :class:`AutoIndex`). Other ways of finding the closest centroid can be
+    selected with ``centroid_index`` (see below).
 
     To compare the performance of using the k-D tree vs brute force, we ran
     benchmarks where we inserted 1k batches of 100 solutions into a 2D archive
@@ -44,11 +93,18 @@ class CVTArchive(ArchiveBase):
         :alt: Runtime to insert 100k entries into CVTArchive
 
     Across almost all numbers of cells, using the k-D tree is faster than using
-    brute force. Thus, **we recommend always using the k-D tree.** See
+    brute force in 2D measure spaces. See
     `benchmarks/cvt_add.py
     <https://github.com/icaros-usc/pyribs/tree/master/benchmarks/cvt_add.py>`_
     in the project repo for more information about how this plot was generated.
 
+    In high-dimensional measure spaces, e.g., with 10 to 50 dimensions, k-D
+    trees degrade to brute force. For such spaces, ``centroid_index`` can select
+    an approximate index that trades a small fraction of misassigned solutions
+    for much higher throughput: ``"ivf"`` for an :class:`IVFIndex` or
+    ``"graph"`` for a :class:`GraphIndex`. The benchmark script above also
+    compares these indices across measure space dimensions.
+
     Finally, if running multiple experiments, it may be beneficial to use the
     same centroids across each experiment. Doing so can keep experiments
     consistent and reduce execution time. To do this, either (1) construct
@@ -96,6 +152,9 @@ class CVTArchive(ArchiveBase):
             ``"d"`` / ``np.float64``, or a dict specifying separate dtypes, of
             the form ``{"solution": <dtype>, "objective": <dtype>, "measures":
             <dtype>}``.
+            In the dict, the solution dtype may also be a
+            :class:`~ribs.archives.FieldCodec`, which stores the solutions in
+            reduced precision.
         extra_fields (dict): Description of extra fields of data that is stored
             next to elite data like solutions and objectives. The description is
             a dict mapping from a field name (str) to a tuple of ``(shape,
@@ -103,7 +162,8 @@ class CVTArchive(ArchiveBase):
             np.float32)}`` will create a "foo" field that contains scalar values
             and a "bar" field that contains 10D values. Note that field names
             must be valid Python identifiers, and names already used in the
-            archive are not allowed.
+            archive are not allowed. The dtype of an extra field may also be a
+            :class:`~ribs.archives.FieldCodec`.
         custom_centroids (array-like): If passed in, this (cells, measure_dim)
             array will be used as the centroids of the CVT instead of generating
             new ones. In this case, ``samples`` will be ignored, and
@@ -111,9 +171,15 @@ class CVTArchive(ArchiveBase):
             to use the same CVT across experiments for fair comparison.
         centroid_method (str): Pass in the following methods for
             generating centroids: "random", "sobol", "scrambled_sobol",
-            "halton". Default method is "kmeans". These methods are derived from
-            Mouret 2023: https://dl.acm.org/doi/pdf/10.1145/3583133.3590726.
-            Note: Samples are only used when method is "kmeans".
+            "halton", "minibatch_kmeans". Default method is "kmeans". These
+            methods are derived from Mouret 2023:
+            https://dl.acm.org/doi/pdf/10.1145/3583133.3590726.
+            "minibatch_kmeans" clusters a stream of samples with
+            :func:`mini_batch_k_means`, which scales to CVTs with many cells
+            and samples since the samples are generated and clustered one
+            batch at a time. In this case, ``archive.samples`` is None unless
+            an array of samples is passed in. Note: Samples are only used when
+            method is "kmeans" or "minibatch_kmeans".
         samples (int or array-like): If it is an int, this specifies the number
             of samples to generate when creating the CVT. Otherwise, this must
             be a (num_samples, measure_dim) array where samples[i] is a sample
@@ -122,20 +188,76 @@ class CVTArchive(ArchiveBase):
             space are (physically) possible.
         k_means_kwargs (dict): kwargs for :func:`~sklearn.cluster.k_means`. By
             default, we pass in `n_init=1`, `init="random"`,
-            `algorithm="lloyd"`, and `random_state=seed`.
+            `algorithm="lloyd"`, and `random_state=seed`. When
+            ``centroid_method`` is "minibatch_kmeans", these are instead kwargs
+            for :func:`mini_batch_k_means`, along with a ``batch_size`` key
+            for the number of samples in each batch (4096 by default).
         use_kd_tree (bool): If True, use a k-D tree for finding the closest
             centroid when inserting into the archive. If False, brute force will
-            be used instead.
+            be used instead. If None, the fastest of the two is selected with
+            an :class:`AutoIndex`.
         ckdtree_kwargs (dict): kwargs for :class:`~scipy.spatial.cKDTree`. By
             default, we do not pass in any kwargs.
         chunk_size (int): If passed, brute forcing the closest centroid search
             will chunk the distance calculations to compute chunk_size inputs at
             a time.
+        centroid_index (str or type): Index used for finding the closest
+            centroid, which overrides ``use_kd_tree``. This can be
+            ``"auto"`` (:class:`AutoIndex`), ``"kd_tree"``
+            (:class:`KDTreeIndex`), ``"brute_force"``
+            (:class:`BruteForceIndex`), ``"gemm"`` (:class:`GEMMIndex`),
+            ``"ivf"`` (:class:`IVFIndex`), ``"graph"`` (:class:`GraphIndex`),
+            or a subclass of :class:`CentroidIndex`. By default, the index is
+            selected with ``use_kd_tree``.
+        centroid_index_kwargs (dict): kwargs for the class of
+            ``centroid_index``, e.g., ``{"workers": -1}`` to query the k-D
+            tree with all CPUs. By default, ``ckdtree_kwargs`` are passed to
+            :class:`KDTreeIndex` and :class:`AutoIndex`, ``chunk_size`` is
+            passed to :class:`BruteForceIndex`, and ``seed`` is passed to
+            :class:`AutoIndex`, :class:`IVFIndex`, and :class:`GraphIndex`.
+        centroid_cache (str or pathlib.Path or CentroidCache): If passed, the
+            centroids and samples are loaded from this :class:`CentroidCache`
+            (or a cache in this directory) when an archive with the same
+            ``cells``, ``ranges``, ``dtype``, ``centroid_method``,
+            ``samples``, ``seed``, and ``k_means_kwargs`` was created before,
+            and they are stored in the cache otherwise. The loaded arrays are
+            read-only memory maps. The cache is not used when ``seed`` is None,
+            since the centroids are then meant to differ between archives, or
+            when ``custom_centroids`` is passed. The :attr:`adjacency` of the
+            cells is also stored in this cache.
+        adjacency_method (str): How to compute the :attr:`adjacency` of the
+            cells. ``"delaunay"`` computes the exact adjacency of the Voronoi
+            cells from the Delaunay triangulation of the centroids, which
+            becomes very slow beyond a few dimensions. ``"knn"`` approximates
+            the adjacency by connecting each centroid to its
+            ``adjacency_neighbors`` nearest centroids (in both directions).
+            ``"auto"`` uses ``"delaunay"`` when ``measure_dim`` is at most 4
+            and ``"knn"`` otherwise.
+        adjacency_neighbors (int): Number of nearest centroids to connect to
+            each centroid when ``adjacency_method`` is ``"knn"``. Defaults to
+            ``2 * measure_dim``.
+        memmap_dir (str or pathlib.Path): If passed, the elites' data is stored
+            in :class:`numpy.memmap` files under this directory instead of in
+            memory, which allows creating archives that are larger than RAM.
+            If the directory already holds elites from a previous archive with
+            the same fields, the archive is restored from the directory without
+            copying the data. See :class:`~ribs.archives.ArrayStore` for more
+            info.
+        shared_memory (bool): If True, the elites' data is allocated in
+            :mod:`multiprocessing.shared_memory`, and other processes can read
+            the archive without a copy through an
+            :class:`~ribs.archives.ArchiveView` created with :attr:`shm_name`.
+            Call :meth:`release_shared_memory` once the other processes are
+            done. See :class:`~ribs.archives.ArrayStore` for more info.
     Raises:
         ValueError: Invalid values for learning_rate and threshold_min.
         ValueError: Invalid names in extra_fields.
         ValueError: The ``samples`` array or the ``custom_centroids`` array has
             the wrong shape.
+        ValueError: ``centroid_index`` is not a known index.
+        ValueError: ``adjacency_method`` is not a known method.
+        ValueError: ``memmap_dir`` holds elites from an archive with different
+            fields or a different number of cells.
     """
 
     def __init__(
@@ -154,9 +276,16 @@ class CVTArchive(ArchiveBase):
         centroid_method="kmeans",
         samples=100_000,
         k_means_kwargs=None,
-        use_kd_tree=True,
+        use_kd_tree=None,
         ckdtree_kwargs=None,
         chunk_size=None,
+        centroid_index=None,
+        centroid_index_kwargs=None,
+        centroid_cache=None,
+        adjacency_method="auto",
+        adjacency_neighbors=None,
+        memmap_dir=None,
+        shared_memory=False,
     ):
         self._rng = np.random.default_rng(seed)
 
@@ -188,7 +317,13 @@ class CVTArchive(ArchiveBase):
                 **extra_fields,
             },
             capacity=cells,
+            memmap_dir=memmap_dir,
+            shared_memory=shared_memory,
         )
+        if self._store.capacity != cells:
+            raise ValueError(
+                f"The store in memmap_dir has capacity {self._store.capacity}, "
+                f"but this archive has {cells} cells.")
 
         # Set up constant properties.
         ranges = list(zip(*ranges))
@@ -200,80 +335,57 @@ class CVTArchive(ArchiveBase):
         self._qd_score_offset = self.dtypes["objective"](qd_score_offset)
 
         # Set up statistics -- objective_sum is the sum of all objective values
-        # in the archive; it is useful for computing qd_score and obj_mean.
-        self._best_elite = None
+        # in the archive; it is useful for computing qd_score and obj_mean. It
+        # is kept in float64 and only cast to the objective dtype in stats. The
+        # stats are recomputed (rather than reset) in case the store was
+        # reopened from memmap_dir.
         self._objective_sum = None
+        self._obj_max = None
+        self._best_index = None
+        self._best_elite = None
         self._stats = None
-        self._stats_reset()
+        self._stats_recompute()
 
         # Apply default args for k-means. Users can easily override these,
         # particularly if they want higher quality clusters.
         self._k_means_kwargs = ({} if k_means_kwargs is None else
                                 k_means_kwargs.copy())
-        self._k_means_kwargs.setdefault(
-            # Only run one iter to be fast.
-            "n_init",
-            1)
-        self._k_means_kwargs.setdefault(
-            # The default "k-means++" takes very long to init.
-            "init",
-            "random")
-        self._k_means_kwargs.setdefault("algorithm", "lloyd")
-        self._k_means_kwargs.setdefault("random_state", seed)
+        if centroid_method == "minibatch_kmeans":
+            self._k_means_kwargs.setdefault("batch_size", 4096)
+        else:
+            self._k_means_kwargs.setdefault(
+                # Only run one iter to be fast.
+                "n_init",
+                1)
+            self._k_means_kwargs.setdefault(
+                # The default "k-means++" takes very long to init.
+                "init",
+                "random")
+            self._k_means_kwargs.setdefault("algorithm", "lloyd")
+            self._k_means_kwargs.setdefault("random_state", seed)
+
+        # The cache and the parameters of the centroids in it, which are also
+        # used for caching the adjacency.
+        self._centroid_cache = None
+        self._centroid_cache_params = None
 
         if custom_centroids is None:
-            self._samples = None
-            if centroid_method == "kmeans":
-                if not isinstance(samples, numbers.Integral):
-                    # Validate shape of custom samples.
-                    samples = np.asarray(samples, dtype=self.dtypes["measures"])
-                    if samples.shape[1] != self._measure_dim:
-                        raise ValueError(
-                            f"Samples has shape {samples.shape} but must be of "
-                            f"shape (n_samples, len(ranges)="
-                            f"{self._measure_dim})")
-                    self._samples = samples
-                else:
-                    self._samples = self._rng.uniform(
-                        self._lower_bounds,
-                        self._upper_bounds,
-                        size=(samples, self._measure_dim),
-                    ).astype(self.dtypes["measures"])
-
-                self._centroids = k_means(self._samples, self.cells,
-                                          **self._k_means_kwargs)[0]
-
-                if self._centroids.shape[0] < self.cells:
-                    raise RuntimeError(
-                        "While generating the CVT, k-means clustering found "
-                        f"{self._centroids.shape[0]} centroids, but this "
-                        f"archive needs {self.cells} cells. This most "
-                        "likely happened because there are too few samples "
-                        "and/or too many cells.")
-            elif centroid_method == "random":
-                # Generates random centroids.
-                self._centroids = self._rng.uniform(self._lower_bounds,
-                                                    self._upper_bounds,
-                                                    size=(self.cells,
-                                                          self._measure_dim))
-            elif centroid_method == "sobol":
-                # Generates centroids as a Sobol sequence.
-                sampler = Sobol(d=self._measure_dim, scramble=False)
-                sobol_nums = sampler.random(n=self.cells)
-                self._centroids = (self._lower_bounds + sobol_nums *
-                                   (self._upper_bounds - self._lower_bounds))
-            elif centroid_method == "scrambled_sobol":
-                # Generates centroids as a scrambled Sobol sequence.
-                sampler = Sobol(d=self._measure_dim, scramble=True)
-                sobol_nums = sampler.random(n=self.cells)
-                self._centroids = (self._lower_bounds + sobol_nums *
-                                   (self._upper_bounds - self._lower_bounds))
-            elif centroid_method == "halton":
-                # Generates centroids with a Halton sequence.
-                sampler = Halton(d=self._measure_dim)
-                halton_nums = sampler.random(n=self.cells)
-                self._centroids = (self._lower_bounds + halton_nums *
-                                   (self._upper_bounds - self._lower_bounds))
+            if (centroid_method in ("kmeans", "minibatch_kmeans") and
+                    not isinstance(samples, numbers.Integral)):
+                # Validate shape of custom samples.
+                samples = np.asarray(samples, dtype=self.dtypes["measures"])
+                if samples.shape[1] != self._measure_dim:
+                    raise ValueError(
+                        f"Samples has shape {samples.shape} but must be of "
+                        f"shape (n_samples, len(ranges)="
+                        f"{self._measure_dim})")
+
+            if centroid_cache is None or seed is None:
+                self._centroids, self._samples = self._generate_centroids(
+                    centroid_method, samples)
+            else:
+                self._load_centroids(centroid_cache, centroid_method, samples,
+                                     seed)
         else:
             # Validate shape of `custom_centroids` when they are provided.
             custom_centroids = np.asarray(custom_centroids,
@@ -286,14 +398,195 @@ class CVTArchive(ArchiveBase):
             self._centroids = custom_centroids
             self._samples = None
 
-        self._use_kd_tree = use_kd_tree
-        self._centroid_kd_tree = None
-        self._ckdtree_kwargs = ({} if ckdtree_kwargs is None else
-                                ckdtree_kwargs.copy())
-        self._chunk_size = chunk_size
-        if self._use_kd_tree:
-            self._centroid_kd_tree = cKDTree(self._centroids,
-                                             **self._ckdtree_kwargs)
+        if centroid_index is None:
+            centroid_index = ("auto" if use_kd_tree is None else
+                              "kd_tree" if use_kd_tree else "brute_force")
+        centroid_index_kwargs = ({} if centroid_index_kwargs is None else
+                                 centroid_index_kwargs.copy())
+        if centroid_index == "kd_tree":
+            centroid_index = KDTreeIndex
+            centroid_index_kwargs = {
+                **(ckdtree_kwargs or {}),
+                **centroid_index_kwargs
+            }
+        elif centroid_index == "brute_force":
+            centroid_index = BruteForceIndex
+            centroid_index_kwargs.setdefault("chunk_size", chunk_size)
+        elif centroid_index == "gemm":
+            centroid_index = GEMMIndex
+        elif centroid_index == "auto":
+            centroid_index = AutoIndex
+            centroid_index_kwargs.setdefault("seed", seed)
+            centroid_index_kwargs.setdefault("ckdtree_kwargs", ckdtree_kwargs)
+        elif centroid_index in ("ivf", "graph"):
+            centroid_index = (IVFIndex
+                              if centroid_index == "ivf" else GraphIndex)
+            centroid_index_kwargs.setdefault("seed", seed)
+        elif not (isinstance(centroid_index, type) and
+                  issubclass(centroid_index, CentroidIndex)):
+            raise ValueError(
+                "centroid_index must be one of 'auto', 'kd_tree', "
+                "'brute_force', 'gemm', 'ivf', or 'graph', or a subclass of "
+                "CentroidIndex, but got "
+                f"{centroid_index!r}.")
+        self._centroid_index = centroid_index(self._centroids,
+                                              **centroid_index_kwargs)
+
+        if adjacency_method == "auto":
+            adjacency_method = ("delaunay" if self._measure_dim
+                                <= _DELAUNAY_MAX_DIM else "knn")
+        if adjacency_method not in ("delaunay", "knn"):
+            raise ValueError("adjacency_method must be one of 'auto', "
+                             f"'delaunay', or 'knn', but got "
+                             f"{adjacency_method!r}.")
+        self._adjacency_method = adjacency_method
+        self._adjacency_neighbors = (2 *
+                                     self._measure_dim if adjacency_neighbors
+                                     is None else adjacency_neighbors)
+        # Computed on first access.
+        self._adjacency = None
+        self._voronoi = {}
+
+    def _generate_centroids(self, centroid_method, samples):
+        """Generates the centroids of the CVT.
+
+        Returns:
+            tuple: The centroids and the samples used to create them (None if
+            the method does not use samples).
+        """
+        if centroid_method == "kmeans":
+            if isinstance(samples, numbers.Integral):
+                samples = self._rng.uniform(
+                    self._lower_bounds,
+                    self._upper_bounds,
+                    size=(samples, self._measure_dim),
+                ).astype(self.dtypes["measures"])
+
+            centroids = k_means(samples, self.cells, **self._k_means_kwargs)[0]
+
+            if centroids.shape[0] < self.cells:
+                raise RuntimeError(
+                    "While generating the CVT, k-means clustering found "
+                    f"{centroids.shape[0]} centroids, but this "
+                    f"archive needs {self.cells} cells. This most "
+                    "likely happened because there are too few samples "
+                    "and/or too many cells.")
+            return centroids, samples
+        elif centroid_method == "minibatch_kmeans":
+            return self._generate_minibatch_centroids(samples)
+        elif centroid_method == "random":
+            # Generates random centroids.
+            centroids = self._rng.uniform(self._lower_bounds,
+                                          self._upper_bounds,
+                                          size=(self.cells, self._measure_dim))
+        elif centroid_method == "sobol":
+            # Generates centroids as a Sobol sequence.
+            sampler = Sobol(d=self._measure_dim, scramble=False)
+            sobol_nums = sampler.random(n=self.cells)
+            centroids = (self._lower_bounds + sobol_nums *
+                         (self._upper_bounds - self._lower_bounds))
+        elif centroid_method == "scrambled_sobol":
+            # Generates centroids as a scrambled Sobol sequence.
+            sampler = Sobol(d=self._measure_dim, scramble=True)
+            sobol_nums = sampler.random(n=self.cells)
+            centroids = (self._lower_bounds + sobol_nums *
+                         (self._upper_bounds - self._lower_bounds))
+        elif centroid_method == "halton":
+            # Generates centroids with a Halton sequence.
+            sampler = Halton(d=self._measure_dim)
+            halton_nums = sampler.random(n=self.cells)
+            centroids = (self._lower_bounds + halton_nums *
+                         (self._upper_bounds - self._lower_bounds))
+        return centroids, None
+
+    def _generate_minibatch_centroids(self, samples):
+        """Generates the centroids of the CVT with mini-batch k-means.
+
+        Returns:
+            tuple: The centroids and the samples used to create them (None if
+            the samples were generated in a stream).
+        """
+        kwargs = self._k_means_kwargs.copy()
+        batch_size = kwargs.pop("batch_size")
+
+        if isinstance(samples, numbers.Integral):
+            # The stream gets its own generator so that the archive's generator
+            # always takes one draw, no matter how many samples the clustering
+            # reads before stopping early.
+            stream_rng = np.random.default_rng(
+                self._rng.bit_generator.random_raw())
+
+            def sample_batches():
+                for start in range(0, samples, batch_size):
+                    yield stream_rng.uniform(
+                        self._lower_bounds,
+                        self._upper_bounds,
+                        size=(min(batch_size,
+                                  samples - start), self._measure_dim),
+                    ).astype(self.dtypes["measures"])
+
+            stream = sample_batches()
+            cvt_samples = None
+        else:
+            stream = (samples[start:start + batch_size]
+                      for start in range(0, len(samples), batch_size))
+            cvt_samples = samples
+
+        try:
+            centroids = mini_batch_k_means(stream, self.cells, **kwargs)
+        except ValueError as e:
+            raise RuntimeError(
+                "While generating the CVT, there were fewer samples than the "
+                f"{self.cells} cells in this archive.") from e
+        return centroids.astype(self.dtypes["measures"]), cvt_samples
+
+    def _load_centroids(self, centroid_cache, centroid_method, samples, seed):
+        """Loads the centroids from the cache, generating them if they are not
+        in the cache yet."""
+        cache = (centroid_cache if isinstance(centroid_cache, CentroidCache)
+                 else CentroidCache(centroid_cache))
+        kmeans = centroid_method in ("kmeans", "minibatch_kmeans")
+        params = {
+            "cells": self.cells,
+            "ranges": [self._lower_bounds, self._upper_bounds],
+            "dtype": np.dtype(self.dtypes["measures"]).str,
+            "centroid_method": centroid_method,
+            "samples": samples if kmeans else None,
+            "seed": seed,
+            "k_means_kwargs": self._k_means_kwargs if kmeans else None,
+        }
+
+        generated = False
+
+        def compute():
+            nonlocal generated
+            generated = True
+            centroids, cvt_samples = self._generate_centroids(
+                centroid_method, samples)
+            arrays = {"centroids": centroids}
+            if cvt_samples is not None:
+                arrays["samples"] = cvt_samples
+            return arrays
+
+        arrays = cache.get(params, compute)
+        self._centroid_cache = cache
+        self._centroid_cache_params = params
+        self._centroids = arrays["centroids"]
+        self._samples = arrays.get("samples")
+
+        if not generated:
+            # Advance the random number generator past the numbers that
+            # generating the centroids would have drawn, so that the archive
+            # behaves the same whether or not the centroids were cached. Each
+            # uniform sample takes one draw.
+            if (centroid_method == "kmeans" and
+                    isinstance(samples, numbers.Integral)):
+                self._rng.bit_generator.advance(samples * self._measure_dim)
+            elif (centroid_method == "minibatch_kmeans" and
+                  isinstance(samples, numbers.Integral)):
+                self._rng.bit_generator.advance(1)
+            elif centroid_method == "random":
+                self._rng.bit_generator.advance(self.cells * self._measure_dim)
 
     ## Properties inherited from ArchiveBase ##
 
@@ -307,12 +600,39 @@ class CVTArchive(ArchiveBase):
 
     @property
     def stats(self):
+        if self._stats is None:
+            num_elites = len(self)
+            objective_dtype = self.dtypes["objective"]
+            if num_elites == 0:
+                self._stats = ArchiveStats(
+                    num_elites=0,
+                    coverage=objective_dtype(0.0),
+                    qd_score=objective_dtype(0.0),
+                    norm_qd_score=objective_dtype(0.0),
+                    obj_max=None,
+                    obj_mean=None,
+                )
+            else:
+                qd_score = (self._objective_sum -
+                            num_elites * np.float64(self._qd_score_offset))
+                self._stats = ArchiveStats(
+                    num_elites=num_elites,
+                    coverage=objective_dtype(num_elites / self.cells),
+                    qd_score=objective_dtype(qd_score),
+                    norm_qd_score=objective_dtype(qd_score / self.cells),
+                    obj_max=self._obj_max,
+                    obj_mean=objective_dtype(self._objective_sum / num_elites),
+                )
         return self._stats
 
     @property
     def empty(self):
         return len(self._store) == 0
 
+    @property
+    def generation(self):
+        return self._store.generation
+
     ## Properties that are not in ArchiveBase ##
     ## Roughly ordered by the parameter list in the constructor. ##
 
@@ -337,6 +657,7 @@ class CVTArchive(ArchiveBase):
             threshold of the best elite's cell after the best elite was inserted
             into the archive.
         """
+        self._load_best_elite()
         return self._best_elite
 
     @property
@@ -383,6 +704,12 @@ class CVTArchive(ArchiveBase):
         """
         return self._centroids
 
+    @property
+    def centroid_index(self):
+        """CentroidIndex: The index used for finding the closest centroid in
+        :meth:`index_of`."""
+        return self._centroid_index
+
     @property
     def samples(self):
         """(num_samples, measure_dim) numpy.ndarray: The samples used in
@@ -392,6 +719,168 @@ class CVTArchive(ArchiveBase):
         """
         return self._samples
 
+    @property
+    def adjacency(self):
+        """scipy.sparse.csr_matrix: (cells, cells) boolean matrix where entry
+        (i, j) is True if cells i and j are neighbors.
+
+        The adjacency is computed with ``adjacency_method`` the first time it
+        is accessed (see the constructor) and reused afterwards. It is
+        symmetric, and no cell is adjacent to itself. Avoid modifying it, as it
+        is shared with :meth:`neighbors` and :meth:`occupied_neighbors`.
+        """
+        if self._adjacency is None:
+
+            def compute():
+                indptr, indices = _cvt_adjacency(self._centroids,
+                                                 self._adjacency_method,
+                                                 self._adjacency_neighbors)
+                return {"indptr": indptr, "indices": indices}
+
+            if self._centroid_cache is None:
+                arrays = compute()
+            else:
+                arrays = self._centroid_cache.get(
+                    {
+                        **self._centroid_cache_params,
+                        "adjacency_method":
+                            self._adjacency_method,
+                        "adjacency_neighbors":
+                            (self._adjacency_neighbors
+                             if self._adjacency_method == "knn" else None),
+                    },
+                    compute,
+                )
+            indices = np.asarray(arrays["indices"])
+            self._adjacency = csr_matrix(
+                (np.ones(len(indices),
+                         dtype=bool), indices, np.asarray(arrays["indptr"])),
+                shape=(self.cells, self.cells),
+            )
+        return self._adjacency
+
+    @property
+    def shm_name(self):
+        """str: Name of the shared memory holding the elites, which is passed to
+        :class:`~ribs.archives.ArchiveView` to read this archive from other
+        processes. None if the archive was not created with
+        ``shared_memory=True``."""
+        return self._store.shm_name
+
+    ## Neighborhoods ##
+
+    def neighbors(self, indices, hops=1):
+        """Finds the cells that are at most ``hops`` steps away from each of
+        the given cells in the :attr:`adjacency` graph.
+
+        Args:
+            indices (array-like): (batch_size,) array of cell indices.
+            hops (int): Maximum number of steps from each cell.
+        Returns:
+            list of numpy.ndarray: batch_size arrays, where the i-th array holds
+            the sorted indices of the cells within ``hops`` steps of
+            ``indices[i]``, excluding ``indices[i]`` itself.
+        Raises:
+            ValueError: ``indices`` is not 1D.
+            ValueError: ``hops`` is less than 1.
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        check_is_1d(indices, "indices")
+        if hops < 1:
+            raise ValueError(f"hops must be at least 1, but got {hops}.")
+
+        # Row i of `reach` marks the cells within the current number of hops of
+        # indices[i].
+        adjacency = self.adjacency
+        reach = adjacency[indices]
+        for _ in range(hops - 1):
+            reach = reach + reach @ adjacency
+
+        reach = reach.tocoo()
+        keep = reach.col != indices[reach.row]
+        rows, cols = reach.row[keep], reach.col[keep]
+        order = np.lexsort((cols, rows))
+        counts = np.bincount(rows, minlength=len(indices))
+        return np.split(cols[order].astype(np.int32), np.cumsum(counts)[:-1])
+
+    def occupied_neighbors(self, indices, hops=1):
+        """Finds the cells that hold an elite among the :meth:`neighbors` of
+        each of the given cells.
+
+        The elites in these cells can then be retrieved with
+        ``archive.retrieve(archive.centroids[neighbors])``.
+
+        Args:
+            indices (array-like): (batch_size,) array of cell indices.
+            hops (int): Maximum number of steps from each cell.
+        Returns:
+            list of numpy.ndarray: batch_size arrays, where the i-th array holds
+            the sorted indices of the occupied cells within ``hops`` steps of
+            ``indices[i]``, excluding ``indices[i]`` itself.
+        Raises:
+            ValueError: ``indices`` is not 1D.
+            ValueError: ``hops`` is less than 1.
+        """
+        occupied = self._store.occupied
+        return [
+            neighbors[occupied[neighbors]]
+            for neighbors in self.neighbors(indices, hops)
+        ]
+
+    def voronoi(self, transpose_measures=False):
+        """Computes the Voronoi diagram of the centroids.
+
+        Each diagram is computed once and reused afterwards, e.g., by
+        :func:`~ribs.visualize.cvt_archive_heatmap`. So that every cell is a
+        bounded region, the points of the diagram are the centroids followed by
+        ``2 ** measure_dim`` points that are about 1000 times the archive's
+        interval size away from the archive in every direction, i.e.,
+        ``voronoi.point_region[i]`` is the region of centroid ``i`` for ``i <
+        cells``. Computing the diagram is only practical when ``measure_dim``
+        is small.
+
+        Args:
+            transpose_measures (bool): Whether to compute the diagram with the
+                order of the measures reversed, e.g., with the x and y axes
+                swapped in 2D.
+        Returns:
+            scipy.spatial.Voronoi: The Voronoi diagram.
+        Raises:
+            ValueError: ``measure_dim`` is less than 2.
+        """
+        if transpose_measures not in self._voronoi:
+            if self._measure_dim < 2:
+                raise ValueError("Voronoi diagrams require measure_dim >= 2, "
+                                 f"but the archive has measure_dim "
+                                 f"{self._measure_dim}.")
+            centroids = self._centroids
+            lower_bounds = self._lower_bounds
+            upper_bounds = self._upper_bounds
+            if transpose_measures:
+                centroids = np.flip(centroids, axis=1)
+                lower_bounds = np.flip(lower_bounds)
+                upper_bounds = np.flip(upper_bounds)
+
+            # The faraway points lie in every direction from the archive, e.g.,
+            # upper right, upper left, bottom left, and bottom right in 2D
+            # (the directions are listed in Gray code order).
+            gray = np.arange(2**self._measure_dim)
+            gray ^= gray >> 1
+            directions = 1 - 2 * (
+                (gray[:, None] >> np.arange(self._measure_dim)) & 1)
+            base = np.where(directions[:, -1:] > 0, upper_bounds, lower_bounds)
+            faraway_pts = base + (upper_bounds -
+                                  lower_bounds) * directions * 1000
+
+            # The dict is replaced rather than modified so that snapshots of
+            # the archive do not share it.
+            self._voronoi = {
+                **self._voronoi,
+                transpose_measures:
+                    Voronoi(np.append(centroids, faraway_pts, axis=0)),
+            }
+        return self._voronoi[transpose_measures]
+
     ## dunder methods ##
 
     def __len__(self):
@@ -404,43 +893,57 @@ class CVTArchive(ArchiveBase):
 
     def _stats_reset(self):
         """Resets the archive stats."""
+        self._objective_sum = np.float64(0.0)
+        self._obj_max = None
+        self._best_index = None
         self._best_elite = None
-        self._objective_sum = self.dtypes["objective"](0.0)
-        self._stats = ArchiveStats(
-            num_elites=0,
-            coverage=self.dtypes["objective"](0.0),
-            qd_score=self.dtypes["objective"](0.0),
-            norm_qd_score=self.dtypes["objective"](0.0),
-            obj_max=None,
-            obj_mean=None,
-        )
+        self._stats = None
 
-    def _stats_update(self, new_objective_sum, new_best_index):
+    def _stats_recompute(self):
+        """Recomputes the archive stats from the elites currently in the
+        store."""
+        self._stats_reset()
+        if self.empty:
+            return
+        objective = self._store.data("objective")
+        best = np.argmax(objective)
+        self._stats_update(np.sum(objective, dtype=np.float64),
+                           self._store.occupied_list[best], objective[best])
+
+    def _stats_update(self, new_objective_sum, new_best_index,
+                      new_best_objective):
         """Updates statistics based on a new sum of objective values
-        (new_objective_sum) and the index of a potential new best elite
-        (new_best_index)."""
-        _, new_best_elite = self._store.retrieve([new_best_index])
-        new_best_elite = {k: v[0] for k, v in new_best_elite.items()}
-
-        if (self._stats.obj_max is None or
-                new_best_elite["objective"] > self._stats.obj_max):
-            self._best_elite = new_best_elite
-            new_obj_max = new_best_elite["objective"]
-        else:
-            new_obj_max = self._stats.obj_max
+        (new_objective_sum) and the index and objective of a potential new best
+        elite (new_best_index and new_best_objective).
 
+        Only the raw counters are updated here; :attr:`stats` and
+        :attr:`best_elite` are built from them when they are accessed, so that
+        frequent small additions do not pay for retrieving the best elite and
+        creating an ArchiveStats every time.
+        """
+        # The objective may come straight from the validated input, so it is
+        # cast to match the objectives stored in the archive.
+        new_best_objective = self.dtypes["objective"](new_best_objective)
+        if self._obj_max is None or new_best_objective > self._obj_max:
+            self._obj_max = new_best_objective
+            self._best_index = new_best_index
+            self._best_elite = None
         self._objective_sum = new_objective_sum
-        new_qd_score = (
-            self._objective_sum -
-            self.dtypes["objective"](len(self)) * self._qd_score_offset)
-        self._stats = ArchiveStats(
-            num_elites=len(self),
-            coverage=self.dtypes["objective"](len(self) / self.cells),
-            qd_score=new_qd_score,
-            norm_qd_score=self.dtypes["objective"](new_qd_score / self.cells),
-            obj_max=new_obj_max,
-            obj_mean=self.dtypes["objective"](self._objective_sum / len(self)),
-        )
+        self._stats = None
+
+    def _load_best_elite(self, indices=None):
+        """Retrieves the best elite from the store if it has not been retrieved
+        since it was found.
+
+        If ``indices`` is passed, the best elite is only retrieved if it is at
+        one of the indices, i.e., right before those cells are overwritten.
+        This matters in non-elitist archives, where the cell of the best elite
+        may be taken by an elite with a lower objective.
+        """
+        if (self._best_elite is None and self._best_index is not None and
+            (indices is None or np.any(indices == self._best_index))):
+            _, best_elite = self._store.retrieve([self._best_index])
+            self._best_elite = {k: v[0] for k, v in best_elite.items()}
 
     def index_of(self, measures):
         """Finds the indices of the centroid closest to the given coordinates in
@@ -451,8 +954,10 @@ class CVTArchive(ArchiveBase):
         centroid closest to ``measures[i]``. See :attr:`centroids` for more
         info.
 
-        The centroid indices are located using either the k-D tree or brute
-        force, depending on the value of ``use_kd_tree`` in the constructor.
+        The centroid indices are located with :attr:`centroid_index`, which is
+        selected with ``centroid_index`` or ``use_kd_tree`` in the constructor.
+        Approximate indices such as :class:`IVFIndex` may return a centroid that
+        is close to, but not the closest to, some coordinates.
 
         Args:
             measures (array-like): (batch_size, :attr:`measure_dim`) array of
@@ -469,32 +974,7 @@ class CVTArchive(ArchiveBase):
         check_batch_shape(measures, "measures", self.measure_dim, "measure_dim")
         check_finite(measures, "measures")
 
-        if self._use_kd_tree:
-            _, indices = self._centroid_kd_tree.query(measures)
-            return indices.astype(np.int32)
-        else:
-            expanded_measures = np.expand_dims(measures, axis=1)
-            # Compute indices chunks at a time
-            if self._chunk_size is not None and \
-                    self._chunk_size < measures.shape[0]:
-                indices = []
-                chunks = np.array_split(
-                    expanded_measures,
-                    np.ceil(len(expanded_measures) / self._chunk_size))
-                for chunk in chunks:
-                    distances = chunk - self.centroids
-                    distances = np.sum(np.square(distances), axis=2)
-                    current_res = np.argmin(distances, axis=1).astype(np.int32)
-                    indices.append(current_res)
-                return np.concatenate(tuple(indices))
-            else:
-                # Brute force distance calculation -- start by taking the
-                # difference between each measure i and all the centroids.
-                distances = expanded_measures - self.centroids
-                # Compute the total squared distance -- no need to compute
-                # actual distance with a sqrt.
-                distances = np.sum(np.square(distances), axis=2)
-                return np.argmin(distances, axis=1).astype(np.int32)
+        return self._centroid_index.query(measures)
 
     def index_of_single(self, measures):
         """Returns the index of the measures for one solution.
@@ -518,47 +998,6 @@ class CVTArchive(ArchiveBase):
 
     ## Methods for writing to the archive ##
 
-    @staticmethod
-    def _compute_thresholds(indices, objective, cur_threshold, learning_rate,
-                            dtype):
-        """Computes new thresholds with the CMA-MAE batch threshold update rule.
-
-        If entries in `indices` are duplicated, they receive the same threshold.
-        """
-        if len(indices) == 0:
-            return np.array([], dtype=dtype)
-
-        # Compute the number of objectives inserted into each cell. Note that we
-        # index with `indices` to place the counts at all relevant indices. For
-        # instance, if we had an array [1,2,3,1,5], we would end up with
-        # [2,1,1,2,1] (there are 2 1's, 1 2, 1 3, 2 1's, and 1 5).
-        #
-        # All objective_sizes should be > 0 since we only retrieve counts for
-        # indices in `indices`.
-        objective_sizes = aggregate(indices, 1, func="len",
-                                    fill_value=0)[indices]
-
-        # Compute the sum of the objectives inserted into each cell -- again, we
-        # index with `indices`.
-        objective_sums = aggregate(indices,
-                                   objective,
-                                   func="sum",
-                                   fill_value=np.nan)[indices]
-
-        # Update the threshold with the batch update rule from Fontaine 2023
-        # (https://arxiv.org/abs/2205.10752).
-        #
-        # Unlike in single_entry_with_threshold, we do not need to worry about
-        # cur_threshold having -np.inf here as a result of threshold_min being
-        # -np.inf. This is because the case with threshold_min = -np.inf is
-        # handled separately since we compute the new threshold based on the max
-        # objective in each cell in that case.
-        ratio = dtype(1.0 - learning_rate)**objective_sizes
-        new_threshold = (ratio * cur_threshold +
-                         (objective_sums / objective_sizes) * (1 - ratio))
-
-        return new_threshold
-
     def add(self, solution, objective, measures, **fields):
         """Inserts a batch of solutions into the archive.
 
@@ -669,97 +1108,46 @@ class CVTArchive(ArchiveBase):
 
         # Retrieve indices of the archive cells.
         indices = self.index_of(data["measures"])
-        batch_size = len(indices)
-
-        # Retrieve current data and thresholds. Unoccupied cells default to
-        # threshold_min.
-        cur_occupied, cur_data = self._store.retrieve(indices)
-        cur_threshold = cur_data["threshold"]
-        cur_threshold[~cur_occupied] = self.threshold_min
-
-        # Compute status -- arrays below are all boolean arrays of length
-        # batch_size.
-        #
-        # When we want CMA-ME behavior, the threshold defaults to -inf for new
-        # cells, which satisfies the condition for can_insert.
-        can_insert = data["objective"] > cur_threshold
-        is_new = can_insert & ~cur_occupied
-        improve_existing = can_insert & cur_occupied
-        add_info["status"] = np.zeros(batch_size, dtype=np.int32)
-        add_info["status"][is_new] = 2
-        add_info["status"][improve_existing] = 1
-
-        # If threshold_min is -inf, then we want CMA-ME behavior, which computes
-        # the improvement value of new solutions w.r.t zero. Otherwise, we
-        # compute improvement with respect to threshold_min.
-        cur_threshold[is_new] = (self.dtypes["threshold"](0.0)
-                                 if self.threshold_min == -np.inf else
-                                 self.threshold_min)
-        add_info["value"] = data["objective"] - cur_threshold
-
-        # Return early if we cannot insert anything -- continuing throws a
-        # ValueError in aggregate() since index[can_insert] would be empty.
-        if not np.any(can_insert):
-            return add_info
 
-        # Select all solutions that _can_ be inserted -- at this point, there
-        # are still conflicts in the insertions, e.g., multiple solutions can
-        # map to index 0.
-        indices = indices[can_insert]
-        data = {name: arr[can_insert] for name, arr in data.items()}
-        cur_threshold = cur_threshold[can_insert]
-
-        # Compute the new threshold associated with each entry.
-        if self.threshold_min == -np.inf:
-            # Regular archive behavior: thresholds are just the objectives.
-            new_threshold = data["objective"]
-        else:
-            # Batch threshold update described in Fontaine 2023
-            # (https://arxiv.org/abs/2205.10752). This computation is based on
-            # the mean objective of all solutions in the batch that could have
-            # been inserted into each cell.
-            new_threshold = self._compute_thresholds(indices, data["objective"],
-                                                     cur_threshold,
-                                                     self.learning_rate,
-                                                     self.dtypes["threshold"])
-
-        # Retrieve indices of solutions that _should_ be inserted into the
-        # archive. Currently, multiple solutions may be inserted at each archive
-        # index, but we only want to insert the maximum among these solutions.
-        # Thus, we obtain the argmax for each archive index.
-        #
-        # We use a fill_value of -1 to indicate archive indices that were not
-        # covered in the batch. Note that the length of archive_argmax is only
-        # max(indices), rather than the total number of grid cells. However,
-        # this is okay because we only need the indices of the solutions, which
-        # we store in should_insert.
-        #
-        # aggregate() always chooses the first item if there are ties, so the
-        # first elite will be inserted if there is a tie. See their default
-        # numpy implementation for more info:
-        # https://github.com/ml31415/numpy-groupies/blob/master/numpy_groupies/aggregate_numpy.py#L107
-        archive_argmax = aggregate(indices,
-                                   data["objective"],
-                                   func="argmax",
-                                   fill_value=-1)
-        should_insert = archive_argmax[archive_argmax != -1]
+        # Retrieve current thresholds and objectives.
+        cur_occupied, (cur_threshold, cur_objective) = self._store.retrieve(
+            indices, ["threshold", "objective"], return_type="tuple")
+
+        # Compute the status and value of each solution, as well as which
+        # solutions to insert and their new thresholds. When we want CMA-ME
+        # behavior, the threshold defaults to -inf for new cells, so every
+        # solution can be inserted into a new cell, and the value of new
+        # solutions is computed w.r.t. zero. Otherwise, values are computed
+        # w.r.t. threshold_min, and thresholds follow the batch threshold update
+        # described in Fontaine 2023 (https://arxiv.org/abs/2205.10752). When
+        # multiple solutions can be inserted into the same cell, only the one
+        # with the highest objective is inserted, and the first one wins ties.
+        (status, value, should_insert, new_threshold, objective_delta,
+         best) = batch_insertion(indices, data["objective"], cur_occupied,
+                                 cur_threshold, cur_objective,
+                                 self.threshold_min, self.learning_rate)
+        add_info["status"] = status
+        add_info["value"] = value
+
+        # Return early if we cannot insert anything.
+        if len(should_insert) == 0:
+            return add_info
 
         # Select only solutions that will be inserted into the archive.
         indices = indices[should_insert]
         data = {name: arr[should_insert] for name, arr in data.items()}
-        data["threshold"] = new_threshold[should_insert]
+        data["threshold"] = new_threshold
 
-        # Insert elites into the store.
+        # Insert elites into the store. With a learning rate below 1, an elite
+        # may be replaced by one with a lower objective, so the best elite must
+        # be retrieved before its cell is overwritten.
+        self._load_best_elite(indices)
         self._store.add(indices, data)
 
         # Compute statistics.
-        cur_objective = cur_data["objective"]
-        cur_objective[~cur_occupied] = 0.0
-        cur_objective = cur_objective[can_insert][should_insert]
-        objective_sum = (self._objective_sum +
-                         np.sum(data["objective"] - cur_objective))
-        best_index = indices[np.argmax(data["objective"])]
-        self._stats_update(objective_sum, best_index)
+        objective_sum = self._objective_sum + objective_delta
+        self._stats_update(objective_sum, indices[best],
+                           data["objective"][best])
 
         return add_info
 
@@ -868,7 +1256,9 @@ class CVTArchive(ArchiveBase):
             data["threshold"] = [(cur_threshold * (1.0 - self.learning_rate) +
                                   objective * self.learning_rate)]
 
-            # Insert elite into the store.
+            # Insert elite into the store, retrieving the best elite first in
+            # case this overwrites it (see add()).
+            self._load_best_elite(index)
             self._store.add(index[None], {
                 name: np.expand_dims(arr, axis=0) for name, arr in data.items()
             })
@@ -877,7 +1267,7 @@ class CVTArchive(ArchiveBase):
             cur_objective = (cur_data["objective"][0]
                              if cur_occupied else self.dtypes["objective"](0.0))
             self._stats_update(self._objective_sum + objective - cur_objective,
-                               index)
+                               index, objective)
 
         # Value is the improvement over the current threshold (can be negative).
         add_info["value"] = objective - cur_threshold
@@ -889,6 +1279,93 @@ class CVTArchive(ArchiveBase):
         self._store.clear()
         self._stats_reset()
 
+    def remove(self, indices):
+        """Removes the elites at the given indices from the archive.
+
+        Emptied cells behave like cells that were never filled; in particular,
+        their CMA-MAE thresholds start over from :attr:`threshold_min`.
+
+        Args:
+            indices (array-like): Indices of elites to remove; see
+                :meth:`index_of`. Indices without an elite are ignored.
+        """
+        self._store.remove(indices)
+        self._stats_recompute()
+
+    def checkpoint(self, path, compact=False):
+        """Persists the archive to a delta log in the directory ``path``.
+
+        See :meth:`ArchiveBase.checkpoint
+        <ribs.archives.ArchiveBase.checkpoint>` for more info.
+        """
+        path = os.fspath(path)
+        if self._store.log_dir != path:
+            self._store.start_log(path)
+        elif compact:
+            self._store.compact_log()
+        else:
+            self._store.sync_log()
+
+    def restore(self, path):
+        """Restores the elites in the archive from a log written by
+        :meth:`checkpoint`.
+
+        See :meth:`ArchiveBase.restore
+        <ribs.archives.ArchiveBase.restore>` for more info. Note that the
+        restored elites are held in private memory even if the archive was
+        created with ``memmap_dir`` or ``shared_memory``; in the latter case,
+        the shared memory is released.
+
+        Args:
+            path (str or pathlib.Path): Directory of the log.
+        Raises:
+            ValueError: The fields of the elites in the log do not match the
+                fields of this archive.
+            ValueError: The capacity of the archive in the log is not the
+                number of cells in this archive.
+        """
+        store = ArrayStore.load_log(path,
+                                    resume=True,
+                                    field_desc=self._store.field_desc)
+        if (store.field_desc != self._store.field_desc or
+                store.capacity != self.cells):
+            store.close_log()
+            raise ValueError(
+                f"The archive in {os.fspath(path)} has fields "
+                f"{store.field_desc} and capacity {store.capacity}, which "
+                "do not match the fields "
+                f"{self._store.field_desc} and number of cells "
+                f"{self.cells} of this archive.")
+
+        self._store.close_log()
+        self._store.release_shared_memory()
+        self._store = store
+        self._stats_recompute()
+
+    def release_shared_memory(self):
+        """Moves the elites out of shared memory.
+
+        :class:`~ribs.archives.ArchiveView` instances of this archive can no
+        longer read it afterwards. Does nothing if the archive was not created
+        with ``shared_memory=True``.
+        """
+        self._store.release_shared_memory()
+
+    @classmethod
+    def from_records(cls, records, **kwargs):
+        """Creates an archive holding the elites in a structured array.
+
+        See :meth:`ArchiveBase.from_records
+        <ribs.archives.ArchiveBase.from_records>` for more info.
+        """
+        # pylint: disable = protected-access
+        archive = cls(**kwargs)
+        indices = (records["index"] if "index" in (records.dtype.names or ())
+                   else archive.index_of(records["measures"]))
+        load_records(archive._store, records, indices)
+        archive._stats_recompute()
+        return archive
+
     ## Methods for reading from the archive ##
     ## Refer to ArchiveBase for documentation of these methods. ##
 
@@ -911,14 +1388,36 @@ class CVTArchive(ArchiveBase):
 
         return occupied[0], {field: arr[0] for field, arr in data.items()}
 
-    def data(self, fields=None, return_type="dict"):
-        return self._store.data(fields, return_type)
+    def data(self, fields=None, return_type="dict", copy=True, out=None):
+        return self._store.data(fields, return_type, copy, out)
+
+    def write_arrow(self,
+                    path,
+                    fields=None,
+                    file_format="parquet",
+                    chunk_size=100_000):
+        self._store.write_arrow(path, fields, file_format, chunk_size)
+
+    def to_records(self, fields=None):
+        return self._store.to_records(fields)
 
-    def sample_elites(self, n):
+    def iter_batches(self, batch_size, fields=None):
+        return self._store.iter_batches(batch_size, fields)
+
+    def changes_since(self, token, fields=None):
+        indices, token = self._store.changes_since(token)
+        if indices is None or fields is None:
+            return indices, token
+        return self._store.retrieve(indices, fields)[1], token
+
+    def sample_elites(self, n, fields=None, out=None):
         if self.empty:
             raise IndexError("No elements in archive.")
 
         random_indices = self._rng.integers(len(self._store), size=n)
         selected_indices = self._store.occupied_list[random_indices]
-        _, elites = self._store.retrieve(selected_indices)
+        _, elites = self._store.retrieve(selected_indices, fields, out=out)
         return elites
+
+    def snapshot(self):
+        return snapshot_archive(self)
@@ -0,0 +1,158 @@
+"""Provides codecs for storing fields of an ArrayStore in reduced precision."""
+import numpy as np
+
+
+class FieldCodec:
+    """Base class for codecs that store a field of an
+    :class:`~ribs.archives.ArrayStore` in a compact encoding.
+
+    A codec can be passed in place of the dtype of a field in the
+    ``field_desc`` of an :class:`~ribs.archives.ArrayStore`, or as the dtype of
+    the solutions or of an extra field in the archives, e.g.,
+    ``GridArchive(..., dtype={"solution": Int8Codec(), "objective": np.float32,
+    "measures": np.float32})``. The store then holds each entry of the field in
+    its encoded form. Data are encoded when they are passed to
+    :meth:`~ribs.archives.ArrayStore.add`, and they are decoded when they are
+    read, e.g., with :meth:`~ribs.archives.ArrayStore.retrieve`. Encoding is
+    usually lossy, so the values that are read back may differ slightly from
+    the values that were added.
+
+    Subclasses implement :meth:`storage`, :meth:`encode`, and :meth:`decode`.
+
+    Args:
+        dtype (str or data-type): Floating-point dtype of decoded values.
+    """
+
+    def __init__(self, dtype=np.float32):
+        self.dtype = np.dtype(dtype).type
+
+    def __repr__(self):
+        """Shows the codec and the dtype of decoded values."""
+        return f"{type(self).__name__}(dtype={np.dtype(self.dtype).name})"
+
+    def __eq__(self, other):
+        """Codecs are equal if they have the same type and dtype."""
+        return type(self) is type(other) and self.dtype == other.dtype
+
+    def __hash__(self):
+        """Hashes the type and dtype of the codec."""
+        return hash((type(self), self.dtype))
+
+    def storage(self, shape):
+        """Describes how entries of the given shape are stored.
+
+        Args:
+            shape (tuple): Shape of each decoded entry of the field.
+        Returns:
+            tuple: ``(shape, dtype)`` of each encoded entry.
+        """
+        raise NotImplementedError
+
+    def encode(self, arr):
+        """Encodes a batch of entries.
+
+        Args:
+            arr (numpy.ndarray): Array of shape ``(batch_size, *shape)``.
+        Returns:
+            numpy.ndarray: Array of shape ``(batch_size, *storage_shape)``,
+            where ``storage_shape`` is given by :meth:`storage`.
+        """
+        raise NotImplementedError
+
+    def decode(self, arr, shape):
+        """Decodes a batch of entries encoded with :meth:`encode`.
+
+        Args:
+            arr (numpy.ndarray): Array of shape ``(batch_size,
+                *storage_shape)``.
+            shape (tuple): Shape of each decoded entry of the field.
+        Returns:
+            numpy.ndarray: Array of shape ``(batch_size, *shape)`` with dtype
+            :attr:`dtype`.
+        """
+        raise NotImplementedError
+
+
+class Float16Codec(FieldCodec):
+    """Stores each value as an IEEE half-precision float.
+
+    This halves the memory of float32 data and quarters the memory of float64
+    data. Values keep about 3 significant decimal digits, and magnitudes above
+    65504 overflow to infinity.
+
+    Args:
+        dtype (str or data-type): Floating-point dtype of decoded values.
+    """
+
+    def storage(self, shape):
+        return shape, np.float16
+
+    def encode(self, arr):
+        return np.asarray(arr).astype(np.float16)
+
+    def decode(self, arr, shape):
+        return arr.astype(self.dtype)
+
+
+class BFloat16Codec(FieldCodec):
+    """Stores each value as the upper 16 bits of its float32 representation.
+
+    This format is similar to bfloat16. It has the same range as float32 but
+    only about 2 significant decimal digits, since the lower bits of the
+    mantissa are truncated.
+
+    Args:
+        dtype (str or data-type): Floating-point dtype of decoded values.
+    """
+
+    def storage(self, shape):
+        return shape, np.uint16
+
+    def encode(self, arr):
+        bits = np.ascontiguousarray(arr, dtype=np.float32).view(np.uint32)
+        return (bits >> 16).astype(np.uint16)
+
+    def decode(self, arr, shape):
+        bits = arr.astype(np.uint32) << 16
+        return bits.view(np.float32).astype(self.dtype)
+
+
+class Int8Codec(FieldCodec):
+    """Quantizes each entry to 8-bit integers with a per-entry scale and
+    offset.
+
+    Each entry (e.g., each solution) is mapped linearly from its own
+    ``[min, max]`` range onto the 256 values of an int8, and the scale and
+    offset of the mapping are stored as two float32 values next to the
+    integers. An entry with ``d`` values thus takes ``d + 8`` bytes, which is
+    close to an eighth of the memory of float64 data when ``d`` is large. The
+    error of each value is at most half of ``(max - min) / 255``. Values must be
+    finite.
+
+    Args:
+        dtype (str or data-type): Floating-point dtype of decoded values.
+    """
+
+    def storage(self, shape):
+        return (int(np.prod(shape, dtype=int)) + 8,), np.int8
+
+    def encode(self, arr):
+        arr = np.asarray(arr, dtype=np.float64)
+        flat = arr.reshape(len(arr), -1)
+
+        offset = flat.min(axis=1).astype(np.float32)
+        scale = ((flat.max(axis=1) - offset) / 255).astype(np.float32)
+        # Constant entries only need their offset.
+        scale[scale == 0] = 1.0
+
+        codes = np.rint((flat - offset[:, None]) / scale[:, None]) - 128
+        encoded = np.empty((len(arr), flat.shape[1] + 8), dtype=np.int8)
+        encoded[:, :-8] = np.clip(codes, -128, 127)
+        encoded[:, -8:] = np.stack([scale, offset], axis=1).view(np.int8)
+        return encoded
+
+    def decode(self, arr, shape):
+        params = np.ascontiguousarray(arr[:, -8:]).view(np.float32)
+        codes = arr[:, :-8].astype(np.float64) + 128
+        flat = codes * params[:, :1] + params[:, 1:]
+        return flat.reshape((len(arr),) + tuple(shape)).astype(self.dtype)
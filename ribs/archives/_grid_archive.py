@@ -1,4 +1,6 @@
 """Contains the GridArchive."""
+import os
+
 import numpy as np
 from numpy_groupies import aggregate_nb as aggregate
 
@@ -7,7 +9,9 @@ from ribs._utils import (check_batch_shape, check_finite, check_is_1d,
 from ribs.archives._archive_base import ArchiveBase
 from ribs.archives._archive_stats import ArchiveStats
 from ribs.archives._array_store import ArrayStore
-from ribs.archives._utils import (fill_sentinel_values, parse_dtype,
+from ribs.archives._sparse_array_store import SparseArrayStore
+from ribs.archives._utils import (batch_insertion, fill_sentinel_values,
+                                  load_records, parse_dtype, snapshot_archive,
                                   validate_cma_mae_settings)
 
 
@@ -71,6 +75,9 @@ class GridArchive(ArchiveBase):
             ``"d"`` / ``np.float64``, or a dict specifying separate dtypes, of
             the form ``{"solution": <dtype>, "objective": <dtype>, "measures":
             <dtype>}``.
+            In the dict, the solution dtype may also be a
+            :class:`~ribs.archives.FieldCodec`, which stores the solutions in
+            reduced precision.
         extra_fields (dict): Description of extra fields of data that is stored
             next to elite data like solutions and objectives. The description is
             a dict mapping from a field name (str) to a tuple of ``(shape,
@@ -78,11 +85,39 @@ class GridArchive(ArchiveBase):
             np.float32)}`` will create a "foo" field that contains scalar values
             and a "bar" field that contains 10D values. Note that field names
             must be valid Python identifiers, and names already used in the
-            archive are not allowed.
+            archive are not allowed. The dtype of an extra field may also be a
+            :class:`~ribs.archives.FieldCodec`.
+        memmap_dir (str or pathlib.Path): If passed, the elites' data is stored
+            in :class:`numpy.memmap` files under this directory instead of in
+            memory, which allows creating archives that are larger than RAM.
+            If the directory already holds elites from a previous archive with
+            the same fields, the archive is restored from the directory without
+            copying the data. See :class:`~ribs.archives.ArrayStore` for more
+            info.
+        shared_memory (bool): If True, the elites' data is allocated in
+            :mod:`multiprocessing.shared_memory`, and other processes can read
+            the archive without a copy through an
+            :class:`~ribs.archives.ArchiveView` created with :attr:`shm_name`.
+            Call :meth:`release_shared_memory` once the other processes are
+            done. See :class:`~ribs.archives.ArrayStore` for more info.
+        sparse (bool): If True, the elites' data is held in a
+            :class:`~ribs.archives.SparseArrayStore`, which allocates memory
+            only for occupied cells rather than for every cell in the grid.
+            This allows grids with far more cells than could fit in memory,
+            e.g., 50 cells in each of 6 dimensions, as long as only a small
+            fraction of the cells is ever filled. Sparse archives cannot be
+            combined with ``memmap_dir`` or ``shared_memory``, and their
+            ``index`` field is int64 rather than int32.
     Raises:
         ValueError: Invalid values for learning_rate and threshold_min.
         ValueError: Invalid names in extra_fields.
         ValueError: ``dims`` and ``ranges`` are not the same length.
+        ValueError: ``memmap_dir`` holds elites from an archive with different
+            fields or a different number of cells.
+        ValueError: The grid has more cells than a dense archive can index
+            (:math:`2^{31} - 1`), and ``sparse`` is False.
+        ValueError: ``sparse`` was combined with ``memmap_dir`` or
+            ``shared_memory``.
     """
 
     def __init__(
@@ -98,6 +133,9 @@ class GridArchive(ArchiveBase):
         seed=None,
         dtype=np.float64,
         extra_fields=None,
+        memmap_dir=None,
+        shared_memory=False,
+        sparse=False,
     ):
         self._rng = np.random.default_rng(seed)
         self._dims = np.array(dims, dtype=np.int32)
@@ -119,8 +157,9 @@ class GridArchive(ArchiveBase):
             raise ValueError("The following names are not allowed in "
                              f"extra_fields: {reserved_fields}")
         dtype = parse_dtype(dtype)
-        self._store = ArrayStore(
-            field_desc={
+        self._sparse = sparse
+        self._store = self._create_store(
+            {
                 "solution": (self.solution_dim, dtype["solution"]),
                 "objective": ((), dtype["objective"]),
                 "measures": (self.measure_dim, dtype["measures"]),
@@ -129,8 +168,14 @@ class GridArchive(ArchiveBase):
                 "threshold": ((), dtype["objective"]),
                 **extra_fields,
             },
-            capacity=np.prod(self._dims),
+            memmap_dir,
+            shared_memory,
         )
+        if self._store.capacity != self._n_cells(self._dims):
+            raise ValueError(
+                f"The store in memmap_dir has capacity {self._store.capacity}, "
+                f"but an archive with dims {self._dims} has "
+                f"{self._n_cells(self._dims)} cells.")
 
         # Set up constant properties.
         if len(self._dims) != len(ranges):
@@ -149,11 +194,45 @@ class GridArchive(ArchiveBase):
         self._qd_score_offset = self.dtypes["objective"](qd_score_offset)
 
         # Set up statistics -- objective_sum is the sum of all objective values
-        # in the archive; it is useful for computing qd_score and obj_mean.
-        self._best_elite = None
+        # in the archive; it is useful for computing qd_score and obj_mean. It
+        # is kept in float64 and only cast to the objective dtype in stats. The
+        # stats are recomputed (rather than reset) in case the store was
+        # reopened from memmap_dir.
         self._objective_sum = None
+        self._obj_max = None
+        self._best_index = None
+        self._best_elite = None
         self._stats = None
-        self._stats_reset()
+        self._stats_recompute()
+
+    @staticmethod
+    def _n_cells(dims):
+        """Number of cells in a grid with the given dims, computed in int64 so
+        that it does not overflow."""
+        return int(np.prod(dims, dtype=np.int64))
+
+    def _check_cells(self, dims):
+        """Checks that the store can index a grid with the given dims."""
+        cells = self._n_cells(dims)
+        if not self._sparse and cells > np.iinfo(np.int32).max:
+            raise ValueError(
+                f"An archive with dims {dims} has {cells} cells, which is more "
+                "than a dense archive can index. Pass sparse=True to only "
+                "allocate memory for occupied cells.")
+
+    def _create_store(self, field_desc, memmap_dir, shared_memory):
+        """Creates the store for the elites of a grid with the current dims."""
+        self._check_cells(self._dims)
+        cells = self._n_cells(self._dims)
+        if self._sparse:
+            if memmap_dir is not None or shared_memory:
+                raise ValueError("sparse=True cannot be combined with "
+                                 "memmap_dir or shared_memory.")
+            return SparseArrayStore(field_desc, cells)
+        return ArrayStore(field_desc,
+                          capacity=cells,
+                          memmap_dir=memmap_dir,
+                          shared_memory=shared_memory)
 
     @staticmethod
     def _compute_boundaries(dims, lower_bounds, upper_bounds):
@@ -176,12 +255,39 @@ class GridArchive(ArchiveBase):
 
     @property
     def stats(self):
+        if self._stats is None:
+            num_elites = len(self)
+            objective_dtype = self.dtypes["objective"]
+            if num_elites == 0:
+                self._stats = ArchiveStats(
+                    num_elites=0,
+                    coverage=objective_dtype(0.0),
+                    qd_score=objective_dtype(0.0),
+                    norm_qd_score=objective_dtype(0.0),
+                    obj_max=None,
+                    obj_mean=None,
+                )
+            else:
+                qd_score = (self._objective_sum -
+                            num_elites * np.float64(self._qd_score_offset))
+                self._stats = ArchiveStats(
+                    num_elites=num_elites,
+                    coverage=objective_dtype(num_elites / self.cells),
+                    qd_score=objective_dtype(qd_score),
+                    norm_qd_score=objective_dtype(qd_score / self.cells),
+                    obj_max=self._obj_max,
+                    obj_mean=objective_dtype(self._objective_sum / num_elites),
+                )
         return self._stats
 
     @property
     def empty(self):
         return len(self._store) == 0
 
+    @property
+    def generation(self):
+        return self._store.generation
+
     ## Properties that are not in ArchiveBase ##
     ## Roughly ordered by the parameter list in the constructor. ##
 
@@ -206,8 +312,15 @@ class GridArchive(ArchiveBase):
             threshold of the best elite's cell after the best elite was inserted
             into the archive.
         """
+        self._load_best_elite()
         return self._best_elite
 
+    @property
+    def sparse(self):
+        """bool: Whether the elites are held in a
+        :class:`~ribs.archives.SparseArrayStore`."""
+        return self._sparse
+
     @property
     def dims(self):
         """(measure_dim,) numpy.ndarray: Number of cells in each dimension."""
@@ -274,6 +387,14 @@ class GridArchive(ArchiveBase):
         computing the QD score."""
         return self._qd_score_offset
 
+    @property
+    def shm_name(self):
+        """str: Name of the shared memory holding the elites, which is passed to
+        :class:`~ribs.archives.ArchiveView` to read this archive from other
+        processes. None if the archive was not created with
+        ``shared_memory=True``."""
+        return self._store.shm_name
+
     ## dunder methods ##
 
     def __len__(self):
@@ -286,43 +407,57 @@ class GridArchive(ArchiveBase):
 
     def _stats_reset(self):
         """Resets the archive stats."""
+        self._objective_sum = np.float64(0.0)
+        self._obj_max = None
+        self._best_index = None
         self._best_elite = None
-        self._objective_sum = self.dtypes["objective"](0.0)
-        self._stats = ArchiveStats(
-            num_elites=0,
-            coverage=self.dtypes["objective"](0.0),
-            qd_score=self.dtypes["objective"](0.0),
-            norm_qd_score=self.dtypes["objective"](0.0),
-            obj_max=None,
-            obj_mean=None,
-        )
+        self._stats = None
 
-    def _stats_update(self, new_objective_sum, new_best_index):
+    def _stats_recompute(self):
+        """Recomputes the archive stats from the elites currently in the
+        store."""
+        self._stats_reset()
+        if self.empty:
+            return
+        objective = self._store.data("objective")
+        best = np.argmax(objective)
+        self._stats_update(np.sum(objective, dtype=np.float64),
+                           self._store.occupied_list[best], objective[best])
+
+    def _stats_update(self, new_objective_sum, new_best_index,
+                      new_best_objective):
         """Updates statistics based on a new sum of objective values
-        (new_objective_sum) and the index of a potential new best elite
-        (new_best_index)."""
-        _, new_best_elite = self._store.retrieve([new_best_index])
-        new_best_elite = {k: v[0] for k, v in new_best_elite.items()}
-
-        if (self._stats.obj_max is None or
-                new_best_elite["objective"] > self._stats.obj_max):
-            self._best_elite = new_best_elite
-            new_obj_max = new_best_elite["objective"]
-        else:
-            new_obj_max = self._stats.obj_max
+        (new_objective_sum) and the index and objective of a potential new best
+        elite (new_best_index and new_best_objective).
 
+        Only the raw counters are updated here; :attr:`stats` and
+        :attr:`best_elite` are built from them when they are accessed, so that
+        frequent small additions do not pay for retrieving the best elite and
+        creating an ArchiveStats every time.
+        """
+        # The objective may come straight from the validated input, so it is
+        # cast to match the objectives stored in the archive.
+        new_best_objective = self.dtypes["objective"](new_best_objective)
+        if self._obj_max is None or new_best_objective > self._obj_max:
+            self._obj_max = new_best_objective
+            self._best_index = new_best_index
+            self._best_elite = None
         self._objective_sum = new_objective_sum
-        new_qd_score = (
-            self._objective_sum -
-            self.dtypes["objective"](len(self)) * self._qd_score_offset)
-        self._stats = ArchiveStats(
-            num_elites=len(self),
-            coverage=self.dtypes["objective"](len(self) / self.cells),
-            qd_score=new_qd_score,
-            norm_qd_score=self.dtypes["objective"](new_qd_score / self.cells),
-            obj_max=new_obj_max,
-            obj_mean=self.dtypes["objective"](self._objective_sum / len(self)),
-        )
+        self._stats = None
+
+    def _load_best_elite(self, indices=None):
+        """Retrieves the best elite from the store if it has not been retrieved
+        since it was found.
+
+        If ``indices`` is passed, the best elite is only retrieved if it is at
+        one of the indices, i.e., right before those cells are overwritten.
+        This matters in non-elitist archives, where the cell of the best elite
+        may be taken by an elite with a lower objective.
+        """
+        if (self._best_elite is None and self._best_index is not None and
+            (indices is None or np.any(indices == self._best_index))):
+            _, best_elite = self._store.retrieve([self._best_index])
+            self._best_elite = {k: v[0] for k, v in best_elite.items()}
 
     def index_of(self, measures):
         """Returns archive indices for the given batch of measures.
@@ -349,8 +484,8 @@ class GridArchive(ArchiveBase):
             measures (array-like): (batch_size, :attr:`measure_dim`) array of
                 coordinates in measure space.
         Returns:
-            numpy.ndarray: (batch_size,) array of integer indices representing
-            the flattened grid coordinates.
+            numpy.ndarray: (batch_size,) int64 array of integer indices
+            representing the flattened grid coordinates.
         Raises:
             ValueError: ``measures`` is not of shape (batch_size,
                 :attr:`measure_dim`).
@@ -402,7 +537,9 @@ class GridArchive(ArchiveBase):
             grid_indices (array-like): (batch_size, :attr:`measure_dim`)
                 array of indices in the archive grid.
         Returns:
-            numpy.ndarray: (batch_size,) array of integer indices.
+            numpy.ndarray: (batch_size,) int64 array of integer indices. The
+            indices are int64 so that they do not overflow in grids with more
+            than :math:`2^{31} - 1` cells.
         Raises:
             ValueError: ``grid_indices`` is not of shape (batch_size,
                 :attr:`measure_dim`)
@@ -411,7 +548,7 @@ class GridArchive(ArchiveBase):
         check_batch_shape(grid_indices, "grid_indices", self.measure_dim,
                           "measure_dim")
 
-        return np.ravel_multi_index(grid_indices.T, self._dims).astype(np.int32)
+        return np.ravel_multi_index(grid_indices.T, self._dims).astype(np.int64)
 
     def int_to_grid_index(self, int_indices):
         """Converts a batch of indices into indices in the archive's grid.
@@ -420,7 +557,8 @@ class GridArchive(ArchiveBase):
 
         Args:
             int_indices (array-like): (batch_size,) array of integer
-                indices such as those output by :meth:`index_of`.
+                indices such as those output by :meth:`index_of`. Indices may
+                exceed the range of int32.
         Returns:
             numpy.ndarray: (batch_size, :attr:`measure_dim`) array of indices
             in the archive grid.
@@ -430,6 +568,8 @@ class GridArchive(ArchiveBase):
         int_indices = np.asarray(int_indices)
         check_is_1d(int_indices, "int_indices")
 
+        # The grid indices along each dimension are less than the dims, so they
+        # fit in int32 even when the integer indices do not.
         return np.asarray(np.unravel_index(
             int_indices,
             self._dims,
@@ -437,47 +577,6 @@ class GridArchive(ArchiveBase):
 
     ## Methods for writing to the archive ##
 
-    @staticmethod
-    def _compute_thresholds(indices, objective, cur_threshold, learning_rate,
-                            dtype):
-        """Computes new thresholds with the CMA-MAE batch threshold update rule.
-
-        If entries in `indices` are duplicated, they receive the same threshold.
-        """
-        if len(indices) == 0:
-            return np.array([], dtype=dtype)
-
-        # Compute the number of objectives inserted into each cell. Note that we
-        # index with `indices` to place the counts at all relevant indices. For
-        # instance, if we had an array [1,2,3,1,5], we would end up with
-        # [2,1,1,2,1] (there are 2 1's, 1 2, 1 3, 2 1's, and 1 5).
-        #
-        # All objective_sizes should be > 0 since we only retrieve counts for
-        # indices in `indices`.
-        objective_sizes = aggregate(indices, 1, func="len",
-                                    fill_value=0)[indices]
-
-        # Compute the sum of the objectives inserted into each cell -- again, we
-        # index with `indices`.
-        objective_sums = aggregate(indices,
-                                   objective,
-                                   func="sum",
-                                   fill_value=np.nan)[indices]
-
-        # Update the threshold with the batch update rule from Fontaine 2023
-        # (https://arxiv.org/abs/2205.10752).
-        #
-        # Unlike in single_entry_with_threshold, we do not need to worry about
-        # cur_threshold having -np.inf here as a result of threshold_min being
-        # -np.inf. This is because the case with threshold_min = -np.inf is
-        # handled separately since we compute the new threshold based on the max
-        # objective in each cell in that case.
-        ratio = dtype(1.0 - learning_rate)**objective_sizes
-        new_threshold = (ratio * cur_threshold +
-                         (objective_sums / objective_sizes) * (1 - ratio))
-
-        return new_threshold
-
     def add(self, solution, objective, measures, **fields):
         """Inserts a batch of solutions into the archive.
 
@@ -588,97 +687,46 @@ class GridArchive(ArchiveBase):
 
         # Retrieve indices of the archive cells.
         indices = self.index_of(data["measures"])
-        batch_size = len(indices)
-
-        # Retrieve current data and thresholds. Unoccupied cells default to
-        # threshold_min.
-        cur_occupied, cur_data = self._store.retrieve(indices)
-        cur_threshold = cur_data["threshold"]
-        cur_threshold[~cur_occupied] = self.threshold_min
-
-        # Compute status -- arrays below are all boolean arrays of length
-        # batch_size.
-        #
-        # When we want CMA-ME behavior, the threshold defaults to -inf for new
-        # cells, which satisfies the condition for can_insert.
-        can_insert = data["objective"] > cur_threshold
-        is_new = can_insert & ~cur_occupied
-        improve_existing = can_insert & cur_occupied
-        add_info["status"] = np.zeros(batch_size, dtype=np.int32)
-        add_info["status"][is_new] = 2
-        add_info["status"][improve_existing] = 1
-
-        # If threshold_min is -inf, then we want CMA-ME behavior, which computes
-        # the improvement value of new solutions w.r.t zero. Otherwise, we
-        # compute improvement with respect to threshold_min.
-        cur_threshold[is_new] = (self.dtypes["threshold"](0.0)
-                                 if self.threshold_min == -np.inf else
-                                 self.threshold_min)
-        add_info["value"] = data["objective"] - cur_threshold
-
-        # Return early if we cannot insert anything -- continuing throws a
-        # ValueError in aggregate() since index[can_insert] would be empty.
-        if not np.any(can_insert):
-            return add_info
 
-        # Select all solutions that _can_ be inserted -- at this point, there
-        # are still conflicts in the insertions, e.g., multiple solutions can
-        # map to index 0.
-        indices = indices[can_insert]
-        data = {name: arr[can_insert] for name, arr in data.items()}
-        cur_threshold = cur_threshold[can_insert]
-
-        # Compute the new threshold associated with each entry.
-        if self.threshold_min == -np.inf:
-            # Regular archive behavior: thresholds are just the objectives.
-            new_threshold = data["objective"]
-        else:
-            # Batch threshold update described in Fontaine 2023
-            # (https://arxiv.org/abs/2205.10752). This computation is based on
-            # the mean objective of all solutions in the batch that could have
-            # been inserted into each cell.
-            new_threshold = self._compute_thresholds(indices, data["objective"],
-                                                     cur_threshold,
-                                                     self.learning_rate,
-                                                     self.dtypes["threshold"])
-
-        # Retrieve indices of solutions that _should_ be inserted into the
-        # archive. Currently, multiple solutions may be inserted at each archive
-        # index, but we only want to insert the maximum among these solutions.
-        # Thus, we obtain the argmax for each archive index.
-        #
-        # We use a fill_value of -1 to indicate archive indices that were not
-        # covered in the batch. Note that the length of archive_argmax is only
-        # max(indices), rather than the total number of grid cells. However,
-        # this is okay because we only need the indices of the solutions, which
-        # we store in should_insert.
-        #
-        # aggregate() always chooses the first item if there are ties, so the
-        # first elite will be inserted if there is a tie. See their default
-        # numpy implementation for more info:
-        # https://github.com/ml31415/numpy-groupies/blob/master/numpy_groupies/aggregate_numpy.py#L107
-        archive_argmax = aggregate(indices,
-                                   data["objective"],
-                                   func="argmax",
-                                   fill_value=-1)
-        should_insert = archive_argmax[archive_argmax != -1]
+        # Retrieve current thresholds and objectives.
+        cur_occupied, (cur_threshold, cur_objective) = self._store.retrieve(
+            indices, ["threshold", "objective"], return_type="tuple")
+
+        # Compute the status and value of each solution, as well as which
+        # solutions to insert and their new thresholds. When we want CMA-ME
+        # behavior, the threshold defaults to -inf for new cells, so every
+        # solution can be inserted into a new cell, and the value of new
+        # solutions is computed w.r.t. zero. Otherwise, values are computed
+        # w.r.t. threshold_min, and thresholds follow the batch threshold update
+        # described in Fontaine 2023 (https://arxiv.org/abs/2205.10752). When
+        # multiple solutions can be inserted into the same cell, only the one
+        # with the highest objective is inserted, and the first one wins ties.
+        (status, value, should_insert, new_threshold, objective_delta,
+         best) = batch_insertion(indices, data["objective"], cur_occupied,
+                                 cur_threshold, cur_objective,
+                                 self.threshold_min, self.learning_rate)
+        add_info["status"] = status
+        add_info["value"] = value
+
+        # Return early if we cannot insert anything.
+        if len(should_insert) == 0:
+            return add_info
 
         # Select only solutions that will be inserted into the archive.
         indices = indices[should_insert]
         data = {name: arr[should_insert] for name, arr in data.items()}
-        data["threshold"] = new_threshold[should_insert]
+        data["threshold"] = new_threshold
 
-        # Insert elites into the store.
+        # Insert elites into the store. With a learning rate below 1, an elite
+        # may be replaced by one with a lower objective, so the best elite must
+        # be retrieved before its cell is overwritten.
+        self._load_best_elite(indices)
         self._store.add(indices, data)
 
         # Compute statistics.
-        cur_objective = cur_data["objective"]
-        cur_objective[~cur_occupied] = 0.0
-        cur_objective = cur_objective[can_insert][should_insert]
-        objective_sum = (self._objective_sum +
-                         np.sum(data["objective"] - cur_objective))
-        best_index = indices[np.argmax(data["objective"])]
-        self._stats_update(objective_sum, best_index)
+        objective_sum = self._objective_sum + objective_delta
+        self._stats_update(objective_sum, indices[best],
+                           data["objective"][best])
 
         return add_info
 
@@ -787,7 +835,9 @@ class GridArchive(ArchiveBase):
             data["threshold"] = [(cur_threshold * (1.0 - self.learning_rate) +
                                   objective * self.learning_rate)]
 
-            # Insert elite into the store.
+            # Insert elite into the store, retrieving the best elite first in
+            # case this overwrites it (see add()).
+            self._load_best_elite(index)
             self._store.add(index[None], {
                 name: np.expand_dims(arr, axis=0) for name, arr in data.items()
             })
@@ -796,7 +846,7 @@ class GridArchive(ArchiveBase):
             cur_objective = (cur_data["objective"][0]
                              if cur_occupied else self.dtypes["objective"](0.0))
             self._stats_update(self._objective_sum + objective - cur_objective,
-                               index)
+                               index, objective)
 
         # Value is the improvement over the current threshold (can be negative).
         add_info["value"] = objective - cur_threshold
@@ -808,6 +858,99 @@ class GridArchive(ArchiveBase):
         self._store.clear()
         self._stats_reset()
 
+    def remove(self, indices):
+        """Removes the elites at the given indices from the archive.
+
+        Emptied cells behave like cells that were never filled; in particular,
+        their CMA-MAE thresholds start over from :attr:`threshold_min`.
+
+        Args:
+            indices (array-like): Indices of elites to remove; see
+                :meth:`index_of`. Indices without an elite are ignored.
+        """
+        self._store.remove(indices)
+        self._stats_recompute()
+
+    def checkpoint(self, path, compact=False):
+        """Persists the archive to a delta log in the directory ``path``.
+
+        See :meth:`ArchiveBase.checkpoint
+        <ribs.archives.ArchiveBase.checkpoint>` for more info.
+        """
+        path = os.fspath(path)
+        if self._store.log_dir != path:
+            self._store.start_log(path)
+        elif compact:
+            self._store.compact_log()
+        else:
+            self._store.sync_log()
+
+    def restore(self, path):
+        """Restores the elites in the archive from a log written by
+        :meth:`checkpoint`.
+
+        See :meth:`ArchiveBase.restore
+        <ribs.archives.ArchiveBase.restore>` for more info. Note that the
+        restored elites are held in private memory even if the archive was
+        created with ``memmap_dir`` or ``shared_memory``; in the latter case,
+        the shared memory is released.
+
+        Args:
+            path (str or pathlib.Path): Directory of the log.
+        Raises:
+            ValueError: The fields of the elites in the log do not match the
+                fields of this archive.
+            ValueError: The capacity of the archive in the log is not the
+                number of cells in this archive.
+        """
+        if self._sparse:
+            store = SparseArrayStore.load_log(path,
+                                              self.cells,
+                                              resume=True,
+                                              field_desc=self._store.field_desc)
+        else:
+            store = ArrayStore.load_log(path,
+                                        resume=True,
+                                        field_desc=self._store.field_desc)
+        if (store.field_desc != self._store.field_desc or
+                store.capacity != self.cells):
+            store.close_log()
+            raise ValueError(
+                f"The archive in {os.fspath(path)} has fields "
+                f"{store.field_desc} and capacity {store.capacity}, which "
+                "do not match the fields "
+                f"{self._store.field_desc} and number of cells "
+                f"{self.cells} of this archive.")
+
+        self._store.close_log()
+        self._store.release_shared_memory()
+        self._store = store
+        self._stats_recompute()
+
+    def release_shared_memory(self):
+        """Moves the elites out of shared memory.
+
+        :class:`~ribs.archives.ArchiveView` instances of this archive can no
+        longer read it afterwards. Does nothing if the archive was not created
+        with ``shared_memory=True``.
+        """
+        self._store.release_shared_memory()
+
+    @classmethod
+    def from_records(cls, records, **kwargs):
+        """Creates an archive holding the elites in a structured array.
+
+        See :meth:`ArchiveBase.from_records
+        <ribs.archives.ArchiveBase.from_records>` for more info.
+        """
+        # pylint: disable = protected-access
+        archive = cls(**kwargs)
+        indices = (records["index"] if "index" in (records.dtype.names or ())
+                   else archive.index_of(records["measures"]))
+        load_records(archive._store, records, indices)
+        archive._stats_recompute()
+        return archive
+
     ## Methods for reading from the archive ##
     ## Refer to ArchiveBase for documentation of these methods. ##
 
@@ -830,67 +973,160 @@ class GridArchive(ArchiveBase):
 
         return occupied[0], {field: arr[0] for field, arr in data.items()}
 
-    def data(self, fields=None, return_type="dict"):
-        return self._store.data(fields, return_type)
+    def data(self, fields=None, return_type="dict", copy=True, out=None):
+        return self._store.data(fields, return_type, copy, out)
+
+    def write_arrow(self,
+                    path,
+                    fields=None,
+                    file_format="parquet",
+                    chunk_size=100_000):
+        self._store.write_arrow(path, fields, file_format, chunk_size)
+
+    def to_records(self, fields=None):
+        return self._store.to_records(fields)
 
-    def sample_elites(self, n):
+    def iter_batches(self, batch_size, fields=None):
+        return self._store.iter_batches(batch_size, fields)
+
+    def changes_since(self, token, fields=None):
+        indices, token = self._store.changes_since(token)
+        if indices is None or fields is None:
+            return indices, token
+        return self._store.retrieve(indices, fields)[1], token
+
+    def sample_elites(self, n, fields=None, out=None):
         if self.empty:
             raise IndexError("No elements in archive.")
 
         random_indices = self._rng.integers(len(self._store), size=n)
         selected_indices = self._store.occupied_list[random_indices]
-        _, elites = self._store.retrieve(selected_indices)
+        _, elites = self._store.retrieve(selected_indices, fields, out=out)
         return elites
 
+    def snapshot(self):
+        return snapshot_archive(self)
+
     ## retessellate ##
 
-    def retessellate(self, new_dims):
+    def retessellate(self, new_dims, threshold_transfer=None):
         """Updates the resolution of this archive to the given dimensions.
 
-        Upon resizing the archive, this method re-inserts the solutions that are
-        currently contained in the archive. Note that if the new grid resolution
-        is smaller than the old grid resolution, some solutions may be dropped,
-        as solutions originally from different cells may now land in the same
-        cell, and only the highest-objective elite in each cell is retained.
-
-        Also note that the current implementation does not support archive
-        thresholds from CMA-MAE, i.e., the learning rate must be 1. The
-        thresholds within each cell should correspond to how well the measure
-        space within that cell has been explored, and thereby should correspond
-        to the measure space volume within that cell. It is an open research
-        problem as to how the new thresholds should be determined after
-        retessellating.
+        Upon resizing the archive, this method moves the elites that are
+        currently contained in the archive into the cells of the new grid. The
+        new cell of each elite is computed from its stored measures, and the
+        elites are moved in one pass without going through :meth:`add`. Note
+        that if the new grid resolution is smaller than the old grid resolution,
+        some solutions may be dropped, as solutions originally from different
+        cells may now land in the same cell, and only the highest-objective
+        elite in each cell is retained.
+
+        Archives with thresholds from CMA-MAE, i.e., with a learning rate other
+        than 1, can only be retessellated with an explicit
+        ``threshold_transfer`` policy. The thresholds within each cell should
+        correspond to how well the measure space within that cell has been
+        explored, and thereby should correspond to the measure space volume
+        within that cell. It is an open research problem as to how the new
+        thresholds should be determined after retessellating, so the following
+        policies are provided:
+
+        - ``"winner"``: Each occupied cell takes the threshold of the elite that
+          is retained in it.
+        - ``"max"``, ``"min"``, ``"mean"``: Each occupied cell takes the
+          maximum, minimum, or mean of the thresholds of all the elites that
+          land in it.
+        - ``"reset"``: The thresholds of all cells start over from
+          :attr:`threshold_min`.
+
+        Cells that do not receive an elite always start from
+        :attr:`threshold_min`. With a learning rate of 1, thresholds equal the
+        objectives of the elites, so ``None`` behaves like ``"winner"``.
+
+        If the archive was created with ``shared_memory=True``, the elites are
+        moved to new shared memory with a new :attr:`shm_name`, and existing
+        :class:`~ribs.archives.ArchiveView` instances can no longer read the
+        archive.
 
         Args:
             new_dims (array-like of int):  Number of cells in each dimension of
                 the measure space, e.g., ``[20, 30, 40]`` indicates there should
                 be 3 dimensions with 20, 30, and 40 cells. The format is
                 identical to the ``dims`` argument in ``__init__``.
+            threshold_transfer (str): Policy for computing the thresholds of
+                the new cells, as described above. None is only allowed when
+                the learning rate is 1.
 
         Raises:
             ValueError: Attempted to retessellate an archive with learning rate
-                not equal to 1.
+                not equal to 1 without a ``threshold_transfer`` policy.
+            ValueError: ``threshold_transfer`` is not one of the policies
+                above.
             ValueError: The measure space dimensionality in ``new_dims`` does
                 not match the current measure space dimensionality.
+            ValueError: ``new_dims`` has more cells than a dense archive can
+                index.
         """
-        if not np.isclose(self.learning_rate, 1):
-            raise ValueError("Cannot retessellate an archive with "
-                             "learning rate not equal to 1.")
+        if threshold_transfer is None:
+            if not np.isclose(self.learning_rate, 1):
+                raise ValueError(
+                    "Cannot retessellate an archive with learning rate not "
+                    "equal to 1 unless threshold_transfer is passed.")
+            threshold_transfer = "winner"
+        if threshold_transfer not in {"winner", "max", "min", "mean", "reset"}:
+            raise ValueError(
+                "threshold_transfer must be one of 'winner', 'max', 'min', "
+                f"'mean', or 'reset', but got {threshold_transfer!r}.")
         if len(new_dims) != self.measure_dim:
             raise ValueError(
                 "The measure space dimensionality indicated in `new_dims` "
                 f"is {len(new_dims)}, but this archive has a measure space "
                 f"dimensionality of {self.measure_dim}.")
+        self._check_cells(new_dims)
 
         cur_data = self.data()
-        del cur_data['index']
-        # Note: No need to clear the store since we just replace it below.
+        del cur_data["index"]
+
+        # The store is replaced below, but clearing it first allows a memmap
+        # store to be recreated in the same directory with the new capacity.
+        self.clear()
+        log_dir = self._store.log_dir
+        self._store.close_log()
 
         self._dims = np.array(new_dims, dtype=np.int32)
         self._boundaries = self._compute_boundaries(self._dims,
                                                     self._lower_bounds,
                                                     self._upper_bounds)
-        self._store = ArrayStore(self._store.field_desc,
-                                 capacity=np.prod(self._dims))
-
-        self.add(**cur_data)
+        # Views of a shared memory archive cannot follow the archive to the new
+        # store, since they would index it with the old dims.
+        shared_memory = self._store.shm_name is not None
+        self._store.release_shared_memory()
+        self._store = self._create_store(self._store.field_desc,
+                                         self._store.memmap_dir, shared_memory)
+        if log_dir is not None:
+            # The layout of the store changed, so the log starts over with a
+            # new snapshot.
+            self._store.start_log(log_dir)
+
+        if len(cur_data["objective"]) > 0:
+            # Group the elites by their new cell and keep the best elite in
+            # each group.
+            new_indices, groups = np.unique(self.index_of(cur_data["measures"]),
+                                            return_inverse=True)
+            best = aggregate(groups, cur_data["objective"], func="argmax")
+
+            if threshold_transfer == "winner":
+                threshold = cur_data["threshold"][best]
+            elif threshold_transfer == "reset":
+                threshold = np.full(len(best),
+                                    self._threshold_min,
+                                    dtype=self.dtypes["threshold"])
+            else:
+                threshold = aggregate(groups,
+                                      cur_data["threshold"],
+                                      func=threshold_transfer).astype(
+                                          self.dtypes["threshold"])
+
+            new_data = {name: arr[best] for name, arr in cur_data.items()}
+            new_data["threshold"] = threshold
+            self._store.add(new_indices, new_data)
+        self._stats_recompute()
@@ -0,0 +1,734 @@
+"""Contains the HierarchicalGridArchive."""
+import copy
+
+import numpy as np
+from numpy_groupies import aggregate_nb as aggregate
+
+from ribs._utils import readonly
+from ribs.archives._archive_stats import ArchiveStats
+from ribs.archives._array_store import ArrayStore
+from ribs.archives._grid_archive import GridArchive
+from ribs.archives._utils import load_records
+
+
+class _LevelStore:
+    # The `copy` parameter of the reading methods matches the ArrayStore.
+    # pylint: disable = redefined-outer-name
+    """Read-only store holding the best elite in each cell of one resolution of
+    a :class:`HierarchicalGridArchive`.
+
+    The store does not hold any data itself. Instead, each cell is mapped to
+    the index of its best elite in the store of :attr:`~HierarchicalGridArchive.
+    finest`, and the data are read from there. This store provides the methods
+    for reading entries that :class:`GridArchive` uses with its store, so that
+    the HierarchicalGridArchive can present the active resolution as a regular
+    GridArchive. Unlike in the :class:`~ribs.archives.ArrayStore`, retrieved
+    data are always copies.
+
+    Args:
+        archive (HierarchicalGridArchive): The archive holding the resolution.
+        level (int): Index of the resolution in the archive's resolutions.
+    """
+
+    def __init__(self, archive, level):
+        self._archive = archive
+        self._level = level
+
+    @property
+    def _finest_store(self):
+        """The store of the finest archive, which may be replaced, e.g., when
+        the archive is restored."""
+        # pylint: disable = protected-access
+        return self._archive._finest._store
+
+    @property
+    def _elite(self):
+        """Index in the finest store of the best elite in each cell (-1 in empty
+        cells), or None if this is the finest resolution."""
+        # pylint: disable = protected-access
+        if self._level == self._archive._finest_level:
+            return None
+        return self._archive._level_elite[self._level]
+
+    def __len__(self):
+        """Number of occupied cells."""
+        # pylint: disable = protected-access
+        if self._elite is None:
+            return len(self._finest_store)
+        return int(self._archive._level_num_elites[self._level])
+
+    def __iter__(self):
+        """Iterates over entries in the store.
+
+        See :meth:`ArrayStore.__iter__ <ribs.archives.ArrayStore.__iter__>`.
+        """
+        for batch in self.iter_batches(1024):
+            for i in range(len(batch["index"])):
+                yield {name: arr[i] for name, arr in batch.items()}
+
+    @property
+    def capacity(self):
+        """int: Number of cells at this resolution."""
+        # pylint: disable = protected-access
+        return self._archive._n_cells(self._archive.resolutions[self._level])
+
+    @property
+    def occupied_list(self):
+        """numpy.ndarray: int32 array listing all occupied cells."""
+        if self._elite is None:
+            return self._finest_store.occupied_list
+        return readonly(np.flatnonzero(self._elite != -1).astype(np.int32))
+
+    @property
+    def generation(self):
+        """int: The :attr:`ArrayStore.generation
+        <ribs.archives.ArrayStore.generation>` of the finest store, since every
+        change at this resolution comes from a change of the finest store."""
+        return self._finest_store.generation
+
+    @property
+    def shm_name(self):
+        """str: Name of the shared memory of the finest store, if any."""
+        return self._finest_store.shm_name
+
+    @property
+    def field_desc(self):
+        """dict: Description of fields in the store."""
+        return self._finest_store.field_desc
+
+    @property
+    def dtypes(self):
+        """dict: Data types of fields in the store."""
+        return self._finest_store.dtypes
+
+    @property
+    def dtypes_with_index(self):
+        """dict: Data types of fields in the store, plus the index."""
+        return self._finest_store.dtypes_with_index
+
+    @property
+    def field_list(self):
+        """list: List of fields in the store."""
+        return self._finest_store.field_list
+
+    @property
+    def field_list_with_index(self):
+        """list: List of fields in the store, plus the index."""
+        return self._finest_store.field_list_with_index
+
+    def retrieve(self,
+                 indices,
+                 fields=None,
+                 return_type="dict",
+                 copy=True,
+                 out=None):
+        """Collects the data of the best elites in the given cells.
+
+        See :meth:`ArrayStore.retrieve <ribs.archives.ArrayStore.retrieve>`.
+        The ``"index"`` field holds the given cells rather than the indices of
+        the elites in the finest store.
+        """
+        # pylint: disable = protected-access
+        if self._elite is None:
+            return self._finest_store.retrieve(indices, fields, return_type,
+                                               copy, out)
+        indices = np.asarray(indices, dtype=np.int32)
+        rows = self._elite[indices]  # Induces copy.
+        occupied = rows != -1
+        # Data of empty cells may be arbitrary, so any valid row will do.
+        rows[~occupied] = 0
+        return occupied, self._finest_store._gather(indices, rows, fields,
+                                                    return_type, out)
+
+    def data(self, fields=None, return_type="dict", copy=True, out=None):
+        """Retrieves data for all occupied cells.
+
+        See :meth:`ArrayStore.data <ribs.archives.ArrayStore.data>`.
+        """
+        return self.retrieve(self.occupied_list, fields, return_type, copy,
+                             out)[1]
+
+    def changes_since(self, token):
+        """Lists the cells whose elites may have changed since the given token.
+
+        See :meth:`ArrayStore.changes_since
+        <ribs.archives.ArrayStore.changes_since>`. Tokens from other
+        resolutions are treated like unknown tokens.
+        """
+        # pylint: disable = protected-access
+        if token is not None and token[1] != self._level:
+            token = None
+        fine_indices, fine_token = self._finest_store.changes_since(
+            None if token is None else token[0])
+        new_token = (fine_token, self._level)
+        if fine_indices is None or self._elite is None:
+            return fine_indices, new_token
+        return (np.unique(
+            self._archive._fine_to_level(fine_indices, self._level)), new_token)
+
+    def iter_batches(self, batch_size, fields=None):
+        """Iterates over entries in the store in batches.
+
+        See :meth:`ArrayStore.iter_batches
+        <ribs.archives.ArrayStore.iter_batches>`.
+        """
+        return ArrayStore.iter_batches(self, batch_size, fields)
+
+    def write_arrow(self,
+                    path,
+                    fields=None,
+                    file_format="parquet",
+                    chunk_size=100_000):
+        """Writes all entries in the store to a Parquet or Feather file.
+
+        See :meth:`ArrayStore.write_arrow
+        <ribs.archives.ArrayStore.write_arrow>`.
+        """
+        ArrayStore.write_arrow(self, path, fields, file_format, chunk_size)
+
+    def to_records(self, fields=None, chunk_size=100_000):
+        """Copies all entries in the store into a NumPy structured array.
+
+        See :meth:`ArrayStore.to_records
+        <ribs.archives.ArrayStore.to_records>`.
+        """
+        return ArrayStore.to_records(self, fields, chunk_size)
+
+    def release_shared_memory(self):
+        """Releases the shared memory of the finest store, if any."""
+        self._finest_store.release_shared_memory()
+
+
+class HierarchicalGridArchive(GridArchive):
+    """A :class:`GridArchive` that tracks its elites at several nested
+    resolutions of the same grid.
+
+    This archive is intended for algorithms that refine the resolution of their
+    archive over time, such as BOP-Elites (see
+    :class:`~ribs.schedulers.BayesianOptimizationScheduler`). All elites are
+    stored once in an archive at the finest resolution, which is available as
+    :attr:`finest`. The finest resolution is the elementwise least common
+    multiple of the resolutions, so that each cell of every resolution covers a
+    block of finest cells. For each resolution, the archive keeps the index in
+    :attr:`finest` of the best elite in each of its cells, along with the number
+    of elites and the sum of their objectives. These levels are maintained
+    incrementally with max-reductions over the cells that change in the finest
+    archive, so that :meth:`level_stats` and :meth:`level_elites` are cheap for
+    every resolution.
+
+    One of the resolutions is *active*; this is the resolution at which the
+    archive behaves like a regular :class:`GridArchive`, e.g., in :meth:`add`,
+    :meth:`retrieve`, :meth:`data`, and :attr:`stats`. Solutions are only
+    inserted into :attr:`finest`, and the elites of the active resolution are
+    read from :attr:`finest` through the indices of the best elites of its
+    cells, so they are never copied. Initially, the coarsest resolution is
+    active. Calling :meth:`retessellate` with another one of the resolutions
+    makes that resolution active without moving any elites.
+
+    Since the levels are computed with max-reductions, the archive is elitist,
+    i.e., it does not support the thresholds of CMA-MAE.
+
+    Args:
+        solution_dim (int): Dimension of the solution space.
+        resolutions (array-like of int): (n_levels, measure_dim) array where
+            each row is the number of cells in each dimension at one resolution,
+            e.g., ``[[5, 5], [10, 10], [25, 25]]``. Resolutions must be listed
+            from coarsest to finest, i.e., the number of cells in each
+            dimension may not decrease from one resolution to the next. The
+            resolutions need not divide each other; :attr:`finest` has the
+            least common multiple of the resolutions in each dimension, e.g.,
+            ``[50, 50]`` in the example above.
+        ranges (array-like of (float, float)): Upper and lower bound of each
+            dimension of the measure space, e.g. ``[(-1, 1), (-2, 2)]``
+            indicates the first dimension should have bounds :math:`[-1,1]`
+            (inclusive), and the second dimension should have bounds
+            :math:`[-2,2]` (inclusive). ``ranges`` should be the same length as
+            each row of ``resolutions``.
+        epsilon (float): Due to floating point precision errors, we add a small
+            epsilon when computing the archive indices in the :meth:`index_of`
+            method -- refer to the implementation `here
+            <../_modules/ribs/archives/_grid_archive.html#GridArchive.index_of>`_.
+            Pass this parameter to configure that epsilon.
+        qd_score_offset (float): Archives often contain negative objective
+            values, and if the QD score were to be computed with these negative
+            objectives, the algorithm would be penalized for adding new cells
+            with negative objectives. Thus, a standard practice is to normalize
+            all the objectives so that they are non-negative by introducing an
+            offset. This QD score offset will be *subtracted* from all
+            objectives in the archive, e.g., if your objectives go as low as
+            -300, pass in -300 so that each objective will be transformed as
+            ``objective - (-300)``.
+        seed (int): Value to seed the random number generator. Set to None to
+            avoid a fixed seed.
+        dtype (str or data-type or dict): Data type of the solutions,
+            objectives, and measures. See :class:`GridArchive` for more info.
+        extra_fields (dict): Description of extra fields of data that is stored
+            next to elite data like solutions and objectives. See
+            :class:`GridArchive` for more info.
+    Raises:
+        ValueError: ``resolutions`` is not a non-empty 2D array, or its
+            resolutions are not positive and ordered as described above.
+    """
+
+    def __init__(
+        self,
+        *,
+        solution_dim,
+        resolutions,
+        ranges,
+        epsilon=1e-6,
+        qd_score_offset=0.0,
+        seed=None,
+        dtype=np.float64,
+        extra_fields=None,
+    ):
+        self._resolutions = np.array(resolutions, dtype=np.int32)
+        if self._resolutions.ndim != 2 or len(self._resolutions) == 0:
+            raise ValueError("resolutions must be a non-empty 2D array of "
+                             "shape (n_levels, measure_dim), but it has shape "
+                             f"{self._resolutions.shape}.")
+        if (np.any(self._resolutions < 1) or
+                np.any(np.diff(self._resolutions, axis=0) < 0)):
+            raise ValueError(
+                "resolutions must be positive and ordered from coarsest to "
+                f"finest, but got {self._resolutions.tolist()}.")
+
+        self._finest = GridArchive(
+            solution_dim=solution_dim,
+            dims=np.lcm.reduce(self._resolutions, axis=0),
+            ranges=ranges,
+            epsilon=epsilon,
+            qd_score_offset=qd_score_offset,
+            dtype=dtype,
+            extra_fields=extra_fields,
+        )
+        # Level of the finest resolution. If the last resolution is not the
+        # finest one, the finest resolution is not one of the levels and every
+        # resolution gets its own level.
+        if np.array_equal(self._resolutions[-1], self._finest.dims):
+            self._finest_level = len(self._resolutions) - 1
+        else:
+            self._finest_level = len(self._resolutions)
+        self._level = 0
+
+        # For each resolution below the finest level, the objective and the
+        # index in the finest archive of the best elite in each cell (-inf and
+        # -1 in empty cells), as well as the number of occupied cells and the
+        # sum of their objectives.
+        self._level_objective = None
+        self._level_elite = None
+        self._level_num_elites = None
+        self._level_objective_sum = None
+        self._finest_token = None
+        self._levels_rebuild()
+
+        # The store of the archive is a _LevelStore of the active resolution;
+        # see _create_store().
+        GridArchive.__init__(
+            self,
+            solution_dim=solution_dim,
+            dims=self._resolutions[0],
+            ranges=ranges,
+            epsilon=epsilon,
+            qd_score_offset=qd_score_offset,
+            seed=seed,
+            dtype=dtype,
+            extra_fields=extra_fields,
+        )
+
+    ## Properties inherited from GridArchive ##
+
+    @property
+    def stats(self):
+        return self.level_stats(self._dims)
+
+    @property
+    def best_elite(self):
+        """dict: The elite with the highest objective in the archive.
+
+        None if there are no elites in the archive. See
+        :attr:`GridArchive.best_elite` for more info.
+        """
+        best_elite = self._finest.best_elite
+        if best_elite is None or self._level == self._finest_level:
+            return best_elite
+        # The best elite may tie with the elite that is kept in its cell at the
+        # active resolution, so the data are read from that cell.
+        _, data = self._store.retrieve(
+            self._fine_to_level([best_elite["index"]], self._level))
+        return {name: arr[0] for name, arr in data.items()}
+
+    ## Properties that are not in GridArchive ##
+
+    @property
+    def resolutions(self):
+        """(n_levels, measure_dim) numpy.ndarray: The resolutions of the
+        archive, from coarsest to finest."""
+        return self._resolutions
+
+    @property
+    def finest(self):
+        """GridArchive: The archive holding all the elites at the finest
+        resolution.
+
+        This archive should be treated as read-only; elites should be added
+        through the :class:`HierarchicalGridArchive` instead so that its other
+        resolutions stay up to date.
+        """
+        return self._finest
+
+    ## Utilities ##
+
+    def _find_level(self, dims):
+        """Returns the level of the resolution ``dims``."""
+        dims = np.asarray(dims)
+        if dims.shape != (self.measure_dim,):
+            raise ValueError(
+                f"dims must have shape ({self.measure_dim},), but it has shape "
+                f"{dims.shape}.")
+        levels = np.flatnonzero(np.all(self._resolutions == dims, axis=1))
+        if len(levels) == 0:
+            raise ValueError(
+                f"dims {dims.tolist()} is not one of the resolutions of this "
+                f"archive: {self._resolutions.tolist()}")
+        # Repeated resolutions are identical, so the last one is used to avoid
+        # keeping a level for the finest resolution.
+        return levels[-1]
+
+    def _fine_to_level(self, fine_indices, level):
+        """Maps indices of cells at the finest resolution to the indices of the
+        cells that cover them at the given level."""
+        factors = self._finest.dims // self._resolutions[level]
+        fine_grid = np.unravel_index(fine_indices, self._finest.dims)
+        return np.asarray(
+            np.ravel_multi_index(
+                tuple(g // f for g, f in zip(fine_grid, factors)),
+                self._resolutions[level],
+            ),
+            dtype=np.int32,
+        )
+
+    def _levels_rebuild(self):
+        """Recomputes the coarser levels from all elites in the finest
+        archive."""
+        fine_index, objective = self._finest.data(["index", "objective"],
+                                                  return_type="tuple")
+        objective_dtype = self._finest.dtypes["objective"]
+
+        self._level_objective = []
+        self._level_elite = []
+        self._level_num_elites = np.zeros(self._finest_level, dtype=np.int64)
+        self._level_objective_sum = np.zeros(self._finest_level,
+                                             dtype=np.float64)
+        for level in range(self._finest_level):
+            cells = self._n_cells(self._resolutions[level])
+            level_objective = np.full(cells, -np.inf, dtype=objective_dtype)
+            level_elite = np.full(cells, -1, dtype=np.int32)
+
+            if len(fine_index) > 0:
+                # Position in the finest archive's data of the best elite in
+                # each cell, or -1 for empty cells.
+                best = aggregate(self._fine_to_level(fine_index, level),
+                                 objective,
+                                 func="argmax",
+                                 fill_value=-1,
+                                 size=cells)
+                occupied = best != -1
+                level_objective[occupied] = objective[best[occupied]]
+                level_elite[occupied] = fine_index[best[occupied]]
+                self._level_num_elites[level] = np.count_nonzero(occupied)
+                self._level_objective_sum[level] = np.sum(
+                    level_objective[occupied], dtype=np.float64)
+
+            self._level_objective.append(level_objective)
+            self._level_elite.append(level_elite)
+
+        _, self._finest_token = self._finest.changes_since(None)
+
+    def _levels_update(self):
+        """Updates the coarser levels with the cells that changed in the finest
+        archive since the last update."""
+        changes, self._finest_token = self._finest.changes_since(
+            self._finest_token, ["index", "objective"])
+        if changes is None:
+            self._levels_rebuild()
+            return
+
+        fine_index, objective = changes["index"], changes["objective"]
+        if len(fine_index) == 0:
+            return
+
+        for level in range(self._finest_level):
+            indices = self._fine_to_level(fine_index, level)
+
+            # Since the archive is elitist, objectives in the finest archive
+            # only increase, so the best elite of a cell only changes if the
+            # best of the changed cells that it covers beats it.
+            order = np.lexsort((-objective, indices))
+            cells, first = np.unique(indices[order], return_index=True)
+            candidates = order[first]
+            cur_objective = self._level_objective[level][cells]
+            improved = objective[candidates] > cur_objective
+            cells = cells[improved]
+            candidates = candidates[improved]
+            cur_objective = cur_objective[improved]
+
+            was_occupied = cur_objective != -np.inf
+            self._level_num_elites[level] += np.count_nonzero(~was_occupied)
+            self._level_objective_sum[level] += (
+                np.sum(objective[candidates], dtype=np.float64) -
+                np.sum(cur_objective[was_occupied], dtype=np.float64))
+            self._level_objective[level][cells] = objective[candidates]
+            self._level_elite[level][cells] = fine_index[candidates]
+
+    def _active_add_info(self, measures, objective):
+        """Computes the add_info of solutions at the active resolution from the
+        objectives of the best elites of their cells before the solutions are
+        added.
+
+        Must be called after the solutions are added to the finest archive but
+        before :meth:`_levels_update`.
+        """
+        indices = self.index_of(measures)
+        objective = np.asarray(objective, dtype=self.dtypes["objective"])
+        cur_objective = self._level_objective[self._level][indices]
+        is_new = cur_objective == -np.inf
+        status = np.where(objective > cur_objective, np.where(is_new, 2, 1),
+                          0).astype(np.int32)
+        value = objective - np.where(is_new, 0, cur_objective).astype(
+            objective.dtype)
+        return {"status": status, "value": value}
+
+    def _activate(self, level):
+        """Makes the given level active.
+
+        This only replaces the store of the archive with a view of the level, so
+        it takes constant time regardless of the number of elites.
+        """
+        self._level = level
+        self._dims = np.array(self._resolutions[level], dtype=np.int32)
+        self._boundaries = self._compute_boundaries(self._dims,
+                                                    self._lower_bounds,
+                                                    self._upper_bounds)
+        self._store = _LevelStore(self, level)
+
+    def _create_store(self, field_desc, memmap_dir, shared_memory):
+        """Creates a view of the active level in place of a store, since all
+        elites are stored in :attr:`finest`."""
+        del field_desc, memmap_dir, shared_memory
+        return _LevelStore(self, self._level)
+
+    ## Methods that are not in GridArchive ##
+
+    def level_stats(self, dims):
+        """Computes the stats of the archive at the given resolution.
+
+        These are the stats that the archive would have in :attr:`stats` if
+        ``dims`` were the active resolution. They are computed in constant time
+        from the counters of the level, except at the finest resolution, where
+        they are the stats of :attr:`finest`.
+
+        Args:
+            dims (array-like of int): One of the :attr:`resolutions`.
+        Returns:
+            ArchiveStats: The stats at the given resolution.
+        Raises:
+            ValueError: ``dims`` is not one of the :attr:`resolutions`.
+        """
+        level = self._find_level(dims)
+        if level == self._finest_level:
+            return self._finest.stats
+
+        num_elites = int(self._level_num_elites[level])
+        objective_dtype = self.dtypes["objective"]
+        cells = self._n_cells(self._resolutions[level])
+        if num_elites == 0:
+            return ArchiveStats(
+                num_elites=0,
+                coverage=objective_dtype(0.0),
+                qd_score=objective_dtype(0.0),
+                norm_qd_score=objective_dtype(0.0),
+                obj_max=None,
+                obj_mean=None,
+            )
+
+        objective_sum = self._level_objective_sum[level]
+        qd_score = (objective_sum -
+                    num_elites * np.float64(self._qd_score_offset))
+        return ArchiveStats(
+            num_elites=num_elites,
+            coverage=objective_dtype(num_elites / cells),
+            qd_score=objective_dtype(qd_score),
+            norm_qd_score=objective_dtype(qd_score / cells),
+            # The best elite of the coarsest cell holding it is the best elite
+            # overall.
+            obj_max=self._finest.stats.obj_max,
+            obj_mean=objective_dtype(objective_sum / num_elites),
+        )
+
+    def level_elites(self, dims, fields=None):
+        """Retrieves the best elite in each occupied cell at the given
+        resolution.
+
+        Args:
+            dims (array-like of int): One of the :attr:`resolutions`.
+            fields (array-like of str): List of fields to include, as in
+                :meth:`data`. By default, all fields are included.
+        Returns:
+            dict: Data of the elites, like the data returned by :meth:`data`
+            with ``return_type="dict"``. The ``"index"`` field holds the
+            indices of the cells at the given resolution rather than at the
+            finest resolution.
+        Raises:
+            ValueError: ``dims`` is not one of the :attr:`resolutions`.
+        """
+        return _LevelStore(self, self._find_level(dims)).data(fields)
+
+    ## Methods inherited from GridArchive ##
+
+    def index_of(self, measures):
+        """Returns the indices of the cells of the active resolution that hold
+        the given batch of measures.
+
+        The indices are computed at the finest resolution and then mapped to the
+        active resolution, so that they always agree with the cells of the
+        elites in :attr:`finest`. See :meth:`GridArchive.index_of` for more
+        info.
+        """
+        return self._fine_to_level(self._finest.index_of(measures),
+                                   self._level).astype(np.int64)
+
+    ## Methods for writing to the archive ##
+
+    def add(self, solution, objective, measures, **fields):
+        """Inserts a batch of solutions into the archive.
+
+        The solutions are only inserted into :attr:`finest`. The coarser levels
+        are then updated from the cells that changed in :attr:`finest`. See
+        :meth:`GridArchive.add` for more info; the returned ``add_info`` refers
+        to the active resolution.
+        """
+        if self._level == self._finest_level:
+            add_info = self._finest.add(solution, objective, measures, **fields)
+        else:
+            self._finest.add(solution, objective, measures, **fields)
+            add_info = self._active_add_info(measures, objective)
+        self._levels_update()
+        return add_info
+
+    def add_single(self, solution, objective, measures, **fields):
+        """Inserts a single solution into the archive.
+
+        See :meth:`add` for more info.
+        """
+        if self._level == self._finest_level:
+            add_info = self._finest.add_single(solution, objective, measures,
+                                               **fields)
+        else:
+            self._finest.add_single(solution, objective, measures, **fields)
+            add_info = self._active_add_info(
+                np.asarray(measures)[None],
+                np.asarray(objective)[None])
+            add_info = {name: arr[0] for name, arr in add_info.items()}
+        self._levels_update()
+        return add_info
+
+    def clear(self):
+        """Removes all elites in the archive at all resolutions."""
+        self._finest.clear()
+        self._levels_rebuild()
+
+    def remove(self, indices):
+        """Removes the elites in the given cells of the active resolution.
+
+        All the elites in :attr:`finest` that lie in these cells are removed
+        too.
+
+        Args:
+            indices (array-like): Indices of cells at the active resolution;
+                see :meth:`index_of`. Indices without an elite are ignored.
+        """
+        fine_index = self._finest.data("index")
+        self._finest.remove(fine_index[np.isin(
+            self._fine_to_level(fine_index, self._level), indices)])
+        self._levels_rebuild()
+
+    def checkpoint(self, path, compact=False):
+        """Persists the elites in :attr:`finest` to a delta log in the directory
+        ``path``.
+
+        The other resolutions are derived from these elites when the archive is
+        restored. See :meth:`ArchiveBase.checkpoint
+        <ribs.archives.ArchiveBase.checkpoint>` for more info.
+        """
+        self._finest.checkpoint(path, compact)
+
+    def restore(self, path):
+        """Restores the elites in :attr:`finest` from a log written by
+        :meth:`checkpoint` and rebuilds the other resolutions from them.
+
+        See :meth:`GridArchive.restore` for more info.
+        """
+        self._finest.restore(path)
+        self._levels_rebuild()
+
+    @classmethod
+    def from_records(cls, records, **kwargs):
+        """Creates an archive holding the elites in a structured array.
+
+        The elites are inserted at the finest resolution based on their
+        measures, so records of :attr:`finest`, e.g., from
+        ``archive.finest.to_records()``, restore all the elites. See
+        :meth:`ArchiveBase.from_records
+        <ribs.archives.ArchiveBase.from_records>` for more info.
+        """
+        # pylint: disable = protected-access
+        archive = cls(**kwargs)
+        load_records(archive._finest._store, records,
+                     archive._finest.index_of(records["measures"]))
+        archive._finest._stats_recompute()
+        archive._levels_rebuild()
+        return archive
+
+    ## Methods for reading from the archive ##
+
+    def snapshot(self):
+        # pylint: disable = protected-access
+        snapshot = copy.copy(self)
+        snapshot._rng = copy.deepcopy(self._rng)
+        snapshot._finest = self._finest.snapshot()
+        snapshot._level_objective = [
+            np.copy(arr) for arr in self._level_objective
+        ]
+        snapshot._level_elite = [np.copy(arr) for arr in self._level_elite]
+        snapshot._level_num_elites = np.copy(self._level_num_elites)
+        snapshot._level_objective_sum = np.copy(self._level_objective_sum)
+        snapshot._store = _LevelStore(snapshot, self._level)
+        return snapshot
+
+    ## retessellate ##
+
+    def retessellate(self, new_dims, threshold_transfer=None):
+        """Makes one of the :attr:`resolutions` the active resolution.
+
+        Unlike :meth:`GridArchive.retessellate`, the elites are not moved
+        between cells. Instead, the archive starts reading the best elite of
+        each cell at the new resolution, which is already known from the levels
+        of the archive, so this takes constant time. Since all elites are kept
+        in :attr:`finest`, switching back to a finer resolution recovers the
+        elites that were not in the coarser one.
+
+        Args:
+            new_dims (array-like of int): One of the :attr:`resolutions`.
+            threshold_transfer (str): Since the archive is elitist, each cell
+                always takes the threshold of its elite, so only None and
+                ``"winner"`` are supported.
+        Raises:
+            ValueError: ``new_dims`` is not one of the :attr:`resolutions`.
+            ValueError: ``threshold_transfer`` is not None or ``"winner"``.
+        """
+        if threshold_transfer not in (None, "winner"):
+            raise ValueError("HierarchicalGridArchive only supports the "
+                             "'winner' threshold_transfer policy, but got "
+                             f"{threshold_transfer!r}.")
+        self._activate(self._find_level(new_dims))
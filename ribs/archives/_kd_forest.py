@@ -0,0 +1,270 @@
+"""Provides KDForest."""
+import copy
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class _Tree:
+    """A static k-D tree in the forest, along with the ids of its points and a
+    mask of the points that are still in the forest."""
+
+    def __init__(self, points, ids, ckdtree_kwargs):
+        self.tree = cKDTree(points, **ckdtree_kwargs)
+        self.ids = ids
+        self.alive = np.ones(len(ids), dtype=bool)
+        self.n_dead = 0
+
+    @property
+    def size(self):
+        """Number of points in the tree, including dead points."""
+        return len(self.ids)
+
+    def alive_points(self):
+        """Returns the points and ids that are still in the forest."""
+        return self.tree.data[self.alive], self.ids[self.alive]
+
+
+class KDForest:
+    """Nearest neighbor index that supports inserting and replacing points.
+
+    Rebuilding a :class:`~scipy.spatial.cKDTree` with all points after every
+    insertion takes O(n log n) time, so inserting n points one batch at a time
+    takes O(n^2 log n) time. Instead, this index follows the logarithmic method
+    of `Bentley and Saxe 1980
+    <https://doi.org/10.1016/0196-6774(80)90015-2>`_: the points are held in a
+    forest of static k-D trees whose sizes are ``buffer_size`` times distinct
+    powers of two, plus a buffer of up to ``buffer_size`` recent points that is
+    searched by brute force. When the buffer fills up, its points become a new
+    tree, and trees with the same size are merged, just like carrying in binary
+    addition. Each point is thus rebuilt into a tree O(log n) times, and queries
+    search O(log n) trees.
+
+    Points are identified by integer ids. Replacing or removing a point marks
+    it as dead in its tree; queries skip dead points by asking each tree for
+    extra neighbors, and a tree is rebuilt once it holds more than
+    ``max_dead`` dead points.
+
+    Args:
+        dim (int): Dimensionality of the points.
+        buffer_size (int): Maximum number of points in the buffer.
+        max_dead (int): Maximum number of dead points in each tree.
+        workers (int): Number of workers for :meth:`cKDTree.query
+            <scipy.spatial.cKDTree.query>`. Pass -1 to use all CPUs.
+        ckdtree_kwargs (dict): kwargs for :class:`~scipy.spatial.cKDTree`.
+    """
+
+    def __init__(self,
+                 dim,
+                 buffer_size=256,
+                 max_dead=64,
+                 workers=1,
+                 ckdtree_kwargs=None):
+        self._dim = dim
+        self._buffer_size = buffer_size
+        self._max_dead = max_dead
+        self._workers = workers
+        self._ckdtree_kwargs = ({} if ckdtree_kwargs is None else
+                                ckdtree_kwargs.copy())
+        self._trees = []
+        self._buffer_points = np.empty((0, dim), dtype=np.float64)
+        self._buffer_ids = np.empty(0, dtype=np.intp)
+
+    def __len__(self):
+        """Number of points in the forest."""
+        return len(self._buffer_ids) + sum(
+            tree.size - tree.n_dead for tree in self._trees)
+
+    @property
+    def n_trees(self):
+        """int: Number of k-D trees in the forest."""
+        return len(self._trees)
+
+    def copy(self):
+        """Copies the forest.
+
+        The k-D trees are shared with the copy since they never change; only
+        the masks of dead points and the buffer are copied.
+        """
+        # pylint: disable = protected-access
+        # The buffer arrays are only ever reassigned, so they can be shared.
+        forest = copy.copy(self)
+        forest._trees = [copy.copy(tree) for tree in self._trees]
+        for tree in forest._trees:
+            tree.alive = tree.alive.copy()
+        return forest
+
+    def clear(self):
+        """Removes all points."""
+        self._trees = []
+        self._buffer_points = np.empty((0, self._dim), dtype=np.float64)
+        self._buffer_ids = np.empty(0, dtype=np.intp)
+
+    def rebuild(self, points, ids=None):
+        """Replaces all points in the forest with the given points.
+
+        Args:
+            points (array-like): (n, dim) array of points.
+            ids (array-like): (n,) array of ids of the points. Defaults to
+                ``arange(n)``.
+        """
+        # The points are copied since the trees keep a reference to them.
+        points = np.array(points, dtype=np.float64)
+        ids = (np.arange(len(points))
+               if ids is None else np.asarray(ids, dtype=np.intp))
+        self.clear()
+        if len(points) > 0:
+            self._trees.append(_Tree(points, ids, self._ckdtree_kwargs))
+
+    def remove(self, ids):
+        """Removes the points with the given ids. Ids that are not in the forest
+        are ignored.
+
+        Args:
+            ids (array-like): Ids of the points to remove.
+        """
+        ids = np.asarray(ids, dtype=np.intp)
+        if len(ids) == 0:
+            return
+
+        in_buffer = np.isin(self._buffer_ids, ids)
+        if np.any(in_buffer):
+            self._buffer_points = self._buffer_points[~in_buffer]
+            self._buffer_ids = self._buffer_ids[~in_buffer]
+
+        stale = []
+        for tree in self._trees:
+            dead = np.isin(tree.ids, ids) & tree.alive
+            n_dead = np.count_nonzero(dead)
+            if n_dead > 0:
+                tree.alive &= ~dead
+                tree.n_dead += n_dead
+                if tree.n_dead > self._max_dead:
+                    stale.append(tree)
+
+        # Rebuild the trees with too many dead points. The rebuilt trees are
+        # smaller, so they may need to be merged with other trees.
+        for tree in stale:
+            self._trees.remove(tree)
+            points, tree_ids = tree.alive_points()
+            if len(tree_ids) > 0:
+                self._add_tree(points, tree_ids)
+
+    def remap(self, id_map):
+        """Changes the id of every point in the forest from ``id`` to
+        ``id_map[id]``.
+
+        This is useful when the ids are indices into a store that was
+        compacted, e.g., with :meth:`ArrayStore.compact
+        <ribs.archives.ArrayStore.compact>`. Only the ids change, so the trees
+        are not rebuilt.
+
+        Args:
+            id_map (array-like): Array mapping each old id to its new id. Dead
+                points may be mapped to any value.
+        """
+        # The id arrays are reassigned rather than modified in place since they
+        # are shared with copies of the forest.
+        id_map = np.asarray(id_map)
+        for tree in self._trees:
+            tree.ids = id_map[tree.ids].astype(np.intp)
+        self._buffer_ids = id_map[self._buffer_ids].astype(np.intp)
+
+    def insert(self, points, ids):
+        """Inserts points into the forest.
+
+        Args:
+            points (array-like): (n, dim) array of points.
+            ids (array-like): (n,) array of ids of the points. The ids must not
+                already be in the forest; to replace points, :meth:`remove`
+                them first.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        ids = np.asarray(ids, dtype=np.intp)
+        self._buffer_points = np.concatenate((self._buffer_points, points))
+        self._buffer_ids = np.concatenate((self._buffer_ids, ids))
+        if len(self._buffer_ids) >= self._buffer_size:
+            self._add_tree(self._buffer_points, self._buffer_ids)
+            self._buffer_points = np.empty((0, self._dim), dtype=np.float64)
+            self._buffer_ids = np.empty(0, dtype=np.intp)
+
+    def _level(self, size):
+        """Level of a tree with the given number of points, where trees at
+        level j have between ``buffer_size * 2**j`` and ``buffer_size *
+        2**(j+1)`` points."""
+        return int(np.log2(max(size, self._buffer_size) / self._buffer_size))
+
+    def _add_tree(self, points, ids):
+        """Builds a tree from the points, first merging it with existing trees
+        at the same level."""
+        level = self._level(len(ids))
+        while True:
+            same_level = [
+                tree for tree in self._trees
+                if self._level(tree.size - tree.n_dead) == level
+            ]
+            if not same_level:
+                break
+            other = same_level[0]
+            self._trees.remove(other)
+            other_points, other_ids = other.alive_points()
+            points = np.concatenate((points, other_points))
+            ids = np.concatenate((ids, other_ids))
+            level = self._level(len(ids))
+        self._trees.append(_Tree(points, ids, self._ckdtree_kwargs))
+        # Largest trees first, so that query results do not depend on the order
+        # in which the trees were built.
+        self._trees.sort(key=lambda tree: -tree.size)
+
+    def query(self, points, k=1):
+        """Finds the k nearest neighbors of each point.
+
+        Args:
+            points (array-like): (batch_size, dim) array of points.
+            k (int): Number of neighbors. Must be at most the number of points
+                in the forest.
+        Returns:
+            tuple: (batch_size, k) array of distances to the neighbors, sorted
+            in increasing order, and (batch_size, k) array of ids of the
+            neighbors.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        batch_size = len(points)
+
+        all_dists = []
+        all_ids = []
+        for tree in self._trees:
+            tree_k = min(k + tree.n_dead, tree.size)
+            dists, indices = tree.tree.query(points,
+                                             k=tree_k,
+                                             workers=self._workers)
+            dists = dists.reshape(batch_size, tree_k)
+            indices = indices.reshape(batch_size, tree_k)
+            if tree.n_dead > 0:
+                dists = np.where(tree.alive[indices], dists, np.inf)
+            all_dists.append(dists)
+            all_ids.append(tree.ids[indices])
+
+        if len(self._buffer_ids) > 0:
+            # Distances to the buffer are computed in chunks of the batch so
+            # that the differences between the points take limited memory.
+            buffer_dists = np.empty((batch_size, len(self._buffer_ids)))
+            chunk_size = max(1, 2**22 // self._buffer_points.size)
+            for start in range(0, batch_size, chunk_size):
+                chunk = points[start:start + chunk_size]
+                buffer_dists[start:start + chunk_size] = np.linalg.norm(
+                    chunk[:, None] - self._buffer_points[None], axis=2)
+            all_dists.append(buffer_dists)
+            all_ids.append(
+                np.broadcast_to(self._buffer_ids,
+                                (batch_size, len(self._buffer_ids))))
+
+        dists = np.concatenate(all_dists, axis=1)
+        ids = np.concatenate(all_ids, axis=1)
+        if dists.shape[1] > k:
+            nearest = np.argpartition(dists, k - 1, axis=1)[:, :k]
+            dists = np.take_along_axis(dists, nearest, axis=1)
+            ids = np.take_along_axis(ids, nearest, axis=1)
+        order = np.argsort(dists, axis=1, kind="stable")
+        return (np.take_along_axis(dists, order, axis=1),
+                np.take_along_axis(ids, order, axis=1))
@@ -0,0 +1,119 @@
+"""Provides mini_batch_k_means."""
+import numpy as np
+
+from ribs.archives._centroid_index import GEMMIndex
+
+
+def mini_batch_k_means(sample_batches,
+                       n_clusters,
+                       *,
+                       tol=0.0,
+                       max_no_improvement=10,
+                       smoothing=0.1):
+    """Clusters a stream of samples with mini-batch k-means.
+
+    This is the mini-batch k-means of `Sculley 2010
+    <https://dl.acm.org/doi/10.1145/1772690.1772862>`_. The first
+    ``n_clusters`` samples in the stream become the initial centers. Then,
+    for each batch, every sample is assigned to its closest center, and each
+    center moves towards the mean of its assigned samples with a step size of
+    one over the number of samples assigned to it so far, i.e., each center is
+    the running mean of the samples assigned to it. Samples are only held one
+    batch at a time, so the stream may hold far more samples than fit in
+    memory.
+
+    Samples are assigned to centers with a :class:`~ribs.archives.GEMMIndex`,
+    so the assignment runs on all the cores that the BLAS library uses.
+
+    Like :class:`sklearn.cluster.MiniBatchKMeans`, the clustering stops early
+    if the squared distance that the centers move in one batch, averaged over
+    the centers, falls below ``tol`` times the variance of the first batch, or
+    if an exponentially weighted average of the inertia of each batch (the
+    mean squared distance from each sample to its center) does not improve for
+    ``max_no_improvement`` consecutive batches.
+
+    Args:
+        sample_batches (iterable of array-like): Batches of samples, each of
+            shape (batch_size, dim). Batches may have different sizes.
+        n_clusters (int): Number of centers.
+        tol (float): Tolerance for the movement of the centers. Pass 0 to
+            disable this criterion.
+        max_no_improvement (int): Number of consecutive batches without
+            improvement of the smoothed inertia after which to stop. Pass None
+            to disable this criterion.
+        smoothing (float): Weight of each new batch in the exponentially
+            weighted average of the inertia.
+    Returns:
+        numpy.ndarray: (n_clusters, dim) array of centers.
+    Raises:
+        ValueError: The stream has fewer than ``n_clusters`` samples.
+    """
+    sample_batches = iter(sample_batches)
+
+    # Initialize the centers with the first samples in the stream. Any samples
+    # after them in the last batch read here form the first batch.
+    initial = []
+    n_initial = 0
+    for batch in sample_batches:
+        batch = np.asarray(batch)
+        initial.append(batch)
+        n_initial += len(batch)
+        if n_initial >= n_clusters:
+            break
+    if n_initial < n_clusters:
+        raise ValueError(f"The stream has {n_initial} samples, but "
+                         f"{n_clusters} are needed to initialize the centers.")
+    initial = np.concatenate(initial)
+    centers = initial[:n_clusters].astype(np.float64)
+
+    def batches():
+        if n_initial > n_clusters:
+            yield initial[n_clusters:]
+        for batch in sample_batches:
+            yield np.asarray(batch)
+
+    counts = np.zeros(n_clusters, dtype=np.int64)
+    tol_scaled = None
+    ewa_inertia = None
+    best_inertia = np.inf
+    no_improvement = 0
+    for batch in batches():
+        if len(batch) == 0:
+            continue
+        if tol_scaled is None:
+            tol_scaled = tol * np.mean(np.var(batch, axis=0))
+
+        labels = GEMMIndex(centers).query(batch)
+        inertia = np.mean(np.sum(np.square(batch - centers[labels]), axis=1))
+
+        # Move each center to the running mean of its samples.
+        batch_counts = np.bincount(labels, minlength=n_clusters)
+        batch_sums = np.stack(
+            [
+                np.bincount(labels, weights=batch[:, i], minlength=n_clusters)
+                for i in range(batch.shape[1])
+            ],
+            axis=1,
+        )
+        updated = batch_counts > 0
+        counts[updated] += batch_counts[updated]
+        shift = ((batch_sums[updated] -
+                  batch_counts[updated, None] * centers[updated]) /
+                 counts[updated, None])
+        centers[updated] += shift
+
+        if tol > 0 and np.sum(np.square(shift)) / n_clusters <= tol_scaled:
+            break
+
+        ewa_inertia = (inertia if ewa_inertia is None else
+                       (1 - smoothing) * ewa_inertia + smoothing * inertia)
+        if ewa_inertia < best_inertia:
+            best_inertia = ewa_inertia
+            no_improvement = 0
+        else:
+            no_improvement += 1
+            if (max_no_improvement is not None and
+                    no_improvement >= max_no_improvement):
+                break
+
+    return centers
@@ -1,14 +1,61 @@
 """Contains the ProximityArchive."""
+import os
+
+import numba as nb
 import numpy as np
 from numpy_groupies import aggregate_nb as aggregate
-from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
 
 from ribs._utils import (check_batch_shape, check_finite, check_shape,
                          validate_batch, validate_single)
 from ribs.archives._archive_base import ArchiveBase
 from ribs.archives._archive_stats import ArchiveStats
 from ribs.archives._array_store import ArrayStore
-from ribs.archives._utils import fill_sentinel_values, parse_dtype
+from ribs.archives._chunked_array_store import ChunkedArrayStore
+from ribs.archives._kd_forest import KDForest
+from ribs.archives._utils import (fill_sentinel_values, load_records,
+                                  parse_dtype, snapshot_archive)
+
+
+@nb.jit(nopython=True)
+def _greedy_novelty_nb(neighbor_dists, n_neighbors, pair_dists,
+                       novelty_threshold):
+    """Computes the novelty of a block of solutions in order, where each
+    solution's novelty also accounts for the earlier solutions in the block
+    that were novel enough.
+
+    ``neighbor_dists`` is a (block_size, k_neighbors) array holding the sorted
+    distances from each solution to its nearest neighbors so far, padded with
+    inf, and ``n_neighbors`` holds the number of neighbors of each solution.
+    Both are updated in place as solutions are accepted. ``pair_dists`` holds
+    the distances between the solutions in the block.
+    """
+    block_size, k_neighbors = neighbor_dists.shape
+    novelty = np.empty(block_size, dtype=np.float64)
+    novel_enough = np.zeros(block_size, dtype=np.bool_)
+    for i in range(block_size):
+        count = n_neighbors[i]
+        novelty[i] = (novelty_threshold
+                      if count == 0 else np.mean(neighbor_dists[i, :count]))
+        if novelty[i] < novelty_threshold:
+            continue
+        novel_enough[i] = True
+
+        # Insert solution i into the sorted neighbors of the later solutions.
+        for j in range(i + 1, block_size):
+            dist = pair_dists[i, j]
+            if n_neighbors[j] < k_neighbors:
+                pos = n_neighbors[j]
+                n_neighbors[j] += 1
+            elif dist < neighbor_dists[j, k_neighbors - 1]:
+                pos = k_neighbors - 1
+            else:
+                continue
+            while pos > 0 and neighbor_dists[j, pos - 1] > dist:
+                neighbor_dists[j, pos] = neighbor_dists[j, pos - 1]
+                pos -= 1
+            neighbor_dists[j, pos] = dist
+    return novelty, novel_enough
 
 
 class ProximityArchive(ArchiveBase):
@@ -79,6 +126,12 @@ class ProximityArchive(ArchiveBase):
             objective will be compared to that of its nearest neighbor. If the
             candidate's objective is higher, it will replace the nearest
             neighbor.
+        intra_batch_novelty (bool): Whether :meth:`add` computes the novelty of
+            each solution with respect to the archive *and* the solutions
+            earlier in the same batch that were novel enough to be added. By
+            default, novelty is only computed with respect to the archive, so
+            a batch of near-identical novel solutions is added in its entirety.
+            Not supported with ``local_competition``.
         initial_capacity (int): Since this archive is unstructured, it does not
             have a fixed size, and it will grow as solutions are added. In the
             implementation, we store solutions in fixed-size arrays, and every
@@ -102,6 +155,9 @@ class ProximityArchive(ArchiveBase):
             ``"d"`` / ``np.float64``, or a dict specifying separate dtypes, of
             the form ``{"solution": <dtype>, "objective": <dtype>, "measures":
             <dtype>}``.
+            In the dict, the solution dtype may also be a
+            :class:`~ribs.archives.FieldCodec`, which stores the solutions in
+            reduced precision.
         extra_fields (dict): Description of extra fields of data that is stored
             next to elite data like solutions and objectives. The description is
             a dict mapping from a field name (str) to a tuple of ``(shape,
@@ -109,13 +165,41 @@ class ProximityArchive(ArchiveBase):
             np.float32)}`` will create a "foo" field that contains scalar values
             and a "bar" field that contains 10D values. Note that field names
             must be valid Python identifiers, and names already used in the
-            archive are not allowed.
-        ckdtree_kwargs (dict): When computing nearest neighbors, we construct a
-            :class:`~scipy.spatial.cKDTree`. This parameter will pass additional
-            kwargs when constructing the tree. By default, we do not pass in any
-            kwargs.
+            archive are not allowed. The dtype of an extra field may also be a
+            :class:`~ribs.archives.FieldCodec`.
+        ckdtree_kwargs (dict): When computing nearest neighbors, we construct
+            :class:`~scipy.spatial.cKDTree` instances. This parameter will pass
+            additional kwargs when constructing the trees. By default, we do not
+            pass in any kwargs.
+        workers (int): Number of workers for querying the k-D trees in
+            :meth:`compute_novelty` and :meth:`index_of`. Pass -1 to use all
+            CPUs.
+        memmap_dir (str or pathlib.Path): If passed, the elites' data is stored
+            in :class:`numpy.memmap` files under this directory instead of in
+            memory, which allows creating archives that are larger than RAM.
+            If the directory already holds elites from a previous archive with
+            the same fields, the archive is restored from the directory without
+            copying the data. See :class:`~ribs.archives.ArrayStore` for more
+            info.
+        shared_memory (bool): If True, the elites' data is allocated in
+            :mod:`multiprocessing.shared_memory`, and other processes can read
+            the archive without a copy through an
+            :class:`~ribs.archives.ArchiveView` created with :attr:`shm_name`.
+            Call :meth:`release_shared_memory` once the other processes are
+            done. See :class:`~ribs.archives.ArrayStore` for more info.
+        block_size (int): If passed, the elites' data is held in a
+            :class:`~ribs.archives.ChunkedArrayStore` with blocks of this many
+            elites. When the capacity doubles, such a store only allocates new
+            blocks rather than copying every elite into larger arrays, which
+            avoids long pauses and peaks in memory usage once the archive holds
+            millions of elites. Chunked archives cannot be combined with
+            ``memmap_dir`` or ``shared_memory``.
     Raises:
         ValueError: ``initial_capacity`` must be at least 1.
+        ValueError: ``intra_batch_novelty`` and ``local_competition`` were both
+            turned on.
+        ValueError: ``block_size`` was passed along with ``memmap_dir`` or
+            ``shared_memory``.
     """
 
     def __init__(
@@ -126,12 +210,17 @@ class ProximityArchive(ArchiveBase):
         k_neighbors,
         novelty_threshold,
         local_competition=False,
+        intra_batch_novelty=False,
         initial_capacity=128,
         qd_score_offset=0.0,
         seed=None,
         dtype=np.float64,
         extra_fields=None,
         ckdtree_kwargs=None,
+        workers=1,
+        memmap_dir=None,
+        shared_memory=False,
+        block_size=None,
     ):
         self._rng = np.random.default_rng(seed)
 
@@ -151,36 +240,59 @@ class ProximityArchive(ArchiveBase):
                              f"extra_fields: {reserved_fields}")
         if initial_capacity < 1:
             raise ValueError("initial_capacity must be at least 1.")
+        if intra_batch_novelty and local_competition:
+            raise ValueError("intra_batch_novelty is not supported with "
+                             "local_competition.")
         dtype = parse_dtype(dtype)
-        self._store = ArrayStore(
-            field_desc={
-                "solution": (self.solution_dim, dtype["solution"]),
-                "objective": ((), dtype["objective"]),
-                "measures": (self.measure_dim, dtype["measures"]),
-                **extra_fields,
-            },
-            capacity=initial_capacity,
-        )
+        field_desc = {
+            "solution": (self.solution_dim, dtype["solution"]),
+            "objective": ((), dtype["objective"]),
+            "measures": (self.measure_dim, dtype["measures"]),
+            **extra_fields,
+        }
+        if block_size is not None:
+            if memmap_dir is not None or shared_memory:
+                raise ValueError("block_size cannot be combined with "
+                                 "memmap_dir or shared_memory.")
+            self._store = ChunkedArrayStore(field_desc,
+                                            capacity=initial_capacity,
+                                            block_size=block_size)
+        else:
+            self._store = ArrayStore(
+                field_desc,
+                capacity=initial_capacity,
+                memmap_dir=memmap_dir,
+                shared_memory=shared_memory,
+            )
 
         # Set up constant properties.
         self._k_neighbors = int(k_neighbors)
         self._novelty_threshold = self.dtypes["measures"](novelty_threshold)
         self._local_competition = local_competition
+        self._intra_batch_novelty = intra_batch_novelty
         self._ckdtree_kwargs = ({} if ckdtree_kwargs is None else
                                 ckdtree_kwargs.copy())
         self._qd_score_offset = self.dtypes["objective"](qd_score_offset)
 
-        # Set up k-D tree with current measures in the archive. Updated on
-        # add().
-        self._cur_kd_tree = cKDTree(self._store.data("measures"),
-                                    **self._ckdtree_kwargs)
+        # Set up the nearest neighbor index with the current measures in the
+        # archive. Rebuilding a single k-D tree after every add() would take
+        # O(n log n) time per add(), so the index is instead a forest of k-D
+        # trees that is updated incrementally on add(); see KDForest.
+        self._kd_forest = KDForest(self.measure_dim,
+                                   workers=workers,
+                                   ckdtree_kwargs=self._ckdtree_kwargs)
+        self._kd_forest.rebuild(self._store.data("measures"))
 
         # Set up statistics -- objective_sum is the sum of all objective values
-        # in the archive; it is useful for computing qd_score and obj_mean.
-        self._best_elite = None
+        # in the archive; it is useful for computing qd_score and obj_mean. The
+        # stats are recomputed (rather than reset) in case the store was
+        # reopened from memmap_dir.
         self._objective_sum = None
+        self._obj_max = None
+        self._best_index = None
+        self._best_elite = None
         self._stats = None
-        self._stats_reset()
+        self._stats_recompute()
 
     ## Properties inherited from ArchiveBase ##
 
@@ -194,12 +306,39 @@ class ProximityArchive(ArchiveBase):
 
     @property
     def stats(self):
+        if self._stats is None:
+            num_elites = len(self)
+            objective_dtype = self.dtypes["objective"]
+            if num_elites == 0:
+                self._stats = ArchiveStats(
+                    num_elites=0,
+                    coverage=objective_dtype(0.0),
+                    qd_score=objective_dtype(0.0),
+                    norm_qd_score=objective_dtype(0.0),
+                    obj_max=None,
+                    obj_mean=None,
+                )
+            else:
+                qd_score = (self._objective_sum -
+                            objective_dtype(num_elites) * self._qd_score_offset)
+                self._stats = ArchiveStats(
+                    num_elites=num_elites,
+                    coverage=objective_dtype(num_elites / self.cells),
+                    qd_score=qd_score,
+                    norm_qd_score=objective_dtype(qd_score / self.cells),
+                    obj_max=self._obj_max,
+                    obj_mean=objective_dtype(self._objective_sum / num_elites),
+                )
         return self._stats
 
     @property
     def empty(self):
         return len(self._store) == 0
 
+    @property
+    def generation(self):
+        return self._store.generation
+
     ## Properties that are not in ArchiveBase ##
     ## Roughly ordered by the parameter list in the constructor. ##
 
@@ -209,6 +348,7 @@ class ProximityArchive(ArchiveBase):
 
         None if there are no elites in the archive.
         """
+        self._load_best_elite()
         return self._best_elite
 
     @property
@@ -227,12 +367,26 @@ class ProximityArchive(ArchiveBase):
         """bool: Whether local competition behavior is turned on."""
         return self._local_competition
 
+    @property
+    def intra_batch_novelty(self):
+        """bool: Whether novelty in :meth:`add` accounts for the solutions
+        earlier in the same batch."""
+        return self._intra_batch_novelty
+
     @property
     def capacity(self):
         """int: The number of solutions that can currently be stored in this
         archive. The capacity doubles every time the archive fills up."""
         return self._store.capacity
 
+    @property
+    def block_size(self):
+        """int: Number of elites in each block of the
+        :class:`~ribs.archives.ChunkedArrayStore` holding the elites, or None if
+        the elites are held in an :class:`~ribs.archives.ArrayStore`."""
+        return (self._store.block_size
+                if isinstance(self._store, ChunkedArrayStore) else None)
+
     @property
     def cells(self):
         """int: Strictly speaking, this archive does not have "cells" since it
@@ -247,6 +401,14 @@ class ProximityArchive(ArchiveBase):
         computing the QD score."""
         return self._qd_score_offset
 
+    @property
+    def shm_name(self):
+        """str: Name of the shared memory holding the elites, which is passed to
+        :class:`~ribs.archives.ArchiveView` to read this archive from other
+        processes. None if the archive was not created with
+        ``shared_memory=True``."""
+        return self._store.shm_name
+
     ## dunder methods ##
 
     def __len__(self):
@@ -259,43 +421,57 @@ class ProximityArchive(ArchiveBase):
 
     def _stats_reset(self):
         """Resets the archive stats."""
-        self._best_elite = None
         self._objective_sum = self.dtypes["objective"](0.0)
-        self._stats = ArchiveStats(
-            num_elites=0,
-            coverage=self.dtypes["objective"](0.0),
-            qd_score=self.dtypes["objective"](0.0),
-            norm_qd_score=self.dtypes["objective"](0.0),
-            obj_max=None,
-            obj_mean=None,
-        )
+        self._obj_max = None
+        self._best_index = None
+        self._best_elite = None
+        self._stats = None
 
-    def _stats_update(self, new_objective_sum, new_best_index):
+    def _stats_recompute(self):
+        """Recomputes the archive stats from the elites currently in the
+        store."""
+        self._stats_reset()
+        if self.empty:
+            return
+        objective = self._store.data("objective")
+        best = np.argmax(objective)
+        self._stats_update(np.sum(objective), self._store.occupied_list[best],
+                           objective[best])
+
+    def _stats_update(self, new_objective_sum, new_best_index,
+                      new_best_objective):
         """Updates statistics based on a new sum of objective values
-        (new_objective_sum) and the index of a potential new best elite
-        (new_best_index)."""
-        _, new_best_elite = self._store.retrieve([new_best_index])
-        new_best_elite = {k: v[0] for k, v in new_best_elite.items()}
-
-        if (self._stats.obj_max is None or
-                new_best_elite["objective"] > self._stats.obj_max):
-            self._best_elite = new_best_elite
-            new_obj_max = new_best_elite["objective"]
-        else:
-            new_obj_max = self._stats.obj_max
+        (new_objective_sum) and the index and objective of a potential new best
+        elite (new_best_index and new_best_objective).
 
+        Only the raw counters are updated here; :attr:`stats` and
+        :attr:`best_elite` are built from them when they are accessed, so that
+        frequent small additions do not pay for retrieving the best elite and
+        creating an ArchiveStats every time.
+        """
+        # The objective may come straight from the validated input, so it is
+        # cast to match the objectives stored in the archive.
+        new_best_objective = self.dtypes["objective"](new_best_objective)
+        if self._obj_max is None or new_best_objective > self._obj_max:
+            self._obj_max = new_best_objective
+            self._best_index = new_best_index
+            self._best_elite = None
         self._objective_sum = new_objective_sum
-        new_qd_score = (
-            self._objective_sum -
-            self.dtypes["objective"](len(self)) * self._qd_score_offset)
-        self._stats = ArchiveStats(
-            num_elites=len(self),
-            coverage=self.dtypes["objective"](len(self) / self.cells),
-            qd_score=new_qd_score,
-            norm_qd_score=self.dtypes["objective"](new_qd_score / self.cells),
-            obj_max=new_obj_max,
-            obj_mean=self.dtypes["objective"](self._objective_sum / len(self)),
-        )
+        self._stats = None
+
+    def _load_best_elite(self, indices=None):
+        """Retrieves the best elite from the store if it has not been retrieved
+        since it was found.
+
+        If ``indices`` is passed, the best elite is only retrieved if it is at
+        one of the indices, i.e., right before those cells are overwritten.
+        This matters in non-elitist archives, where the cell of the best elite
+        may be taken by an elite with a lower objective.
+        """
+        if (self._best_elite is None and self._best_index is not None and
+            (indices is None or np.any(indices == self._best_index))):
+            _, best_elite = self._store.retrieve([self._best_index])
+            self._best_elite = {k: v[0] for k, v in best_elite.items()}
 
     def index_of(self, measures) -> np.ndarray:
         """Returns the index of the closest solution to the given measures.
@@ -331,8 +507,8 @@ class ProximityArchive(ArchiveBase):
                 "neighbor to the input measures, so there must be at least one "
                 "solution present in the archive.")
 
-        _, indices = self._cur_kd_tree.query(measures)
-        return indices.astype(np.int32)
+        _, indices = self._kd_forest.query(measures)
+        return indices[:, 0].astype(np.int32)
 
     def index_of_single(self, measures):
         """Returns the index of the measures for one solution.
@@ -395,16 +571,11 @@ class ProximityArchive(ArchiveBase):
         else:
             # Compute nearest neighbors.
             k_neighbors = min(len(self), self.k_neighbors)
-            dists, indices = self._cur_kd_tree.query(measures, k=k_neighbors)
-
-            # Expand since query() automatically squeezes the last dim when k=1.
-            dists = dists[:, None] if k_neighbors == 1 else dists
+            dists, indices = self._kd_forest.query(measures, k=k_neighbors)
 
             novelty = np.mean(dists, axis=1)
 
             if use_local_competition:
-                indices = indices[:, None] if k_neighbors == 1 else indices
-
                 # The first item returned by `retrieve` is `occupied` -- all
                 # these indices are occupied since they are indices of solutions
                 # in the archive.
@@ -426,6 +597,62 @@ class ProximityArchive(ArchiveBase):
         else:
             return novelty
 
+    def _compute_intra_batch_novelty(self, measures, block_size=1024):
+        """Computes the novelty of each solution with respect to the archive
+        and the earlier solutions in the batch that were novel enough.
+
+        The solutions are processed in blocks. The distances to the novel
+        solutions in earlier blocks are computed with blocked pairwise
+        distances, and the solutions within each block are processed in order
+        by :func:`_greedy_novelty_nb`.
+
+        Returns:
+            tuple: (batch_size,) array of novelty scores in the dtype of the
+            measures and (batch_size,) boolean array indicating which solutions
+            were novel enough.
+        """
+        batch_size = len(measures)
+        measures = np.asarray(measures, dtype=np.float64)
+
+        # Sorted distances to the nearest neighbors found so far, padded with
+        # inf, and the number of neighbors found.
+        neighbor_dists = np.full((batch_size, self.k_neighbors), np.inf)
+        n_neighbors = np.zeros(batch_size, dtype=np.int64)
+        if not self.empty:
+            k_neighbors = min(len(self), self.k_neighbors)
+            neighbor_dists[:, :k_neighbors], _ = self._kd_forest.query(
+                measures, k=k_neighbors)
+            n_neighbors[:] = k_neighbors
+
+        novelty = np.empty(batch_size, dtype=np.float64)
+        novel_enough = np.zeros(batch_size, dtype=bool)
+        for start in range(0, batch_size, block_size):
+            end = min(start + block_size, batch_size)
+            block = measures[start:end]
+
+            # Merge in the novel solutions from earlier blocks.
+            earlier = measures[:start][novel_enough[:start]]
+            for earlier_start in range(0, len(earlier), block_size):
+                earlier_block = earlier[earlier_start:earlier_start +
+                                        block_size]
+                dists = np.concatenate(
+                    (neighbor_dists[start:end], cdist(block, earlier_block)),
+                    axis=1)
+                dists = np.partition(dists, self.k_neighbors - 1,
+                                     axis=1)[:, :self.k_neighbors]
+                neighbor_dists[start:end] = np.sort(dists, axis=1)
+                n_neighbors[start:end] = np.minimum(
+                    n_neighbors[start:end] + len(earlier_block),
+                    self.k_neighbors)
+
+            novelty[start:end], novel_enough[start:end] = _greedy_novelty_nb(
+                neighbor_dists[start:end], n_neighbors[start:end],
+                cdist(block, block), float(self.novelty_threshold))
+
+        # The novelty is computed in float64 so that novel_enough matches the
+        # comparisons in add_single(), and it is only cast afterwards.
+        return novelty.astype(self.dtypes["measures"]), novel_enough
+
     ## Methods for writing to the archive ##
 
     def _maybe_resize(self, new_size):
@@ -444,7 +671,11 @@ class ProximityArchive(ArchiveBase):
 
         Solutions are inserted if they have a high enough novelty score as
         discussed in the documentation for this class. The novelty is determined
-        by comparing to solutions currently in the archive.
+        by comparing to solutions currently in the archive. If
+        :attr:`intra_batch_novelty` is turned on, the novelty of each solution
+        is also determined by comparing to the solutions earlier in the batch
+        that were novel enough, so that near-identical solutions in one batch
+        are not all added.
 
         If :attr:`local_competition` is turned on, solutions can also replace
         existing solutions in the archive. Namely, if the solution was not novel
@@ -554,8 +785,12 @@ class ProximityArchive(ArchiveBase):
 
         if not self.local_competition:
             # Regular addition -- add solutions that are novel enough.
-            novelty = self.compute_novelty(measures=data["measures"])
-            novel_enough = novelty >= self.novelty_threshold
+            if self.intra_batch_novelty:
+                novelty, novel_enough = self._compute_intra_batch_novelty(
+                    data["measures"])
+            else:
+                novelty = self.compute_novelty(measures=data["measures"])
+                novel_enough = novelty >= self.novelty_threshold
             n_novel_enough = np.sum(novel_enough)
             new_size = len(self) + n_novel_enough
             self._maybe_resize(new_size)
@@ -578,13 +813,13 @@ class ProximityArchive(ArchiveBase):
                 self._store.add(indices, data)
 
                 # Compute statistics.
-                best_index = indices[np.argmax(data["objective"])]
+                best = np.argmax(data["objective"])
                 objective_sum = self._objective_sum + np.sum(data["objective"])
-                self._stats_update(objective_sum, best_index)
+                self._stats_update(objective_sum, indices[best],
+                                   data["objective"][best])
 
-                # Make a new tree with the updated solutions.
-                self._cur_kd_tree = cKDTree(self._store.data("measures"),
-                                            **self._ckdtree_kwargs)
+                # Insert the new solutions into the nearest neighbor index.
+                self._kd_forest.insert(data["measures"], indices)
 
             return add_info
 
@@ -693,13 +928,15 @@ class ProximityArchive(ArchiveBase):
                 objective_sum = (self._objective_sum +
                                  np.sum(novel_data["objective"]) +
                                  np.sum(data["objective"] - cur_objective))
-                best_index = combined_indices[np.argmax(
-                    combined_data["objective"])]
-                self._stats_update(objective_sum, best_index)
+                best = np.argmax(combined_data["objective"])
+                self._stats_update(objective_sum, combined_indices[best],
+                                   combined_data["objective"][best])
 
-                # Make a new tree with the updated solutions.
-                self._cur_kd_tree = cKDTree(self._store.data("measures"),
-                                            **self._ckdtree_kwargs)
+                # Update the nearest neighbor index -- the replaced solutions
+                # are removed before all new solutions are inserted.
+                self._kd_forest.remove(indices)
+                self._kd_forest.insert(combined_data["measures"],
+                                       combined_indices)
 
             return add_info
 
@@ -747,8 +984,126 @@ class ProximityArchive(ArchiveBase):
     def clear(self):
         """Removes all elites in the archive."""
         self._store.clear()
+        self._kd_forest.clear()
         self._stats_reset()
 
+    def remove(self, indices):
+        """Removes the elites at the given indices from the archive.
+
+        Since this archive stores its elites at indices ``0`` through
+        ``len(archive) - 1``, the remaining elites are renumbered after removal
+        (keeping their relative order). The removed elites are only removed
+        from the k-D trees and the ids of the other elites are renumbered, so
+        the trees are not rebuilt. The capacity of the archive does not change.
+
+        Args:
+            indices (array-like): Indices of elites to remove. Indices without
+                an elite are ignored.
+        Returns:
+            numpy.ndarray: int32 array of size ``(capacity,)`` mapping each old
+            index to its new index, or to -1 if there was no elite at the old
+            index (including the removed elites).
+        """
+        indices = np.unique(np.asarray(indices, dtype=np.int32))
+        occupied, objective = self._store.retrieve(indices, "objective")
+        indices = indices[occupied]
+
+        self._store.remove(indices)
+        index_map = self._store.compact()
+        self._kd_forest.remove(indices)
+        self._kd_forest.remap(index_map)
+
+        if self._best_index is None:
+            # The archive is empty.
+            return index_map
+        if np.any(indices == self._best_index):
+            self._stats_recompute()
+            return index_map
+
+        self._objective_sum = self._objective_sum - np.sum(
+            objective[occupied], dtype=self._objective_sum.dtype)
+        self._best_index = index_map[self._best_index]
+        if self._best_elite is not None:
+            self._best_elite = {**self._best_elite, "index": self._best_index}
+        self._stats = None
+        return index_map
+
+    def checkpoint(self, path, compact=False):
+        """Persists the archive to a delta log in the directory ``path``.
+
+        See :meth:`ArchiveBase.checkpoint
+        <ribs.archives.ArchiveBase.checkpoint>` for more info.
+        """
+        path = os.fspath(path)
+        if self._store.log_dir != path:
+            self._store.start_log(path)
+        elif compact:
+            self._store.compact_log()
+        else:
+            self._store.sync_log()
+
+    def restore(self, path):
+        """Restores the elites in the archive from a log written by
+        :meth:`checkpoint`.
+
+        See :meth:`ArchiveBase.restore
+        <ribs.archives.ArchiveBase.restore>` for more info. Note that the
+        restored elites are held in private memory even if the archive was
+        created with ``memmap_dir`` or ``shared_memory``; in the latter case,
+        the shared memory is released.
+
+        Args:
+            path (str or pathlib.Path): Directory of the log.
+        Raises:
+            ValueError: The fields of the elites in the log do not match the
+                fields of this archive.
+        """
+        store_class = (ChunkedArrayStore if isinstance(
+            self._store, ChunkedArrayStore) else ArrayStore)
+        store = store_class.load_log(path,
+                                     resume=True,
+                                     field_desc=self._store.field_desc)
+        if store.field_desc != self._store.field_desc:
+            store.close_log()
+            raise ValueError(
+                f"The archive in {os.fspath(path)} has fields "
+                f"{store.field_desc}, which do not match the fields "
+                f"{self._store.field_desc} of this archive.")
+
+        self._store.close_log()
+        self._store.release_shared_memory()
+        self._store = store
+        self._kd_forest.rebuild(self._store.data("measures"))
+        self._stats_recompute()
+
+    def release_shared_memory(self):
+        """Moves the elites out of shared memory.
+
+        :class:`~ribs.archives.ArchiveView` instances of this archive can no
+        longer read it afterwards. Does nothing if the archive was not created
+        with ``shared_memory=True``.
+        """
+        self._store.release_shared_memory()
+
+    @classmethod
+    def from_records(cls, records, **kwargs):
+        """Creates an archive holding the elites in a structured array.
+
+        See :meth:`ArchiveBase.from_records
+        <ribs.archives.ArchiveBase.from_records>` for more info. Since this
+        archive stores its elites at indices ``0`` through ``len(archive) -
+        1``, the elites are written in the order of ``records``, and the
+        ``index`` field of ``records`` is ignored. The novelty of the elites is
+        not checked, and the k-D trees are built once at the end.
+        """
+        # pylint: disable = protected-access
+        archive = cls(**kwargs)
+        archive._maybe_resize(len(records))
+        load_records(archive._store, records, np.arange(len(records)))
+        archive._kd_forest.rebuild(archive._store.data("measures"))
+        archive._stats_recompute()
+        return archive
+
     ## Methods for reading from the archive ##
     ## Refer to ArchiveBase for documentation of these methods. ##
 
@@ -771,14 +1126,41 @@ class ProximityArchive(ArchiveBase):
 
         return occupied[0], {field: arr[0] for field, arr in data.items()}
 
-    def data(self, fields=None, return_type="dict"):
-        return self._store.data(fields, return_type)
+    def data(self, fields=None, return_type="dict", copy=True, out=None):
+        return self._store.data(fields, return_type, copy, out)
+
+    def write_arrow(self,
+                    path,
+                    fields=None,
+                    file_format="parquet",
+                    chunk_size=100_000):
+        self._store.write_arrow(path, fields, file_format, chunk_size)
 
-    def sample_elites(self, n):
+    def to_records(self, fields=None):
+        return self._store.to_records(fields)
+
+    def iter_batches(self, batch_size, fields=None):
+        return self._store.iter_batches(batch_size, fields)
+
+    def changes_since(self, token, fields=None):
+        indices, token = self._store.changes_since(token)
+        if indices is None or fields is None:
+            return indices, token
+        return self._store.retrieve(indices, fields)[1], token
+
+    def sample_elites(self, n, fields=None, out=None):
         if self.empty:
             raise IndexError("No elements in archive.")
 
         random_indices = self._rng.integers(len(self._store), size=n)
         selected_indices = self._store.occupied_list[random_indices]
-        _, elites = self._store.retrieve(selected_indices)
+        _, elites = self._store.retrieve(selected_indices, fields, out=out)
         return elites
+
+    def snapshot(self):
+        # pylint: disable = protected-access
+        snapshot = snapshot_archive(self)
+        # The forest is updated in place on add(), so the snapshot needs its own
+        # copy.
+        snapshot._kd_forest = self._kd_forest.copy()
+        return snapshot
@@ -11,7 +11,8 @@ from ribs.archives._archive_base import ArchiveBase
 from ribs.archives._archive_stats import ArchiveStats
 from ribs.archives._array_store import ArrayStore
 from ribs.archives._grid_archive import GridArchive
-from ribs.archives._utils import fill_sentinel_values, parse_dtype
+from ribs.archives._utils import (fill_sentinel_values, parse_dtype,
+                                  snapshot_archive)
 
 
 class SolutionBuffer:
@@ -62,6 +63,30 @@ class SolutionBuffer:
         for i, m in enumerate(data["measures"]):
             self._measure_lists[i].add(m)
 
+    def remove(self, predicate):
+        """Removes the entries for which ``predicate(entry)`` is True."""
+        kept = deque()
+        for data in self._queue:
+            if predicate(data):
+                for i, m in enumerate(data["measures"]):
+                    self._measure_lists[i].remove(m)
+            else:
+                kept.append(data)
+        self._queue = kept
+
+    def copy(self):
+        """Copies the buffer.
+
+        The entries are shared with the copy since they are never modified.
+        """
+        # pylint: disable = protected-access
+        buffer = SolutionBuffer(self._buffer_capacity, 0)
+        buffer._queue = self._queue.copy()
+        buffer._measure_lists = [
+            measure_list.copy() for measure_list in self._measure_lists
+        ]
+        return buffer
+
     def full(self):
         """Whether buffer is full."""
         return len(self._queue) >= self._buffer_capacity
@@ -144,6 +169,9 @@ class SlidingBoundariesArchive(ArchiveBase):
             ``"d"`` / ``np.float64``, or a dict specifying separate dtypes, of
             the form ``{"solution": <dtype>, "objective": <dtype>, "measures":
             <dtype>}``.
+            In the dict, the solution dtype may also be a
+            :class:`~ribs.archives.FieldCodec`, which stores the solutions in
+            reduced precision.
         extra_fields (dict): Description of extra fields of data that is stored
             next to elite data like solutions and objectives. The description is
             a dict mapping from a field name (str) to a tuple of ``(shape,
@@ -151,7 +179,8 @@ class SlidingBoundariesArchive(ArchiveBase):
             np.float32)}`` will create a "foo" field that contains scalar values
             and a "bar" field that contains 10D values. Note that field names
             must be valid Python identifiers, and names already used in the
-            archive are not allowed.
+            archive are not allowed. The dtype of an extra field may also be a
+            :class:`~ribs.archives.FieldCodec`.
         remap_frequency (int): Frequency of remapping. Archive will remap once
             after ``remap_frequency`` number of solutions has been found.
         buffer_capacity (int): Number of solutions to keep in the buffer.
@@ -231,8 +260,8 @@ class SlidingBoundariesArchive(ArchiveBase):
 
         # Set up statistics -- objective_sum is the sum of all objective values
         # in the archive; it is useful for computing qd_score and obj_mean.
-        self._best_elite = None
         self._objective_sum = None
+        self._obj_max = None
         self._stats = None
         self._stats_reset()
 
@@ -248,12 +277,39 @@ class SlidingBoundariesArchive(ArchiveBase):
 
     @property
     def stats(self):
+        if self._stats is None:
+            num_elites = len(self)
+            objective_dtype = self.dtypes["objective"]
+            if num_elites == 0:
+                self._stats = ArchiveStats(
+                    num_elites=0,
+                    coverage=objective_dtype(0.0),
+                    qd_score=objective_dtype(0.0),
+                    norm_qd_score=objective_dtype(0.0),
+                    obj_max=None,
+                    obj_mean=None,
+                )
+            else:
+                qd_score = (self._objective_sum -
+                            objective_dtype(num_elites) * self._qd_score_offset)
+                self._stats = ArchiveStats(
+                    num_elites=num_elites,
+                    coverage=objective_dtype(num_elites / self.cells),
+                    qd_score=qd_score,
+                    norm_qd_score=objective_dtype(qd_score / self.cells),
+                    obj_max=self._obj_max,
+                    obj_mean=objective_dtype(self._objective_sum / num_elites),
+                )
         return self._stats
 
     @property
     def empty(self):
         return len(self._store) == 0
 
+    @property
+    def generation(self):
+        return self._store.generation
+
     ## Properties that are not in ArchiveBase ##
     ## Roughly ordered by the parameter list in the constructor. ##
 
@@ -342,43 +398,35 @@ class SlidingBoundariesArchive(ArchiveBase):
 
     def _stats_reset(self):
         """Resets the archive stats."""
-        self._best_elite = None
         self._objective_sum = self.dtypes["objective"](0.0)
-        self._stats = ArchiveStats(
-            num_elites=0,
-            coverage=self.dtypes["objective"](0.0),
-            qd_score=self.dtypes["objective"](0.0),
-            norm_qd_score=self.dtypes["objective"](0.0),
-            obj_max=None,
-            obj_mean=None,
-        )
+        self._obj_max = None
+        self._stats = None
 
-    def _stats_update(self, new_objective_sum, new_best_index):
+    def _stats_recompute(self):
+        """Recomputes the archive stats from the elites currently in the
+        store."""
+        self._stats_reset()
+        if self.empty:
+            return
+        objective = self._store.data("objective")
+        self._stats_update(np.sum(objective), np.max(objective))
+
+    def _stats_update(self, new_objective_sum, new_best_objective):
         """Updates statistics based on a new sum of objective values
-        (new_objective_sum) and the index of a potential new best elite
-        (new_best_index)."""
-        _, new_best_elite = self._store.retrieve([new_best_index])
-        new_best_elite = {k: v[0] for k, v in new_best_elite.items()}
-
-        if (self._stats.obj_max is None or
-                new_best_elite["objective"] > self._stats.obj_max):
-            self._best_elite = new_best_elite
-            new_obj_max = new_best_elite["objective"]
-        else:
-            new_obj_max = self._stats.obj_max
+        (new_objective_sum) and the objective of a potential new best elite
+        (new_best_objective).
 
+        Only the raw counters are updated here; :attr:`stats` is built from
+        them when it is accessed, so that frequent small additions do not pay
+        for creating an ArchiveStats every time.
+        """
+        # The objective may come straight from the validated input, so it is
+        # cast to match the objectives stored in the archive.
+        new_best_objective = self.dtypes["objective"](new_best_objective)
+        if self._obj_max is None or new_best_objective > self._obj_max:
+            self._obj_max = new_best_objective
         self._objective_sum = new_objective_sum
-        new_qd_score = (
-            self._objective_sum -
-            self.dtypes["objective"](len(self)) * self._qd_score_offset)
-        self._stats = ArchiveStats(
-            num_elites=len(self),
-            coverage=self.dtypes["objective"](len(self) / self.cells),
-            qd_score=new_qd_score,
-            norm_qd_score=self.dtypes["objective"](new_qd_score / self.cells),
-            obj_max=new_obj_max,
-            obj_mean=self.dtypes["objective"](self._objective_sum / len(self)),
-        )
+        self._stats = None
 
     def index_of(self, measures):
         """Returns archive indices for the given batch of measures.
@@ -602,7 +650,7 @@ class SlidingBoundariesArchive(ArchiveBase):
 
             # Update stats.
             self._stats_update(self._objective_sum + objective - cur_objective,
-                               index)
+                               objective)
 
         # Value is the improvement over the current objective (can be negative).
         add_info["value"] = objective - cur_objective
@@ -668,6 +716,74 @@ class SlidingBoundariesArchive(ArchiveBase):
         self._store.clear()
         self._stats_reset()
 
+    def remove(self, indices):
+        """Removes the elites at the given indices from the archive.
+
+        The removed elites are also removed from the solution buffer, i.e., the
+        entries of the buffer with the same objective and measures as a removed
+        elite are dropped, so that the elites are not inserted again at the next
+        remap. The boundaries are not changed until the next remap.
+
+        Args:
+            indices (array-like): Indices of elites to remove; see
+                :meth:`index_of`. Indices without an elite are ignored.
+        """
+        occupied, elites = self._store.retrieve(indices,
+                                                ["objective", "measures"])
+        removed = set(
+            zip(elites["objective"][occupied].tolist(),
+                map(tuple, elites["measures"][occupied].tolist())))
+
+        def is_removed(data):
+            measures = np.asarray(data["measures"],
+                                  dtype=self.dtypes["measures"])
+            return (data["objective"].item(),
+                    tuple(measures.tolist())) in removed
+
+        self._buffer.remove(is_removed)
+
+        self._store.remove(indices)
+        self._stats_recompute()
+
+    def checkpoint(self, path, compact=False):
+        """Not supported by this archive.
+
+        The delta log only holds the elites, not the boundaries and the
+        solution buffer of the archive.
+
+        Raises:
+            NotImplementedError: Always.
+        """
+        raise NotImplementedError(
+            "SlidingBoundariesArchive does not support checkpoint() since the "
+            "delta log does not hold its boundaries and solution buffer.")
+
+    def restore(self, path):
+        """Not supported by this archive; see :meth:`checkpoint`.
+
+        Raises:
+            NotImplementedError: Always.
+        """
+        raise NotImplementedError(
+            "SlidingBoundariesArchive does not support restore() since the "
+            "delta log does not hold its boundaries and solution buffer.")
+
+    @classmethod
+    def from_records(cls, records, **kwargs):
+        """Not supported by this archive.
+
+        The boundaries of the archive are computed from its buffer of recent
+        solutions, which the records do not hold, so the elites cannot be
+        placed in the same cells.
+
+        Raises:
+            NotImplementedError: Always.
+        """
+        raise NotImplementedError(
+            "SlidingBoundariesArchive does not support from_records() since "
+            "its boundaries depend on its solution buffer, which records do "
+            "not hold.")
+
     ## Methods for reading from the archive ##
     ## Refer to ArchiveBase for documentation of these methods. ##
 
@@ -690,14 +806,42 @@ class SlidingBoundariesArchive(ArchiveBase):
 
         return occupied[0], {field: arr[0] for field, arr in data.items()}
 
-    def data(self, fields=None, return_type="dict"):
-        return self._store.data(fields, return_type)
+    def data(self, fields=None, return_type="dict", copy=True, out=None):
+        return self._store.data(fields, return_type, copy, out)
 
-    def sample_elites(self, n):
+    def write_arrow(self,
+                    path,
+                    fields=None,
+                    file_format="parquet",
+                    chunk_size=100_000):
+        self._store.write_arrow(path, fields, file_format, chunk_size)
+
+    def to_records(self, fields=None):
+        return self._store.to_records(fields)
+
+    def iter_batches(self, batch_size, fields=None):
+        return self._store.iter_batches(batch_size, fields)
+
+    def changes_since(self, token, fields=None):
+        indices, token = self._store.changes_since(token)
+        if indices is None or fields is None:
+            return indices, token
+        return self._store.retrieve(indices, fields)[1], token
+
+    def sample_elites(self, n, fields=None, out=None):
         if self.empty:
             raise IndexError("No elements in archive.")
 
         random_indices = self._rng.integers(len(self._store), size=n)
         selected_indices = self._store.occupied_list[random_indices]
-        _, elites = self._store.retrieve(selected_indices)
+        _, elites = self._store.retrieve(selected_indices, fields, out=out)
         return elites
+
+    def snapshot(self):
+        # pylint: disable = protected-access
+        snapshot = snapshot_archive(self)
+        # Unlike the other attributes, the boundaries and the buffer are
+        # modified in place when solutions are added.
+        snapshot._boundaries = np.copy(self._boundaries)
+        snapshot._buffer = self._buffer.copy()
+        return snapshot
@@ -0,0 +1,472 @@
+"""Provides SparseArrayStore."""
+from functools import cached_property
+
+import numba as nb
+import numpy as np
+
+from ribs._utils import readonly
+from ribs.archives._array_store import ArrayStore, _contiguous_slice
+
+# Name of the field that holds the index of the entry in each row.
+_INDEX_FIELD = "_index"
+
+# Marks empty slots in the hash table. Indices are never negative.
+_EMPTY = -1
+
+# Number of rows allocated for a new store.
+_INITIAL_ROWS = 16
+
+
+@nb.jit(nopython=True)
+def _slot(key, shift):
+    """Fibonacci hash of ``key`` into a table of ``2**(64 - shift)`` slots."""
+    return np.int64((np.uint64(key) *
+                     np.uint64(11400714819323198485)) >> np.uint64(shift))
+
+
+@nb.jit(nopython=True)
+def _lookup_nb(keys, table_keys, table_rows, shift):
+    """Returns the row of each key in the hash table, or -1 if the key is not in
+    the table."""
+    mask = len(table_keys) - 1
+    rows = np.empty(len(keys), dtype=np.int64)
+    for i, key in enumerate(keys):
+        slot = _slot(key, shift)
+        while True:
+            cur = table_keys[slot]
+            if cur == _EMPTY:
+                rows[i] = -1
+                break
+            if cur == key:
+                rows[i] = table_rows[slot]
+                break
+            slot = (slot + 1) & mask
+    return rows
+
+
+@nb.jit(nopython=True)
+def _insert_nb(keys, rows, table_keys, table_rows, shift):
+    """Inserts keys that are not yet in the hash table with linear probing."""
+    mask = len(table_keys) - 1
+    for i, key in enumerate(keys):
+        slot = _slot(key, shift)
+        while table_keys[slot] != _EMPTY:
+            slot = (slot + 1) & mask
+        table_keys[slot] = key
+        table_rows[slot] = rows[i]
+
+
+class SparseArrayStore:
+    # pylint: disable = too-many-public-methods
+    """Maintains a set of arrays for a huge index space of which only a small
+    part is ever occupied.
+
+    An :class:`~ribs.archives.ArrayStore` allocates ``capacity`` rows for every
+    field up front. This is not feasible when the index space is huge, e.g., in
+    a :class:`~ribs.archives.GridArchive` with 50 cells in each of 6 measure
+    dimensions (over 15 billion cells), even though an archive of this size
+    might only ever fill a few hundred thousand cells. Instead, the
+    SparseArrayStore holds the data of the occupied indices in the dense rows of
+    an internal :class:`~ribs.archives.ArrayStore`, which grows as entries are
+    added, and it maps each occupied index to its row with an open-addressing
+    hash table. Memory thus scales with the number of occupied indices rather
+    than with ``capacity``. Indices are int64, so ``capacity`` may exceed the
+    range of int32.
+
+    The SparseArrayStore supports the same methods for reading and writing
+    entries as the :class:`~ribs.archives.ArrayStore`, e.g., :meth:`retrieve`,
+    :meth:`add`, :meth:`remove`, and the delta log. It cannot be memory-mapped
+    or placed in shared memory.
+
+    Args:
+        field_desc (dict): Description of fields in the store. See
+            :class:`~ribs.archives.ArrayStore`.
+        capacity (int): Total number of possible indices, i.e., indices range
+            from 0 to ``capacity - 1``.
+    Raises:
+        ValueError: One of the fields in ``field_desc`` has a reserved name
+            ("index" or "_index") or is not a valid Python identifier.
+    """
+
+    def __init__(self, field_desc, capacity):
+        if _INDEX_FIELD in field_desc:
+            raise ValueError(f"`{_INDEX_FIELD}` is a reserved field name.")
+        self._capacity = int(capacity)
+
+        # Rows 0 through len(self) - 1 of this store are always the occupied
+        # ones, in the order in which their indices were added (each batch of
+        # new indices is added in increasing order).
+        self._rows = ArrayStore(
+            {
+                **field_desc,
+                _INDEX_FIELD: ((), np.int64),
+            },
+            _INITIAL_ROWS,
+        )
+
+        self._table_keys = None
+        self._table_rows = None
+        self._shift = None
+        self._rebuild_table(len(self._rows))
+
+    ## Hash table ##
+
+    def _rebuild_table(self, n):
+        """Creates a hash table with room for ``n`` indices (at a load factor of
+        at most 0.5) and inserts the occupied indices into it."""
+        size = 16
+        while size < 2 * n:
+            size *= 2
+        self._table_keys = np.full(size, _EMPTY, dtype=np.int64)
+        self._table_rows = np.empty(size, dtype=np.int32)
+        self._shift = 64 - (size.bit_length() - 1)
+
+        n_occupied = len(self._rows)
+        _insert_nb(self._index_array()[:n_occupied], np.arange(n_occupied),
+                   self._table_keys, self._table_rows, self._shift)
+
+    def _lookup(self, indices):
+        """Returns the row of each index, or -1 for unoccupied indices."""
+        return _lookup_nb(indices, self._table_keys, self._table_rows,
+                          self._shift)
+
+    def _index_array(self):
+        """Returns the array holding the index of the entry in each row."""
+        # pylint: disable-next = protected-access
+        return self._rows._fields[_INDEX_FIELD]
+
+    ## dunder methods ##
+
+    def __len__(self):
+        """Number of occupied indices in the store."""
+        return len(self._rows)
+
+    def __iter__(self):
+        """Iterates over entries in the store.
+
+        See :meth:`ArrayStore.__iter__ <ribs.archives.ArrayStore.__iter__>`.
+        """
+        for entry in self._rows:
+            # Replace the row with the index of the entry.
+            entry["index"] = entry.pop(_INDEX_FIELD)
+            yield entry
+
+    def iter_batches(self, batch_size, fields=None):
+        """Iterates over entries in the store in batches.
+
+        See :meth:`ArrayStore.iter_batches
+        <ribs.archives.ArrayStore.iter_batches>`.
+        """
+        return ArrayStore.iter_batches(self, batch_size, fields)
+
+    ## Properties ##
+
+    @property
+    def capacity(self):
+        """int: Total number of possible indices in the store."""
+        return self._capacity
+
+    @property
+    def memmap_dir(self):
+        """None: Sparse stores are always held in memory."""
+        return None
+
+    @property
+    def shm_name(self):
+        """None: Sparse stores are never placed in shared memory."""
+        return None
+
+    @property
+    def log_dir(self):
+        """str: Directory of the delta log of this store, or None if the store
+        is not logging its changes."""
+        return self._rows.log_dir
+
+    @property
+    def occupied_list(self):
+        """numpy.ndarray: int64 array listing all occupied indices in the
+        store."""
+        return readonly(self._index_array()[:len(self)])
+
+    @property
+    def generation(self):
+        """int: Token that changes every time the store is modified.
+
+        See :attr:`ArrayStore.generation
+        <ribs.archives.ArrayStore.generation>`.
+        """
+        return self._rows.generation
+
+    @cached_property
+    def field_desc(self):
+        """dict: Description of fields in the store."""
+        desc = dict(self._rows.field_desc)
+        del desc[_INDEX_FIELD]
+        return desc
+
+    @cached_property
+    def dtypes(self):
+        """dict: Data types of fields in the store."""
+        dtypes = dict(self._rows.dtypes)
+        del dtypes[_INDEX_FIELD]
+        return dtypes
+
+    @cached_property
+    def dtypes_with_index(self):
+        """dict: Data types of fields in the store, plus the index, which is
+        int64."""
+        return self.dtypes | {"index": np.int64}
+
+    @cached_property
+    def field_list(self):
+        """list: List of fields in the store."""
+        return list(self.field_desc)
+
+    @cached_property
+    def field_list_with_index(self):
+        """list: List of fields in the store, plus the index."""
+        return self.field_list + ["index"]
+
+    ## Methods for reading ##
+
+    def retrieve(self,
+                 indices,
+                 fields=None,
+                 return_type="dict",
+                 copy=True,
+                 out=None):
+        """Collects data at the given indices.
+
+        See :meth:`ArrayStore.retrieve <ribs.archives.ArrayStore.retrieve>` for
+        more info. Unlike in the ArrayStore, the data of unoccupied indices
+        are taken from an arbitrary occupied index.
+
+        Args:
+            indices (array-like): List of indices at which to collect data.
+            fields (str or array-like of str): List of fields to include.
+            return_type (str): Type of data to return.
+            copy (bool): If False and the indices are occupied and were added
+                in a contiguous range of rows, the data is returned as views.
+            out (dict): Preallocated arrays for the data of some fields. See
+                :meth:`ArrayStore.retrieve
+                <ribs.archives.ArrayStore.retrieve>`.
+        Returns:
+            tuple: 2-element tuple of ``occupied`` and ``data``, as in
+            :meth:`ArrayStore.retrieve <ribs.archives.ArrayStore.retrieve>`.
+        Raises:
+            ValueError: Invalid field name provided.
+            ValueError: Invalid return_type provided.
+            ValueError: An array in ``out`` has the wrong shape or dtype.
+        """
+        # pylint: disable = protected-access
+        indices = np.asarray(indices, dtype=np.int64)
+        rows = self._lookup(indices)
+        occupied = rows != -1
+        rows[~occupied] = 0
+
+        view_slice = (None if copy or return_type == "pandas" or
+                      not np.all(occupied) else _contiguous_slice(rows))
+
+        if fields is None:
+            fields = self.field_list_with_index
+        elif not isinstance(fields, str):
+            fields = list(fields)
+        if _INDEX_FIELD in ([fields] if isinstance(fields, str) else fields):
+            raise ValueError(
+                f"`{_INDEX_FIELD}` is not a field in this SparseArrayStore.")
+
+        data = self._rows._gather(indices,
+                                  rows if view_slice is None else view_slice,
+                                  fields, return_type, out)
+        return occupied, data
+
+    def data(self, fields=None, return_type="dict", copy=True, out=None):
+        """Retrieves data for all entries in the store.
+
+        See :meth:`ArrayStore.data <ribs.archives.ArrayStore.data>`.
+        """
+        return self.retrieve(self.occupied_list, fields, return_type, copy,
+                             out)[1]
+
+    def changes_since(self, token):
+        """Lists the indices that were written since the given token.
+
+        See :meth:`ArrayStore.changes_since
+        <ribs.archives.ArrayStore.changes_since>`. The indices are int64 like
+        :attr:`occupied_list`.
+        """
+        rows, token = self._rows.changes_since(token)
+        if rows is None:
+            return None, token
+        return np.unique(self._index_array()[rows]), token
+
+    def write_arrow(self,
+                    path,
+                    fields=None,
+                    file_format="parquet",
+                    chunk_size=100_000):
+        """Writes all entries in the store to a Parquet or Feather file.
+
+        See :meth:`ArrayStore.write_arrow
+        <ribs.archives.ArrayStore.write_arrow>`.
+        """
+        # The implementation only reads the store through occupied_list and
+        # retrieve(), so it applies to this store as well.
+        ArrayStore.write_arrow(self, path, fields, file_format, chunk_size)
+
+    def to_records(self, fields=None, chunk_size=100_000):
+        """Copies all entries in the store into a NumPy structured array.
+
+        See :meth:`ArrayStore.to_records
+        <ribs.archives.ArrayStore.to_records>`.
+        """
+        return ArrayStore.to_records(self, fields, chunk_size)
+
+    ## Methods for writing ##
+
+    def add(self, indices, data):
+        """Adds new data to the store at the given indices.
+
+        Indices that are not yet occupied are assigned new rows, which grows the
+        underlying arrays by doubling when they are full. See
+        :meth:`ArrayStore.add <ribs.archives.ArrayStore.add>` for more info.
+
+        Args:
+            indices (array-like): List of indices for addition.
+            data (dict): Dict with data to add at each index.
+        Raises:
+            IndexError: Some of the indices are outside the range ``[0,
+                capacity)``.
+            ValueError: ``data`` does not have the same keys as the fields of
+                this store.
+            ValueError: ``data`` has fields that have a different length than
+                ``indices``.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) > 0 and (indices.min() < 0 or
+                                 indices.max() >= self._capacity):
+            raise IndexError(
+                f"Indices must be in the range [0, {self._capacity}).")
+
+        rows = self._lookup(indices)
+        new = rows == -1
+        new_indices, inverse = np.unique(indices[new], return_inverse=True)
+        n_occupied = len(self)
+        rows[new] = n_occupied + inverse.reshape(-1)
+
+        n_total = n_occupied + len(new_indices)
+        if n_total > self._rows.capacity:
+            self._rows.resize(max(n_total, 2 * self._rows.capacity))
+
+        # Since the new rows come right after the occupied ones in increasing
+        # order, the store keeps its occupied rows at the front.
+        self._rows.add(rows, {**data, _INDEX_FIELD: indices})
+
+        if 2 * n_total > len(self._table_keys):
+            self._rebuild_table(n_total)
+        else:
+            _insert_nb(new_indices, np.arange(n_occupied, n_total),
+                       self._table_keys, self._table_rows, self._shift)
+
+    def clear(self):
+        """Removes all entries from the store."""
+        self._rows.clear()
+        self._table_keys.fill(_EMPTY)
+
+    def remove(self, indices):
+        """Removes the entries at the given indices from the store.
+
+        The remaining entries are moved up to fill the rows of the removed ones,
+        so this takes time proportional to the size of the store. Indices that
+        are not occupied are ignored.
+
+        Args:
+            indices (array-like): Indices to remove.
+        """
+        rows = self._lookup(np.asarray(indices, dtype=np.int64))
+        self._rows.remove(rows[rows != -1])
+        self._rows.compact()
+        self._rebuild_table(len(self))
+
+    def snapshot(self):
+        """Returns a read-only copy of the store at this point in time.
+
+        The rows of the store are shared with the snapshot as in
+        :meth:`ArrayStore.snapshot <ribs.archives.ArrayStore.snapshot>`, while
+        the hash table is copied.
+
+        Returns:
+            SparseArrayStore: The snapshot.
+        """
+        # pylint: disable = protected-access
+        snapshot = SparseArrayStore({}, self._capacity)
+        snapshot._rows = self._rows.snapshot()
+        snapshot._table_keys = readonly(np.copy(self._table_keys))
+        snapshot._table_rows = readonly(np.copy(self._table_rows))
+        snapshot._shift = self._shift
+        return snapshot
+
+    def release_shared_memory(self):
+        """Does nothing, since sparse stores are never in shared memory."""
+
+    ## Delta log ##
+
+    def start_log(self, log_dir):
+        """Starts recording changes to the store in a delta log.
+
+        See :meth:`ArrayStore.start_log <ribs.archives.ArrayStore.start_log>`.
+        The log holds the rows of the store, including the index of each row.
+        """
+        self._rows.start_log(log_dir)
+
+    def sync_log(self):
+        """Flushes the delta log to disk."""
+        self._rows.sync_log()
+
+    def compact_log(self):
+        """Folds the records of the delta log into its base snapshot."""
+        self._rows.compact_log()
+
+    def close_log(self):
+        """Stops recording changes to the store."""
+        self._rows.close_log()
+
+    @staticmethod
+    def load_log(log_dir, capacity, resume=False, field_desc=None):
+        """Loads a store from a delta log written by :meth:`start_log`.
+
+        See :meth:`ArrayStore.load_log <ribs.archives.ArrayStore.load_log>`.
+
+        Args:
+            log_dir (str or pathlib.Path): Directory of the log.
+            capacity (int): Total number of possible indices in the store. The
+                log does not record the capacity.
+            resume (bool): Whether the loaded store continues writing to the
+                log.
+            field_desc (dict): Description of the fields of the store, which is
+                needed to decode fields with a codec.
+        Returns:
+            SparseArrayStore: The new store.
+        Raises:
+            ValueError: The log was not written by a SparseArrayStore, or it
+                holds indices outside the range ``[0, capacity)``.
+        """
+        # pylint: disable = protected-access
+        rows = ArrayStore.load_log(log_dir, resume, field_desc)
+        store = SparseArrayStore({}, capacity)  # Create an empty store.
+        store._rows = rows
+
+        if _INDEX_FIELD not in rows.field_desc:
+            rows.close_log()
+            raise ValueError(
+                f"The log in {log_dir} was not written by a SparseArrayStore.")
+        occupied_list = store.occupied_list
+        if len(occupied_list) > 0 and (occupied_list.min() < 0 or
+                                       occupied_list.max() >= capacity):
+            rows.close_log()
+            raise ValueError(
+                f"The log in {log_dir} holds indices outside the range "
+                f"[0, {capacity}).")
+
+        store._rebuild_table(len(store))
+        return store
@@ -1,6 +1,11 @@
 """Utilities specific to archives."""
+import copy
+
+import numba as nb
 import numpy as np
 
+from ribs.archives._field_codecs import FieldCodec
+
 
 def parse_dtype(dtype):
     """Parses dtypes for the archive.
@@ -8,6 +13,9 @@ def parse_dtype(dtype):
     At the end, all dtypes will be scalar types like np.float32 or np.float64 --
     note that this is different from the numpy.dtype like np.dtype("f"). See
     here: https://numpy.org/doc/stable/reference/arrays.dtypes.html
+
+    The exception is that the solution dtype may be a FieldCodec, which is left
+    as is.
     """
     if isinstance(dtype, dict):
         if ("solution" not in dtype or "objective" not in dtype or
@@ -29,6 +37,12 @@ def parse_dtype(dtype):
 
     # Cast everything to scalar types, including string abbreviations like "f".
     for key in dtype_dict:
+        if isinstance(dtype_dict[key], FieldCodec):
+            if key != "solution":
+                raise ValueError(
+                    f"A FieldCodec was passed as the dtype of `{key}`, but "
+                    "codecs are only supported for the solution.")
+            continue
         dtype_dict[key] = np.dtype(dtype_dict[key]).type
 
     return dtype_dict
@@ -71,3 +85,185 @@ def fill_sentinel_values(occupied, data):
             fill_val = np.nan
 
         arr[unoccupied] = fill_val
+
+
+def load_records(store, records, indices):
+    """Writes the elites in a structured array (e.g., from ``to_records()``)
+    into a store in one pass, replacing the current contents of the store.
+
+    Every field of the store must be in ``records``, except that missing
+    thresholds are set to the objectives of the elites. Besides the fields of
+    the store, ``records`` may only have an ``index`` field. Each elite is
+    written at the corresponding entry of ``indices``.
+    """
+    names = set(records.dtype.names or ())
+    missing = set(store.field_list) - names - {"threshold"}
+    unknown = names - set(store.field_list) - {"index"}
+    if missing:
+        raise ValueError(f"records is missing the fields {sorted(missing)}.")
+    if unknown:
+        raise ValueError(f"records has the fields {sorted(unknown)}, which "
+                         "are not fields of the archive.")
+
+    indices = np.asarray(indices)
+    if len(np.unique(indices)) != len(indices):
+        raise ValueError("records has multiple elites in the same cell.")
+
+    store.clear()
+    store.add(
+        indices, {
+            name: records[name if name in names else "objective"]
+            for name in store.field_list
+        })
+
+
+def snapshot_archive(archive):
+    """Creates a snapshot of an archive that holds its elites in an ArrayStore.
+
+    The snapshot is a shallow copy of the archive whose store is replaced with
+    a snapshot of the store. Other attributes of the archive are only ever
+    reassigned rather than modified in place, so they can be shared. The
+    random number generator is copied so that sampling from the snapshot does
+    not affect the archive.
+    """
+    # pylint: disable = protected-access
+    snapshot = copy.copy(archive)
+    snapshot._store = archive._store.snapshot()
+    snapshot._rng = copy.deepcopy(archive._rng)
+    return snapshot
+
+
+@nb.jit(nopython=True)
+def _batch_insertion_nb(indices, objective, cur_occupied, cur_threshold,
+                        cur_objective, threshold_min, ratio_base, value_base):
+    """Numba kernel for batch_insertion."""
+    batch_size = len(indices)
+    status = np.zeros(batch_size, dtype=np.int32)
+    value = np.empty(batch_size, dtype=objective.dtype)
+
+    n_cells = 0 if batch_size == 0 else indices.max() + 1
+    cell_argmax = np.full(n_cells, -1, dtype=np.int64)
+    cell_count = np.zeros(n_cells, dtype=np.int64)
+    # Sums accumulate in float64 so that float32 objectives do not lose
+    # precision.
+    cell_sum = np.zeros(n_cells, dtype=np.float64)
+
+    # First pass: status, value, and per-cell statistics of the solutions that
+    # can be inserted. The first solution wins ties in the argmax.
+    for i in range(batch_size):
+        threshold = cur_threshold[i] if cur_occupied[i] else threshold_min
+        if objective[i] > threshold:
+            if cur_occupied[i]:
+                status[i] = 1
+            else:
+                status[i] = 2
+                threshold = value_base
+            cell = indices[i]
+            cell_count[cell] += 1
+            cell_sum[cell] += np.float64(objective[i])
+            if (cell_argmax[cell] == -1 or
+                    objective[i] > objective[cell_argmax[cell]]):
+                cell_argmax[cell] = i
+        value[i] = objective[i] - threshold
+
+    n_insert = 0
+    for cell in range(n_cells):
+        if cell_argmax[cell] != -1:
+            n_insert += 1
+
+    # Second pass over the cells (in increasing order): the solution inserted
+    # into each cell, its new threshold, and the stats of the insertion.
+    should_insert = np.empty(n_insert, dtype=np.int64)
+    new_threshold = np.empty(n_insert, dtype=np.float64)
+    objective_delta = np.float64(0.0)
+    best = -1
+    j = 0
+    for cell in range(n_cells):
+        i = cell_argmax[cell]
+        if i == -1:
+            continue
+        should_insert[j] = i
+
+        if threshold_min == -np.inf:
+            new_threshold[j] = objective[i]
+        else:
+            # Batch threshold update described in Fontaine 2023
+            # (https://arxiv.org/abs/2205.10752), based on the mean objective
+            # of all solutions in the batch that could have been inserted into
+            # the cell.
+            threshold = cur_threshold[i] if cur_occupied[i] else value_base
+            ratio = np.float64(ratio_base)**np.float64(cell_count[cell])
+            new_threshold[j] = (ratio * threshold +
+                                (cell_sum[cell] / cell_count[cell]) *
+                                (1.0 - ratio))
+
+        if cur_occupied[i]:
+            objective_delta += (np.float64(objective[i]) -
+                                np.float64(cur_objective[i]))
+        else:
+            objective_delta += np.float64(objective[i])
+        if best == -1 or objective[i] > objective[should_insert[best]]:
+            best = j
+        j += 1
+
+    return status, value, should_insert, new_threshold, objective_delta, best
+
+
+def batch_insertion(indices, objective, cur_occupied, cur_threshold,
+                    cur_objective, threshold_min, learning_rate):
+    """Computes the result of inserting a batch of solutions into the cells of
+    an archive with CMA-MAE thresholds.
+
+    This is the insertion procedure shared by GridArchive, CVTArchive, and
+    CategoricalArchive. A solution can be inserted if its objective exceeds the
+    threshold of its cell (``threshold_min`` for unoccupied cells). Among the
+    solutions that can be inserted into the same cell, the one with the highest
+    objective is inserted, with ties going to the solution that comes first in
+    the batch. The new threshold of each cell is the inserted objective if
+    ``threshold_min`` is -inf; otherwise, it is computed with the CMA-MAE batch
+    threshold update rule.
+
+    All of this happens in a single compiled pass over the batch, rather than
+    through separate masking and ``aggregate`` calls.
+
+    Args:
+        indices (numpy.ndarray): (batch_size,) array of cell indices.
+        objective (numpy.ndarray): (batch_size,) array of objectives.
+        cur_occupied (numpy.ndarray): (batch_size,) array indicating whether
+            each cell in ``indices`` is occupied.
+        cur_threshold (numpy.ndarray): (batch_size,) array with the current
+            threshold of each cell in ``indices``.
+        cur_objective (numpy.ndarray): (batch_size,) array with the objective
+            of the current elite in each cell in ``indices``.
+        threshold_min (float): Threshold of unoccupied cells, in the dtype of
+            the thresholds.
+        learning_rate (float): CMA-MAE learning rate, in the dtype of the
+            thresholds.
+    Returns:
+        tuple: 6-element tuple consisting of:
+
+        - **status**: (batch_size,) int32 array with the status of each
+          solution (see :class:`AddStatus`).
+        - **value**: (batch_size,) array with the value of each solution, i.e.,
+          its objective minus the current threshold of its cell. For new cells,
+          the threshold is taken to be 0 if ``threshold_min`` is -inf and
+          ``threshold_min`` otherwise.
+        - **should_insert**: Positions (in the batch) of the solutions to
+          insert, ordered by increasing cell index. Each cell appears once.
+        - **new_threshold**: Array with the new threshold of the cell of each
+          solution in ``should_insert``.
+        - **objective_delta**: Change in the sum of the objectives of all elites
+          in the archive after the insertion, as a float64.
+        - **best**: Position in ``should_insert`` of the inserted solution with
+          the highest objective (the first one in case of ties), or -1 if
+          nothing is inserted.
+    """
+    dtype = threshold_min.dtype.type
+    value_base = dtype(0.0) if threshold_min == -np.inf else threshold_min
+    # The kernel keeps per-cell statistics in arrays with one entry per cell,
+    # so the cells are renumbered in increasing order of index. This keeps the
+    # arrays as small as the batch even when the archive has billions of cells.
+    _, cells = np.unique(indices, return_inverse=True)
+    return _batch_insertion_nb(cells.reshape(-1), objective, cur_occupied,
+                               cur_threshold, cur_objective, threshold_min,
+                               dtype(1.0 - learning_rate), value_base)
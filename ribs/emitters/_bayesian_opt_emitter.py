@@ -177,6 +177,11 @@ class BayesianOptimizationEmitter(EmitterBase):
 
         self._min_obj = min_obj
 
+        # Objective of every cell in the archive, which is kept up to date with
+        # archive.changes_since() in _get_expected_improvements().
+        self._all_obj = None
+        self._all_obj_token = None
+
     @property
     def batch_size(self):
         """int: Number of solutions to return in :meth:`ask`."""
@@ -353,6 +358,25 @@ class BayesianOptimizationEmitter(EmitterBase):
 
         return rescaled_samples
 
+    def _get_all_obj(self):
+        """Returns an array of shape (:attr:`archive.cells`,) with the objective
+        of the elite in each cell, or :attr:`min_obj` for empty cells.
+
+        The array is cached between calls, and only the cells that changed
+        since the previous call are updated.
+        """
+        changes, self._all_obj_token = self.archive.changes_since(
+            self._all_obj_token, ["index", "objective"])
+        if (changes is None or self._all_obj is None or
+                len(self._all_obj) != self.archive.cells):
+            self._all_obj = np.full((self.archive.cells,), self.min_obj)
+            elite_idx, elite_obj = self.archive.data(["index", "objective"],
+                                                     return_type="tuple")
+            self._all_obj[elite_idx] = elite_obj
+        else:
+            self._all_obj[changes["index"]] = changes["objective"]
+        return self._all_obj
+
     def _get_expected_improvements(self, obj_mus, obj_stds):
         """Computes expected improvements predicted by :attr:`_gp` for a batch
         of solutions over all cells in the current archive. This function
@@ -373,10 +397,7 @@ class BayesianOptimizationEmitter(EmitterBase):
                 each cell.
         """
         num_samples = obj_mus.shape[0]
-        all_obj = np.full((self.archive.cells,), self.min_obj)
-        elite_idx, elite_obj = self.archive.data(["index", "objective"],
-                                                 return_type="tuple")
-        all_obj[elite_idx] = elite_obj
+        all_obj = self._get_all_obj()
 
         distribution = norm(
             loc=np.repeat(all_obj[None, :], num_samples, axis=0),
@@ -1,10 +1,25 @@
 """Provides EmitterBase."""
+import inspect
 import numbers
 from abc import ABC
 
 import numpy as np
 
 
+def _accepts_fields_and_out(sample_elites):
+    """Checks whether an archive's ``sample_elites`` accepts the ``fields`` and
+    ``out`` parameters, which archives written for older versions of pyribs may
+    not."""
+    try:
+        params = inspect.signature(sample_elites).parameters
+    except (TypeError, ValueError):
+        return False
+    if any(param.kind == inspect.Parameter.VAR_KEYWORD
+           for param in params.values()):
+        return True
+    return "fields" in params and "out" in params
+
+
 class EmitterBase(ABC):
     """Base class for emitters.
 
@@ -33,6 +48,8 @@ class EmitterBase(ABC):
     def __init__(self, archive, *, solution_dim, bounds):
         self._archive = archive
         self._solution_dim = solution_dim
+        self._sampled_solutions = None
+        self._sample_with_out = _accepts_fields_and_out(archive.sample_elites)
         (self._lower_bounds,
          self._upper_bounds) = self._process_bounds(bounds, self._solution_dim,
                                                     archive.dtypes["solution"])
@@ -66,6 +83,31 @@ class EmitterBase(ABC):
             upper_bounds[idx] = np.inf if bnd[1] is None else bnd[1]
         return lower_bounds, upper_bounds
 
+    def _sample_solutions(self, n, reuse=True):
+        """Samples the solutions of ``n`` elites from the archive.
+
+        If ``reuse`` is True, the solutions are written into an array that is
+        reused on every call with the same ``n``, so the result is only valid
+        until the next call. Otherwise, the result is a new array. Archives
+        whose ``sample_elites`` does not accept ``fields`` and ``out`` are
+        sampled with ``sample_elites(n)["solution"]`` instead.
+        """
+        if not self._sample_with_out:
+            return self.archive.sample_elites(n)["solution"]
+        if not reuse:
+            return self.archive.sample_elites(n, "solution")
+
+        solution_dim = (self.solution_dim,) \
+                       if isinstance(self.solution_dim, numbers.Integral) \
+                       else self.solution_dim
+        shape = (n,) + tuple(solution_dim)
+        if (self._sampled_solutions is None or
+                self._sampled_solutions.shape != shape):
+            self._sampled_solutions = np.empty(
+                shape, dtype=self.archive.dtypes["solution"])
+        return self.archive.sample_elites(
+            n, "solution", out={"solution": self._sampled_solutions})
+
     @property
     def archive(self):
         """ribs.archives.ArchiveBase: The archive which stores solutions
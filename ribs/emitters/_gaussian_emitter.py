@@ -130,7 +130,7 @@ class GaussianEmitter(EmitterBase):
         if self.archive.empty:
             parents = np.repeat(self.x0[None], repeats=self.batch_size, axis=0)
         else:
-            parents = self.archive.sample_elites(self.batch_size)["solution"]
+            parents = self._sample_solutions(self.batch_size)
 
         noise = self._rng.normal(
             scale=self.sigma,
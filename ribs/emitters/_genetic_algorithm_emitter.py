@@ -127,8 +127,7 @@ class GeneticAlgorithmEmitter(EmitterBase):
                                     repeats=self.batch_size,
                                     axis=0)
             else:
-                parents = self.archive.sample_elites(
-                    self.batch_size)["solution"]
+                parents = self._sample_solutions(self.batch_size)
             return self._clip(self._operator.ask(parents))
 
         elif self._operator.parent_type == 2:
@@ -137,8 +136,7 @@ class GeneticAlgorithmEmitter(EmitterBase):
                                     repeats=2 * self.batch_size,
                                     axis=0)
             else:
-                parents = self.archive.sample_elites(
-                    2 * self.batch_size)["solution"]
+                parents = self._sample_solutions(2 * self.batch_size)
             return self._clip(
                 self._operator.ask(parents.reshape(2, self.batch_size, -1)))
 
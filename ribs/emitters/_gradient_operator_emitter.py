@@ -210,7 +210,7 @@ class GradientOperatorEmitter(EmitterBase):
         if self.archive.empty:
             parents = np.expand_dims(self.x0, axis=0)
         else:
-            parents = self.archive.sample_elites(self.batch_size)["solution"]
+            parents = self._sample_solutions(self.batch_size)
 
         if self._use_isolinedd:
             noise = self._rng.normal(
@@ -219,8 +219,9 @@ class GradientOperatorEmitter(EmitterBase):
                 size=(self.batch_size, self.solution_dim),
             ).astype(self.archive.dtypes["solution"])
 
-            directions = self.archive.sample_elites(
-                self._batch_size)["solution"] - parents
+            # A new array is needed since `parents` is in the reused array.
+            directions = self._sample_solutions(self._batch_size,
+                                                reuse=False) - parents
 
             line_gaussian = self._rng.normal(
                 loc=0.0,
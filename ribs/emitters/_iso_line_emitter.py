@@ -156,8 +156,7 @@ class IsoLineEmitter(EmitterBase):
                                 repeats=2 * self.batch_size,
                                 axis=0)
         else:
-            parents = self.archive.sample_elites(2 *
-                                                 self.batch_size)["solution"]
+            parents = self._sample_solutions(2 * self.batch_size)
 
         parents = parents.reshape(2, self.batch_size, self.solution_dim)
         elites = parents[0]
@@ -4,7 +4,6 @@ import matplotlib.pyplot as plt
 import numpy as np
 import shapely
 from matplotlib.cm import ScalarMappable
-from scipy.spatial import Voronoi  # pylint: disable=no-name-in-module
 
 from ribs.visualize._utils import (archive_heatmap_1d, retrieve_cmap, set_cbar,
                                    validate_df, validate_heatmap_visual_args)
@@ -288,19 +287,13 @@ def cvt_archive_heatmap(archive,
         ax.set_ylim(lower_bounds[1], upper_bounds[1])
         ax.set_aspect(aspect)
 
-        # Add faraway points so that the edge regions of the Voronoi diagram are
-        # filled in. Refer to
+        # The archive computes the Voronoi diagram once and caches it. The
+        # diagram includes faraway points after the centroids so that the edge
+        # regions are filled in. Refer to
         # https://stackoverflow.com/questions/20515554/colorize-voronoi-diagram
         # for more info.
-        interval = upper_bounds - lower_bounds
-        scale = 1000
-        faraway_pts = [
-            upper_bounds + interval * scale,  # Far upper right.
-            upper_bounds + interval * [-1, 1] * scale,  # Far upper left.
-            lower_bounds + interval * [-1, -1] * scale,  # Far bottom left.
-            lower_bounds + interval * [1, -1] * scale,  # Far bottom right.
-        ]
-        vor = Voronoi(np.append(centroids, faraway_pts, axis=0))
+        vor = archive.voronoi(transpose_measures)
+        n_faraway = len(vor.points) - len(centroids)
 
         # Calculate objective value for each region. `vor.point_region` contains
         # the region index of each point.
@@ -308,7 +301,7 @@ def cvt_archive_heatmap(archive,
         min_obj, max_obj = np.inf, -np.inf
         pt_to_obj = dict(zip(index_batch, objective_batch))
         for pt_idx, region_idx in enumerate(
-                vor.point_region[:-4]):  # Exclude faraway_pts.
+                vor.point_region[:-n_faraway]):  # Exclude faraway points.
             if region_idx != -1 and pt_idx in pt_to_obj:
                 obj = pt_to_obj[pt_idx]
                 min_obj = min(min_obj, obj)
@@ -40,6 +40,24 @@ def test_str_dtype_float(name, dtype):
     assert archive.dtypes["index"] == np.int32
 
 
+@pytest.mark.parametrize("name", ARCHIVE_NAMES)
+@pytest.mark.parametrize("single", [True, False], ids=["single", "batch"])
+def test_float32_obj_max(name, single):
+    data = get_archive_data(name, np.float32)
+    archive = data.archive
+    # This objective is not representable in float32.
+    objective = 1.816475940881144
+    if single:
+        archive.add_single(data.solution, objective, data.measures)
+    else:
+        archive.add([data.solution], [objective], [data.measures])
+
+    assert archive.stats.obj_max.dtype == np.float32
+    assert archive.stats.obj_max == np.max(archive.data("objective"))
+    if hasattr(archive, "best_elite"):
+        assert archive.stats.obj_max == archive.best_elite["objective"]
+
+
 def test_dict_dtype():
     archive = GridArchive(
         solution_dim=3,
@@ -96,6 +114,25 @@ def test_iteration():
             [data.grid_indices])[0]
 
 
+def test_iter_batches():
+    data = get_archive_data("GridArchive")
+    data.archive.add(
+        np.tile(data.solution, (3, 1)),
+        [1.0, 2.0, 3.0],
+        [[-1, -1], [0, 0], [1, 1]],
+    )
+
+    batches = list(data.archive.iter_batches(2, ["objective", "index"]))
+    assert [list(batch) for batch in batches] == [["objective", "index"]] * 2
+    assert np.all(
+        np.concatenate([batch["objective"] for batch in batches]) ==
+        data.archive.data("objective"))
+
+    with pytest.raises(RuntimeError):
+        for _ in data.archive.iter_batches(1):
+            data.archive.clear()
+
+
 def test_add_during_iteration(add_mode):
     # Even with just one entry, adding during iteration should still raise an
     # error, just like it does in set.
@@ -292,6 +329,28 @@ def test_best_elite_with_threshold(add_mode):
     assert np.isclose(archive.stats.obj_max, 1.0)
 
 
+def test_best_elite_not_read_before_replacement(add_mode):
+    # Same as above, but the best elite is only read after it was replaced. The
+    # archive must still return the original best elite.
+    archive = GridArchive(solution_dim=3,
+                          dims=[10, 20],
+                          ranges=[(-1, 1), (-2, 2)],
+                          learning_rate=0.1,
+                          threshold_min=0.0)
+
+    if add_mode == "single":
+        archive.add_single([1, 2, 3], 1.0, [0, 0])
+        archive.add_single([4, 5, 6], 0.2, [0, 0])
+    else:
+        archive.add([[1, 2, 3]], [1.0], [[0, 0]])
+        archive.add([[4, 5, 6]], [0.2], [[0, 0]])
+
+    assert np.isclose(archive.best_elite["solution"], [1, 2, 3]).all()
+    assert np.isclose(archive.best_elite["objective"], 1.0)
+    assert np.isclose(archive.best_elite["threshold"], 0.1)
+    assert np.isclose(archive.stats.obj_mean, 0.2)
+
+
 #
 # index_of() and index_of_single() tests
 #
@@ -493,6 +552,30 @@ def test_retrieve_single_wrong_shape(data):
         data.archive.retrieve_single(data.measures[:-1])
 
 
+def test_to_records(data):
+    records = data.archive_with_elite.to_records()
+    assert list(records.dtype.names) == data.archive_with_elite.field_list
+    assert len(records) == 1
+    for name, arr in data.archive_with_elite.data().items():
+        assert np.all(records[name] == arr)
+
+
+def test_changes_since(data):
+    changes, token = data.archive.changes_since(None)
+    assert changes is None
+
+    data.archive.add_single(data.solution, data.objective, data.measures)
+    changes, token = data.archive.changes_since(token, ["index", "objective"])
+    assert np.all(changes["index"] == data.archive.data("index"))
+    assert np.all(changes["objective"] == data.objective)
+
+    indices, token = data.archive.changes_since(token)
+    assert len(indices) == 0
+
+    data.archive.clear()
+    assert data.archive.changes_since(token)[0] is None
+
+
 def test_sample_elites_gets_single_elite(data):
     elites = data.archive_with_elite.sample_elites(2)
     assert np.all(elites["solution"] == data.solution)
@@ -501,11 +584,41 @@ def test_sample_elites_gets_single_elite(data):
     # Avoid checking elite["index"] since the meaning varies by archive.
 
 
+def test_sample_elites_out(data):
+    out = {
+        "solution":
+            np.empty((3,) + data.solution.shape,
+                     dtype=data.archive.dtypes["solution"]),
+    }
+    solution = data.archive_with_elite.sample_elites(3, "solution", out=out)
+    assert solution is out["solution"]
+    assert np.all(solution == data.solution)
+
+    elites = data.archive_with_elite.sample_elites(2, ["objective"])
+    assert list(elites) == ["objective"]
+
+
 def test_sample_elites_fails_when_empty(data):
     with pytest.raises(IndexError):
         data.archive.sample_elites(1)
 
 
+def test_snapshot(data):
+    snapshot = data.archive_with_elite.snapshot()
+    data.archive_with_elite.clear()
+
+    assert data.archive_with_elite.empty
+    assert len(snapshot) == 1
+    assert snapshot.stats.num_elites == 1
+    elite = list(snapshot)[0]
+    assert np.all(elite["solution"] == data.solution)
+    assert np.all(elite["measures"] == data.measures)
+    assert np.all(snapshot.data("objective") == [data.objective])
+
+    with pytest.raises(RuntimeError):
+        snapshot.clear()
+
+
 @pytest.mark.parametrize("name", ARCHIVE_NAMES)
 @pytest.mark.parametrize("with_elite", [True, False], ids=["nonempty", "empty"])
 @pytest.mark.parametrize("dtype", [np.float64, np.float32],
@@ -44,6 +44,20 @@ def test_iterelites(data, df):
         assert elite["index"] == index
 
 
+def test_iter_batches(data, df):
+    batches = list(df.iter_batches(2))
+    assert [len(batch["index"]) for batch in batches] == [2, 2, 1]
+    assert np.all(
+        np.concatenate([batch["objective"] for batch in batches]) == data[1])
+    assert np.all(
+        np.concatenate([batch["solution"] for batch in batches]) == data[0])
+
+
+def test_iter_batches_bad_size(df):
+    with pytest.raises(ValueError):
+        df.iter_batches(0)
+
+
 def test_get_field(data, df):
     (solution_batch, objective_batch, measures_batch, index_batch,
      metadata_batch) = data
@@ -1,18 +1,64 @@
 """Tests for theshold update in archive."""
 import numpy as np
 import pytest
-
-from ribs.archives import CategoricalArchive, CVTArchive, GridArchive
-
-
-@pytest.fixture(params=["grid", "cvt", "categorical"])
+from numpy_groupies import aggregate_nb as aggregate
+
+from ribs.archives import GridArchive
+from ribs.archives._utils import batch_insertion
+
+
+def reference_thresholds(indices, objective, cur_threshold, learning_rate,
+                         dtype):
+    """Computes new thresholds with the CMA-MAE batch threshold update rule.
+
+    This is a reference implementation of the rule with ``aggregate``. If
+    entries in `indices` are duplicated, they receive the same threshold.
+    """
+    if len(indices) == 0:
+        return np.array([], dtype=dtype)
+
+    # Compute the number of objectives inserted into each cell. Note that we
+    # index with `indices` to place the counts at all relevant indices. For
+    # instance, if we had an array [1,2,3,1,5], we would end up with
+    # [2,1,1,2,1] (there are 2 1's, 1 2, 1 3, 2 1's, and 1 5).
+    objective_sizes = aggregate(indices, 1, func="len", fill_value=0)[indices]
+
+    # Compute the sum of the objectives inserted into each cell -- again, we
+    # index with `indices`.
+    objective_sums = aggregate(indices,
+                               objective,
+                               func="sum",
+                               fill_value=np.nan)[indices]
+
+    # Update the threshold with the batch update rule from Fontaine 2023
+    # (https://arxiv.org/abs/2205.10752).
+    ratio = dtype(1.0 - learning_rate)**objective_sizes
+    return (ratio * cur_threshold + (objective_sums / objective_sizes) *
+            (1 - ratio))
+
+
+def batch_insertion_thresholds(indices, objective, cur_threshold, learning_rate,
+                               dtype):
+    """Computes thresholds with batch_insertion, in the same format as
+    reference_thresholds.
+
+    All cells are treated as occupied, and all objectives must exceed the
+    current thresholds of their cells.
+    """
+    _, _, should_insert, new_threshold, _, _ = batch_insertion(
+        indices, objective, np.ones(len(indices), dtype=bool), cur_threshold,
+        np.zeros_like(objective), dtype(0.0), dtype(learning_rate))
+    cells = indices[should_insert]
+    return new_threshold[np.searchsorted(cells, indices)]
+
+
+@pytest.fixture(params=["reference", "batch_insertion"])
 def _compute_thresholds(request):
-    """Grabs the _compute_thresholds func from archives that use it."""
+    """Grabs the reference threshold update as well as the batch_insertion
+    kernel that the archives use in add()."""
     return {
-        # pylint: disable = protected-access
-        "grid": GridArchive._compute_thresholds,
-        "cvt": CVTArchive._compute_thresholds,
-        "categorical": CategoricalArchive._compute_thresholds,
+        "reference": reference_thresholds,
+        "batch_insertion": batch_insertion_thresholds,
     }[request.param]
 
 
@@ -0,0 +1,90 @@
+"""Tests for ArchiveView."""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from ribs.archives import ArchiveView, GridArchive
+
+# pylint: disable = redefined-outer-name
+
+
+def make_archive(**kwargs):
+    """Creates a small GridArchive."""
+    return GridArchive(solution_dim=3,
+                       dims=[10, 20],
+                       ranges=[(-1, 1), (-2, 2)],
+                       **kwargs)
+
+
+@pytest.fixture
+def archive():
+    """GridArchive in shared memory, which is released after the test."""
+    archive = make_archive(shared_memory=True)
+    yield archive
+    archive.release_shared_memory()
+
+
+def test_not_shared():
+    assert make_archive().shm_name is None
+
+
+def test_read_live_data(archive):
+    view = ArchiveView(archive.shm_name,
+                       index_of=make_archive().index_of,
+                       seed=42)
+    assert view.empty
+    with pytest.raises(IndexError):
+        view.sample_elites(2)
+
+    archive.add([[1, 2, 3], [4, 5, 6]], [1.0, 2.0], [[0, 0], [0.5, 1.0]])
+    assert len(view) == 2
+    assert view.generation == archive.generation
+    assert view.field_list == archive.field_list
+
+    occupied, data = view.retrieve([[0, 0], [-0.9, -1.9]])
+    assert np.all(occupied == [True, False])
+    assert np.all(data["solution"][0] == [1, 2, 3])
+    assert np.isnan(data["objective"][1])
+
+    assert np.all(
+        np.sort(view.data("objective")) == np.sort(archive.data("objective")))
+
+    elites = view.sample_elites(5)
+    assert elites["solution"].shape == (5, 3)
+    assert np.all(np.isin(elites["objective"], [1.0, 2.0]))
+
+    view.close()
+
+
+def test_retrieve_without_index_of(archive):
+    view = ArchiveView(archive.shm_name)
+    with pytest.raises(RuntimeError):
+        view.retrieve([[0, 0]])
+    view.close()
+
+
+def test_release(archive):
+    view = ArchiveView(archive.shm_name)
+    archive.release_shared_memory()
+    with pytest.raises(RuntimeError):
+        len(view)
+    view.close()
+
+
+def sample_objectives(name):
+    """Samples from an archive in a worker process."""
+    view = ArchiveView(name, seed=42)
+    objective = view.sample_elites(10)["objective"]
+    view.close()
+    return objective
+
+
+def test_read_from_worker_process(archive):
+    archive.add([[1, 2, 3], [4, 5, 6]], [1.0, 2.0], [[0, 0], [0.5, 1.0]])
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        objective = executor.submit(sample_objectives,
+                                    archive.shm_name).result()
+
+    assert np.all(np.isin(objective, [1.0, 2.0]))
@@ -1,8 +1,12 @@
 """Tests for ArrayStore."""
+import os
+import pickle
+
 import numpy as np
 import pytest
 
-from ribs.archives import ArrayStore
+from ribs.archives import ArrayStore, BFloat16Codec, Float16Codec, Int8Codec
+from ribs.archives import _array_store as array_store
 
 # pylint: disable = redefined-outer-name
 
@@ -338,6 +342,224 @@ def test_retrieve_single_field(store):
     assert np.all(data == [2.0, 1.0])
 
 
+def test_retrieve_views(store):
+    store.add(
+        [3, 4],
+        {
+            "objective": [1.0, 2.0],
+            "measures": [[1.0, 2.0], [3.0, 4.0]],
+            "solution": [np.zeros(10), np.ones(10)],
+        },
+    )
+    generation = store.generation
+
+    occupied, data = store.retrieve([3, 4, 5], copy=False)
+
+    assert np.all(occupied == [True, True, False])
+    assert np.all(data["index"] == [3, 4, 5])
+    assert np.all(data["objective"][:2] == [1.0, 2.0])
+    for arr in [occupied, *data.values()]:
+        assert not arr.flags.writeable
+    assert np.shares_memory(data["solution"],
+                            store.data(copy=False)["solution"])
+
+    # Views reflect later modifications, which are signaled by the generation.
+    store.add(
+        [3],
+        {
+            "objective": [5.0],
+            "measures": [[1.0, 2.0]],
+            "solution": [np.zeros(10)],
+        },
+    )
+    assert store.generation == generation + 1
+    assert data["objective"][0] == 5.0
+
+
+def test_retrieve_views_fallback_to_copy(store):
+    store.add(
+        [3, 5],
+        {
+            "objective": [1.0, 2.0],
+            "measures": [[1.0, 2.0], [3.0, 4.0]],
+            "solution": [np.zeros(10), np.ones(10)],
+        },
+    )
+
+    # Non-contiguous and unordered indices cannot be represented as views.
+    for indices in [[3, 5], [4, 3], [3, 3]]:
+        _, data = store.retrieve(indices, "objective", copy=False)
+        assert data.flags.writeable
+        assert data.flags.owndata
+
+
+def test_retrieve_out(store):
+    store.add(
+        [3, 5],
+        {
+            "objective": [1.0, 2.0],
+            "measures": [[1.0, 2.0], [3.0, 4.0]],
+            "solution": [np.zeros(10), np.ones(10)],
+        },
+    )
+    out = {
+        "solution": np.empty((3, 10), dtype=np.float32),
+        "index": np.empty(3, dtype=np.int32),
+    }
+
+    for copy in [True, False]:
+        occupied, data = store.retrieve([5, 3, 5], ["solution", "index"],
+                                        copy=copy,
+                                        out=out)
+        assert np.all(occupied)
+        assert data["solution"] is out["solution"]
+        assert data["index"] is out["index"]
+        assert np.all(out["solution"][:, 0] == [1.0, 0.0, 1.0])
+        assert np.all(out["index"] == [5, 3, 5])
+
+    # Fields without a buffer are allocated as usual, and buffers for fields
+    # that are not retrieved are ignored.
+    _, objective = store.retrieve([3], "objective", out=out)
+    assert objective[0] == 1.0
+
+    _, data = store.retrieve([3, 4, 5], copy=False, out=out)
+    assert data["solution"] is out["solution"]
+    assert data["solution"].flags.writeable
+
+
+@pytest.mark.parametrize("buf", [
+    np.empty((2, 10), dtype=np.float32),
+    np.empty((3, 10), dtype=np.float64),
+],
+                         ids=["shape", "dtype"])
+def test_retrieve_out_mismatch(store, buf):
+    with pytest.raises(ValueError):
+        store.retrieve([0, 1, 2], "solution", out={"solution": buf})
+
+
+def add_range(store, indices):
+    """Adds entries whose objective equals their index."""
+    store.add(
+        indices,
+        {
+            "objective": indices,
+            "measures": np.stack([indices, indices], axis=1),
+            "solution": np.repeat(np.asarray(indices)[:, None], 10, axis=1),
+        },
+    )
+
+
+def test_remove(store):
+    add_range(store, np.arange(8))
+
+    store.remove([1, 6, 6, 9])
+
+    assert len(store) == 6
+    assert set(store.occupied_list) == {0, 2, 3, 4, 5, 7}
+    assert np.all(store.occupied == np.isin(np.arange(10), [0, 2, 3, 4, 5, 7]))
+    data = store.data()
+    assert np.all(data["objective"] == data["index"])
+
+    # The position map stays consistent with later additions and removals.
+    add_range(store, np.array([1, 8]))
+    store.remove([0, 8, 7])
+    assert set(store.occupied_list) == {1, 2, 3, 4, 5}
+    store.remove(np.arange(10))
+    assert len(store) == 0
+
+
+def test_remove_during_iteration(store):
+    add_range(store, np.arange(2))
+    with pytest.raises(RuntimeError):
+        for _ in store:
+            store.remove([0])
+
+
+@pytest.mark.parametrize("capacity", [None, 4, 20])
+def test_compact(store, capacity):
+    add_range(store, np.arange(8))
+    store.remove([0, 3, 6, 7])
+
+    index_map = store.compact(capacity)
+
+    assert store.capacity == (10 if capacity is None else capacity)
+    assert np.all(index_map == [-1, 0, 1, -1, 2, 3, -1, -1, -1, -1])
+    assert np.all(store.occupied_list == [0, 1, 2, 3])
+    assert np.all(store.occupied[:4]) and not np.any(store.occupied[4:])
+    assert np.all(store.data("objective") == [1, 2, 4, 5])
+
+    add_range(store, np.array([3]))
+    assert len(store) == 4
+
+
+def test_to_records(store):
+    add_range(store, np.array([6, 2, 4, 8]))
+
+    records = store.to_records(chunk_size=3)
+
+    assert records.dtype.names == ("objective", "measures", "solution", "index")
+    assert records["measures"].shape == (4, 2)
+    assert records["index"].dtype == np.int32
+    for name, arr in store.data().items():
+        assert np.all(records[name] == arr)
+
+    assert store.to_records("objective").dtype.names == ("objective",)
+    with pytest.raises(ValueError):
+        store.to_records(["foo"])
+
+
+def test_changes_since(store, monkeypatch):
+    indices, token = store.changes_since(None)
+    assert indices is None
+
+    add_range(store, np.array([3, 1]))
+    add_range(store, np.array([1, 5]))
+    indices, token = store.changes_since(token)
+    assert indices.dtype == np.int32
+    assert np.all(indices == [1, 3, 5])
+
+    # Nothing changed since the last token.
+    indices, token = store.changes_since(token)
+    assert len(indices) == 0
+
+    # Removals require a full refresh.
+    store.remove([1])
+    assert store.changes_since(token)[0] is None
+
+    # So does a token from another store.
+    other = ArrayStore(store.field_desc, 10)
+    assert store.changes_since(other.changes_since(None)[1])[0] is None
+
+    # So does overflowing the log.
+    monkeypatch.setattr(array_store, "_CHANGE_LOG_SIZE", 2)
+    _, token = store.changes_since(None)
+    add_range(store, np.array([7]))
+    _, new_token = store.changes_since(token)
+    add_range(store, np.array([8, 9]))
+    assert store.changes_since(token)[0] is None
+    assert np.all(store.changes_since(new_token)[0] == [8, 9])
+
+
+def test_compact_bad_capacity(store):
+    add_range(store, np.arange(8))
+    with pytest.raises(ValueError):
+        store.compact(7)
+
+
+def test_log_remove_compact(tmp_path, store):
+    store.start_log(tmp_path)
+    add_range(store, np.arange(8))
+    store.remove([2, 5])
+    store.compact(6)
+    store.close_log()
+
+    loaded = ArrayStore.load_log(tmp_path)
+
+    assert loaded.capacity == 6
+    assert np.all(loaded.occupied_list == np.arange(6))
+    assert np.all(loaded.data("objective") == [0, 1, 3, 4, 6, 7])
+
+
 def test_resize_bad_capacity(store):
     with pytest.raises(ValueError):
         store.resize(store.capacity)
@@ -429,6 +651,409 @@ def test_from_raw_dict(store):
     assert np.all(data["index"] == [5, 3])
 
 
+def test_memmap_object_dtype(tmp_path):
+    with pytest.raises(ValueError):
+        ArrayStore({"measures": ((2,), object)}, 10, memmap_dir=tmp_path)
+
+
+def test_memmap_add_resize_reopen(tmp_path):
+    field_desc = {
+        "objective": ((), np.float32),
+        "measures": ((2,), np.float32),
+        "solution": ((10,), np.float32),
+    }
+    store = ArrayStore(field_desc, 10, memmap_dir=tmp_path)
+    assert store.memmap_dir == str(tmp_path)
+    assert isinstance(store.as_raw_dict()["fields.solution"], np.memmap)
+
+    store.add(
+        [3, 5],
+        {
+            "objective": [1.0, 2.0],
+            "measures": [[1.0, 2.0], [3.0, 4.0]],
+            "solution": [np.zeros(10), np.ones(10)],
+        },
+    )
+    store.resize(20)
+    store.add(
+        [15],
+        {
+            "objective": [3.0],
+            "measures": [[5.0, 6.0]],
+            "solution": [np.full(10, 2.0)],
+        },
+    )
+
+    # The capacity passed in is ignored since the store is not empty.
+    reopened = ArrayStore(field_desc, 10, memmap_dir=tmp_path)
+
+    assert reopened.capacity == 20
+    assert len(reopened) == 3
+    assert np.all(np.sort(reopened.occupied_list) == [3, 5, 15])
+    assert np.all(reopened.as_raw_dict()["props.updates"] == [2, 0])
+
+    occupied, data = reopened.retrieve([15, 5, 3])
+    assert np.all(occupied)
+    assert np.all(data["objective"] == [3.0, 2.0, 1.0])
+    assert np.all(
+        data["solution"] == [np.full(
+            10, 2.0), np.ones(10), np.zeros(10)])
+
+
+def test_memmap_reopen_wrong_fields(tmp_path):
+    store = ArrayStore({"objective": ((), np.float32)}, 10, memmap_dir=tmp_path)
+    store.add([0], {"objective": [1.0]})
+
+    with pytest.raises(ValueError):
+        ArrayStore({"objective": ((), np.float64)}, 10, memmap_dir=tmp_path)
+
+
+def test_memmap_reopen_empty_uses_new_capacity(tmp_path):
+    ArrayStore({"objective": ((), np.float32)}, 10, memmap_dir=tmp_path)
+    store = ArrayStore({"objective": ((), np.float32)}, 5, memmap_dir=tmp_path)
+    assert store.capacity == 5
+    assert len(store) == 0
+
+
+def test_memmap_pickle_is_in_memory(tmp_path):
+    store = ArrayStore({"objective": ((), np.float32)}, 10, memmap_dir=tmp_path)
+    store.add([0], {"objective": [1.0]})
+
+    new_store = pickle.loads(pickle.dumps(store))
+    new_store.add([0], {"objective": [2.0]})
+
+    assert new_store.memmap_dir is None
+    assert store.retrieve([0], "objective")[1][0] == 1.0
+
+
+def test_snapshot(store, monkeypatch):
+    # Use chunks of 4 rows in the "solution" field.
+    monkeypatch.setattr(array_store, "_SNAPSHOT_CHUNK_BYTES", 160)
+    add_range(store, np.arange(6))
+    expected = store.data()
+
+    snapshot = store.snapshot()
+    assert snapshot.snapshot() is snapshot
+    assert snapshot.generation == store.generation
+
+    store.add([1], {
+        "objective": [10.0],
+        "measures": [[0.0, 0.0]],
+        "solution": [np.zeros(10)],
+    })
+    # Only the chunk that was written is copied.
+    # pylint: disable-next = protected-access
+    assert list(snapshot._fields["solution"].chunks) == [0]
+
+    store.remove([2, 3])
+    store.compact()
+    store.clear()
+
+    assert len(store) == 0
+    assert len(snapshot) == 6
+    data = snapshot.data()
+    for name, arr in expected.items():
+        assert np.all(data[name] == arr)
+    assert [entry["index"] for entry in snapshot] == list(range(6))
+
+    with pytest.raises(RuntimeError):
+        snapshot.clear()
+
+
+def test_snapshot_memmap_resize(tmp_path):
+    store = ArrayStore({"objective": ((), np.float32)}, 10, memmap_dir=tmp_path)
+    store.add([0, 1], {"objective": [1.0, 2.0]})
+    snapshot = store.snapshot()
+
+    store.resize(20)
+    store.add([0], {"objective": [3.0]})
+
+    assert np.all(snapshot.data("objective") == [1.0, 2.0])
+
+
+@pytest.fixture
+def shared_store():
+    """ArrayStore in shared memory, which is released after the test."""
+    store = ArrayStore(
+        field_desc={
+            "objective": ((), np.float32),
+            "measures": ((2,), np.float32),
+        },
+        capacity=10,
+        shared_memory=True,
+    )
+    yield store
+    store.release_shared_memory()
+
+
+def test_shared_memory_bad_args(tmp_path):
+    with pytest.raises(ValueError):
+        ArrayStore({"measures": ((2,), object)}, 10, shared_memory=True)
+    with pytest.raises(ValueError):
+        ArrayStore({"objective": ((), np.float32)},
+                   10,
+                   memmap_dir=tmp_path,
+                   shared_memory=True)
+
+
+def test_shared_memory_attach(shared_store):
+    shared_store.add([3, 5], {
+        "objective": [1.0, 2.0],
+        "measures": [[1.0, 2.0], [3.0, 4.0]],
+    })
+
+    reader = ArrayStore.attach(shared_store.shm_name)
+    data = reader.consistent_read(lambda store: store.data())
+    assert np.all(data["index"] == [3, 5])
+    assert np.all(data["measures"] == [[1.0, 2.0], [3.0, 4.0]])
+    assert reader.generation == shared_store.generation
+
+    # The reader sees later additions, including ones after a resize.
+    shared_store.resize(20)
+    shared_store.add([15], {"objective": [3.0], "measures": [[5.0, 6.0]]})
+    capacity, objective = reader.consistent_read(
+        lambda store: (store.capacity, store.data("objective")))
+    assert capacity == 20
+    assert np.all(objective == [1.0, 2.0, 3.0])
+
+    with pytest.raises(RuntimeError):
+        reader.add([0], {"objective": [1.0], "measures": [[0.0, 0.0]]})
+
+    reader.detach()
+
+
+def test_shared_memory_torn_read(shared_store):
+    reader = ArrayStore.attach(shared_store.shm_name)
+
+    # pylint: disable-next = protected-access
+    with shared_store._writing():
+        # The store is in the middle of a modification.
+        with pytest.raises(TimeoutError):
+            reader.consistent_read(len, timeout=0.01)
+
+    calls = []
+
+    def read(store):
+        calls.append(None)
+        if len(calls) == 1:
+            # Simulates an addition that overlaps the first read.
+            shared_store.add([0], {
+                "objective": [1.0],
+                "measures": [[0.0, 0.0]]
+            })
+        return len(store)
+
+    assert reader.consistent_read(read) == 1
+    assert len(calls) == 2
+
+    reader.detach()
+
+
+def test_shared_memory_release(shared_store):
+    shared_store.add([0], {"objective": [1.0], "measures": [[0.0, 0.0]]})
+    reader = ArrayStore.attach(shared_store.shm_name)
+
+    # Pickling copies the store into memory.
+    new_store = pickle.loads(pickle.dumps(shared_store))
+    assert new_store.shm_name is None
+    assert len(new_store) == 1
+
+    shared_store.release_shared_memory()
+    assert shared_store.shm_name is None
+    shared_store.add([1], {"objective": [2.0], "measures": [[0.0, 0.0]]})
+    assert len(shared_store) == 2
+
+    with pytest.raises(RuntimeError):
+        reader.consistent_read(len)
+    reader.detach()
+
+
+def test_log_replay(tmp_path, store):
+    store.add(
+        [3, 5],
+        {
+            "objective": [1.0, 2.0],
+            "measures": [[1.0, 2.0], [3.0, 4.0]],
+            "solution": [np.zeros(10), np.ones(10)],
+        },
+    )
+    store.start_log(tmp_path)
+    store.add(
+        [5, 7, 7],
+        {
+            "objective": [3.0, 4.0, 5.0],
+            "measures": [[5.0, 6.0], [7.0, 8.0], [9.0, 10.0]],
+            "solution": [np.full(10, 2.0),
+                         np.full(10, 3.0),
+                         np.full(10, 4.0)],
+        },
+    )
+    store.resize(20)
+    store.add(
+        [15],
+        {
+            "objective": [6.0],
+            "measures": [[1.0, 1.0]],
+            "solution": [np.zeros(10)],
+        },
+    )
+    store.sync_log()
+
+    loaded = ArrayStore.load_log(tmp_path)
+
+    assert loaded.capacity == 20
+    assert loaded.generation == store.generation
+    assert np.all(loaded.occupied == store.occupied)
+    assert np.all(loaded.occupied_list == store.occupied_list)
+    for name, arr in store.data().items():
+        assert np.all(loaded.data(name) == arr)
+
+
+def test_log_clear_and_compact(tmp_path, store):
+    store.start_log(tmp_path)
+    store.add(
+        [3],
+        {
+            "objective": [1.0],
+            "measures": [[1.0, 2.0]],
+            "solution": [np.zeros(10)],
+        },
+    )
+    store.clear()
+    store.add(
+        [4],
+        {
+            "objective": [2.0],
+            "measures": [[3.0, 4.0]],
+            "solution": [np.ones(10)],
+        },
+    )
+    store.compact_log()
+    assert os.path.getsize(tmp_path / "log.bin") == 0
+    store.close_log()
+    assert store.log_dir is None
+
+    loaded = ArrayStore.load_log(tmp_path)
+
+    assert np.all(loaded.occupied_list == [4])
+    assert np.all(loaded.data("objective") == [2.0])
+    assert loaded.generation == store.generation
+
+
+def test_log_torn_record(tmp_path, store):
+    store.start_log(tmp_path)
+    for i in range(2):
+        store.add(
+            [i],
+            {
+                "objective": [i],
+                "measures": [[i, i]],
+                "solution": [np.full(10, i)],
+            },
+        )
+    store.close_log()
+
+    # Simulate a crash in the middle of writing the second record.
+    log_path = tmp_path / "log.bin"
+    os.truncate(log_path, os.path.getsize(log_path) - 5)
+
+    loaded = ArrayStore.load_log(tmp_path, resume=True)
+    assert np.all(loaded.occupied_list == [0])
+
+    # New records go after the last valid record.
+    loaded.add(
+        [9],
+        {
+            "objective": [9.0],
+            "measures": [[9.0, 9.0]],
+            "solution": [np.zeros(10)],
+        },
+    )
+    loaded.close_log()
+    assert np.all(ArrayStore.load_log(tmp_path).occupied_list == [0, 9])
+
+
+def test_log_object_dtype(tmp_path):
+    store = ArrayStore({"obj": (2, object), "objective": ((), np.float32)}, 10)
+    store.add([1, 4], {"obj": [["a", 1], ["b", 2]], "objective": [1.0, 2.0]})
+    store.start_log(tmp_path)
+    store.add([4, 7], {"obj": [["c", 3], ["d", None]], "objective": [3.0, 4.0]})
+    store.close_log()
+
+    loaded = ArrayStore.load_log(tmp_path)
+    assert loaded.dtypes["obj"] == np.object_
+    assert np.all(loaded.occupied_list == [1, 4, 7])
+    assert loaded.retrieve([1, 4, 7], "obj")[1].tolist() == [["a", 1], ["c", 3],
+                                                             ["d", None]]
+    assert np.all(loaded.retrieve([1, 4, 7], "objective")[1] == [1, 3, 4])
+
+
+@pytest.mark.parametrize(
+    ("codec", "tol"),
+    [(Float16Codec(), 1e-3), (BFloat16Codec(), 1e-2), (Int8Codec(), 1e-2)],
+    ids=["float16", "bfloat16", "int8"],
+)
+def test_codec_round_trip(codec, tol):
+    store = ArrayStore({"solution": ((4, 5), codec)}, 10)
+    solution = np.random.default_rng(42).uniform(-1, 1, (3, 4, 5))
+    store.add([1, 3, 5], {"solution": solution})
+
+    assert store.field_desc["solution"] == ((4, 5), codec)
+    assert store.dtypes["solution"] == np.float32
+
+    _, data = store.retrieve([1, 3, 5])
+    assert data["solution"].dtype == np.float32
+    assert data["solution"].shape == (3, 4, 5)
+    assert np.allclose(data["solution"], solution, atol=tol)
+
+    for entry in store:
+        assert entry["solution"].shape == (4, 5)
+
+
+def test_codec_int8_storage():
+    store = ArrayStore({"solution": ((100,), Int8Codec())}, 10)
+    store.add([0, 1], {"solution": [np.linspace(-5, 5, 100), np.full(100, 3)]})
+
+    # Each row holds 100 codes plus a float32 scale and offset.
+    raw = store.as_raw_dict()["fields.solution"]
+    assert raw.dtype == np.int8
+    assert raw.shape == (10, 108)
+
+    _, data = store.retrieve([0, 1])
+    assert np.allclose(data["solution"][0],
+                       np.linspace(-5, 5, 100),
+                       atol=10 / 255 / 2 + 1e-6)
+    assert np.all(data["solution"][1] == 3)
+
+
+def test_codec_log_replay(tmp_path):
+    field_desc = {"solution": ((3,), Float16Codec()), "objective": ((), float)}
+    store = ArrayStore(field_desc, 10)
+    store.start_log(tmp_path)
+    store.add([2, 4], {"solution": [[1, 2, 3], [4, 5, 6]], "objective": [1, 2]})
+    store.sync_log()
+
+    loaded = ArrayStore.load_log(tmp_path, field_desc=field_desc)
+    assert loaded.field_desc == store.field_desc
+    assert np.all(loaded.data("solution") == [[1, 2, 3], [4, 5, 6]])
+
+
+def test_codec_shared_memory():
+    store = ArrayStore({"solution": ((3,), Int8Codec())},
+                       10,
+                       shared_memory=True)
+    try:
+        store.add([2, 4], {"solution": [[1, 2, 3], [4, 5, 6]]})
+        reader = ArrayStore.attach(store.shm_name)
+        assert np.allclose(
+            reader.consistent_read(lambda store: store.data("solution")),
+            [[1, 2, 3], [4, 5, 6]],
+            atol=1e-2)
+        reader.detach()
+    finally:
+        store.release_shared_memory()
+
+
 def test_data(store):
     store.add(
         [3, 5],
@@ -543,6 +1168,44 @@ def test_iteration(store):
         assert np.all(entry["index"] == [3])
 
 
+def test_iter_batches(store):
+    store.add(
+        [3, 5, 7],
+        {
+            "objective": [1.0, 2.0, 3.0],
+            "measures": [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]],
+            "solution": [np.zeros(10),
+                         np.ones(10),
+                         np.full(10, 2.0)],
+        },
+    )
+
+    batches = list(store.iter_batches(2))
+    assert [len(batch["index"]) for batch in batches] == [2, 1]
+    assert np.all(
+        np.concatenate([batch["index"]
+                        for batch in batches]) == store.occupied_list)
+    assert np.all(batches[1]["solution"] == [np.full(10, 2.0)])
+
+    assert [
+        list(objective) for objective in store.iter_batches(2, "objective")
+    ] == [[1.0, 2.0], [3.0]]
+
+
+def test_iter_batches_modified(store):
+    store.add(
+        [3, 5], {
+            "objective": [1.0, 2.0],
+            "measures": [[1.0, 2.0], [3.0, 4.0]],
+            "solution": [np.zeros(10), np.ones(10)],
+        })
+    with pytest.raises(RuntimeError):
+        for _ in store.iter_batches(2):
+            store.clear()
+    with pytest.raises(ValueError):
+        next(store.iter_batches(0))
+
+
 def test_add_during_iteration(store):
     store.add(
         [3],
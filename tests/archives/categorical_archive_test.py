@@ -1,5 +1,6 @@
 """Tests for the CategoricalArchive."""
 import numpy as np
+import pytest
 
 from ribs.archives import CategoricalArchive
 
@@ -75,3 +76,57 @@ def test_str_solutions():
         measures_batch=[["A", "Four"], ["B", "Three"], ["C", "One"]],
         grid_indices_batch=[[0, 3], [1, 2], [2, 0]],
     )
+
+
+def test_from_records():
+    kwargs = {
+        "solution_dim": 2,
+        "categories": [
+            ["A", "B", "C"],
+            ["One", "Two", "Three", "Four"],
+        ],
+    }
+    archive = CategoricalArchive(**kwargs)
+    archive.add([[1, 2], [3, 4]], [1.0, 2.0], [["A", "One"], ["C", "Four"]])
+    records = archive.to_records()
+
+    loaded = CategoricalArchive.from_records(
+        records[["solution", "objective", "measures"]], **kwargs)
+
+    assert loaded.stats == archive.stats
+    assert np.all(loaded.data("index") == [0, 11])
+    assert np.all(loaded.data("measures") == archive.data("measures"))
+
+
+def test_checkpoint_restore(tmp_path):
+    kwargs = {
+        "solution_dim": 2,
+        "categories": [
+            ["A", "B", "C"],
+            ["One", "Two", "Three", "Four"],
+        ],
+    }
+    archive = CategoricalArchive(**kwargs)
+    archive.add_single([1, 2], 1.0, ["A", "One"])
+    archive.checkpoint(tmp_path)
+    archive.add([[3, 4], [5, 6]], [2.0, 3.0], [["C", "Four"], ["A", "One"]])
+    archive.checkpoint(tmp_path)
+
+    restored = CategoricalArchive(**kwargs)
+    restored.restore(tmp_path)
+
+    assert restored.stats == archive.stats
+    assert np.all(restored.data("index") == [0, 11])
+    assert np.all(restored.data("measures") == archive.data("measures"))
+    assert np.all(restored.best_elite["solution"] == [5, 6])
+
+    # The restored archive continues logging to the same directory.
+    restored.add_single([7, 8], 4.0, ["B", "Two"])
+    restored.checkpoint(tmp_path, compact=True)
+    archive.restore(tmp_path)
+    assert len(archive) == 3
+    assert archive.retrieve_single(["B", "Two"])[1]["objective"] == 4.0
+
+    with pytest.raises(ValueError):
+        CategoricalArchive(solution_dim=2, categories=[["A",
+                                                        "B"]]).restore(tmp_path)
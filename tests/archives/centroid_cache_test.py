@@ -0,0 +1,111 @@
+"""Tests for CentroidCache."""
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ribs.archives import CentroidCache
+
+
+def test_key_depends_on_params():
+    params = {"cells": 10, "samples": np.arange(6).reshape(3, 2), "seed": 1}
+    key = CentroidCache.key(params)
+
+    assert key == CentroidCache.key(dict(params))
+    assert key != CentroidCache.key({**params, "seed": 2})
+    assert key != CentroidCache.key({
+        **params, "samples": np.arange(1, 7).reshape(3, 2)
+    })
+
+
+def test_save_and_load(tmp_path):
+    cache = CentroidCache(tmp_path / "cache")
+    assert cache.load("missing") is None
+
+    cache.save("entry", {"centroids": np.ones((3, 2)), "samples": np.zeros(4)})
+    arrays = cache.load("entry")
+
+    assert set(arrays) == {"centroids", "samples"}
+    assert np.all(arrays["centroids"] == 1)
+    assert not arrays["centroids"].flags.writeable
+
+    # Saving an existing entry leaves it as is.
+    cache.save("entry", {"centroids": np.zeros((3, 2))})
+    assert np.all(cache.load("entry")["centroids"] == 1)
+    assert sorted(path.name for path in cache.directory.iterdir()) == ["entry"]
+
+
+def test_get_computes_once(tmp_path):
+    cache = CentroidCache(tmp_path)
+    n_computed = 0
+
+    def compute():
+        nonlocal n_computed
+        n_computed += 1
+        time.sleep(0.2)
+        return {"centroids": np.arange(5)}
+
+    results = [{}] * 4
+
+    def get(i):
+        results[i] = cache.get({"cells": 5}, compute, poll_interval=0.01)
+
+    threads = [threading.Thread(target=get, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert n_computed == 1
+    for arrays in results:
+        assert np.all(arrays["centroids"] == np.arange(5))
+    assert not list(tmp_path.glob("*.lock"))
+
+
+def write_lock(cache, params, pid):
+    """Writes a lock for the entry of the given parameters as if it were held
+    by the given process."""
+    lock_path = cache.directory / f"{cache.key(params)}.lock"
+    lock_path.write_text(
+        json.dumps({
+            "host": socket.gethostname(),
+            "pid": pid,
+            "time": time.time(),
+        }))
+    return lock_path
+
+
+@pytest.mark.skipif(os.name != "posix", reason="Requires POSIX")
+def test_get_breaks_stale_lock(tmp_path):
+    cache = CentroidCache(tmp_path)
+    # PID of a process that has exited.
+    with subprocess.Popen([sys.executable, "-c", "pass"]) as process:
+        process.wait()
+    write_lock(cache, {"cells": 5}, process.pid)
+
+    arrays = cache.get({"cells": 5},
+                       lambda: {"centroids": np.arange(5)},
+                       poll_interval=0.01,
+                       timeout=5)
+
+    assert np.all(arrays["centroids"] == np.arange(5))
+    assert not list(tmp_path.glob("*.lock*"))
+
+
+def test_get_timeout(tmp_path):
+    cache = CentroidCache(tmp_path)
+    # The lock is held by a live process, i.e., this one.
+    lock_path = write_lock(cache, {"cells": 5}, os.getpid())
+
+    with pytest.raises(TimeoutError, match=re.escape(str(lock_path))):
+        cache.get({"cells": 5},
+                  lambda: {"centroids": np.arange(5)},
+                  poll_interval=0.01,
+                  timeout=0.1)
@@ -0,0 +1,125 @@
+"""Tests for the centroid indices."""
+import numpy as np
+import pytest
+
+from ribs.archives import (AutoIndex, BruteForceIndex, GEMMIndex, GraphIndex,
+                           IVFIndex, KDTreeIndex)
+
+# pylint: disable = redefined-outer-name
+
+
+@pytest.fixture(params=[2, 20])
+def centroids(request):
+    """Random centroids in a low and a high-dimensional measure space."""
+    return np.random.default_rng(42).uniform(-1, 1, (2000, request.param))
+
+
+@pytest.fixture
+def measures(centroids):
+    """Points to look up in the centroid indices."""
+    return np.random.default_rng(0).uniform(-1, 1, (500, centroids.shape[1]))
+
+
+@pytest.fixture
+def nearest(centroids, measures):
+    """Exact nearest centroids to the measures."""
+    return np.argmin(np.sum(np.square(measures[:, None] - centroids), axis=2),
+                     axis=1)
+
+
+@pytest.mark.parametrize("index_class",
+                         [KDTreeIndex, BruteForceIndex, GEMMIndex, AutoIndex])
+def test_exact_indices(index_class, centroids, measures, nearest):
+    indices = index_class(centroids).query(measures)
+    assert indices.dtype == np.int32
+    assert np.all(indices == nearest)
+
+
+def test_brute_force_chunks(centroids, measures, nearest):
+    index = BruteForceIndex(centroids, chunk_size=64)
+    assert np.all(index.query(measures) == nearest)
+
+
+def test_kd_tree_workers(centroids, measures, nearest):
+    index = KDTreeIndex(centroids, workers=-1)
+    assert np.all(index.query(measures) == nearest)
+
+
+def test_gemm_blocks(centroids, measures, nearest):
+    index = GEMMIndex(centroids, block_size=64)
+    assert np.all(index.query(measures) == nearest)
+    assert np.all(index.query(measures.astype(np.float32)) == nearest)
+
+
+@pytest.mark.parametrize("index_class",
+                         [KDTreeIndex, BruteForceIndex, GEMMIndex, AutoIndex])
+def test_offset_float32_centroids(index_class):
+    # Far from the origin, computing distances from dot products loses most of
+    # the precision of float32.
+    rng = np.random.default_rng(42)
+    centroids = rng.uniform(1000, 1001, (2000, 2)).astype(np.float32)
+    measures = rng.uniform(1000, 1001, (500, 2)).astype(np.float32)
+    expected = KDTreeIndex(centroids).query(measures)
+
+    assert np.all(index_class(centroids).query(measures) == expected)
+
+
+class InexactIndex(GEMMIndex):
+    """GEMMIndex that is always off by one centroid."""
+
+    def query(self, measures):
+        return (GEMMIndex.query(self, measures) + 1) % len(self.centroids)
+
+
+def test_auto_rejects_inexact(centroids, monkeypatch):
+    monkeypatch.setattr("ribs.archives._centroid_index.GEMMIndex", InexactIndex)
+    index = AutoIndex(centroids, seed=42)
+    assert index.times["InexactIndex"] == np.inf
+    assert not isinstance(index.selected, InexactIndex)
+
+
+def test_auto_selects_fastest(centroids):
+    index = AutoIndex(centroids, seed=42)
+    assert set(index.times) == {"KDTreeIndex", "GEMMIndex", "BruteForceIndex"}
+    assert index.times[type(index.selected).__name__] == min(
+        index.times.values())
+
+
+def test_ivf_full_probe_is_exact(centroids, measures, nearest):
+    index = IVFIndex(centroids, n_lists=20, n_probe=20, seed=42)
+    assert index.n_lists == 20
+    assert np.all(index.query(measures) == nearest)
+
+
+def test_ivf_recall_grows_with_n_probe(centroids, measures, nearest):
+    index = IVFIndex(centroids, n_probe=1, seed=42)
+    low_recall = np.mean(index.query(measures) == nearest)
+    index.n_probe = 16
+    high_recall = np.mean(index.query(measures) == nearest)
+
+    assert high_recall >= low_recall
+    assert high_recall > 0.9
+
+
+def test_graph_recall(centroids, measures, nearest):
+    index = GraphIndex(centroids, ef=64, seed=42)
+    indices = index.query(measures)
+    assert indices.dtype == np.int32
+    assert np.mean(indices == nearest) > 0.9
+
+
+def test_graph_tiny():
+    # With a single centroid, the graph has no edges.
+    index = GraphIndex([[0.0, 0.0]])
+    assert np.all(index.query(np.ones((3, 2))) == 0)
+
+
+@pytest.mark.parametrize("kwargs", [{"n_probe": 0}, {"n_lists": 0}])
+def test_ivf_bad_args(kwargs, centroids):
+    with pytest.raises(ValueError):
+        IVFIndex(centroids, **kwargs)
+
+
+def test_graph_bad_args(centroids):
+    with pytest.raises(ValueError):
+        GraphIndex(centroids, ef=0)
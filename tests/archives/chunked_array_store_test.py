@@ -0,0 +1,181 @@
+"""Tests for ChunkedArrayStore."""
+import pickle
+
+import numpy as np
+import pytest
+
+from ribs.archives import ArrayStore, ChunkedArrayStore
+
+# pylint: disable = redefined-outer-name
+
+FIELD_DESC = {
+    "objective": ((), np.float32),
+    "measures": ((2,), np.float32),
+}
+
+
+@pytest.fixture
+def store():
+    """Chunked store with 3 blocks, the last of which is partial."""
+    return ChunkedArrayStore(FIELD_DESC, capacity=10, block_size=4)
+
+
+def make_data(n, start=0.0):
+    """Data for n entries with objectives start, start + 1, ..."""
+    return {
+        "objective": np.arange(start, start + n),
+        "measures": np.zeros((n, 2)),
+    }
+
+
+def test_init_bad_block_size():
+    with pytest.raises(ValueError):
+        ChunkedArrayStore(FIELD_DESC, 10, block_size=0)
+
+
+def test_properties(store):
+    assert store.capacity == 10
+    assert store.block_size == 4
+    assert store.field_list == ["objective", "measures"]
+    assert store.field_list_with_index == ["objective", "measures", "index"]
+    assert store.memmap_dir is None
+
+
+def test_retrieve_across_blocks(store):
+    dense = ArrayStore(FIELD_DESC, 10)
+    indices = [9, 0, 5, 5, 3]
+    for s in [store, dense]:
+        s.add(indices, make_data(5))
+
+    assert len(store) == 4
+    assert np.all(store.occupied_list == [0, 3, 5, 9])
+    assert np.all(store.occupied == dense.occupied)
+
+    occupied, data = store.retrieve([0, 9, 1, 5])
+    dense_occupied, dense_data = dense.retrieve([0, 9, 1, 5])
+    assert np.all(occupied == dense_occupied)
+    for name, arr in data.items():
+        assert arr.dtype == dense_data[name].dtype
+        assert np.all(arr[occupied] == dense_data[name][occupied])
+
+    _, df = store.retrieve([0, 9, 1, 5], return_type="pandas")
+    _, dense_df = dense.retrieve([0, 9, 1, 5], return_type="pandas")
+    assert df[occupied].equals(dense_df[occupied])
+
+    assert np.all(store.retrieve([9, 0], "objective")[1] == [0.0, 1.0])
+
+
+def test_retrieve_out_across_blocks(store):
+    store.add([1, 6, 9], make_data(3))
+    out = {
+        "objective": np.empty(3, dtype=np.float32),
+        "index": np.empty(3, dtype=np.int32),
+    }
+
+    _, data = store.retrieve([9, 1, 6], out=out)
+
+    assert data["objective"] is out["objective"]
+    assert np.all(out["objective"] == [2.0, 0.0, 1.0])
+    assert np.all(out["index"] == [9, 1, 6])
+
+    with pytest.raises(ValueError):
+        store.retrieve([1, 9], out={"objective": np.empty(3, np.float32)})
+
+
+def test_views_within_block(store):
+    store.add([4, 5, 6], make_data(3))
+    _, data = store.retrieve([4, 5, 6], copy=False)
+    assert not data["objective"].flags.writeable
+    assert np.all(data["index"] == [4, 5, 6])
+
+
+def test_out_of_range(store):
+    with pytest.raises(IndexError):
+        store.add([10], make_data(1))
+    with pytest.raises(IndexError):
+        store.retrieve([-1])
+
+
+def test_resize_keeps_blocks(store):
+    store.add([0, 9], make_data(2))
+    # pylint: disable-next = protected-access
+    first_block = store._blocks[0]
+
+    store.resize(13)
+
+    assert store.capacity == 13
+    # pylint: disable-next = protected-access
+    assert store._blocks[0] is first_block
+    store.add([12], make_data(1, 2.0))
+    assert np.all(store.data("objective") == [0.0, 1.0, 2.0])
+
+
+def test_remove_and_compact(store):
+    store.add([1, 3, 6, 9], make_data(4))
+    store.remove([3, 6])
+
+    index_map = store.compact(capacity=3)
+
+    assert np.all(index_map == [-1, 0, -1, -1, -1, -1, -1, -1, -1, 1])
+    assert store.capacity == 3
+    assert np.all(store.occupied_list == [0, 1])
+    assert np.all(store.data("objective") == [0.0, 3.0])
+
+
+def test_changes_since(store):
+    _, token = store.changes_since(None)
+    store.add([9, 1], make_data(2))
+    indices, token = store.changes_since(token)
+    assert np.all(indices == [1, 9])
+
+    # Entries in new blocks count as changed.
+    store.resize(13)
+    store.add([12, 3], make_data(2))
+    indices, token = store.changes_since(token)
+    assert np.all(indices == [3, 12])
+
+    store.remove([3])
+    assert store.changes_since(token)[0] is None
+
+
+def test_iteration(store):
+    store.add([1, 6], make_data(2))
+    assert [entry["index"] for entry in store] == [1, 6]
+    assert [list(batch) for batch in store.iter_batches(1, "index")] == [[1],
+                                                                         [6]]
+
+    with pytest.raises(RuntimeError):
+        for _ in store:
+            store.add([9], make_data(1))
+
+
+def test_snapshot_and_pickle(store):
+    store.add([1, 6], make_data(2))
+    snapshot = store.snapshot()
+    store.clear()
+    store.resize(20)
+
+    assert np.all(snapshot.data("index") == [1, 6])
+    with pytest.raises(RuntimeError):
+        snapshot.resize(30)
+
+    unpickled = pickle.loads(pickle.dumps(snapshot))
+    unpickled.add([9], make_data(1))
+    assert np.all(unpickled.data("index") == [1, 6, 9])
+
+
+def test_log(tmp_path):
+    store = ChunkedArrayStore(FIELD_DESC, capacity=2, block_size=4)
+    store.start_log(tmp_path)
+    store.resize(10)
+    store.add([0, 5, 9], make_data(3))
+    store.remove([5])
+    store.sync_log()
+
+    loaded = ChunkedArrayStore.load_log(tmp_path)
+    assert loaded.capacity == 10
+    assert np.all(loaded.occupied_list == [0, 9])
+    assert np.all(loaded.data("objective") == [0.0, 2.0])
+
+    with pytest.raises(ValueError):
+        ChunkedArrayStore.load_log(tmp_path / "block_0")
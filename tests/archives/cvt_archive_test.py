@@ -71,8 +71,9 @@ def test_custom_centroids_bad_shape(use_kd_tree):
                    use_kd_tree=use_kd_tree)
 
 
-@pytest.mark.parametrize("method",
-                         ["random", "sobol", "scrambled_sobol", "halton"])
+@pytest.mark.parametrize(
+    "method",
+    ["random", "sobol", "scrambled_sobol", "halton", "minibatch_kmeans"])
 def test_alternative_centroids(method):
     archive = CVTArchive(
         solution_dim=10,
@@ -168,3 +169,228 @@ def test_chunked_calculation():
     correct_centroids = [0, 0, 1, 2, 3, 4, 5, 6, 7, 8]
 
     assert np.all(closest_centroids == correct_centroids)
+
+
+@pytest.mark.parametrize(
+    "centroid_index",
+    ["auto", "kd_tree", "brute_force", "gemm", "ivf", "graph"])
+def test_centroid_index(centroid_index):
+    centroids = [[-1, 1], [0, 1], [1, 1], [-1, 0], [0, 0], [1, 0], [-1, -1],
+                 [0, -1], [1, -1]]
+
+    # With these kwargs, the approximate indices search all the centroids.
+    kwargs = {
+        "auto": {},
+        "kd_tree": {},
+        "brute_force": {},
+        "gemm": {},
+        "ivf": {
+            "n_probe": 9
+        },
+        "graph": {
+            "ef": 9
+        },
+    }[centroid_index]
+    archive = CVTArchive(solution_dim=0,
+                         cells=9,
+                         ranges=[(-1, 1), (-1, 1)],
+                         custom_centroids=centroids,
+                         centroid_index=centroid_index,
+                         centroid_index_kwargs=kwargs)
+    measure_batch = [[-1, 1], [-1, .9], [-.1, 1], [.9, .9], [-.9, 0], [.1, 0],
+                     [1, 0], [-1, -.9], [.1, -.9], [.9, -.9]]
+
+    assert np.all(
+        archive.index_of(measure_batch) == [0, 0, 1, 2, 3, 4, 5, 6, 7, 8])
+
+
+def test_centroid_index_unknown():
+    with pytest.raises(ValueError):
+        CVTArchive(solution_dim=0,
+                   cells=9,
+                   ranges=[(-1, 1), (-1, 1)],
+                   samples=10,
+                   centroid_index="lsh")
+
+
+def test_minibatch_kmeans_custom_samples():
+    samples = np.random.default_rng(0).uniform(-1, 1, (1000, 2))
+    archive = CVTArchive(solution_dim=2,
+                         cells=20,
+                         ranges=[(-1, 1), (-1, 1)],
+                         samples=samples,
+                         centroid_method="minibatch_kmeans",
+                         k_means_kwargs={"batch_size": 100})
+
+    assert archive.centroids.shape == (20, 2)
+    assert np.all(archive.samples == samples)
+
+
+def test_minibatch_kmeans_too_few_samples():
+    with pytest.raises(RuntimeError):
+        CVTArchive(solution_dim=2,
+                   cells=20,
+                   ranges=[(-1, 1), (-1, 1)],
+                   samples=10,
+                   centroid_method="minibatch_kmeans")
+
+
+@pytest.mark.parametrize("centroid_method",
+                         ["kmeans", "minibatch_kmeans", "random"])
+def test_centroid_cache(tmp_path, centroid_method):
+    kwargs = {
+        "solution_dim": 2,
+        "cells": 20,
+        "ranges": [(-1, 1), (-1, 1)],
+        "samples": 1000,
+        "centroid_method": centroid_method,
+        "seed": 42,
+    }
+    archive = CVTArchive(**kwargs)
+    cached = [CVTArchive(**kwargs, centroid_cache=tmp_path) for _ in range(2)]
+
+    assert len(list(tmp_path.iterdir())) == 1
+    for other in cached:
+        assert np.all(other.centroids == archive.centroids)
+        if centroid_method == "kmeans":
+            assert np.all(other.samples == archive.samples)
+
+    # The archives draw the same random numbers whether or not the centroids
+    # were generated.
+    for other in [archive] + cached:
+        other.add_single([1, 2], 1.0, [0, 0])
+        other.add_single([3, 4], 2.0, [0.5, 0.5])
+    expected = archive.sample_elites(10)["solution"]
+    for other in cached:
+        assert np.all(other.sample_elites(10)["solution"] == expected)
+
+    # A different seed leads to a different entry.
+    CVTArchive(**{**kwargs, "seed": 1}, centroid_cache=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def grid_centroids_archive(**kwargs):
+    """Archive whose centroids lie on a 4x4 grid, so that the cells of the CVT
+    are squares. Index 4 * i + j is the cell in row i and column j."""
+    centroids = np.stack(np.meshgrid(np.arange(4), np.arange(4), indexing="ij"),
+                         axis=-1).reshape(-1, 2) + 0.5
+    return CVTArchive(solution_dim=2,
+                      cells=16,
+                      ranges=[(0, 4), (0, 4)],
+                      custom_centroids=centroids,
+                      **kwargs)
+
+
+def test_adjacency_delaunay():
+    archive = grid_centroids_archive(adjacency_method="delaunay")
+    adjacency = archive.adjacency
+
+    assert adjacency.shape == (16, 16)
+    assert (adjacency != adjacency.T).nnz == 0
+    assert not adjacency.diagonal().any()
+    # Cells sharing an edge are always adjacent. Diagonal cells only share a
+    # corner, and the Delaunay triangulation includes one of the two diagonals
+    # of each square.
+    assert adjacency[0, 1] and adjacency[0, 4] and adjacency[5, 9]
+    assert not adjacency[0, 2] and not adjacency[0, 8]
+    assert adjacency.nnz == 2 * (24 + 9)
+
+
+def test_adjacency_knn():
+    archive = grid_centroids_archive(adjacency_method="knn",
+                                     adjacency_neighbors=2)
+    adjacency = archive.adjacency
+
+    assert (adjacency != adjacency.T).nnz == 0
+    assert not adjacency.diagonal().any()
+    # Each centroid connects to at least its 2 nearest centroids.
+    assert np.all(adjacency.sum(axis=1) >= 2)
+    assert adjacency[0, 1] and adjacency[0, 4]
+
+
+def test_adjacency_bad_method():
+    with pytest.raises(ValueError):
+        grid_centroids_archive(adjacency_method="voronoi")
+
+
+def reference_neighbors(adjacency, index, hops):
+    """Finds the cells within the given number of hops with a breadth-first
+    search."""
+    found = {index}
+    frontier = {index}
+    for _ in range(hops):
+        frontier = {
+            j for i in frontier for j in adjacency[i].indices if j not in found
+        }
+        found |= frontier
+    return sorted(found - {index})
+
+
+@pytest.mark.parametrize("hops", [1, 2, 3])
+@pytest.mark.parametrize("adjacency_method", ["delaunay", "knn"])
+def test_neighbors(hops, adjacency_method):
+    archive = CVTArchive(solution_dim=2,
+                         cells=50,
+                         ranges=[(-1, 1), (-1, 1)],
+                         samples=1000,
+                         adjacency_method=adjacency_method,
+                         seed=42)
+    indices = [0, 7, 7, 49]
+    neighbors = archive.neighbors(indices, hops=hops)
+
+    assert len(neighbors) == len(indices)
+    for index, actual in zip(indices, neighbors):
+        assert actual.tolist() == reference_neighbors(archive.adjacency, index,
+                                                      hops)
+
+
+def test_neighbors_bad_hops():
+    archive = grid_centroids_archive()
+    with pytest.raises(ValueError):
+        archive.neighbors([0], hops=0)
+
+
+def test_occupied_neighbors():
+    archive = grid_centroids_archive(adjacency_method="knn",
+                                     adjacency_neighbors=2)
+    # Cells 1, 5, and 15.
+    archive.add([[1, 2], [3, 4], [5, 6]], [1.0, 2.0, 3.0],
+                [[0.5, 1.5], [1.5, 1.5], [3.5, 3.5]])
+
+    # Cell 0 is adjacent to cells 1 and 4 (its two nearest centroids), and
+    # cell 14 is not adjacent to cell 5.
+    occupied = archive.occupied_neighbors([0, 14])
+    assert occupied[0].tolist() == [1]
+    assert 15 in occupied[1] and 5 not in occupied[1]
+
+
+def test_voronoi():
+    archive = grid_centroids_archive()
+    vor = archive.voronoi()
+
+    assert len(vor.points) == 16 + 4
+    assert archive.voronoi() is vor
+    # Every cell is bounded.
+    for region_idx in vor.point_region[:16]:
+        region = vor.regions[region_idx]
+        assert len(region) > 0 and -1 not in region
+    assert np.allclose(
+        archive.voronoi(transpose_measures=True).points[:16],
+        np.flip(archive.centroids, axis=1))
+
+
+def test_adjacency_cache(tmp_path):
+    kwargs = {
+        "solution_dim": 2,
+        "cells": 20,
+        "ranges": [(-1, 1), (-1, 1)],
+        "samples": 1000,
+        "seed": 42,
+    }
+    archive = CVTArchive(**kwargs)
+    cached = [CVTArchive(**kwargs, centroid_cache=tmp_path) for _ in range(2)]
+
+    for other in cached:
+        assert (other.adjacency != archive.adjacency).nnz == 0
+    # One entry for the centroids and one for the adjacency.
+    assert len(list(tmp_path.iterdir())) == 2
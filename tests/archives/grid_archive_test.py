@@ -2,7 +2,7 @@
 import numpy as np
 import pytest
 
-from ribs.archives import AddStatus, GridArchive
+from ribs.archives import AddStatus, GridArchive, Int8Codec
 
 from .conftest import get_archive_data
 
@@ -701,6 +701,41 @@ def test_nonfinite_inputs(data):
         data.archive.index_of_single(data.measures)
 
 
+def test_sparse_archive():
+    archive = GridArchive(solution_dim=3,
+                          dims=[50] * 6,
+                          ranges=[(-1, 1)] * 6,
+                          sparse=True)
+    assert archive.cells == 50**6
+    assert archive.dtypes["index"] == np.int64
+
+    measures = [[0.9] * 6, [-0.9] * 6, [0.9] * 6]
+    add_info = archive.add([[1, 2, 3]] * 3, [1.0, 2.0, 3.0], measures)
+    assert np.all(add_info["status"] == [2, 2, 2])
+    assert len(archive) == 2
+    assert archive.stats.obj_max == 3.0
+
+    index = archive.index_of([[0.9] * 6])
+    assert index.dtype == np.int64
+    assert index[0] > np.iinfo(np.int32).max
+    assert np.all(archive.int_to_grid_index(index) == [[47] * 6])
+
+    occupied, data = archive.retrieve([[0.9] * 6, [0.0] * 6])
+    assert np.all(occupied == [True, False])
+    assert data["objective"][0] == 3.0
+
+
+def test_dense_archive_too_many_cells():
+    with pytest.raises(ValueError):
+        GridArchive(solution_dim=3, dims=[50] * 6, ranges=[(-1, 1)] * 6)
+    with pytest.raises(ValueError):
+        GridArchive(solution_dim=3,
+                    dims=[10, 20],
+                    ranges=[(-1, 1), (-2, 2)],
+                    sparse=True,
+                    shared_memory=True)
+
+
 def test_retessellate_bad_learning_rate():
     archive = GridArchive(
         solution_dim=3,
@@ -766,6 +801,45 @@ def test_retessellate_into_bigger_dims():
     )
 
 
+@pytest.mark.parametrize("single", [True, False], ids=["single", "batch"])
+def test_float32_objective_sum(single):
+    archive = GridArchive(solution_dim=1,
+                          dims=[100, 100],
+                          ranges=[(0, 1), (0, 1)],
+                          dtype=np.float32)
+    archive.add_single([0], 1e8, [0, 0])
+    # In float32, 1e8 + 1 rounds back to 1e8, so each of these additions would
+    # be lost if the sum of the objectives were kept in float32.
+    measures = np.stack(np.meshgrid(
+        np.arange(1, 33) / 100,
+        np.arange(1, 33) / 100),
+                        axis=-1).reshape(-1, 2)
+    for m in measures:
+        if single:
+            archive.add_single([0], 1.0, m)
+        else:
+            archive.add([[0]], [1.0], [m])
+
+    assert archive.stats.qd_score.dtype == np.float32
+    assert archive.stats.qd_score == np.float32(1e8 + len(measures))
+
+
+def test_retessellate_stats():
+    archive = GridArchive(solution_dim=3,
+                          dims=[2, 2],
+                          ranges=[(-1, 1), (-1, 1)])
+    archive.add([[1, 2, 3], [4, 5, 6]], [1.0, 2.0],
+                [[0.75, 0.75], [-0.75, -0.75]])
+    stats = archive.stats
+
+    archive.retessellate([4, 4])
+
+    assert archive.stats.num_elites == 2
+    assert archive.stats.qd_score == stats.qd_score
+    assert archive.stats.obj_mean == stats.obj_mean
+    assert archive.stats.coverage == 2 / 16
+
+
 def test_retessellate_into_smaller_dims():
     archive = GridArchive(
         solution_dim=3,
@@ -795,6 +869,45 @@ def test_retessellate_into_smaller_dims():
     )
 
 
+@pytest.mark.parametrize("threshold_transfer,expected", [
+    ("winner", 1.75),
+    ("max", 2.5),
+    ("min", 1.75),
+    ("mean", 2.125),
+    ("reset", 0.0),
+])
+def test_retessellate_threshold_transfer(threshold_transfer, expected):
+    archive = GridArchive(
+        solution_dim=3,
+        dims=[2, 2],
+        ranges=[(-1, 1), (-1, 1)],
+        learning_rate=0.5,
+        threshold_min=0.0,
+    )
+    # The first cell ends up with objective 3.0 and threshold 2.5, and the
+    # second with objective 3.5 and threshold 1.75.
+    archive.add_single([1, 2, 3], 4.0, [0.75, 0.75])
+    archive.add_single([1, 2, 3], 3.0, [0.75, 0.75])
+    archive.add_single([4, 5, 6], 3.5, [-0.75, -0.75])
+
+    with pytest.raises(ValueError):
+        archive.retessellate([1, 1])
+
+    archive.retessellate([1, 1], threshold_transfer=threshold_transfer)
+
+    assert len(archive) == 1
+    assert archive.data("objective")[0] == 3.5
+    assert archive.data("threshold")[0] == expected
+
+
+def test_retessellate_bad_threshold_transfer():
+    archive = GridArchive(solution_dim=3,
+                          dims=[2, 2],
+                          ranges=[(-1, 1), (-1, 1)])
+    with pytest.raises(ValueError):
+        archive.retessellate([4, 4], threshold_transfer="median")
+
+
 def test_scalar_solutions():
     archive = GridArchive(solution_dim=(),
                           dims=[10, 20],
@@ -821,6 +934,40 @@ def test_scalar_solutions():
     )
 
 
+def test_codec_solutions():
+    archive = GridArchive(
+        solution_dim=3,
+        dims=[10, 20],
+        ranges=[(-1, 1), (-2, 2)],
+        dtype={
+            "solution": Int8Codec(),
+            "objective": np.float32,
+            "measures": np.float32,
+        },
+    )
+    assert archive.dtypes["solution"] == np.float32
+
+    archive.add([[1, 2, 3], [-1, 0, 1]], [1.0, 2.0], [[0, 0], [0.5, 1.0]])
+    assert np.allclose(np.sort(archive.data("solution"), axis=0),
+                       [[-1, 0, 1], [1, 2, 3]],
+                       atol=1e-2)
+    assert archive.sample_elites(4)["solution"].dtype == np.float32
+
+
+def test_codec_objective_dtype():
+    with pytest.raises(ValueError):
+        GridArchive(
+            solution_dim=3,
+            dims=[10, 20],
+            ranges=[(-1, 1), (-2, 2)],
+            dtype={
+                "solution": np.float32,
+                "objective": Int8Codec(),
+                "measures": np.float32,
+            },
+        )
+
+
 def test_str_solutions():
     archive = GridArchive(
         solution_dim=(),
@@ -879,3 +1026,143 @@ def test_multi_dim_solutions():
         measures_batch=[[0, 0], [0.25, 0.25], [0.5, 0.5]],
         grid_indices_batch=[[5, 10], [6, 11], [7, 12]],
     )
+
+
+def test_memmap_reopen(tmp_path):
+    archive = GridArchive(solution_dim=3,
+                          dims=[10, 20],
+                          ranges=[(-1, 1), (-2, 2)],
+                          memmap_dir=tmp_path)
+    archive.add([[1, 2, 3], [4, 5, 6]], [1.0, 2.0], [[0, 0], [0.5, 0.5]])
+
+    reopened = GridArchive(solution_dim=3,
+                           dims=[10, 20],
+                           ranges=[(-1, 1), (-2, 2)],
+                           memmap_dir=tmp_path)
+
+    assert len(reopened) == 2
+    assert reopened.stats == archive.stats
+    assert np.all(reopened.best_elite["solution"] == [4, 5, 6])
+    occupied, data = reopened.retrieve([[0, 0]])
+    assert occupied[0]
+    assert np.all(data["solution"][0] == [1, 2, 3])
+
+
+def test_memmap_reopen_wrong_dims(tmp_path):
+    archive = GridArchive(solution_dim=3,
+                          dims=[10, 20],
+                          ranges=[(-1, 1), (-2, 2)],
+                          memmap_dir=tmp_path)
+    archive.add_single([1, 2, 3], 1.0, [0, 0])
+
+    with pytest.raises(ValueError):
+        GridArchive(solution_dim=3,
+                    dims=[10, 10],
+                    ranges=[(-1, 1), (-2, 2)],
+                    memmap_dir=tmp_path)
+
+
+def test_memmap_retessellate(tmp_path):
+    archive = GridArchive(solution_dim=3,
+                          dims=[10, 20],
+                          ranges=[(-1, 1), (-2, 2)],
+                          memmap_dir=tmp_path)
+    archive.add([[1, 2, 3], [4, 5, 6]], [1.0, 2.0], [[0, 0], [0.5, 0.5]])
+
+    archive.retessellate([20, 40])
+
+    assert archive.cells == 800
+    assert len(archive) == 2
+    reopened = GridArchive(solution_dim=3,
+                           dims=[20, 40],
+                           ranges=[(-1, 1), (-2, 2)],
+                           memmap_dir=tmp_path)
+    assert len(reopened) == 2
+
+
+def test_checkpoint_restore(tmp_path):
+    archive = GridArchive(solution_dim=3,
+                          dims=[10, 20],
+                          ranges=[(-1, 1), (-2, 2)])
+    archive.add_single([1, 2, 3], 1.0, [0, 0])
+    archive.checkpoint(tmp_path)
+    archive.add([[4, 5, 6], [7, 8, 9]], [2.0, 3.0], [[0.5, 0.5], [0, 0]])
+    archive.checkpoint(tmp_path)
+
+    restored = GridArchive(solution_dim=3,
+                           dims=[10, 20],
+                           ranges=[(-1, 1), (-2, 2)])
+    restored.restore(tmp_path)
+
+    assert len(restored) == 2
+    assert restored.stats == archive.stats
+    assert np.all(restored.best_elite["solution"] == [7, 8, 9])
+
+    # The restored archive continues logging to the same directory.
+    restored.add_single([1, 1, 1], 4.0, [-0.5, -0.5])
+    restored.checkpoint(tmp_path, compact=True)
+    archive.restore(tmp_path)
+    assert len(archive) == 3
+
+
+def test_checkpoint_retessellate(tmp_path):
+    archive = GridArchive(solution_dim=3,
+                          dims=[10, 20],
+                          ranges=[(-1, 1), (-2, 2)])
+    archive.checkpoint(tmp_path)
+    archive.add([[1, 2, 3], [4, 5, 6]], [1.0, 2.0], [[0, 0], [0.5, 0.5]])
+    archive.retessellate([20, 40])
+    archive.checkpoint(tmp_path)
+
+    restored = GridArchive(solution_dim=3,
+                           dims=[20, 40],
+                           ranges=[(-1, 1), (-2, 2)])
+    restored.restore(tmp_path)
+    assert len(restored) == 2
+
+    with pytest.raises(ValueError):
+        GridArchive(solution_dim=3, dims=[10, 20],
+                    ranges=[(-1, 1), (-2, 2)]).restore(tmp_path)
+
+
+def test_remove():
+    archive = GridArchive(solution_dim=3,
+                          dims=[10, 20],
+                          ranges=[(-1, 1), (-2, 2)])
+    archive.add([[1, 2, 3], [4, 5, 6]], [1.0, 2.0], [[0, 0], [0.5, 0.5]])
+
+    archive.remove(archive.index_of([[0.5, 0.5]]))
+
+    assert len(archive) == 1
+    assert archive.stats.obj_max == 1.0
+    assert archive.stats.num_elites == 1
+    assert np.all(archive.best_elite["solution"] == [1, 2, 3])
+    occupied, _ = archive.retrieve([[0.5, 0.5]])
+    assert not occupied[0]
+
+
+def test_from_records():
+    kwargs = {"solution_dim": 3, "dims": [10, 20], "ranges": [(-1, 1), (-2, 2)]}
+    archive = GridArchive(**kwargs, learning_rate=0.5, threshold_min=0.0)
+    archive.add([[1, 2, 3], [4, 5, 6]], [1.0, 2.0], [[0, 0], [0.5, 0.5]])
+    records = archive.to_records()
+
+    loaded = GridArchive.from_records(records,
+                                      **kwargs,
+                                      learning_rate=0.5,
+                                      threshold_min=0.0)
+    assert loaded.stats == archive.stats
+    for name, arr in archive.data().items():
+        assert np.all(loaded.data(name) == arr)
+
+    # Without the index and thresholds, the indices are computed from the
+    # measures, and the thresholds are the objectives.
+    loaded = GridArchive.from_records(
+        records[["solution", "objective", "measures"]], **kwargs)
+    assert np.all(loaded.data("index") == archive.data("index"))
+    assert np.all(loaded.data("threshold") == [1.0, 2.0])
+
+    with pytest.raises(ValueError):
+        GridArchive.from_records(records[["solution", "objective"]], **kwargs)
+    with pytest.raises(ValueError):
+        GridArchive.from_records(np.concatenate([records, records]), **kwargs)
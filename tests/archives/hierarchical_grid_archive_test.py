@@ -0,0 +1,280 @@
+"""Tests for the HierarchicalGridArchive."""
+import numpy as np
+import pytest
+
+from ribs.archives import GridArchive, HierarchicalGridArchive
+
+# pylint: disable = redefined-outer-name
+
+RESOLUTIONS = [[2, 3], [4, 3], [8, 6]]
+RANGES = [(-1, 1), (-1, 1)]
+
+
+@pytest.fixture
+def archive():
+    """Archive with three resolutions."""
+    return HierarchicalGridArchive(solution_dim=3,
+                                   resolutions=RESOLUTIONS,
+                                   ranges=RANGES,
+                                   seed=42)
+
+
+def add_random(archive, n_batches=5, batch_size=50, seed=0):
+    """Adds random batches to the archive and returns all data that was
+    added."""
+    rng = np.random.default_rng(seed)
+    batches = []
+    for _ in range(n_batches):
+        batch = {
+            "solution": rng.standard_normal((batch_size, 3)),
+            "objective": rng.standard_normal(batch_size),
+            "measures": rng.uniform(-1, 1, (batch_size, 2)),
+        }
+        archive.add(**batch)
+        batches.append(batch)
+    return {
+        name: np.concatenate([batch[name] for batch in batches])
+        for name in batches[0]
+    }
+
+
+def reference_archive(dims, data):
+    """GridArchive with the given dims holding the given data."""
+    reference = GridArchive(solution_dim=3, dims=dims, ranges=RANGES)
+    reference.add(**data)
+    return reference
+
+
+def assert_same_elites(archive, reference):
+    """Asserts that two archives hold the same elites."""
+    data = archive.data()
+    expected = reference.data()
+    order = np.argsort(data["index"])
+    expected_order = np.argsort(expected["index"])
+    for name, arr in expected.items():
+        assert np.allclose(data[name][order], arr[expected_order])
+
+
+@pytest.mark.parametrize("resolutions", [
+    [2, 3],
+    [[4, 4], [2, 2]],
+    [[2, 3], [3, 2]],
+    [[0, 2], [2, 2]],
+])
+def test_init_bad_resolutions(resolutions):
+    with pytest.raises(ValueError):
+        HierarchicalGridArchive(solution_dim=3,
+                                resolutions=resolutions,
+                                ranges=RANGES)
+
+
+def test_starts_at_coarsest(archive):
+    assert np.all(archive.dims == RESOLUTIONS[0])
+    assert np.all(archive.finest.dims == RESOLUTIONS[-1])
+    assert np.all(archive.resolutions == RESOLUTIONS)
+
+
+def test_finest_is_least_common_multiple():
+    archive = HierarchicalGridArchive(solution_dim=3,
+                                      resolutions=[[5, 2], [10, 3], [25, 3]],
+                                      ranges=RANGES)
+    assert np.all(archive.finest.dims == [50, 6])
+
+
+def test_resolutions_need_not_divide_each_other():
+    resolutions = [[2, 2], [3, 3], [5, 5]]
+    archive = HierarchicalGridArchive(solution_dim=3,
+                                      resolutions=resolutions,
+                                      ranges=RANGES)
+    data = add_random(archive)
+
+    for dims in resolutions:
+        archive.retessellate(dims)
+        reference = reference_archive(dims, data)
+        assert_same_elites(archive, reference)
+        assert archive.stats.num_elites == reference.stats.num_elites
+        assert np.isclose(archive.stats.qd_score, reference.stats.qd_score)
+    assert_same_elites(archive.finest, reference_archive([30, 30], data))
+
+
+def test_active_resolution_reads_finest(archive):
+    add_random(archive)
+    for dims in RESOLUTIONS:
+        archive.retessellate(dims)
+        # Elites are read from the finest archive, so the archive changes
+        # exactly when the finest archive changes.
+        assert archive.generation == archive.finest.generation
+        data = archive.data()
+        for name, arr in archive.level_elites(dims).items():
+            assert np.all(data[name] == arr)
+
+
+def test_changes_since(archive):
+    add_random(archive, seed=0)
+    _, token = archive.changes_since(None)
+    archive.add_single([1, 2, 3], 10.0, [0.9, 0.9])
+
+    changes, token = archive.changes_since(token, ["index", "objective"])
+    assert np.all(changes["index"] == archive.index_of([[0.9, 0.9]]))
+    assert np.all(changes["objective"] == 10.0)
+
+    # Tokens from another resolution are unknown.
+    archive.retessellate(RESOLUTIONS[1])
+    changes, _ = archive.changes_since(token)
+    assert changes is None
+
+
+def test_finest_holds_all_elites(archive):
+    data = add_random(archive)
+    assert_same_elites(archive.finest, reference_archive(RESOLUTIONS[-1], data))
+    assert_same_elites(archive, reference_archive(RESOLUTIONS[0], data))
+
+
+@pytest.mark.parametrize("level", [0, 1, 2])
+def test_retessellate_matches_grid_archive(archive, level):
+    data = add_random(archive)
+    archive.retessellate(RESOLUTIONS[level])
+
+    reference = reference_archive(RESOLUTIONS[level], data)
+    assert np.all(archive.dims == RESOLUTIONS[level])
+    assert np.allclose(archive.boundaries[0], reference.boundaries[0])
+    assert_same_elites(archive, reference)
+    assert archive.stats.num_elites == reference.stats.num_elites
+    assert np.isclose(archive.stats.qd_score, reference.stats.qd_score)
+    assert np.isclose(archive.best_elite["objective"],
+                      reference.best_elite["objective"])
+
+    # Switching back to a coarser resolution recovers the same elites.
+    archive.retessellate(RESOLUTIONS[0])
+    assert_same_elites(archive, reference_archive(RESOLUTIONS[0], data))
+
+
+def test_retessellate_unknown_resolution(archive):
+    with pytest.raises(ValueError):
+        archive.retessellate([3, 3])
+
+
+def test_add_after_retessellate(archive):
+    data = add_random(archive, seed=0)
+    archive.retessellate(RESOLUTIONS[1])
+    more_data = add_random(archive, seed=1)
+    all_data = {
+        name: np.concatenate([data[name], more_data[name]]) for name in data
+    }
+
+    for dims in RESOLUTIONS:
+        reference = reference_archive(dims, all_data)
+        stats = archive.level_stats(dims)
+        assert stats.num_elites == reference.stats.num_elites
+        assert np.isclose(stats.coverage, reference.stats.coverage)
+        assert np.isclose(stats.qd_score, reference.stats.qd_score)
+        assert np.isclose(stats.obj_max, reference.stats.obj_max)
+
+        elites = archive.level_elites(dims, ["index", "objective"])
+        expected = reference.data(["index", "objective"])
+        order = np.argsort(elites["index"])
+        assert np.all(elites["index"][order] == np.sort(expected["index"]))
+        assert np.allclose(elites["objective"][order],
+                           expected["objective"][np.argsort(expected["index"])])
+    assert_same_elites(archive, reference_archive(RESOLUTIONS[1], all_data))
+
+
+def test_add_single(archive):
+    archive.add_single([1, 2, 3], 1.0, [0.9, 0.9])
+    archive.add_single([4, 5, 6], 2.0, [0.6, 0.6])
+
+    assert len(archive) == 1
+    assert len(archive.finest) == 2
+    assert archive.level_stats(RESOLUTIONS[1]).num_elites == 1
+    assert archive.level_elites(RESOLUTIONS[1], "objective")[0] == 2.0
+
+
+def test_clear(archive):
+    add_random(archive)
+    archive.clear()
+
+    assert archive.empty
+    assert archive.finest.empty
+    for dims in RESOLUTIONS:
+        assert archive.level_stats(dims).num_elites == 0
+
+
+def test_remove(archive):
+    data = add_random(archive)
+    removed = archive.index_of([[0.5, 0.5]])
+    archive.remove(removed)
+
+    keep = archive.index_of(data["measures"]) != removed[0]
+    kept_data = {name: arr[keep] for name, arr in data.items()}
+    for dims in RESOLUTIONS:
+        archive.retessellate(dims)
+        assert_same_elites(archive, reference_archive(dims, kept_data))
+        assert archive.level_stats(dims).num_elites == len(archive)
+
+
+def test_snapshot(archive):
+    data = add_random(archive, seed=0)
+    snapshot = archive.snapshot()
+    add_random(archive, seed=1)
+
+    assert_same_elites(snapshot, reference_archive(RESOLUTIONS[0], data))
+    reference = reference_archive(RESOLUTIONS[1], data)
+    assert (snapshot.level_stats(
+        RESOLUTIONS[1]).num_elites == reference.stats.num_elites)
+
+
+def test_from_records(archive):
+    data = add_random(archive)
+    restored = HierarchicalGridArchive.from_records(
+        archive.finest.to_records(),
+        solution_dim=3,
+        resolutions=RESOLUTIONS,
+        ranges=RANGES,
+    )
+
+    assert_same_elites(restored, reference_archive(RESOLUTIONS[0], data))
+    assert_same_elites(restored.finest,
+                       reference_archive(RESOLUTIONS[-1], data))
+
+
+def test_checkpoint_and_restore(tmp_path, archive):
+    data = add_random(archive)
+    archive.retessellate(RESOLUTIONS[1])
+    archive.checkpoint(tmp_path)
+
+    restored = HierarchicalGridArchive(solution_dim=3,
+                                       resolutions=RESOLUTIONS,
+                                       ranges=RANGES)
+    restored.restore(tmp_path)
+
+    assert_same_elites(restored, reference_archive(RESOLUTIONS[0], data))
+    assert_same_elites(restored.finest,
+                       reference_archive(RESOLUTIONS[-1], data))
+
+
+@pytest.mark.parametrize("level", [0, 1, 2])
+def test_add_info_matches_grid_archive(archive, level):
+    data = add_random(archive, seed=0)
+    archive.retessellate(RESOLUTIONS[level])
+    reference = reference_archive(RESOLUTIONS[level], data)
+
+    rng = np.random.default_rng(1)
+    for _ in range(3):
+        batch = {
+            "solution": rng.standard_normal((50, 3)),
+            "objective": rng.standard_normal(50),
+            "measures": rng.uniform(-1, 1, (50, 2)),
+        }
+        add_info = archive.add(**batch)
+        expected = reference.add(**batch)
+        assert np.all(add_info["status"] == expected["status"])
+        assert np.allclose(add_info["value"], expected["value"])
+
+    single = archive.add_single([1, 2, 3], 10.0, [0.1, 0.1])
+    expected = reference.add_single([1, 2, 3], 10.0, [0.1, 0.1])
+    assert single["status"] == expected["status"]
+    assert np.isclose(single["value"], expected["value"])
+
+    assert_same_elites(archive, reference)
+    assert np.isclose(archive.stats.qd_score, reference.stats.qd_score)
+    assert archive.best_elite["objective"] == reference.best_elite["objective"]
@@ -0,0 +1,97 @@
+"""Tests for KDForest."""
+import numpy as np
+import pytest
+from scipy.spatial import cKDTree
+
+from ribs.archives._kd_forest import KDForest
+
+
+def assert_matches_kd_tree(forest, points, k, rng):
+    """Asserts that the forest finds the same neighbors as a cKDTree holding
+    the given points, where the id of each point is its key in the dict."""
+    k = min(k, len(points))
+    ids = np.array(sorted(points))
+    tree = cKDTree(np.array([points[i] for i in ids]))
+    queries = rng.random((20, 3))
+
+    dists, neighbor_ids = forest.query(queries, k=k)
+    expected_dists, expected_indices = tree.query(queries, k=k)
+    assert np.allclose(dists, expected_dists.reshape(20, k))
+    assert np.all(neighbor_ids == ids[expected_indices.reshape(20, k)])
+
+
+@pytest.mark.parametrize("k", [1, 5])
+def test_insert_and_remove(k):
+    rng = np.random.default_rng(42)
+    forest = KDForest(3, buffer_size=16, max_dead=4)
+    points = {}
+    next_id = 0
+    for step in range(100):
+        n = rng.integers(1, 40)
+        new_points = rng.random((n, 3))
+        new_ids = np.arange(next_id, next_id + n)
+        next_id += n
+        forest.insert(new_points, new_ids)
+        points.update(zip(new_ids, new_points))
+
+        if step % 3 == 2:
+            # Replace some points.
+            replaced = rng.choice(next_id, 5, replace=False)
+            forest.remove(replaced)
+            replaced_points = rng.random((5, 3))
+            forest.insert(replaced_points, replaced)
+            points.update(zip(replaced, replaced_points))
+
+        assert len(forest) == len(points)
+        assert_matches_kd_tree(forest, points, k, rng)
+
+    # The trees are merged, so there are only a few of them.
+    assert forest.n_trees <= np.log2(len(points) / 16) + 1
+
+
+def test_rebuild_and_clear():
+    rng = np.random.default_rng(42)
+    forest = KDForest(3, buffer_size=16)
+    forest.insert(rng.random((40, 3)), np.arange(40))
+
+    points = rng.random((50, 3))
+    forest.rebuild(points)
+    assert len(forest) == 50
+    assert forest.n_trees == 1
+    assert_matches_kd_tree(forest, dict(enumerate(points)), 3, rng)
+
+    forest.clear()
+    assert len(forest) == 0
+
+
+def test_copy():
+    rng = np.random.default_rng(42)
+    forest = KDForest(3, buffer_size=16)
+    forest.insert(rng.random((40, 3)), np.arange(40))
+    copy = forest.copy()
+
+    forest.remove([0, 1, 2])
+    forest.insert(rng.random((10, 3)), np.arange(40, 50))
+
+    assert len(copy) == 40
+    assert len(forest) == 47
+
+
+def test_remap():
+    rng = np.random.default_rng(42)
+    forest = KDForest(3, buffer_size=16, max_dead=64)
+    points = rng.random((40, 3))
+    forest.insert(points, np.arange(40))
+    copy = forest.copy()
+
+    # Remove every other point and renumber the rest, as in ArrayStore.compact.
+    removed = np.arange(0, 40, 2)
+    forest.remove(removed)
+    id_map = np.full(40, -1)
+    id_map[1::2] = np.arange(20)
+    forest.remap(id_map)
+
+    assert forest.n_trees == copy.n_trees
+    assert_matches_kd_tree(forest, dict(enumerate(points[1::2])), 3, rng)
+    # The copy keeps its ids.
+    assert_matches_kd_tree(copy, dict(enumerate(points)), 3, rng)
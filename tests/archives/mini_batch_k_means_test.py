@@ -0,0 +1,53 @@
+"""Tests for mini_batch_k_means."""
+import numpy as np
+import pytest
+
+from ribs.archives import mini_batch_k_means
+
+
+def batches(samples, batch_size):
+    """Splits samples into batches."""
+    for start in range(0, len(samples), batch_size):
+        yield samples[start:start + batch_size]
+
+
+def test_finds_clusters():
+    rng = np.random.default_rng(0)
+    means = np.array([[-5.0, -5.0], [0.0, 5.0], [5.0, -5.0]])
+    samples = (means[rng.integers(3, size=3000)] + 0.1 * rng.standard_normal(
+        (3000, 2)))
+    # Start with one sample from each cluster.
+    samples[:3] = means
+
+    centers = mini_batch_k_means(batches(samples, 100), 3)
+
+    assert centers.shape == (3, 2)
+    assert np.allclose(np.sort(centers, axis=0),
+                       np.sort(means, axis=0),
+                       atol=0.05)
+
+
+def test_early_stopping():
+    rng = np.random.default_rng(0)
+    read = []
+
+    def stream():
+        for _ in range(1000):
+            batch = rng.uniform(-1, 1, (100, 2))
+            read.append(batch)
+            yield batch
+
+    mini_batch_k_means(stream(), 10, max_no_improvement=3)
+    assert len(read) < 1000
+
+
+def test_ragged_batches():
+    samples = np.random.default_rng(0).uniform(-1, 1, (100, 3))
+    centers = mini_batch_k_means([samples[:3], samples[3:7], samples[7:]], 5)
+    assert centers.shape == (5, 3)
+    assert np.all(centers >= -1) and np.all(centers <= 1)
+
+
+def test_too_few_samples():
+    with pytest.raises(ValueError):
+        mini_batch_k_means(batches(np.zeros((5, 2)), 2), 10)
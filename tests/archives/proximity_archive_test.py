@@ -2,6 +2,7 @@
 import numpy as np
 import pytest
 from numpy.testing import assert_allclose, assert_equal
+from scipy.spatial import cKDTree
 
 from ribs.archives import AddStatus, ProximityArchive
 from tests.archives.conftest import get_archive_data
@@ -97,6 +98,180 @@ def test_initial_capacity_less_than_1():
         )
 
 
+def test_data_views():
+    archive = ProximityArchive(
+        solution_dim=3,
+        measure_dim=2,
+        k_neighbors=1,
+        novelty_threshold=1.0,
+        initial_capacity=1,
+    )
+    archive.add([[1, 2, 3]] * 3, None, [[0, 0], [0, 5], [0, 10]])
+    generation = archive.generation
+
+    data = archive.data(copy=False)
+
+    assert np.all(data["index"] == [0, 1, 2])
+    assert not data["solution"].flags.writeable
+    assert np.all(data["measures"] == archive.data("measures"))
+
+    archive.clear()
+    assert archive.generation != generation
+
+
+def test_checkpoint_restore(tmp_path):
+    archive = ProximityArchive(
+        solution_dim=3,
+        measure_dim=2,
+        k_neighbors=1,
+        novelty_threshold=1.0,
+        initial_capacity=1,
+    )
+    archive.checkpoint(tmp_path)
+    archive.add([[1, 2, 3]] * 3, [1.0, 2.0, 3.0], [[0, 0], [0, 5], [0, 10]])
+    archive.checkpoint(tmp_path)
+
+    restored = ProximityArchive(
+        solution_dim=3,
+        measure_dim=2,
+        k_neighbors=1,
+        novelty_threshold=1.0,
+    )
+    restored.restore(tmp_path)
+
+    assert len(restored) == 3
+    assert restored.capacity == archive.capacity
+    assert restored.stats == archive.stats
+    assert np.all(restored.compute_novelty([[0, 4]]) == [1.0])
+
+
+def test_remove():
+    archive = ProximityArchive(
+        solution_dim=3,
+        measure_dim=2,
+        k_neighbors=1,
+        novelty_threshold=1.0,
+    )
+    archive.add([[1, 2, 3]] * 4, [1.0, 2.0, 3.0, 4.0],
+                [[0, 0], [0, 5], [0, 10], [0, 15]])
+
+    index_map = archive.remove([1, 3])
+
+    assert np.all(index_map[:4] == [0, -1, 1, -1])
+    assert len(archive) == 2
+    assert np.all(archive.data("measures") == [[0, 0], [0, 10]])
+    assert archive.stats.obj_max == 3.0
+    assert np.all(archive.index_of([[0, 9], [0, 1]]) == [1, 0])
+
+    # New solutions are appended after the remaining ones.
+    archive.add_single([1, 2, 3], 5.0, [0, 20])
+    assert np.all(archive.data("index") == [0, 1, 2])
+
+
+@pytest.mark.parametrize("remove_best", [False, True])
+def test_remove_matches_new_archive(remove_best):
+    kwargs = {
+        "solution_dim": 3,
+        "measure_dim": 2,
+        "k_neighbors": 3,
+        "novelty_threshold": 0.01,
+    }
+    archive = ProximityArchive(**kwargs)
+    rng = np.random.default_rng(42)
+    for _ in range(5):
+        archive.add(rng.standard_normal((100, 3)), rng.standard_normal(100),
+                    rng.standard_normal((100, 2)))
+    archive.best_elite  # pylint: disable = pointless-statement
+
+    removed = rng.choice(len(archive), 50, replace=False)
+    best_index = archive.best_elite["index"]
+    removed = removed[removed != best_index]
+    if remove_best:
+        removed = np.append(removed, best_index)
+    records = archive.to_records()
+    keep = ~np.isin(archive.data("index"), removed)
+    archive.remove(removed)
+
+    expected = ProximityArchive.from_records(records[keep], **kwargs)
+    assert len(archive) == len(expected)
+    assert np.all(archive.data("measures") == expected.data("measures"))
+    assert np.isclose(archive.stats.qd_score, expected.stats.qd_score)
+    assert archive.stats.obj_max == expected.stats.obj_max
+    assert archive.best_elite["index"] == expected.best_elite["index"]
+
+    queries = rng.standard_normal((20, 2))
+    assert np.all(archive.index_of(queries) == expected.index_of(queries))
+    assert_allclose(archive.compute_novelty(queries),
+                    expected.compute_novelty(queries))
+
+
+def test_chunked_archive(tmp_path):
+    archive = ProximityArchive(
+        solution_dim=3,
+        measure_dim=2,
+        k_neighbors=1,
+        novelty_threshold=0.5,
+        initial_capacity=1,
+        block_size=2,
+    )
+    archive.checkpoint(tmp_path)
+    archive.add([[1, 2, 3]] * 5, [1.0, 2.0, 3.0, 4.0, 5.0],
+                np.stack((np.arange(5), np.arange(5)), axis=1))
+
+    assert archive.block_size == 2
+    assert archive.capacity == 8
+    assert np.all(archive.data("index") == [0, 1, 2, 3, 4])
+    assert np.all(archive.index_of([[2.1, 2.1]]) == [2])
+
+    index_map = archive.remove([1])
+    assert np.all(index_map[:5] == [0, -1, 1, 2, 3])
+    assert np.all(archive.data("objective") == [1.0, 3.0, 4.0, 5.0])
+
+    archive.checkpoint(tmp_path)
+    restored = ProximityArchive(
+        solution_dim=3,
+        measure_dim=2,
+        k_neighbors=1,
+        novelty_threshold=0.5,
+        block_size=2,
+    )
+    restored.restore(tmp_path)
+    assert restored.stats == archive.stats
+    assert np.all(restored.data("objective") == [1.0, 3.0, 4.0, 5.0])
+
+
+def test_chunked_archive_with_memmap(tmp_path):
+    with pytest.raises(ValueError):
+        ProximityArchive(
+            solution_dim=3,
+            measure_dim=2,
+            k_neighbors=1,
+            novelty_threshold=0.5,
+            block_size=2,
+            memmap_dir=tmp_path,
+        )
+
+
+def test_from_records():
+    kwargs = {
+        "solution_dim": 3,
+        "measure_dim": 2,
+        "k_neighbors": 1,
+        "novelty_threshold": 0.5,
+        "initial_capacity": 1,
+    }
+    archive = ProximityArchive(**kwargs)
+    archive.add([[1, 2, 3]] * 5, [1.0, 2.0, 3.0, 4.0, 5.0],
+                np.stack((np.arange(5), np.arange(5)), axis=1))
+
+    loaded = ProximityArchive.from_records(archive.to_records(), **kwargs)
+
+    assert loaded.capacity == 8
+    assert loaded.stats == archive.stats
+    assert_equal(loaded.data(), archive.data())
+    assert np.all(loaded.index_of([[2.1, 2.1]]) == [2])
+
+
 def test_resizing_with_add_one_at_a_time():
     archive = ProximityArchive(
         solution_dim=3,
@@ -812,3 +987,126 @@ def test_lc_add_batch_replace_same_cell():
     ])
     assert_equal(add_info["local_competition"], [1, 1, 2, 0])
     assert_allclose(add_info["value"], [1, 2, 3, 0])
+
+
+def test_memmap_reopen(tmp_path):
+    archive = ProximityArchive(solution_dim=3,
+                               measure_dim=2,
+                               k_neighbors=1,
+                               novelty_threshold=0.5,
+                               initial_capacity=1,
+                               memmap_dir=tmp_path)
+    archive.add([[1, 2, 3], [4, 5, 6], [7, 8, 9]], None,
+                [[0, 0], [1, 1], [2, 2]])
+
+    reopened = ProximityArchive(solution_dim=3,
+                                measure_dim=2,
+                                k_neighbors=1,
+                                novelty_threshold=0.5,
+                                initial_capacity=1,
+                                memmap_dir=tmp_path)
+
+    assert len(reopened) == 3
+    assert reopened.capacity == 4
+    assert np.all(reopened.index_of([[1.1, 1.1]]) == [1])
+
+    add_info = reopened.add([[0, 0, 0]], None, [[1, 1]])
+    assert add_info["status"][0] == 0
+
+
+def test_many_batches_match_kd_tree():
+    # The archive updates its k-D trees incrementally, so novelty must still be
+    # computed against all solutions after many additions.
+    archive = ProximityArchive(solution_dim=2,
+                               measure_dim=2,
+                               k_neighbors=3,
+                               novelty_threshold=0.01,
+                               workers=2)
+    rng = np.random.default_rng(42)
+    for _ in range(20):
+        measures = rng.random((50, 2))
+        archive.add(measures, None, measures)
+
+    measures = rng.random((30, 2))
+    dists, _ = cKDTree(archive.data("measures")).query(measures, k=3)
+    assert_allclose(archive.compute_novelty(measures), np.mean(dists, axis=1))
+
+
+def test_snapshot_after_add():
+    archive = ProximityArchive(solution_dim=2,
+                               measure_dim=2,
+                               k_neighbors=1,
+                               novelty_threshold=0.1)
+    archive.add([[0, 0]], None, [[0, 0]])
+    snapshot = archive.snapshot()
+    archive.add([[1, 1]], None, [[1, 1]])
+
+    assert len(snapshot) == 1
+    assert_allclose(snapshot.compute_novelty([[1, 1]]), [np.sqrt(2)])
+    assert_allclose(archive.compute_novelty([[1, 1]]), [0])
+
+
+def test_intra_batch_novelty_duplicates():
+    archive = ProximityArchive(solution_dim=2,
+                               measure_dim=2,
+                               k_neighbors=1,
+                               novelty_threshold=0.1,
+                               intra_batch_novelty=True)
+    measures = [[0, 0], [0, 0], [0.01, 0], [1, 1], [1, 1]]
+    add_info = archive.add(measures, None, measures)
+
+    # Only the first copy of each solution is added.
+    assert_equal(add_info["status"], [2, 0, 0, 2, 0])
+    assert_allclose(add_info["novelty"], [0.1, 0, 0.01, np.sqrt(2), 0])
+    assert len(archive) == 2
+
+
+def test_intra_batch_novelty_matches_add_single():
+    # The batch is large enough to be processed in multiple blocks.
+    rng = np.random.default_rng(42)
+    measures = rng.random((1500, 2))
+    kwargs = {
+        "solution_dim": 2,
+        "measure_dim": 2,
+        "k_neighbors": 3,
+        "novelty_threshold": 0.02,
+    }
+    archive = ProximityArchive(**kwargs, intra_batch_novelty=True)
+    archive.add(measures[:10], None, measures[:10])
+    add_info = archive.add(measures[10:], None, measures[10:])
+
+    # Adding the solutions one at a time gives the same result.
+    reference = ProximityArchive(**kwargs)
+    reference.add(measures[:10], None, measures[:10])
+    for i in range(10, len(measures)):
+        reference_info = reference.add_single(measures[i], None, measures[i])
+        assert add_info["status"][i - 10] == reference_info["status"][0]
+        assert_allclose(add_info["novelty"][i - 10],
+                        reference_info["novelty"][0])
+    assert_allclose(archive.data("measures"), reference.data("measures"))
+
+
+def test_intra_batch_novelty_with_local_competition():
+    with pytest.raises(ValueError):
+        ProximityArchive(solution_dim=2,
+                         measure_dim=2,
+                         k_neighbors=1,
+                         novelty_threshold=0.1,
+                         local_competition=True,
+                         intra_batch_novelty=True)
+
+
+def test_intra_batch_novelty_dtype():
+    archive = ProximityArchive(solution_dim=2,
+                               measure_dim=2,
+                               k_neighbors=1,
+                               novelty_threshold=0.1,
+                               intra_batch_novelty=True,
+                               dtype=np.float32)
+    measures = [[0, 0], [0.5, 0]]
+    add_info = archive.add(measures, None, measures)
+    assert add_info["novelty"].dtype == np.float32
+
+    add_info = archive.add([[1, 0]], None, [[1, 0]])
+    assert add_info["novelty"].dtype == np.float32
+    assert_allclose(add_info["novelty"], [0.5])
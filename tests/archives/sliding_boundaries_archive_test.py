@@ -172,3 +172,72 @@ def test_adds_solutions_from_old_archive():
     # The objective values from the previous archive should remain because they
     # are higher.
     assert (archive.data(["objective"], "tuple")[0] == 2).all()
+
+
+def test_remove(data):
+    archive = data.archive_with_elite
+    archive.add_single(data.solution, data.objective + 1.0, [0.9, 1.9])
+    archive.remove(archive.index_of_single(data.measures)[None])
+
+    assert len(archive) == 1
+    assert archive.stats.num_elites == 1
+    assert np.isclose(archive.stats.obj_max, data.objective + 1.0)
+    assert not archive.retrieve_single(data.measures)[0]
+
+
+def test_removed_elites_do_not_return_at_remap():
+    archive = SlidingBoundariesArchive(solution_dim=2,
+                                       dims=[10, 20],
+                                       ranges=[(-1, 1), (-2, 2)],
+                                       remap_frequency=10,
+                                       buffer_capacity=10)
+    measures = np.linspace(-0.8, 0.8, 10).reshape(5, 2)
+    archive.add(np.zeros((5, 2)), np.arange(5), measures)
+    archive.remove(archive.index_of(measures[[1, 3]]))
+    assert archive._buffer.size == 3  # pylint: disable = protected-access
+
+    # This remaps the archive.
+    archive.add(np.zeros((5, 2)), np.arange(5), np.full((5, 2), 0.1))
+
+    assert archive._buffer.size == 8  # pylint: disable = protected-access
+    for removed in measures[[1, 3]]:
+        assert not np.any(np.all(archive.data("measures") == removed, axis=1))
+
+
+def test_snapshot_keeps_boundaries():
+    archive = SlidingBoundariesArchive(solution_dim=2,
+                                       dims=[10, 20],
+                                       ranges=[(-1, 1), (-2, 2)],
+                                       remap_frequency=10,
+                                       buffer_capacity=10)
+    archive.add(np.zeros((5, 2)), np.arange(5), np.full((5, 2), 0.5))
+    snapshot = archive.snapshot()
+    boundaries = [np.copy(bound) for bound in snapshot.boundaries]
+
+    # This remaps the archive.
+    archive.add(np.zeros((5, 2)), np.arange(5), np.full((5, 2), 0.1))
+
+    assert len(snapshot) == 1
+    for bound, expected in zip(snapshot.boundaries, boundaries):
+        assert np.all(bound == expected)
+    assert snapshot.retrieve_single([0.5, 0.5])[0]
+    with pytest.raises(RuntimeError):
+        snapshot.add_single([0, 0], 10.0, [0.5, 0.5])
+    assert archive._buffer.size == 10  # pylint: disable = protected-access
+
+
+def test_from_records_not_supported(data):
+    with pytest.raises(NotImplementedError, match="SlidingBoundariesArchive"):
+        SlidingBoundariesArchive.from_records(
+            data.archive_with_elite.to_records(),
+            solution_dim=3,
+            dims=[10, 20],
+            ranges=[(-1, 1), (-2, 2)],
+        )
+
+
+def test_checkpoint_not_supported(tmp_path, data):
+    with pytest.raises(NotImplementedError, match="SlidingBoundariesArchive"):
+        data.archive_with_elite.checkpoint(tmp_path)
+    with pytest.raises(NotImplementedError, match="SlidingBoundariesArchive"):
+        data.archive.restore(tmp_path)
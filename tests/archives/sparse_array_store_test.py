@@ -0,0 +1,149 @@
+"""Tests for SparseArrayStore."""
+import pickle
+
+import numpy as np
+import pytest
+
+from ribs.archives import SparseArrayStore
+
+# pylint: disable = redefined-outer-name
+
+# More indices than fit in int32.
+CAPACITY = 50**6
+
+
+@pytest.fixture
+def store():
+    """Sparse store with more indices than fit in int32."""
+    return SparseArrayStore(
+        field_desc={
+            "objective": ((), np.float32),
+            "measures": ((2,), np.float32),
+        },
+        capacity=CAPACITY,
+    )
+
+
+def test_init_reserved_field():
+    with pytest.raises(ValueError):
+        SparseArrayStore({"_index": ((), np.int64)}, CAPACITY)
+
+
+def test_properties(store):
+    assert store.capacity == CAPACITY
+    assert store.field_list == ["objective", "measures"]
+    assert store.field_list_with_index == ["objective", "measures", "index"]
+    assert store.dtypes_with_index == {
+        "objective": np.float32,
+        "measures": np.float32,
+        "index": np.int64,
+    }
+
+
+def test_add_and_retrieve(store):
+    indices = [CAPACITY - 1, 3, 2**33]
+    store.add(
+        indices,
+        {
+            "objective": [1.0, 2.0, 3.0],
+            "measures": [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]],
+        },
+    )
+    assert len(store) == 3
+    # As in ArrayStore, each batch of new indices is added in increasing order.
+    assert np.all(store.occupied_list == np.sort(indices))
+
+    occupied, data = store.retrieve([3, 4, 2**33])
+    assert np.all(occupied == [True, False, True])
+    assert np.all(data["index"] == [3, 4, 2**33])
+    assert data["index"].dtype == np.int64
+    assert data["objective"][0] == 2.0
+    assert data["objective"][2] == 3.0
+
+    # Overwrites existing entries and handles duplicates.
+    store.add([3, 7, 7], {
+        "objective": [4.0, 5.0, 6.0],
+        "measures": [[0.0, 0.0]] * 3,
+    })
+    assert len(store) == 4
+    assert np.all(store.retrieve([3, 7], "objective")[1] == [4.0, 6.0])
+
+
+def test_add_out_of_range(store):
+    with pytest.raises(IndexError):
+        store.add([CAPACITY], {"objective": [1.0], "measures": [[0.0, 0.0]]})
+
+
+def test_grows(store):
+    indices = np.random.default_rng(42).choice(CAPACITY, 1000, replace=False)
+    for batch in np.split(indices, 10):
+        store.add(
+            batch,
+            {
+                "objective": batch.astype(np.float32),
+                "measures": np.zeros((len(batch), 2)),
+            },
+        )
+
+    assert len(store) == 1000
+    occupied, objective = store.retrieve(indices, "objective")
+    assert np.all(occupied)
+    assert np.all(objective == indices.astype(np.float32))
+
+
+def test_remove(store):
+    store.add([10, 20, 30, 40], {
+        "objective": [1.0, 2.0, 3.0, 4.0],
+        "measures": np.zeros((4, 2)),
+    })
+    store.remove([20, 40, 50])
+
+    assert len(store) == 2
+    assert np.all(store.occupied_list == [10, 30])
+    occupied, objective = store.retrieve([10, 20, 30], "objective")
+    assert np.all(occupied == [True, False, True])
+    assert objective[[0, 2]].tolist() == [1.0, 3.0]
+
+
+def test_clear_and_iterate(store):
+    store.add([5, 6], {"objective": [1.0, 2.0], "measures": np.zeros((2, 2))})
+    assert [entry["index"] for entry in store] == [5, 6]
+    assert list(next(iter(store))) == ["index", "objective", "measures"]
+
+    batches = list(store.iter_batches(1, "index"))
+    assert [list(batch) for batch in batches] == [[5], [6]]
+
+    store.clear()
+    assert len(store) == 0
+    assert not store.retrieve([5, 6])[0].any()
+
+
+def test_snapshot_and_pickle(store):
+    store.add([5, 6], {"objective": [1.0, 2.0], "measures": np.zeros((2, 2))})
+    snapshot = store.snapshot()
+    store.clear()
+
+    assert np.all(snapshot.data("index") == [5, 6])
+    with pytest.raises(RuntimeError):
+        snapshot.clear()
+
+    unpickled = pickle.loads(pickle.dumps(snapshot))
+    unpickled.add([7], {"objective": [3.0], "measures": [[0.0, 0.0]]})
+    assert np.all(unpickled.data("index") == [5, 6, 7])
+
+
+def test_log(tmp_path, store):
+    store.start_log(tmp_path)
+    store.add([2**33, 5], {
+        "objective": [1.0, 2.0],
+        "measures": np.zeros((2, 2)),
+    })
+    store.remove([5])
+    store.sync_log()
+
+    loaded = SparseArrayStore.load_log(tmp_path, CAPACITY)
+    assert np.all(loaded.occupied_list == [2**33])
+    assert loaded.retrieve([2**33], "objective")[1][0] == 1.0
+
+    with pytest.raises(ValueError):
+        SparseArrayStore.load_log(tmp_path, 100)
@@ -0,0 +1,100 @@
+"""Tests for Arrow export from ArrayStore and archives."""
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather
+import pyarrow.parquet
+import pytest
+
+from ribs.archives import ArrayStore, GridArchive
+
+# pylint: disable = redefined-outer-name
+
+
+@pytest.fixture
+def store():
+    """ArrayStore with scalar, 1D, and 2D fields."""
+    store = ArrayStore(
+        field_desc={
+            "objective": ((), np.float32),
+            "measures": ((2,), np.float32),
+            "grid": ((2, 3), np.int64),
+        },
+        capacity=10,
+    )
+    store.add(
+        [3, 4],
+        {
+            "objective": [1.0, 2.0],
+            "measures": [[1.0, 2.0], [3.0, 4.0]],
+            "grid": [np.zeros(
+                (2, 3)), np.arange(6).reshape(2, 3)],
+        },
+    )
+    return store
+
+
+def test_retrieve_arrow(store):
+    occupied, batch = store.retrieve([4, 3], return_type="arrow")
+
+    assert np.all(occupied == [True, True])
+    assert isinstance(batch, pa.RecordBatch)
+    assert batch.schema.names == ["objective", "measures", "grid", "index"]
+    assert batch.schema.field("measures").type == pa.list_(pa.float32(), 2)
+    assert batch.schema.field("grid").type == pa.list_(pa.list_(pa.int64(), 3),
+                                                       2)
+    assert batch.column("index").to_pylist() == [4, 3]
+    assert batch.column("measures").to_pylist() == [[3.0, 4.0], [1.0, 2.0]]
+    assert batch.column("grid").to_pylist()[0] == [[0, 1, 2], [3, 4, 5]]
+
+
+def test_data_arrow_zero_copy(store):
+    batch = store.data(return_type="arrow", copy=False)
+    objective = store.data("objective", copy=False)
+
+    # The column shares its buffer with the store.
+    assert (batch.column("objective").buffers()[1].address ==
+            objective.__array_interface__["data"][0])
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "feather"])
+def test_write_arrow(tmp_path, file_format):
+    archive = GridArchive(solution_dim=3,
+                          dims=[10, 20],
+                          ranges=[(-1, 1), (-2, 2)])
+    archive.add(
+        np.arange(30).reshape(10, 3), np.arange(10),
+        np.stack([np.linspace(-1, 1, 10), np.zeros(10)], axis=1))
+    path = tmp_path / f"archive.{file_format}"
+
+    archive.write_arrow(path,
+                        fields=["objective", "solution"],
+                        file_format=file_format,
+                        chunk_size=3)
+
+    if file_format == "parquet":
+        table = pyarrow.parquet.read_table(path)
+    else:
+        table = pyarrow.feather.read_table(path)
+    assert table.schema.names == ["objective", "solution"]
+    assert table.num_rows == len(archive)
+    assert np.all(
+        np.sort(table.column("objective").to_numpy()) == np.sort(
+            archive.data("objective")))
+
+
+def test_write_arrow_empty(tmp_path):
+    archive = GridArchive(solution_dim=3,
+                          dims=[10, 20],
+                          ranges=[(-1, 1), (-2, 2)])
+    path = tmp_path / "archive.feather"
+
+    archive.write_arrow(path, file_format="feather")
+
+    table = pyarrow.feather.read_table(path)
+    assert table.num_rows == 0
+    assert "solution" in table.schema.names
+
+
+def test_write_arrow_invalid_format(tmp_path, store):
+    with pytest.raises(ValueError):
+        store.write_arrow(tmp_path / "store.csv", file_format="csv")
@@ -84,6 +84,30 @@ def test_default_ask_dqd_has_correct_sol_shape(shape):
     assert emitter.ask_dqd().shape == expected_shape
 
 
+class OldSampleElitesArchive(GridArchive):
+    """Archive whose sample_elites does not accept fields and out."""
+
+    def sample_elites(self, n):  # pylint: disable = arguments-differ
+        return super().sample_elites(n)
+
+
+@pytest.mark.parametrize("emitter_type", ["GaussianEmitter", "IsoLineEmitter"])
+def test_ask_with_old_sample_elites(emitter_type):
+    archive = OldSampleElitesArchive(solution_dim=4,
+                                     dims=[10, 10],
+                                     ranges=[(-1, 1), (-1, 1)])
+    archive.add_single(np.ones(4), 1, [0, 0])
+    if emitter_type == "GaussianEmitter":
+        emitter = GaussianEmitter(archive, sigma=0, x0=np.zeros(4))
+    else:
+        emitter = IsoLineEmitter(archive,
+                                 iso_sigma=0,
+                                 line_sigma=0,
+                                 x0=np.zeros(4))
+
+    assert np.all(emitter.ask() == 1)
+
+
 #
 # tell()
 #